@@ -0,0 +1,220 @@
+"""
+Admission control for uploads and job processing.
+
+Under a spike, every accepted upload spools to disk and every accepted
+``/process`` call holds a worker thread (and OpenAI rate limit) for the whole
+pipeline, so past some point accepting more work only makes all of it slower.
+``AdmissionMiddleware`` admits these requests through a ``Gate`` each, before
+the request body is read:
+
+- Uploads (``POST /jobs``): at most MAX_CONCURRENT_UPLOADS at once; the rest
+  are rejected straight away (their bodies would otherwise be spooled first).
+- Processing (``POST /jobs/{job_id}/process``): at most MAX_INFLIGHT_JOBS run
+  at once and up to MAX_QUEUED_JOBS wait, in order, on the event loop (not on a
+  worker thread). A job still queued after ADMISSION_QUEUE_TIMEOUT_SECONDS is
+  turned away.
+
+A request the queue has no room for gets a 429; one that timed out in the
+queue gets a 503. Both carry ``Retry-After``: the time the work ahead of it
+takes to drain at the completion rate observed over the last DRAIN_WINDOW_SECONDS
+(or, before anything has completed there, the mean duration so far). A limit
+of 0 means unlimited. ``admission_stats()`` is reported by ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.api.responses import FastJSONResponse
+from backend.core import config
+
+logger = logging.getLogger(__name__)
+
+DRAIN_WINDOW_SECONDS = 300.0
+DEFAULT_RETRY_AFTER_SECONDS = 5
+
+
+class AdmissionRejected(Exception):
+    """The gate turned the request away; retry after `retry_after` seconds."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Gate:
+    """
+    A concurrency limit with a bounded FIFO wait queue, for one event loop.
+
+    Limits are read from config on every call (callables), so they can be
+    changed at runtime and in tests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_active: Callable[[], int],
+        max_queued: Callable[[], int] = lambda: 0,
+    ) -> None:
+        self.name = name
+        self._max_active = max_active
+        self._max_queued = max_queued
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._completions: Deque[float] = deque()  # Monotonic finish times within the drain window
+        self._total_seconds = 0.0
+        self.stats = {"admitted": 0, "completed": 0, "rejected": 0, "timed_out": 0}
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """Take a slot, waiting in the queue if allowed; returns the start time to pass to `release`."""
+        limit = self._max_active()
+        if limit <= 0 or (self.active < limit and not self._waiters):
+            self.active += 1
+            return self._admit()
+
+        if self.queued >= max(self._max_queued(), 0):
+            self.stats["rejected"] += 1
+            raise AdmissionRejected(
+                429, f"Too many {self.name} requests in progress; try again later", self.retry_after(),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.stats["timed_out"] += 1
+            raise AdmissionRejected(
+                503, f"Timed out waiting for a {self.name} slot; try again later", self.retry_after(),
+            ) from None
+        except asyncio.CancelledError:  # Client went away while queued
+            self._abandon(waiter)
+            raise
+        return self._admit()  # The releasing request handed its slot over
+
+    def release(self, started: float) -> None:
+        now = time.monotonic()
+        self._total_seconds += now - started
+        self.stats["completed"] += 1
+        self._completions.append(now)
+        self._hand_over()
+
+    def _hand_over(self) -> None:
+        """Give a freed slot to the longest-waiting request, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def drain_rate(self) -> float:
+        """Completions per second over the last DRAIN_WINDOW_SECONDS (0.0 when none)."""
+        cutoff = time.monotonic() - DRAIN_WINDOW_SECONDS
+        while self._completions and self._completions[0] < cutoff:
+            self._completions.popleft()
+        return len(self._completions) / DRAIN_WINDOW_SECONDS
+
+    def retry_after(self) -> int:
+        """Seconds until the work ahead of a new request (the queue, plus one) is expected to drain."""
+        rate = self.drain_rate()
+        if rate > 0:
+            seconds = (self.queued + 1) / rate
+        elif self.stats["completed"]:
+            # Nothing finished recently: assume each queued request takes the mean duration
+            mean = self._total_seconds / self.stats["completed"]
+            seconds = mean * (self.queued + 1) / max(self._max_active(), 1)
+        else:
+            seconds = DEFAULT_RETRY_AFTER_SECONDS
+        return max(1, min(math.ceil(seconds), config.ADMISSION_RETRY_AFTER_MAX_SECONDS))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_active": self._max_active(),
+            "max_queued": self._max_queued(),
+            **self.stats,
+            "drain_rate_per_minute": round(self.drain_rate() * 60, 2),
+            "retry_after_seconds": self.retry_after(),
+        }
+
+    def _admit(self) -> float:
+        self.stats["admitted"] += 1
+        return time.monotonic()
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        if waiter.done() and not waiter.cancelled():
+            self._hand_over()  # A slot was handed over just as the wait ended: pass it on
+
+
+UPLOADS = Gate("upload", lambda: config.MAX_CONCURRENT_UPLOADS)
+PROCESSING = Gate("processing", lambda: config.MAX_INFLIGHT_JOBS, lambda: config.MAX_QUEUED_JOBS)
+
+# (method, path) -> gate and how long a request may queue for it
+_ROUTES = (
+    ("POST", re.compile(r"^/jobs/?$"), UPLOADS, None),
+    ("POST", re.compile(r"^/jobs/[^/]+/process/?$"), PROCESSING, "ADMISSION_QUEUE_TIMEOUT_SECONDS"),
+)
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Queue depth, limits and admission counters per gate."""
+    return {"enabled": config.ADMISSION_CONTROL, "uploads": UPLOADS.snapshot(), "processing": PROCESSING.snapshot()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a gate slot for the whole request (see the module docstring)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self._match(scope) if scope["type"] == "http" and config.ADMISSION_CONTROL else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        gate, timeout_setting = route
+        timeout = getattr(config, timeout_setting) if timeout_setting else None
+        try:
+            started = await gate.acquire(timeout=timeout if timeout and timeout > 0 else None)
+        except AdmissionRejected as exc:
+            logger.warning(
+                "Rejected %s %s (%d, retry after %ds)", scope["method"], scope["path"], exc.status_code, exc.retry_after,
+            )
+            response = FastJSONResponse(
+                {"detail": exc.detail}, status_code=exc.status_code, headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(started)
+
+    @staticmethod
+    def _match(scope: Scope):
+        for method, pattern, gate, timeout_setting in _ROUTES:
+            if scope["method"] == method and pattern.match(scope["path"]):
+                return gate, timeout_setting
+        return None
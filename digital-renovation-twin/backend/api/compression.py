@@ -0,0 +1,192 @@
+"""
+Compressed API responses.
+
+``CompressionMiddleware`` compresses text-like responses (JSON, HTML,
+JavaScript, CSS, SVG, plain text) of at least RESPONSE_COMPRESSION_MIN_BYTES
+with the best encoding the client accepts: brotli when the optional ``brotli``
+package is installed, gzip otherwise. Responses that are already encoded
+(cold-tier reports), partial (206) or of other media types (PDFs, photos, GLB
+meshes) pass through untouched, so Range requests keep their byte offsets.
+A strong ``ETag`` on a compressed response is made weak: the encoded bytes are
+not the identity representation, so they must not satisfy strong comparisons
+(If-Range), while weak ones (If-None-Match revalidation) still match.
+Bodies of THREAD_MIN_BYTES or more are compressed on a worker thread, off the
+event loop.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core import config
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore
+
+THREAD_MIN_BYTES = 128 * 1024
+
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+})
+
+
+def is_compressible(media_type: str) -> bool:
+    """Whether a response of this media type (no parameters) is worth compressing."""
+    return (
+        media_type in COMPRESSIBLE_TYPES
+        or media_type.startswith("text/")
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def available_encodings() -> List[str]:
+    """Content codings the server can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str, available: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Pick the content coding for an Accept-Encoding header (RFC 9110 12.5.3), or None for identity.
+
+    The highest q-value wins; ties go to the order of `available`.
+    """
+    available = available_encodings() if available is None else available
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best: Optional[Tuple[float, int]] = None
+    chosen = None
+    for rank, coding in enumerate(available):
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > 0 and (best is None or (weight, -rank) > best):
+            best, chosen = (weight, -rank), coding
+    return chosen
+
+
+class _Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=config.RESPONSE_BROTLI_QUALITY)
+            self._process: Callable[[bytes], bytes] = compressor.process
+            self._finish: Callable[[], bytes] = compressor.finish
+        else:
+            compressor = zlib.compressobj(config.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)  # gzip framing
+            self._process, self._finish = compressor.compress, compressor.flush
+
+    def compress(self, chunk: bytes, *, last: bool) -> bytes:
+        data = self._process(chunk)
+        return data + self._finish() if last else data
+
+    def compress_all(self, body: bytes) -> bytes:
+        return self.compress(body, last=True)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses (see the module docstring)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not config.RESPONSE_COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await _Responder(self.app, encoding)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, encoding: Optional[str]) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.send: Send = None  # type: ignore[assignment]
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            eligible = (
+                message["status"] not in (204, 206, 304)
+                and "content-encoding" not in headers
+                and is_compressible(media_type)
+            )
+            if eligible:
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            if not eligible or self.encoding is None:
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start = message  # Held until the first body chunk shows the size
+            return
+        if self.passthrough or kind != "http.response.body":
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < config.RESPONSE_COMPRESSION_MIN_BYTES:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]  # Streamed: the compressed length isn't known yet
+            else:
+                body = await self._compress_all(body)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        body = self.compressor.compress(body, last=not more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _compress_all(self, body: bytes) -> bytes:
+        if len(body) >= THREAD_MIN_BYTES:
+            return await anyio.to_thread.run_sync(self.compressor.compress_all, body)
+        return self.compressor.compress_all(body)
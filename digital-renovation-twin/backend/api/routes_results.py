@@ -1,57 +1,55 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import zlib
 from pathlib import Path
 
-from fastapi import APIRouter, Header, HTTPException
-from fastapi.responses import FileResponse
-from typing import Optional
+from fastapi import APIRouter, Body, Header, HTTPException
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from ..core.config import PIPELINE_VERSION, REPORTS_DIR
+from ..core.artifacts import GZIP_SUFFIX, read_json
+from ..core.config import PIPELINE_VERSION
 from ..database import (
-    delete_all_job_records,
-    delete_job_record,
-    list_job_records,
+    async_list_job_records,
+    tombstone_all_job_records,
+    tombstone_job_records,
     update_job_record,
 )
 from ..services import job_metadata
 from ..services.analyzers import get_damage_analyzer
 from ..services.cost_estimation import generate_cost_estimate
+from ..services.cost_scenarios import evaluate_scenarios, job_damage_columns, parse_scenarios
 from ..services.image_validation import ImageValidationError, validate_job_images
-from ..services.pdf_generator import generate_pdf_report
+from ..services.mesh_packaging import load_lod_manifest, lod_level, package_reconstruction
+from ..services.portfolio_report import load_portfolio_inputs, portfolio_job_ids, stream_portfolio_report
+from ..services.reclaimer import request_reclaim
+from ..services.report_cache import ensure_report
 from ..services.reconstruction_service import submit_reconstruction_job
 from ..services.risk_scoring import compute_risk_summary
+from ..services.storage import ObjectInfo, StorageBackend, get_storage, report_key
+from .responses import FastJSONRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
-@router.get("/jobs")
-def list_jobs():
-    """
-    List all jobs with their status and metrics.
-    
-    Returns jobs from both file-based metadata and database,
-    preferring database records when available.
-    """
-    # Try database first for richer data
-    try:
-        db_jobs = list_job_records()
-        if db_jobs:
-            # Enrich with file-based data for uploaded_files
-            for job in db_jobs:
-                try:
-                    meta = job_metadata.load_metadata(job["job_id"])
-                    job["uploaded_files"] = meta.get("uploaded_files", [])
-                except FileNotFoundError:
-                    job["uploaded_files"] = []
-            return db_jobs
-    except Exception as exc:
-        logger.warning("Database unavailable, falling back to file metadata: %s", exc)
-    
-    # Fall back to file-based metadata
+def _attach_uploaded_files(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Enrich database rows with the uploaded file list from job metadata."""
+    for job in jobs:
+        try:
+            meta = job_metadata.load_metadata(job["job_id"])
+            job["uploaded_files"] = meta.get("uploaded_files", [])
+        except FileNotFoundError:
+            job["uploaded_files"] = []
+    return jobs
+
+
+def _list_jobs_from_metadata() -> List[Dict[str, Any]]:
+    """Build the job listing from file-based metadata only."""
     jobs = job_metadata.list_jobs()
     response = []
     for meta in jobs:
@@ -60,10 +58,7 @@ def list_jobs():
         estimated_cost = None
         if cost_path:
             try:
-                cost_file = Path(cost_path)
-                if cost_file.exists():
-                    with cost_file.open("r", encoding="utf-8") as fp:
-                        estimated_cost = json.load(fp).get("total_cost")
+                estimated_cost = read_json(Path(cost_path)).get("total_cost")
             except (json.JSONDecodeError, OSError):
                 estimated_cost = None
         response.append(
@@ -82,6 +77,27 @@ def list_jobs():
     return response
 
 
+@router.get("/jobs")
+async def list_jobs():
+    """
+    List all jobs with their status and metrics.
+    
+    Returns jobs from both file-based metadata and database,
+    preferring database records when available.
+    """
+    # Try database first for richer data
+    try:
+        db_jobs = await async_list_job_records()
+        if db_jobs:
+            # Enrich with file-based data for uploaded_files (file I/O stays off the event loop)
+            return await asyncio.to_thread(_attach_uploaded_files, db_jobs)
+    except Exception as exc:
+        logger.warning("Database unavailable, falling back to file metadata: %s", exc)
+    
+    # Fall back to file-based metadata
+    return await asyncio.to_thread(_list_jobs_from_metadata)
+
+
 @router.get("/jobs/{job_id}")
 def get_job(job_id: str):
     if not job_metadata.job_exists(job_id):
@@ -107,7 +123,8 @@ def process_job(
     3. AI damage detection (uses OpenAI if API key provided, otherwise mock)
     4. Cost estimation
     5. Risk scoring
-    6. PDF report generation
+    
+    The PDF report is rendered on its first download (see report_cache).
     
     Headers:
         X-OpenAI-API-Key: Optional OpenAI API key for real AI analysis
@@ -151,6 +168,13 @@ def process_job(
             or reconstruction_data.get("viewer_url")
             or reconstruction_data.get("mesh_workspace_path")
         )
+
+        # Level-of-detail GLBs for the 3D viewer; the viewer is optional, so failures don't fail the job
+        mesh_lods_path = None
+        try:
+            mesh_lods_path = package_reconstruction(job_id, reconstruction_data)
+        except (ValueError, OSError) as mesh_exc:
+            logger.warning("Mesh packaging failed for job %s: %s", job_id, mesh_exc)
         
         # Step 2: Damage detection using configured analyzer
         # If user provides API key, use OpenAI; otherwise use configured default (mock)
@@ -182,24 +206,29 @@ def process_job(
             risk_path = None
             risk_data = None
 
-        # Step 5: PDF report generation
-        report_path = generate_pdf_report(job_id)
-        
-        # Update file-based metadata with outputs
+        # Update file-based metadata with outputs. A reconstruction still running in
+        # the background (external API) fills in its own results when it settles.
+        reconstruction_outputs = {
+            "reconstruction_engine": reconstruction_data.get("engine"),
+            "reconstruction_workspace": reconstruction_data.get("mesh_workspace_path"),
+            "reconstruction_cached_from": reconstruction_data.get("cached_from"),
+        }
+        if reconstruction_data.get("status") != "submitted":
+            reconstruction_outputs.update(
+                viewer_url=reconstruction_data.get("viewer_url"),
+                reconstruction_job=reconstruction_data.get("job_reference"),
+                asset_url=reconstruction_data.get("asset_url"),
+                asset_local_path=reconstruction_data.get("asset_local_path"),
+                reconstruction_error=reconstruction_data.get("error"),
+                mesh_lods=str(mesh_lods_path) if mesh_lods_path else None,
+            )
         job_metadata.update_outputs(
             job_id,
             mesh=str(mesh_reference) if mesh_reference else None,
             damages=str(damages_path),
             cost=str(cost_path),
             risk=str(risk_path) if risk_path else None,
-            report=str(report_path),
-            viewer_url=reconstruction_data.get("viewer_url"),
-            reconstruction_job=reconstruction_data.get("job_reference"),
-            reconstruction_engine=reconstruction_data.get("engine"),
-            reconstruction_workspace=reconstruction_data.get("mesh_workspace_path"),
-            asset_url=reconstruction_data.get("asset_url"),
-            asset_local_path=reconstruction_data.get("asset_local_path"),
-            reconstruction_error=reconstruction_data.get("error"),
+            **reconstruction_outputs,
         )
         
         # Update file-based metadata with final status
@@ -243,25 +272,216 @@ def process_job(
 
 
 @router.get("/jobs/{job_id}/report.pdf")
-def download_report(job_id: str):
+def download_report(
+    job_id: str,
+    accept_encoding: str = Header("", alias="Accept-Encoding"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
+):
+    """
+    Download the job's PDF report, rendering it first if its inputs changed.
+    
+    The ETag is the digest of the report inputs, so `If-None-Match` revalidation
+    answers 304 until the job is re-processed or renamed. Single byte ranges are
+    supported on the uncompressed report.
+    """
+    if not job_metadata.job_exists(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
     try:
-        metadata = job_metadata.load_metadata(job_id)
+        digest = ensure_report(job_id)
     except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=404, detail="Report not ready")
+
+    storage = get_storage()
+    key = report_key(job_id)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{job_id}.pdf"',
+        "Cache-Control": "no-cache",
+    }
 
-    report_path_str = metadata.get("outputs", {}).get("report")
-    report_path = Path(report_path_str) if report_path_str else REPORTS_DIR / f"{job_id}.pdf"
+    info = storage.stat(key)
+    if info is not None:
+        etag = f'"{digest}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={**headers, "ETag": etag})
+        headers.update({"ETag": etag, "Accept-Ranges": "bytes"})
+        if range_header and (if_range is None or if_range == etag):
+            return _object_response(storage, info, headers, range_header)
+        return _object_response(storage, info, headers)
 
-    if not report_path.exists():
+    # Cold-tier report: send the gzip bytes as-is when the client accepts them
+    cold_info = storage.stat(key + GZIP_SUFFIX)
+    if cold_info is None:
         raise HTTPException(status_code=404, detail="Report not ready")
+    headers["Vary"] = "Accept-Encoding"
+    gzip_ok = "gzip" in accept_encoding.lower()
+    # The gzip bytes are a different representation, so they get their own ETag
+    etag = f'"{digest}-gzip"' if gzip_ok else f'"{digest}"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    headers["ETag"] = etag
+    if gzip_ok:
+        return _object_response(storage, cold_info, {**headers, "Content-Encoding": "gzip"})
+    return StreamingResponse(_gunzip(storage.iter_bytes(cold_info.key)), media_type="application/pdf", headers=headers)
+
+
+@router.get("/jobs/{job_id}/mesh")
+def mesh_levels(job_id: str):
+    """
+    The job's 3D model as GLB levels of detail, coarsest first.
+    
+    A viewer renders level 0 (a few hundred kilobytes) straight away and then
+    fetches the finer levels' `url`s in order.
+    """
+    if not job_metadata.job_exists(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        manifest = load_lod_manifest(job_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Mesh not ready")
+    levels = [
+        {key: value for key, value in entry.items() if key != "file"} | {"url": f"/jobs/{job_id}/mesh/{entry['level']}.glb"}
+        for entry in manifest["levels"]
+    ]
+    return {"job_id": job_id, "source": manifest.get("source"), "levels": levels}
 
-    return FileResponse(
-        path=report_path,
+
+@router.get("/jobs/{job_id}/mesh/{level}.glb")
+def mesh_level(job_id: str, level: int, if_none_match: Optional[str] = Header(None, alias="If-None-Match")):
+    """One GLB level of detail; its ETag is the file's SHA-256, so revalidation answers 304."""
+    if not job_metadata.job_exists(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        path, digest = lod_level(job_id, level)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Mesh level not found")
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Mesh level not found")
+    return FileResponse(path, media_type="model/gltf-binary", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match header, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) of a single `bytes=` range, end inclusive; None to send the whole object.
+    
+    Raises ValueError if the range lies entirely past the end of the object.
+    Malformed headers and multi-range requests are ignored.
+    """
+    units, _, spec = range_header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last) or not (first + last).isdigit():
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts past the end of the object")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _object_response(
+    storage: StorageBackend,
+    info: ObjectInfo,
+    headers: Dict[str, str],
+    range_header: Optional[str] = None,
+):
+    """
+    Serve a stored PDF: sendfile for whole local files, a streamed body otherwise.
+    
+    `range_header` is only passed when the caller has checked If-Range, and is
+    answered here for every backend rather than left to FileResponse, whose
+    Range support depends on the Starlette version.
+    """
+    local_path = storage.local_path(info.key)
+    if local_path is not None and range_header is None:
+        return FileResponse(path=local_path, media_type="application/pdf", headers=headers)
+    if range_header is not None:
+        try:
+            byte_range = _parse_range(range_header, info.size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{info.size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                storage.iter_bytes(info.key, start=start, length=end - start + 1),
+                status_code=206,
+                media_type="application/pdf",
+                headers={
+                    **headers,
+                    "Content-Length": str(end - start + 1),
+                    "Content-Range": f"bytes {start}-{end}/{info.size}",
+                },
+            )
+    return StreamingResponse(
+        storage.iter_bytes(info.key),
         media_type="application/pdf",
-        filename=f"{job_id}.pdf",
+        headers={**headers, "Content-Length": str(info.size)},
     )
 
 
+def _gunzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+@router.post("/jobs/{job_id}/cost-scenarios")
+def cost_scenarios(
+    job_id: str,
+    scenarios: List[Dict[str, Any]] = Body(...),
+    base_currency: str = Body("USD"),
+):
+    """
+    Compare a job's repair cost under several rate tables without writing anything.
+    
+    Each scenario is ``{"name", "currency", "exchange_rate", "rates"}`` where
+    `rates` overrides RATE_TABLE entries (``{"crack": 25}`` or
+    ``{"crack": {"rate": 25, "unit": "meter"}}``) and `exchange_rate` converts
+    the scenario's currency into `base_currency`. Returns the line items and a
+    cost per item and total for every scenario.
+    """
+    if not job_metadata.job_exists(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        parsed = parse_scenarios(scenarios)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        columns = job_damage_columns(job_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail="Job has no damages yet")
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return evaluate_scenarios(columns, parsed, base_currency=base_currency)
+
+
 @router.post("/jobs/{job_id}/verify-images")
 def verify_images(job_id: str):
     if not job_metadata.job_exists(job_id):
@@ -289,36 +509,99 @@ def rename_job(job_id: str, label: str):
 
 @router.delete("/jobs/{job_id}")
 def delete_job(job_id: str):
-    """Delete a job and all its associated files."""
+    """
+    Delete a job and all its associated files.
+    
+    The job is tombstoned and hidden immediately; its uploads, reconstructions
+    and report are removed by the background reclaimer.
+    """
     if not job_metadata.job_exists(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Delete from file system
-    success = job_metadata.delete_job(job_id)
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to delete job")
-    
-    # Delete from database
+    # Tombstone in database
     try:
-        delete_job_record(job_id)
+        tombstone_job_records([job_id])
     except Exception as exc:
-        logger.warning("Failed to delete DB record for job %s: %s", job_id, exc)
+        logger.warning("Failed to tombstone DB record for job %s: %s", job_id, exc)
+    
+    # Hide from file system listings
+    if not job_metadata.tombstone_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
     
+    request_reclaim()
     logger.info("Deleted job %s", job_id)
     return {"message": "Job deleted successfully", "job_id": job_id}
 
 
+@router.post("/jobs/batch-delete")
+def batch_delete_jobs(job_ids: List[str] = Body(..., embed=True)):
+    """Delete several jobs in one request; unknown IDs are reported, not fatal."""
+    requested = list(dict.fromkeys(job_ids))
+    existing = [
+        job_id for job_id in requested
+        if job_metadata.is_valid_job_id(job_id) and job_metadata.job_exists(job_id)
+    ]
+    
+    try:
+        tombstone_job_records(existing)
+    except Exception as exc:
+        logger.warning("Failed to tombstone DB records for batch delete: %s", exc)
+    
+    deleted = [job_id for job_id in existing if job_metadata.tombstone_job(job_id)]
+    deleted_ids = set(deleted)
+    not_found = [job_id for job_id in requested if job_id not in deleted_ids]
+    
+    request_reclaim()
+    logger.info("Batch deleted %d jobs", len(deleted))
+    return {
+        "message": f"Deleted {len(deleted)} job(s)",
+        "deleted": deleted,
+        "not_found": not_found,
+        "deleted_count": len(deleted),
+    }
+
+
+@router.post("/jobs/portfolio-report")
+def portfolio_report(job_ids: Optional[List[str]] = Body(None, embed=True)):
+    """
+    Stream one PDF covering several jobs: a summary table, then a section per building.
+    
+    Defaults to every completed job. Sections are laid out in worker processes
+    (PORTFOLIO_WORKERS) and the PDF is sent as pages are finished.
+    """
+    requested = portfolio_job_ids() if job_ids is None else list(dict.fromkeys(job_ids))
+    if not requested:
+        raise HTTPException(status_code=400, detail="No jobs to report on")
+    not_found = [
+        job_id for job_id in requested
+        if not (job_metadata.is_valid_job_id(job_id) and job_metadata.job_exists(job_id))
+    ]
+    if not_found:
+        raise HTTPException(status_code=404, detail=f"Jobs not found: {', '.join(not_found)}")
+    try:
+        buildings = load_portfolio_inputs(requested)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    
+    return StreamingResponse(
+        stream_portfolio_report(buildings),
+        media_type="application/pdf",
+        headers={"Content-Disposition": 'attachment; filename="portfolio.pdf"'},
+    )
+
+
 @router.delete("/jobs")
 def delete_all_jobs():
     """Delete all jobs from both file system and database."""
-    # Delete from file system
-    count = job_metadata.delete_all_jobs()
-    
-    # Delete from database
+    # Tombstone in database
     try:
-        delete_all_job_records()
+        tombstone_all_job_records()
     except Exception as exc:
-        logger.warning("Failed to delete all DB records: %s", exc)
+        logger.warning("Failed to tombstone all DB records: %s", exc)
+    
+    # Move the whole uploads directory aside in one rename
+    count = job_metadata.tombstone_all_jobs()
     
+    request_reclaim()
     logger.info("Deleted %d jobs", count)
     return {"message": f"Deleted {count} job(s)", "deleted_count": count}
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 from pathlib import Path
@@ -5,12 +6,14 @@ from typing import List
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 
-from backend.core.config import UPLOADS_DIR, ensure_data_directories
-from backend.database import create_job_record
+from backend.api.responses import FastJSONRoute
+from backend.core.config import ensure_data_directories
+from backend.database import async_create_job_record
 from backend.services import job_metadata
+from backend.services.storage import get_storage, upload_key
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/jobs", status_code=201)
@@ -18,7 +21,7 @@ async def create_job(label: str | None = Form(None), files: List[UploadFile] = F
     """
     Create a new job by uploading facade images.
     
-    - Saves images to data/uploads/{job_id}/
+    - Streams images into object storage (see services.storage)
     - Creates job metadata file
     - Creates database record for dashboard
     """
@@ -27,16 +30,15 @@ async def create_job(label: str | None = Form(None), files: List[UploadFile] = F
 
     ensure_data_directories()
     job_id = str(uuid.uuid4())
-    job_dir = UPLOADS_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+    storage = get_storage()
 
     saved_filenames = []
     for upload in files:
         filename = Path(upload.filename).name
-        file_path = job_dir / filename
-        content = await upload.read()
-        with file_path.open("wb") as f:
-            f.write(content)
+        # Copy from the spooled upload in chunks, off the event loop
+        await asyncio.to_thread(
+            storage.put, upload_key(job_id, filename), upload.file, content_type=upload.content_type
+        )
         saved_filenames.append(filename)
 
     # Create file-based metadata
@@ -44,7 +46,7 @@ async def create_job(label: str | None = Form(None), files: List[UploadFile] = F
     
     # Create database record
     try:
-        create_job_record(job_id, label=label, file_count=len(saved_filenames))
+        await async_create_job_record(job_id, label=label, file_count=len(saved_filenames))
     except Exception as exc:
         logger.warning("Failed to create DB record for job %s: %s", job_id, exc)
     
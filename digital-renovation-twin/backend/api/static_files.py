@@ -0,0 +1,194 @@
+"""
+Static serving of the built frontend (single-page app).
+
+``StaticSite`` walks STATIC_DIR once, at startup, into a manifest of every file:
+its media type, strong ETag (SHA-256 of the contents) and compressed variants.
+Requests are answered from the manifest alone; nothing is looked up on disk
+per request, and paths that aren't in the manifest can't reach the filesystem.
+
+- Variants: ``name.br`` / ``name.gz`` siblings written at build time by
+  ``precompress`` (``python -m backend.cli precompress-static``) are served to
+  clients that accept them. Small text files without siblings are compressed
+  once, in memory, when the manifest is built.
+- Caching: Vite fingerprints everything under ``assets/`` (``index-B2x8s_9Q.js``),
+  so those files are cached for a year as immutable and never revalidated.
+  Everything else (``index.html``) is ``no-cache``: browsers revalidate it with
+  If-None-Match and get a 304 without a body.
+- Files up to MEMORY_MAX_BYTES, and their variants, are held in memory.
+
+Unknown paths get ``index.html`` (client-side routing), except under
+``assets/``, where a missing bundle is a 404 rather than HTML.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi.responses import FileResponse, Response
+
+from backend.api.compression import brotli, is_compressible, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIRNAME = "assets"
+INDEX_FILENAME = "index.html"
+MEMORY_MAX_BYTES = 1024 * 1024
+PRECOMPRESS_MIN_BYTES = 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Precompressed siblings, most preferred first
+VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class Representation:
+    """One encoding of a static file: on disk, and in memory when small."""
+
+    path: Path
+    stat: os.stat_result
+    body: Optional[bytes] = None
+
+
+@dataclass
+class StaticAsset:
+    media_type: str
+    etag: str  # Of the identity representation; variants append their encoding
+    cache_control: str
+    representations: Dict[Optional[str], Representation] = field(default_factory=dict)  # None = identity
+
+    @property
+    def encodings(self) -> List[str]:
+        return [encoding for encoding in VARIANT_SUFFIXES if encoding in self.representations]
+
+
+def _media_type(path: Path) -> str:
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _worth_compressing(path: Path, size: int) -> bool:
+    return size >= PRECOMPRESS_MIN_BYTES and is_compressible(_media_type(path).partition(";")[0])
+
+
+def _encodings() -> List[str]:
+    return [encoding for encoding in VARIANT_SUFFIXES if encoding != "br" or brotli is not None]
+
+
+def precompress(root: Path) -> int:
+    """
+    Write ``.br`` (with the brotli package) and ``.gz`` siblings of the compressible files under `root`.
+
+    Siblings newer than their file are kept; a variant that isn't smaller is
+    not written. Returns the number of files written.
+    """
+    written = 0
+    variant_suffixes = tuple(VARIANT_SUFFIXES.values())
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.name.endswith(variant_suffixes):
+            continue
+        stat = path.stat()
+        if not _worth_compressing(path, stat.st_size):
+            continue
+        data = None
+        for encoding in _encodings():
+            target = path.with_name(path.name + VARIANT_SUFFIXES[encoding])
+            if target.exists() and target.stat().st_mtime >= stat.st_mtime:
+                continue
+            data = path.read_bytes() if data is None else data
+            compressed = _compress(data, encoding)
+            if len(compressed) < len(data):
+                target.write_bytes(compressed)
+                written += 1
+    return written
+
+
+def build_manifest(root: Path) -> Dict[str, StaticAsset]:
+    """Map each file's path under `root` (POSIX, no leading slash) to its StaticAsset."""
+    manifest: Dict[str, StaticAsset] = {}
+    variant_suffixes = tuple(VARIANT_SUFFIXES.values())
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.name.endswith(variant_suffixes):
+            continue
+        name = path.relative_to(root).as_posix()
+        stat = path.stat()
+        data = path.read_bytes() if stat.st_size <= MEMORY_MAX_BYTES else None
+        if data is not None:
+            digest = hashlib.sha256(data).hexdigest()
+        else:
+            with path.open("rb") as fp:
+                digest = hashlib.file_digest(fp, "sha256").hexdigest()
+        immutable = name.startswith(ASSETS_DIRNAME + "/")
+        asset = StaticAsset(
+            media_type=_media_type(path),
+            etag=f'"{digest}"',
+            cache_control=IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            representations={None: Representation(path, stat, data)},
+        )
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file() and variant.stat().st_mtime >= stat.st_mtime:
+                variant_stat = variant.stat()
+                body = variant.read_bytes() if variant_stat.st_size <= MEMORY_MAX_BYTES else None
+                asset.representations[encoding] = Representation(variant, variant_stat, body)
+            elif data is not None and encoding in _encodings() and _worth_compressing(path, stat.st_size):
+                compressed = _compress(data, encoding)
+                if len(compressed) < len(data):
+                    asset.representations[encoding] = Representation(path, stat, compressed)
+        manifest[name] = asset
+    return manifest
+
+
+class StaticSite:
+    """Serves a built single-page app from its manifest (see the module docstring)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.manifest = build_manifest(root)
+        logger.info("Serving %d static files from %s", len(self.manifest), root)
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """The asset served for a request path: the file, or index.html for client-side routes."""
+        name = path.strip("/")
+        asset = self.manifest.get(name or INDEX_FILENAME)
+        if asset is None and not name.startswith(ASSETS_DIRNAME + "/"):
+            asset = self.manifest.get(INDEX_FILENAME)
+        return asset
+
+    def response(self, path: str, accept_encoding: str = "", if_none_match: Optional[str] = None) -> Response:
+        asset = self.lookup(path)
+        if asset is None:
+            return Response(status_code=404)
+
+        encoding = negotiate_encoding(accept_encoding, asset.encodings) if asset.encodings else None
+        etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control}
+        if asset.encodings:
+            headers["Vary"] = "Accept-Encoding"
+        if if_none_match and any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        representation = asset.representations[encoding]
+        if representation.body is not None:
+            return Response(representation.body, media_type=asset.media_type, headers=headers)
+        return FileResponse(
+            representation.path, media_type=asset.media_type, headers=headers, stat_result=representation.stat,
+        )
@@ -0,0 +1 @@
+"""Performance benchmarks for the Digital Renovation Twin backend."""
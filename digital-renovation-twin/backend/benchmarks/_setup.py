@@ -0,0 +1,34 @@
+"""Shared setup for benchmarks: isolate all data under a temporary directory."""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+
+def use_temp_data_dir() -> Path:
+    """
+    Redirect data directories and the database to a fresh temp directory.
+
+    Must be called before the benchmark imports any backend module.
+    """
+    temp_path = Path(tempfile.mkdtemp(prefix="drt-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{temp_path / 'bench.db'}"
+
+    from backend.core import config
+
+    config.DATA_DIR = temp_path
+    config.UPLOADS_DIR = temp_path / "uploads"
+    config.RECONSTRUCTIONS_DIR = temp_path / "reconstructions"
+    config.REPORTS_DIR = temp_path / "reports"
+    config.TMP_DIR = temp_path / "tmp"
+    config.TRASH_DIR = temp_path / "trash"
+    config.ensure_data_directories()
+    return temp_path
+
+
+def quiet_logging() -> None:
+    """Silence per-request INFO logs that would dominate benchmark timings."""
+    logging.getLogger().setLevel(logging.WARNING)
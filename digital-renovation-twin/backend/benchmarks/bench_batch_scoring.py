@@ -0,0 +1,104 @@
+"""
+Benchmark: batch rescoring (batch_scoring) vs per-job risk and cost scoring.
+
+1. In memory: builds DamageColumns for --jobs synthetic jobs of --damages
+   damages each, then times score_risk() + estimate_costs() over all of them.
+2. On disk: writes --sample jobs' damages.json and times compute_risk_summary()
+   + generate_cost_estimate() per job against rescore_jobs() over the same
+   jobs (both read and write every file), checking the files match.
+
+Usage:
+    python -m backend.benchmarks.bench_batch_scoring --jobs 100000 --damages 40 --sample 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from backend.benchmarks._setup import quiet_logging, use_temp_data_dir
+
+TYPES = ["crack", "spalling", "water_damage", "moisture", "discoloration", "corrosion", "efflorescence"]
+SEVERITIES = ["low", "medium", "high"]
+
+
+def _damages(rng: random.Random, count: int) -> list:
+    damages = []
+    for _ in range(count):
+        damage = {"type": rng.choice(TYPES), "severity": rng.choice(SEVERITIES), "confidence": round(rng.random(), 2)}
+        if rng.random() < 0.5:
+            damage["approx_length_m"] = round(rng.uniform(0.1, 5.0), 2)
+        else:
+            damage["approx_area_m2"] = round(rng.uniform(0.1, 8.0), 2)
+        damages.append(damage)
+    return damages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100_000, help="Jobs scored in memory")
+    parser.add_argument("--damages", type=int, default=40, help="Damages per job")
+    parser.add_argument("--sample", type=int, default=2000, help="Jobs written to disk for the end-to-end comparison")
+    args = parser.parse_args()
+
+    use_temp_data_dir()
+    quiet_logging()
+
+    from backend.core.job_paths import job_reconstruction_dir
+    from backend.services.batch_scoring import build_damage_columns, estimate_costs, rescore_jobs, score_risk
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.damage_records import DamageRecord
+    from backend.services.risk_scoring import compute_risk_summary
+
+    rng = random.Random(42)
+    jobs = [(f"job-{index:06d}", _damages(rng, args.damages)) for index in range(args.jobs)]
+
+    start = time.perf_counter()
+    columns = build_damage_columns((job_id, map(DamageRecord.from_dict, damages)) for job_id, damages in jobs)
+    built = time.perf_counter()
+    score_risk(columns)
+    estimate_costs(columns)
+    scored = time.perf_counter()
+    print(f"{args.jobs:,} jobs, {columns.damage_count:,} damages in memory")
+    print(f"  build columns     {built - start:>8.2f} s")
+    print(f"  score risk + cost {scored - built:>8.2f} s  ({args.jobs / (scored - built):,.0f} jobs/s)")
+
+    sample = jobs[:args.sample]
+    for job_id, damages in sample:
+        recon_dir = job_reconstruction_dir(job_id)
+        recon_dir.mkdir(parents=True)
+        (recon_dir / "damages.json").write_text(json.dumps({"job_id": job_id, "damages": damages}))
+    job_ids = [job_id for job_id, _ in sample]
+
+    def outputs() -> list:
+        return [
+            ((job_reconstruction_dir(job_id) / "risk_summary.json").read_bytes(),
+             (job_reconstruction_dir(job_id) / "cost_estimate.json").read_bytes())
+            for job_id in job_ids
+        ]
+
+    start = time.perf_counter()
+    for job_id in job_ids:
+        compute_risk_summary(job_id)
+        generate_cost_estimate(job_id)
+    per_job = time.perf_counter() - start
+    expected = outputs()
+
+    start = time.perf_counter()
+    result = rescore_jobs(job_ids)
+    batch = time.perf_counter() - start
+
+    print()
+    print(f"{len(job_ids):,} jobs on disk (read damages, write both files)")
+    print(f"  per job           {per_job:>8.2f} s  ({len(job_ids) / per_job:,.0f} jobs/s)")
+    print(
+        f"  batch             {batch:>8.2f} s  ({len(job_ids) / batch:,.0f} jobs/s; load {result['load_seconds']:.2f}"
+        f" / score {result['score_seconds']:.2f} / write {result['write_seconds']:.2f})"
+    )
+    print(f"  identical files:  {'yes' if outputs() == expected else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
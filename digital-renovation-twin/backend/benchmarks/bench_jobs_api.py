@@ -0,0 +1,88 @@
+"""
+Benchmark: requests/sec for POST /jobs and GET /jobs under concurrent clients.
+
+Runs the FastAPI app in-process (httpx ASGI transport) twice:
+- threads: async helpers delegate to the blocking SQLAlchemy helpers on worker threads
+           (the behaviour before the async engine existed)
+- async:   async helpers use the aiosqlite engine
+
+Usage:
+    python -m backend.benchmarks.bench_jobs_api --clients 200 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from backend.benchmarks._setup import quiet_logging, use_temp_data_dir
+
+
+async def _run_concurrent(clients: int, total: int, make_request) -> float:
+    """Issue `total` requests from `clients` concurrent workers; return requests/sec."""
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        for _ in remaining:
+            response = await make_request()
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return total / (time.perf_counter() - start)
+
+
+async def _bench_mode(app, clients: int, total: int) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def post_job():
+            return await client.post(
+                "/jobs",
+                data={"label": "bench"},
+                files=[("files", ("facade.jpg", b"\xff\xd8\xff\xe0bench", "image/jpeg"))],
+            )
+
+        async def get_jobs():
+            return await client.get("/jobs")
+
+        post_rps = await _run_concurrent(clients, total, post_job)
+        # Listing cost grows with table size; keep the GET phase bounded
+        get_rps = await _run_concurrent(clients, max(total // 4, clients), get_jobs)
+    return {"post_jobs_rps": post_rps, "get_jobs_rps": get_rps}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="POST /jobs requests per mode")
+    args = parser.parse_args()
+
+    use_temp_data_dir()
+
+    from backend import database
+    from backend.core import config
+    from backend.main import app
+
+    quiet_logging()
+    config.ADMISSION_CONTROL = False  # Measure the database path, not upload load shedding
+
+    results = {}
+    for mode in ("threads", "async"):
+        database.ASYNC_DATABASE_ENABLED = mode == "async"
+        database.delete_all_job_records()
+        results[mode] = asyncio.run(_bench_mode(app, args.clients, args.requests))
+        if database._async_engine is not None:
+            asyncio.run(database._async_engine.dispose())
+            database._async_engine = None
+            database._AsyncSessionLocal = None
+
+    print(f"{'mode':<10} {'POST /jobs req/s':>18} {'GET /jobs req/s':>18}")
+    for mode, stats in results.items():
+        print(f"{mode:<10} {stats['post_jobs_rps']:>18.1f} {stats['get_jobs_rps']:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: serialization CPU time and bytes on the wire for a GET /jobs listing.
+
+Encodes a synthetic listing of --jobs jobs (database rows plus uploaded file
+names, as GET /jobs returns them) the way FastAPI does by default
+(jsonable_encoder + JSONResponse) and the way FastJSONRoute does (dumps), then
+compresses the body with each encoding CompressionMiddleware can negotiate.
+
+Usage:
+    python -m backend.benchmarks.bench_json_responses --jobs 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+def _listing(rng: random.Random, count: int) -> list:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    jobs = []
+    for index in range(count):
+        created = start + timedelta(minutes=17 * index)
+        completed = rng.random() < 0.9
+        jobs.append({
+            "job_id": uuid.UUID(int=rng.getrandbits(128)).hex,
+            "label": f"Building {index} – façade survey",
+            "created_at": created.isoformat(),
+            "updated_at": (created + timedelta(minutes=3)).isoformat(),
+            "status": "completed" if completed else "failed",
+            "building_health_grade": rng.choice("ABCDE") if completed else None,
+            "overall_risk_score": round(rng.uniform(0, 100), 1) if completed else None,
+            "overall_severity_index": round(rng.uniform(0, 1), 4) if completed else None,
+            "total_estimated_cost": round(rng.uniform(1_000, 250_000), 2) if completed else None,
+            "pipeline_version": "1.0.0",
+            "error": None if completed else "Damage analysis failed: timeout",
+            "file_count": rng.randint(2, 40),
+            "uploaded_files": [f"IMG_{rng.randint(1000, 9999)}.jpg" for _ in range(rng.randint(2, 12))],
+        })
+    return jobs
+
+
+def _time(fn, repeat: int) -> tuple:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10_000, help="Jobs in the listing")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (the best is reported)")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from backend.api.compression import _Compressor, available_encodings
+    from backend.api.responses import FastJSONResponse, orjson
+
+    jobs = _listing(random.Random(42), args.jobs)
+
+    default_time, default_body = _time(lambda: JSONResponse(jsonable_encoder(jobs)).body, args.repeat)
+    fast_time, fast_body = _time(lambda: FastJSONResponse(jobs).body, args.repeat)
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"GET /jobs listing of {args.jobs:,} jobs")
+    print(f"  {'jsonable_encoder + json':<28} {default_time * 1000:>8.1f} ms  {len(default_body):>11,} bytes")
+    print(f"  {'dumps via ' + encoder:<28} {fast_time * 1000:>8.1f} ms  {len(fast_body):>11,} bytes"
+          f"  ({default_time / fast_time:.1f}x faster)")
+
+    print("On the wire")
+    print(f"  {'identity':<28} {'':>11}  {len(fast_body):>11,} bytes")
+    for encoding in available_encodings():
+        seconds, body = _time(lambda: _Compressor(encoding).compress_all(fast_body), args.repeat)
+        print(f"  {encoding:<28} {seconds * 1000:>8.1f} ms  {len(body):>11,} bytes"
+              f"  ({len(fast_body) / len(body):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
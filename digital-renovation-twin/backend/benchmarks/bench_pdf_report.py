@@ -0,0 +1,135 @@
+"""
+Benchmark: bytes and build time per PDF report for each PDFBuilder output mode.
+
+Lays out the same mock-pipeline report (compose_report) and renders it with:
+- original:  uncompressed PDF 1.4, every graphics state operator repeated
+             (the builder's output before compression existed)
+- dedupe:    uncompressed, repeated color/width/font operators dropped
+- flate:     dedupe + FlateDecode content streams (the default)
+- objstm:    flate + PDF 1.5 object stream and cross-reference stream
+
+Then lays out one long document (--pages) both buffered (render) and streamed
+(stream_pdf), reporting time to the first byte, total time and peak traced memory.
+
+Usage:
+    python -m backend.benchmarks.bench_pdf_report --jobs 20 --images 40 --repeat 5 --pages 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from backend.benchmarks._setup import quiet_logging, use_temp_data_dir
+
+MODES = {
+    "original": {"compress": False, "dedupe_state": False},
+    "dedupe": {"compress": False},
+    "flate": {},
+    "objstm": {"object_streams": True},
+}
+
+
+def _make_jobs(count: int, images: int) -> list:
+    from backend.core.job_paths import job_upload_dir
+    from backend.services import job_metadata
+    from backend.services.analyzers import get_damage_analyzer
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.risk_scoring import compute_risk_summary
+
+    analyzer = get_damage_analyzer(mode="mock")
+    job_ids = []
+    for index in range(count):
+        job_id = f"bench-{index:04d}"
+        upload_dir = job_upload_dir(job_id)
+        upload_dir.mkdir(parents=True)
+        names = [f"facade_{n:03d}.jpg" for n in range(images)]
+        for name in names:
+            (upload_dir / name).write_bytes(b"\xff\xd8\xff\xe0bench")
+        job_metadata.create_job_metadata(job_id, names, label=f"Bench {index}")
+        analyzer.analyze(job_id)
+        generate_cost_estimate(job_id)
+        compute_risk_summary(job_id)
+        job_ids.append(job_id)
+    return job_ids
+
+
+def _compose_long(pages: int):
+    def compose(pdf) -> None:
+        pdf.add_header("Portfolio Report", "Benchmark")
+        for page in range(pages):
+            pdf.add_section_title(f"Building {page}")
+            for row in range(30):
+                pdf.add_table_row(["Crack", str(row), f"{row * 1.5} m", f"${row * 120:,.2f}"], [150, 80, 100, 100])
+        pdf.add_footer("Benchmark")
+    return compose
+
+
+def _measure(produce) -> tuple:
+    """(ms to first chunk, total ms, peak traced KiB, bytes) for a chunk iterator factory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in produce():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first * 1000, total * 1000, peak / 1024, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20, help="Distinct jobs to render")
+    parser.add_argument("--images", type=int, default=40, help="Images (and so damages) per job")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders of every job per mode")
+    parser.add_argument("--pages", type=int, default=500, help="Sections in the long streamed document")
+    args = parser.parse_args()
+
+    use_temp_data_dir()
+    quiet_logging()
+
+    from backend.core import config
+
+    config.REPORT_PHOTOS = "off"  # The placeholder uploads are not real JPEGs
+
+    from backend.services.pdf_generator import PDFBuilder, compose_report, stream_pdf
+
+    job_ids = _make_jobs(args.jobs, args.images)
+
+    results = {}
+    for mode, options in MODES.items():
+        total_bytes = 0
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for job_id in job_ids:
+                total_bytes += len(compose_report(job_id, PDFBuilder(**options)).render())
+        elapsed = time.perf_counter() - start
+        renders = args.repeat * len(job_ids)
+        results[mode] = (total_bytes / renders, elapsed / renders * 1000)
+
+    baseline_bytes = results["original"][0]
+    print(f"{'mode':<10} {'bytes/report':>14} {'vs original':>12} {'ms/report':>11}")
+    for mode, (size, ms) in results.items():
+        print(f"{mode:<10} {size:>14,.0f} {size / baseline_bytes:>11.0%} {ms:>11.2f}")
+
+    compose = _compose_long(args.pages)
+
+    def buffered():
+        pdf = PDFBuilder()
+        compose(pdf)
+        yield pdf.render()
+
+    print()
+    print(f"{'long doc':<10} {'first byte ms':>14} {'total ms':>10} {'peak KiB':>10} {'bytes':>12}")
+    for name, produce in (("buffered", buffered), ("streamed", lambda: stream_pdf(compose))):
+        first, total, peak, size = _measure(produce)
+        print(f"{name:<10} {first:>14.1f} {total:>10.1f} {peak:>10,.0f} {size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: portfolio report throughput (buildings/sec) by worker process count.
+
+Creates --buildings mock-pipeline jobs, then renders one portfolio PDF over all
+of them with each worker count in --workers. The first pooled run per worker
+count starts the process pool; it is reported separately ("cold") from the
+warm runs that follow.
+
+Usage:
+    python -m backend.benchmarks.bench_portfolio_report --buildings 500 --images 40 --workers 1,2,4,8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from backend.benchmarks._setup import quiet_logging, use_temp_data_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", type=int, default=500, help="Jobs in the portfolio")
+    parser.add_argument("--images", type=int, default=40, help="Images (and so damages) per job")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Warm renders per worker count")
+    args = parser.parse_args()
+
+    use_temp_data_dir()
+    quiet_logging()
+
+    from backend.benchmarks.bench_pdf_report import _make_jobs
+    from backend.services.pdf_generator import PDFBuilder
+    from backend.services.portfolio_report import compose_portfolio, load_portfolio_inputs, shutdown_portfolio_pool
+
+    buildings = load_portfolio_inputs(_make_jobs(args.buildings, args.images))
+
+    def render(workers: int) -> int:
+        chunks = []
+        pdf = PDFBuilder(output=chunks.append)
+        compose_portfolio(pdf, buildings, workers=workers)
+        pdf.close()
+        return sum(len(chunk) for chunk in chunks)
+
+    print(f"{'workers':>7} {'cold s':>8} {'warm s':>8} {'buildings/s':>12} {'speedup':>8} {'MiB':>7}")
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        start = time.perf_counter()
+        size = render(workers)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            render(workers)
+        warm = (time.perf_counter() - start) / args.repeat
+        shutdown_portfolio_pool()
+        baseline = baseline or warm
+        print(
+            f"{workers:>7} {cold:>8.2f} {warm:>8.2f} {len(buildings) / warm:>12,.0f} "
+            f"{baseline / warm:>7.2f}x {size / 2**20:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
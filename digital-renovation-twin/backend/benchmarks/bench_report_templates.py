@@ -0,0 +1,79 @@
+"""
+Benchmark: reports/sec with and without cached static blocks (templates).
+
+Renders the same mock-pipeline job reports with PDFBuilder's static_cache off
+(every block laid out through _add_text/_draw_rect) and on (header bar,
+section titles, table headings and boilerplate replayed from cached operator
+fragments), after checking that both produce byte-identical PDFs. Then times
+generate_pdf_report() end to end (layout thread, compression, storage write)
+with the block cache cleared before every report and kept warm.
+
+Usage:
+    python -m backend.benchmarks.bench_report_templates --jobs 20 --images 40 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from backend.benchmarks._setup import quiet_logging, use_temp_data_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20, help="Distinct jobs to render")
+    parser.add_argument("--images", type=int, default=40, help="Images (and so damages) per job")
+    parser.add_argument("--repeat", type=int, default=20, help="Renders of every job per mode")
+    args = parser.parse_args()
+
+    use_temp_data_dir()
+    quiet_logging()
+
+    from backend.core import config
+
+    config.REPORT_PHOTOS = "off"  # The placeholder uploads are not real JPEGs
+
+    from backend.benchmarks.bench_pdf_report import _make_jobs
+    from backend.services import pdf_generator
+    from backend.services.pdf_generator import PDFBuilder, compose_report, generate_pdf_report, load_report_inputs
+
+    job_ids = _make_jobs(args.jobs, args.images)
+    inputs = {job_id: load_report_inputs(job_id) for job_id in job_ids}
+    renders = args.repeat * len(job_ids)
+
+    def render(job_id: str, static_cache: bool) -> bytes:
+        pdf = PDFBuilder(static_cache=static_cache, **pdf_generator.report_options())
+        return compose_report(job_id, pdf, inputs=inputs[job_id]).render()
+
+    identical = all(render(job_id, False) == render(job_id, True) for job_id in job_ids)
+    print(f"templated output identical: {'yes' if identical else 'NO'}")
+    print()
+
+    print(f"{'render':<22} {'reports/s':>10} {'ms/report':>10} {'speedup':>8}")
+    baseline = None
+    for name, static_cache in (("laid out", False), ("templated", True)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for job_id in job_ids:
+                render(job_id, static_cache)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{name:<22} {renders / elapsed:>10,.0f} {elapsed / renders * 1000:>10.2f} {baseline / elapsed:>7.2f}x")
+
+    baseline = None
+    for name, warm in (("generate_pdf_report", False), ("generate_pdf_report*", True)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for job_id in job_ids:
+                if not warm:
+                    pdf_generator._static_blocks.clear()
+                generate_pdf_report(job_id, inputs=inputs[job_id])
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{name:<22} {renders / elapsed:>10,.0f} {elapsed / renders * 1000:>10.2f} {baseline / elapsed:>7.2f}x")
+    print("(* static block cache kept warm between reports)")
+
+
+if __name__ == "__main__":
+    main()
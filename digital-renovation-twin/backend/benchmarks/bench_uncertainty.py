@@ -0,0 +1,68 @@
+"""
+Benchmark: Monte Carlo cost and risk intervals (uncertainty.damage_intervals) per job.
+
+Times --samples samples for synthetic jobs of several sizes, against the
+per-job point scoring (compute_risk_summary() + generate_cost_estimate()).
+
+Usage:
+    python -m backend.benchmarks.bench_uncertainty --samples 10000 --damages 10 40 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from backend.benchmarks._setup import quiet_logging, use_temp_data_dir
+from backend.benchmarks.bench_batch_scoring import _damages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10_000, help="Monte Carlo samples per job")
+    parser.add_argument("--damages", type=int, nargs="+", default=[10, 40, 100], help="Damages per job")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per job size")
+    args = parser.parse_args()
+
+    use_temp_data_dir()
+    quiet_logging()
+
+    from backend.core.job_paths import job_reconstruction_dir
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.damage_records import DamageRecord
+    from backend.services.risk_scoring import compute_risk_summary
+    from backend.services.uncertainty import damage_intervals
+
+    rng = random.Random(42)
+    print(f"{args.samples:,} samples per job")
+    for count in args.damages:
+        job_id = f"job-{count}"
+        damages = _damages(rng, count)
+        records = [DamageRecord.from_dict(damage) for damage in damages]
+        recon_dir = job_reconstruction_dir(job_id)
+        recon_dir.mkdir(parents=True)
+        (recon_dir / "damages.json").write_text(json.dumps({"job_id": job_id, "damages": damages}))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            intervals = damage_intervals(job_id, records, samples=args.samples)
+        simulated = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            compute_risk_summary(job_id, intervals=False)
+            generate_cost_estimate(job_id, intervals=False)
+        point = (time.perf_counter() - start) / args.repeat
+
+        cost, risk = intervals["total_cost"], intervals["overall_risk_score"]
+        print(
+            f"  {count:>4} damages  intervals {simulated * 1000:>6.2f} ms  (point scoring {point * 1000:.2f} ms)"
+            f"  cost {cost['p10']:,.0f} / {cost['p50']:,.0f} / {cost['p90']:,.0f}"
+            f"  risk {risk['p10']} / {risk['p50']} / {risk['p90']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
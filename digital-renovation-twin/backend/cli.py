@@ -8,11 +8,15 @@ Usage:
     python -m backend.cli run-job /path/to/images --label "Demo Building"
     python -m backend.cli list-jobs
     python -m backend.cli job-status <job_id>
+    python -m backend.cli gc --dry-run
+    python -m backend.cli migrate-layout --to sharded
+    python -m backend.cli tier --older-than-days 90
+    python -m backend.cli portfolio --output q3-portfolio.pdf
+    python -m backend.cli rescore
 """
 
 import argparse
 import json
-import shutil
 import sys
 import uuid
 from pathlib import Path
@@ -23,17 +27,16 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from backend.core.config import (
     DAMAGE_ANALYZER,
     PIPELINE_VERSION,
-    RECONSTRUCTIONS_DIR,
-    REPORTS_DIR,
-    UPLOADS_DIR,
     ensure_data_directories,
 )
+from backend.core.job_paths import job_report_path
 from backend.database import create_job_record, get_job_stats, list_job_records
 from backend.services import job_metadata
 from backend.services.analyzers import get_damage_analyzer
 from backend.services.cost_estimation import generate_cost_estimate
-from backend.services.pdf_generator import generate_pdf_report
+from backend.services.report_cache import ensure_report
 from backend.services.risk_scoring import compute_risk_summary
+from backend.services.storage import get_storage, upload_key
 
 
 def run_job(image_dir: str, label: str | None = None, analyzer_mode: str | None = None) -> dict:
@@ -64,14 +67,13 @@ def run_job(image_dir: str, label: str | None = None, analyzer_mode: str | None
     # Create job
     ensure_data_directories()
     job_id = str(uuid.uuid4())
-    job_dir = UPLOADS_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+    storage = get_storage()
     
-    # Copy images to job directory
+    # Copy images into the job's uploads
     saved_filenames = []
     for img in images:
-        dest = job_dir / img.name
-        shutil.copy2(img, dest)
+        with img.open("rb") as src:
+            storage.put(upload_key(job_id, img.name), src)
         saved_filenames.append(img.name)
         print(f"  Copied: {img.name}")
     
@@ -112,7 +114,8 @@ def run_job(image_dir: str, label: str | None = None, analyzer_mode: str | None
         
         # Step 4: PDF report
         print("Step 4: PDF Report Generation...")
-        report_path = generate_pdf_report(job_id)
+        ensure_report(job_id)
+        report_path = job_report_path(job_id)
         print(f"  ✓ Report written to: {report_path}")
         
         # Load results
@@ -234,6 +237,187 @@ def stats_cmd():
     print(f"  Processing:       {stats.get('jobs_processing', 0)}")
 
 
+def _parse_size(value: str) -> int:
+    """Parse a byte count such as 500000, 750M or 20G."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    value = value.strip().upper().removesuffix("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def gc_cmd(
+    dry_run: bool = False,
+    max_age_days: float | None = None,
+    max_bytes: str | None = None,
+    statuses: list[str] | None = None,
+    grace_seconds: float | None = None,
+    as_json: bool = False,
+):
+    """Reconcile storage with the database and apply the retention policy."""
+    from backend.services.storage_gc import GC_REASONS, run_gc
+
+    policy = {}
+    if max_age_days is not None:
+        policy["max_age_days"] = max_age_days
+    if max_bytes is not None:
+        policy["max_total_bytes"] = _parse_size(max_bytes)
+    if statuses:
+        policy["statuses"] = statuses
+    if grace_seconds is not None:
+        policy["grace_seconds"] = grace_seconds
+
+    report = run_gc(dry_run=dry_run, **policy)
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return report
+
+    print(f"\nStorage GC{' (dry run)' if dry_run else ''}")
+    print("-" * 60)
+    print(f"Jobs scanned:       {report['jobs_scanned']}")
+    print(f"Bytes scanned:      {_format_bytes(report['bytes_scanned'])}")
+    for reason in GC_REASONS:
+        bucket = report["by_reason"][reason]
+        if bucket["jobs"]:
+            print(f"  {reason:<18}{bucket['jobs']:>6} job(s)  {_format_bytes(bucket['bytes'])}")
+
+    for candidate in report["candidates"]:
+        print(f"{candidate['job_id']:<40} {candidate['reason']:<18} {_format_bytes(candidate['bytes'])}")
+
+    if dry_run:
+        print(f"\nWould free:         {_format_bytes(report['bytes_reclaimable'])}")
+    else:
+        print(f"\nRemoved:            {report['jobs_removed']} job(s)")
+        print(f"Freed:              {_format_bytes(report['bytes_freed'])}")
+        if report["errors"]:
+            print(f"Errors:             {report['errors']}")
+    return report
+
+
+def migrate_layout_cmd(target: str, dry_run: bool = False):
+    """Move existing job directories into the given storage layout."""
+    from backend.services.storage_migration import migrate_layout
+
+    stats = migrate_layout(target, dry_run=dry_run)
+
+    print(f"\nStorage layout migration to '{target}'{' (dry run)' if dry_run else ''}")
+    print("-" * 60)
+    print(f"Jobs to migrate:    {stats['jobs_pending']}")
+    if dry_run:
+        print(f"Entries to move:    {stats['entries_moved']}")
+        return stats
+    print(f"Jobs moved:         {stats['jobs_moved']}")
+    print(f"Entries moved:      {stats['entries_moved']}")
+    if stats["jobs_skipped"]:
+        print(f"Skipped (busy):     {stats['jobs_skipped']}  (re-run once they finish)")
+    if stats["conflicts"] or stats["errors"]:
+        print(f"Conflicts:          {stats['conflicts']}")
+        print(f"Errors:             {stats['errors']}")
+    return stats
+
+
+def tier_cmd(older_than_days: float | None = None, archive: bool | None = None, dry_run: bool = False):
+    """Compress the artifacts of jobs that have gone cold."""
+    from backend.core.config import TIER_ARCHIVE, TIER_COLD_AFTER_DAYS
+    from backend.services.cold_storage import tier_cold_jobs
+
+    days = TIER_COLD_AFTER_DAYS if older_than_days is None else older_than_days
+    report = tier_cold_jobs(days, archive=TIER_ARCHIVE if archive is None else archive, dry_run=dry_run)
+
+    print(f"\nCold tiering of jobs older than {days:g} day(s){' (dry run)' if dry_run else ''}")
+    print("-" * 60)
+    print(f"Jobs tiered:        {report['jobs_tiered']}")
+    print(f"Files compressed:   {report['files']}")
+    print(f"Bytes before:       {_format_bytes(report['bytes_before'])}")
+    if not dry_run:
+        print(f"Bytes after:        {_format_bytes(report['bytes_after'])}")
+        if report["errors"]:
+            print(f"Errors:             {report['errors']}")
+    return report
+
+
+def portfolio_cmd(job_ids: list[str] | None, output: str, workers: int | None = None):
+    """Write one PDF report covering several jobs (all completed jobs by default)."""
+    import time
+
+    from backend.services.portfolio_report import (
+        generate_portfolio_report,
+        portfolio_job_ids,
+        resolve_workers,
+        shutdown_portfolio_pool,
+    )
+
+    job_ids = job_ids or portfolio_job_ids()
+    if not job_ids:
+        print("No completed jobs to report on")
+        return None
+    output_path = Path(output)
+    start = time.perf_counter()
+    try:
+        pages = generate_portfolio_report(job_ids, output_path, workers=workers)
+    except FileNotFoundError as exc:
+        print(f"Cannot build portfolio report: {exc}")
+        return None
+    finally:
+        shutdown_portfolio_pool()
+    elapsed = time.perf_counter() - start
+
+    print(f"\nPortfolio report for {len(job_ids)} building(s)")
+    print("-" * 60)
+    print(f"Pages:              {pages}")
+    print(f"Size:               {_format_bytes(output_path.stat().st_size)}")
+    print(f"Workers:            {resolve_workers(workers)}")
+    print(f"Time:               {elapsed:.2f}s")
+    print(f"Written to:         {output_path}")
+    return {"pages": pages, "path": str(output_path)}
+
+
+def rescore_cmd(job_ids: list[str] | None = None, dry_run: bool = False, intervals: bool = False):
+    """Recompute every job's risk summary and cost estimate with the current tables."""
+    from backend.services.batch_scoring import rescore_jobs
+
+    # Intervals are simulated per job, so they are left to UNCERTAINTY_INTERVALS unless asked for
+    result = rescore_jobs(job_ids, dry_run=dry_run, intervals=True if intervals else None)
+
+    print(f"\nRescored risk and cost{' (dry run)' if dry_run else ''}")
+    print("-" * 60)
+    print(f"Jobs rescored:      {result['jobs']}")
+    print(f"Damages scored:     {result['damages']}")
+    print(f"Time:               load {result['load_seconds']:.2f}s, score {result['score_seconds']:.2f}s, write {result['write_seconds']:.2f}s")
+    if result["skipped"]:
+        print(f"Skipped:            {len(result['skipped'])}")
+        for job_id, reason in sorted(result["skipped"].items()):
+            print(f"  {job_id}: {reason}")
+    return result
+
+
+def precompress_static_cmd(directory: str):
+    """Write .br/.gz siblings of the built frontend's text files, served by the static layer."""
+    from backend.api.compression import brotli
+    from backend.api.static_files import precompress
+
+    root = Path(directory)
+    if not root.is_dir():
+        print(f"Error: Directory not found: {root}")
+        sys.exit(1)
+    written = precompress(root)
+
+    print(f"\nPrecompressed static files in {root}")
+    print("-" * 60)
+    print(f"Variants written:   {written}")
+    print(f"Encodings:          {'br, gzip' if brotli is not None else 'gzip (install brotli for .br)'}")
+    return written
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Façade Risk Analyzer CLI",
@@ -251,6 +435,27 @@ Examples:
   
   Show statistics:
     python -m backend.cli stats
+  
+  Preview what storage GC would free, then run it:
+    python -m backend.cli gc --dry-run --max-age-days 90 --max-bytes 20G
+    python -m backend.cli gc --max-age-days 90
+  
+  Move existing jobs into the sharded directory layout (safe while serving):
+    python -m backend.cli migrate-layout --to sharded
+  
+  Compress artifacts of jobs untouched for 90 days (readers decompress transparently):
+    python -m backend.cli tier --older-than-days 90 --archive
+  
+  Render one report covering every completed job (or the listed ones):
+    python -m backend.cli portfolio --output q3-portfolio.pdf
+    python -m backend.cli portfolio --jobs <job_id> <job_id> --workers 8
+  
+  Recompute all risk summaries and cost estimates after changing the weight or rate tables:
+    python -m backend.cli rescore
+    python -m backend.cli rescore --intervals
+  
+  Precompress the built frontend (done in the Docker image build):
+    python -m backend.cli precompress-static ./static
         """
     )
     
@@ -276,6 +481,54 @@ Examples:
     # stats command
     subparsers.add_parser("stats", help="Show pipeline statistics")
     
+    # gc command
+    gc_parser = subparsers.add_parser("gc", help="Remove orphaned and expired job data")
+    gc_parser.add_argument("--dry-run", "-n", action="store_true", help="Report what would be freed without deleting")
+    gc_parser.add_argument("--max-age-days", type=float, help="Remove jobs not updated for this many days (default: GC_MAX_AGE_DAYS)")
+    gc_parser.add_argument("--max-bytes", help="Evict oldest jobs until storage fits, e.g. 20G (default: GC_MAX_BYTES)")
+    gc_parser.add_argument(
+        "--status", action="append", dest="statuses",
+        help="Status eligible for age/size eviction; repeatable (default: GC_STATUSES)",
+    )
+    gc_parser.add_argument("--grace-seconds", type=float, help="Skip orphans younger than this (default: GC_ORPHAN_GRACE_SECONDS)")
+    gc_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    
+    # migrate-layout command
+    migrate_parser = subparsers.add_parser("migrate-layout", help="Move job directories to another storage layout")
+    migrate_parser.add_argument(
+        "--to", dest="target", choices=["sharded", "flat"], default="sharded",
+        help="Target layout (default: sharded)",
+    )
+    migrate_parser.add_argument("--dry-run", "-n", action="store_true", help="Count what would move without moving it")
+    
+    # tier command
+    tier_parser = subparsers.add_parser("tier", help="Compress artifacts of cold jobs")
+    tier_parser.add_argument("--older-than-days", type=float, help="Tier jobs not updated for this many days (default: TIER_COLD_AFTER_DAYS)")
+    tier_parser.add_argument(
+        "--archive", action="store_true", default=None,
+        help="Pack reconstruction JSON into one artifacts.zip per job (default: TIER_ARCHIVE)",
+    )
+    tier_parser.add_argument("--dry-run", "-n", action="store_true", help="Report what would be compressed")
+    
+    # portfolio command
+    portfolio_parser = subparsers.add_parser("portfolio", help="Render one PDF report covering several jobs")
+    portfolio_parser.add_argument("--jobs", nargs="+", dest="job_ids", help="Job IDs to include (default: all completed jobs)")
+    portfolio_parser.add_argument("--output", "-o", default="portfolio.pdf", help="Output PDF path (default: portfolio.pdf)")
+    portfolio_parser.add_argument("--workers", "-w", type=int, help="Worker processes (default: PORTFOLIO_WORKERS, 0 = one per CPU)")
+    
+    # rescore command
+    rescore_parser = subparsers.add_parser("rescore", help="Recompute risk and cost of many jobs in one batch")
+    rescore_parser.add_argument("--jobs", nargs="+", dest="job_ids", help="Job IDs to rescore (default: all jobs)")
+    rescore_parser.add_argument("--dry-run", "-n", action="store_true", help="Score without writing the files")
+    rescore_parser.add_argument(
+        "--intervals", action="store_true",
+        help="Also simulate uncertainty intervals (much slower; default: UNCERTAINTY_INTERVALS)",
+    )
+    
+    # precompress-static command
+    precompress_parser = subparsers.add_parser("precompress-static", help="Write .br/.gz variants of the built frontend")
+    precompress_parser.add_argument("directory", help="Built frontend directory (STATIC_DIR)")
+    
     args = parser.parse_args()
     
     if args.command == "run-job":
@@ -286,6 +539,25 @@ Examples:
         job_status_cmd(args.job_id)
     elif args.command == "stats":
         stats_cmd()
+    elif args.command == "gc":
+        gc_cmd(
+            dry_run=args.dry_run,
+            max_age_days=args.max_age_days,
+            max_bytes=args.max_bytes,
+            statuses=args.statuses,
+            grace_seconds=args.grace_seconds,
+            as_json=args.json,
+        )
+    elif args.command == "migrate-layout":
+        migrate_layout_cmd(args.target, dry_run=args.dry_run)
+    elif args.command == "tier":
+        tier_cmd(args.older_than_days, archive=args.archive, dry_run=args.dry_run)
+    elif args.command == "portfolio":
+        portfolio_cmd(args.job_ids, args.output, workers=args.workers)
+    elif args.command == "rescore":
+        rescore_cmd(args.job_ids, dry_run=args.dry_run, intervals=args.intervals)
+    elif args.command == "precompress-static":
+        precompress_static_cmd(args.directory)
     else:
         parser.print_help()
 
@@ -0,0 +1,205 @@
+"""
+Transparent access to job artifacts in hot or cold storage.
+
+Cold-tiered jobs (see ``backend.services.cold_storage``) keep their JSON and
+PDF artifacts in one of two compressed forms next to the original path:
+
+- ``name.gz``: the file gzip-compressed in place of the original.
+- ``artifacts.zip``: one deflate archive per directory with ``name`` as a member.
+
+Readers call ``open_artifact`` / ``read_json`` with the original path. A hot
+job's plain file is tried first, so hot reads cost exactly what they did
+before; the cold forms are only probed when the plain file is missing.
+Rewriting a plain file "re-heats" it: plain copies always win over cold ones.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional
+
+GZIP_SUFFIX = ".gz"
+ARCHIVE_NAME = "artifacts.zip"
+
+STREAM_CHUNK_CHARS = 64 * 1024
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def gzip_path(path: Path) -> Path:
+    return path.with_name(path.name + GZIP_SUFFIX)
+
+
+def archive_path(path: Path) -> Path:
+    """The per-directory archive that may hold `path` as a member."""
+    return path.with_name(ARCHIVE_NAME)
+
+
+def is_json_artifact(name: str) -> bool:
+    """True for JSON artifacts in any tier (used to tell them apart from uploaded images)."""
+    return name.endswith(".json") or name.endswith(".json" + GZIP_SUFFIX) or name == ARCHIVE_NAME
+
+
+def _archive_member(path: Path) -> Optional[bytes]:
+    try:
+        with zipfile.ZipFile(archive_path(path)) as archive:
+            return archive.read(path.name)
+    except (FileNotFoundError, NotADirectoryError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def open_artifact(path: Path) -> BinaryIO:
+    """
+    Open an artifact for binary reading, decompressing cold copies on the fly.
+
+    Raises FileNotFoundError when the artifact exists in no tier.
+    """
+    try:
+        return path.open("rb")
+    except FileNotFoundError:
+        pass
+    try:
+        return gzip.open(gzip_path(path), "rb")  # type: ignore[return-value]
+    except FileNotFoundError:
+        pass
+    data = _archive_member(path)
+    if data is None:
+        raise FileNotFoundError(f"Expected file missing: {path}")
+    return io.BytesIO(data)
+
+
+def artifact_exists(path: Path) -> bool:
+    if path.exists() or gzip_path(path).exists():
+        return True
+    archive = archive_path(path)
+    if not archive.exists():
+        return False
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            return path.name in zf.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def read_json(path: Path) -> Any:
+    """Load a JSON artifact from whichever tier holds it."""
+    with open_artifact(path) as fp:
+        return json.load(fp)
+
+
+class _TextStream:
+    """A window over a text file for incremental parsing: `text[pos:]` is what is left of the read part."""
+
+    def __init__(self, fp: io.TextIOBase):
+        self.fp = fp
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """Read another chunk, dropping what was consumed. False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(STREAM_CHUNK_CHARS)
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return not self.eof
+
+    def peek(self) -> str:
+        """The next non-whitespace character (consumed up to it), "" at end of file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self.more():
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self.text, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """Decode the next JSON value, reading until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            # A number may continue in the next chunk
+            if end < len(self.text) or not self.more():
+                self.pos = end
+                return value
+
+    def items(self, decoder: json.JSONDecoder) -> Iterator[Any]:
+        """Decode the items of the array whose "[" was just consumed, through its "]"."""
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            # Fast path: the item and the separator after it are already read
+            text = self.text
+            try:
+                item, end = decoder.raw_decode(text, _WHITESPACE.match(text, self.pos).end())
+                end = _WHITESPACE.match(text, end).end()
+                separator = text[end:end + 1]
+            except json.JSONDecodeError:
+                separator = ""
+            if separator in (",", "]"):
+                self.pos = end + 1
+            else:
+                item = self.value(decoder)
+                separator = self.expect(",]")
+            yield item
+            if separator == "]":
+                return
+
+
+def _iter_array_items(fp: BinaryIO, key: str) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    with fp, io.TextIOWrapper(fp, encoding="utf-8") as text:
+        stream = _TextStream(text)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            name = stream.value(decoder)
+            stream.expect(":")
+            if name != key:
+                stream.value(decoder)  # Other top-level fields are small
+            else:
+                stream.expect("[")
+                yield from stream.items(decoder)
+                return
+            if stream.expect(",}") == "}":
+                return
+
+
+def iter_json_items(path: Path, key: str) -> Iterator[Any]:
+    """
+    Yield the items of the array under top-level `key` of a JSON artifact
+    (from whichever tier holds it) one at a time, without loading the document.
+
+    Only one item is held in memory, however long the array. A document
+    without `key` yields nothing. The artifact is opened before this returns,
+    so FileNotFoundError is raised here; malformed JSON raises ValueError
+    (json.JSONDecodeError) from the iterator.
+    """
+    return _iter_array_items(open_artifact(path), key)
+
+
+def stored_variant(path: Path) -> Optional[Path]:
+    """The file actually on disk for `path`: itself or its gzip copy (archives excluded)."""
+    for candidate in (path, gzip_path(path)):
+        if os.path.lexists(candidate):
+            return candidate
+    return None
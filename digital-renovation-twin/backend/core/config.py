@@ -16,13 +16,202 @@ UPLOADS_DIR = DATA_DIR / "uploads"
 RECONSTRUCTIONS_DIR = DATA_DIR / "reconstructions"
 REPORTS_DIR = DATA_DIR / "reports"
 TMP_DIR = DATA_DIR / "tmp"
+TRASH_DIR = DATA_DIR / "trash"  # Tombstoned job uploads awaiting background reclamation
 FIXTURES_DIR = BACKEND_DIR / "fixtures"
 
+# Per-job directories: "sharded" (uploads/ab/cd/{job_id}) or "flat" (uploads/{job_id}).
+# Both layouts are always readable; this picks where new jobs are written.
+# Resolve paths through backend.core.job_paths rather than joining these directly.
+STORAGE_LAYOUT = os.getenv("STORAGE_LAYOUT", "sharded").lower()
+
+# Where uploaded images and PDF reports are stored: "local" (files under DATA_DIR)
+# or "s3" (an S3-compatible bucket, shared by every replica). Object keys mirror
+# the paths under DATA_DIR, e.g. uploads/ab/cd/{job_id}/facade.jpg.
+# Only those objects move to the bucket: job_meta.json, the analysis and
+# reconstruction artifacts and the SQLite database stay under DATA_DIR, so
+# replicas in s3 mode still need DATA_DIR on a shared volume. (COLMAP stages its
+# images from the bucket, so it runs on whichever replica processes the job.)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "https://s3.amazonaws.com")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID", "")
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY", "")
+S3_KEY_PREFIX = os.getenv("S3_KEY_PREFIX", "")
+
+# =============================================================================
+# API Responses
+# =============================================================================
+# JSON, HTML, JavaScript, CSS and SVG responses of at least
+# RESPONSE_COMPRESSION_MIN_BYTES are compressed with brotli (when the brotli
+# package is installed and the client accepts it) or gzip. gzip level 4 gets
+# within a few percent of level 6's size for JSON at about 3/4 of the CPU time.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("true", "1", "yes")
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "4"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+# =============================================================================
+# Admission Control
+# =============================================================================
+# Past these limits uploads and /process calls are turned away with a 429 (or a
+# 503 after ADMISSION_QUEUE_TIMEOUT_SECONDS in the queue) and a Retry-After,
+# instead of every request slowing down. 0 means unlimited.
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() in ("true", "1", "yes")
+MAX_CONCURRENT_UPLOADS = int(os.getenv("MAX_CONCURRENT_UPLOADS", "8"))
+MAX_INFLIGHT_JOBS = int(os.getenv("MAX_INFLIGHT_JOBS", "4"))  # Jobs through the pipeline at once
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "16"))  # Jobs waiting for one of those slots
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "600"))
+ADMISSION_RETRY_AFTER_MAX_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_MAX_SECONDS", "600"))
+
 # =============================================================================
 # Database
 # =============================================================================
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR / 'facade_risk.db'}")
 
+# Async request handlers run the blocking helpers on worker threads, unless this
+# enables an asyncio engine (aiosqlite for SQLite). The engine frees threadpool
+# slots but is not faster: aiosqlite adds a thread hop per statement, and with
+# the production SQLite profile writes go through the writer thread either way
+# (bench_jobs_api: within noise of the worker threads, sometimes slower).
+ASYNC_DATABASE_ENABLED = os.getenv("ASYNC_DATABASE", "false").lower() in ("true", "1", "yes")
+
+# SQLite profile: "production" enables WAL, tuned pragmas, a read-only connection
+# pool and a single writer thread that group-commits job writes; "default" keeps
+# SQLite's stock settings with one shared engine.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production").lower()
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "128"))
+DB_WRITE_BATCH_WINDOW_MS = float(os.getenv("DB_WRITE_BATCH_WINDOW_MS", "2"))
+
+# =============================================================================
+# Deletion / Reclamation
+# =============================================================================
+# Deleted jobs are tombstoned instantly; a background reclaimer removes their files.
+RECLAIM_WORKERS = int(os.getenv("RECLAIM_WORKERS", "4"))
+RECLAIM_MAX_JOBS_PER_SECOND = float(os.getenv("RECLAIM_MAX_JOBS_PER_SECOND", "50"))
+RECLAIM_INTERVAL_SECONDS = float(os.getenv("RECLAIM_INTERVAL_SECONDS", "300"))
+
+# =============================================================================
+# Storage Garbage Collection
+# =============================================================================
+# Retention policy applied by `cli gc` and the optional background collector.
+# Age and size limits only ever remove jobs whose status is in GC_STATUSES.
+GC_MAX_AGE_DAYS = float(os.getenv("GC_MAX_AGE_DAYS", "0"))  # 0 = keep forever
+GC_MAX_BYTES = int(os.getenv("GC_MAX_BYTES", "0"))  # 0 = no size cap
+GC_STATUSES = tuple(
+    status.strip() for status in os.getenv("GC_STATUSES", "completed,failed").split(",") if status.strip()
+)
+# Orphans and half-created jobs younger than this are left alone (uploads in flight)
+GC_ORPHAN_GRACE_SECONDS = float(os.getenv("GC_ORPHAN_GRACE_SECONDS", "3600"))
+GC_INTERVAL_SECONDS = float(os.getenv("GC_INTERVAL_SECONDS", "0"))  # 0 = no background GC
+
+# =============================================================================
+# Cold Storage Tiering
+# =============================================================================
+# Jobs untouched for TIER_COLD_AFTER_DAYS get their JSON artifacts compacted and
+# gzipped (or packed into one artifacts.zip per job with TIER_ARCHIVE) and their
+# PDF report gzipped. Readers decompress transparently.
+TIER_COLD_AFTER_DAYS = float(os.getenv("TIER_COLD_AFTER_DAYS", "90"))
+TIER_ARCHIVE = os.getenv("TIER_ARCHIVE", "false").lower() in ("true", "1", "yes")
+TIER_INTERVAL_SECONDS = float(os.getenv("TIER_INTERVAL_SECONDS", "0"))  # 0 = CLI only
+
+# =============================================================================
+# PDF Reports
+# =============================================================================
+# Content streams are Flate-compressed by default. PDF_OBJECT_STREAMS switches to
+# PDF 1.5 output with object and cross-reference streams (smaller, but needs a
+# viewer from the last ~20 years).
+PDF_COMPRESS = os.getenv("PDF_COMPRESS", "true").lower() in ("true", "1", "yes")
+PDF_OBJECT_STREAMS = os.getenv("PDF_OBJECT_STREAMS", "false").lower() in ("true", "1", "yes")
+# Worker processes laying out portfolio report sections (0 = one per CPU)
+PORTFOLIO_WORKERS = int(os.getenv("PORTFOLIO_WORKERS", "0"))
+# Inspection photos in job reports: "thumbnail" (downscaled JPEG copies, made with
+# Pillow when installed and stored next to the uploads), "original" (uploaded
+# JPEGs embedded as-is) or "off". JPEG data is embedded without re-encoding.
+REPORT_PHOTOS = os.getenv("REPORT_PHOTOS", "thumbnail").lower()
+REPORT_THUMBNAIL_SIZE = int(os.getenv("REPORT_THUMBNAIL_SIZE", "640"))  # Longest edge, pixels
+REPORT_THUMBNAIL_QUALITY = int(os.getenv("REPORT_THUMBNAIL_QUALITY", "80"))
+
+# =============================================================================
+# Cost Scenarios
+# =============================================================================
+# POST /jobs/{job_id}/cost-scenarios keeps the parsed damages of this many jobs
+# in memory and accepts up to COST_SCENARIOS_MAX rate tables per request.
+COST_SCENARIO_CACHE_SIZE = int(os.getenv("COST_SCENARIO_CACHE_SIZE", "256"))
+COST_SCENARIOS_MAX = int(os.getenv("COST_SCENARIOS_MAX", "50"))
+
+# =============================================================================
+# Uncertainty Intervals
+# =============================================================================
+# P10/P50/P90 of total cost and risk score from Monte Carlo samples of the
+# detections (confidence) and their measurements (+/- the error fraction).
+# UNCERTAINTY_INTERVALS adds them to cost_estimate.json and risk_summary.json
+# when a job is scored, and reports show the stored intervals. They cost about a
+# hundred times the point scores, so batch rescoring only adds them when this is
+# set or `rescore --intervals` asks. UNCERTAINTY_SAMPLES 0 turns them off.
+UNCERTAINTY_INTERVALS = os.getenv("UNCERTAINTY_INTERVALS", "false").lower() in ("true", "1", "yes")
+UNCERTAINTY_SAMPLES = int(os.getenv("UNCERTAINTY_SAMPLES", "10000"))
+UNCERTAINTY_MEASUREMENT_ERROR = float(os.getenv("UNCERTAINTY_MEASUREMENT_ERROR", "0.25"))
+UNCERTAINTY_SEED = int(os.getenv("UNCERTAINTY_SEED", "0"))
+
+# =============================================================================
+# COLMAP Reconstruction
+# =============================================================================
+# COLMAP runs inside COLMAP_DOCKER_IMAGE unless COLMAP_EXECUTABLE names a local
+# binary. COLMAP_MATCHER "auto" matches every image pair up to
+# COLMAP_EXHAUSTIVE_MAX_IMAGES images; larger jobs use spatial matching when all
+# photos carry GPS, vocabulary-tree matching from COLMAP_VOCAB_TREE_MIN_IMAGES
+# (needs COLMAP_VOCAB_TREE_PATH, as COLMAP sees it) and sequential matching
+# otherwise. COLMAP_NUM_THREADS -1 uses every core.
+COLMAP_EXECUTABLE = os.getenv("COLMAP_EXECUTABLE", "")
+COLMAP_DOCKER_IMAGE = os.getenv("COLMAP_DOCKER_IMAGE", "graffitytech/colmap:3.8-cpu-ubuntu22.04")
+COLMAP_MATCHER = os.getenv("COLMAP_MATCHER", "auto").lower()
+COLMAP_EXHAUSTIVE_MAX_IMAGES = int(os.getenv("COLMAP_EXHAUSTIVE_MAX_IMAGES", "100"))
+COLMAP_SEQUENTIAL_OVERLAP = int(os.getenv("COLMAP_SEQUENTIAL_OVERLAP", "10"))
+COLMAP_VOCAB_TREE_PATH = os.getenv("COLMAP_VOCAB_TREE_PATH", "")
+COLMAP_VOCAB_TREE_MIN_IMAGES = int(os.getenv("COLMAP_VOCAB_TREE_MIN_IMAGES", "1000"))
+COLMAP_NUM_THREADS = int(os.getenv("COLMAP_NUM_THREADS", "-1"))
+
+# =============================================================================
+# Reconstruction Cache
+# =============================================================================
+# COLMAP and photogrammetry API results are reused when the same photos are
+# reconstructed again with the same engine settings. Entries are hardlinked
+# with the jobs' reconstruction files and evicted least recently used first
+# past RECONSTRUCTION_CACHE_MAX_BYTES.
+RECONSTRUCTION_CACHE = os.getenv("RECONSTRUCTION_CACHE", "true").lower() in ("true", "1", "yes")
+RECONSTRUCTION_CACHE_DIR = Path(os.getenv("RECONSTRUCTION_CACHE_DIR", str(DATA_DIR / "reconstruction_cache")))
+RECONSTRUCTION_CACHE_MAX_BYTES = int(os.getenv("RECONSTRUCTION_CACHE_MAX_BYTES", str(20 * 1024**3)))
+
+# =============================================================================
+# 3D Viewer Meshes
+# =============================================================================
+# After reconstruction, the mesh or point cloud is packaged into binary glTF
+# levels of detail, coarsest first: one per budget (triangles for meshes,
+# points for point clouds) plus the full model when it is larger.
+MESH_PACKAGING = os.getenv("MESH_PACKAGING", "true").lower() in ("true", "1", "yes")
+MESH_LOD_BUDGETS = tuple(
+    int(budget) for budget in os.getenv("MESH_LOD_BUDGETS", "20000,200000").split(",") if budget.strip()
+)
+
+# =============================================================================
+# Photogrammetry API
+# =============================================================================
+# Hosted reconstruction (RECONSTRUCTION_ENGINE "external_api"). Images are
+# streamed from disk over a pooled connection; the reconstruction is then
+# polled in the background, backing off from PHOTOGRAMMETRY_POLL_INITIAL_SECONDS
+# to PHOTOGRAMMETRY_POLL_MAX_SECONDS, while the rest of the pipeline runs.
+PHOTOGRAMMETRY_API_URL = os.getenv("PHOTOGRAMMETRY_API_URL")
+PHOTOGRAMMETRY_API_KEY = os.getenv("PHOTOGRAMMETRY_API_KEY")
+PHOTOGRAMMETRY_PROVIDER = os.getenv("PHOTOGRAMMETRY_PROVIDER", "polycam")
+PHOTOGRAMMETRY_TIMEOUT_SECONDS = float(os.getenv("PHOTOGRAMMETRY_TIMEOUT_SECONDS", "60"))  # Per request
+PHOTOGRAMMETRY_RETRIES = int(os.getenv("PHOTOGRAMMETRY_RETRIES", "3"))  # Per submission, on transient errors
+PHOTOGRAMMETRY_POLL_INITIAL_SECONDS = float(os.getenv("PHOTOGRAMMETRY_POLL_INITIAL_SECONDS", "2"))
+PHOTOGRAMMETRY_POLL_MAX_SECONDS = float(os.getenv("PHOTOGRAMMETRY_POLL_MAX_SECONDS", "60"))
+PHOTOGRAMMETRY_MAX_WAIT_SECONDS = float(os.getenv("PHOTOGRAMMETRY_MAX_WAIT_SECONDS", "7200"))
+PHOTOGRAMMETRY_WORKERS = int(os.getenv("PHOTOGRAMMETRY_WORKERS", "4"))  # Reconstructions tracked at once
+
 # =============================================================================
 # Analyzer Configuration
 # =============================================================================
@@ -35,5 +224,5 @@ OPENAI_VISION_MODEL = os.getenv("OPENAI_VISION_MODEL", "gpt-4o-mini")
 
 def ensure_data_directories() -> None:
     """Make sure required data directories exist."""
-    for path in [UPLOADS_DIR, RECONSTRUCTIONS_DIR, REPORTS_DIR, TMP_DIR, FIXTURES_DIR]:
+    for path in [UPLOADS_DIR, RECONSTRUCTIONS_DIR, REPORTS_DIR, TMP_DIR, TRASH_DIR, FIXTURES_DIR]:
         path.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,142 @@
+"""
+Path resolution for per-job files.
+
+Every service asks this module where a job's uploads, reconstruction
+workspace and PDF report live instead of joining ``UPLOADS_DIR / job_id``
+itself. With ``STORAGE_LAYOUT=sharded`` (the default) jobs are spread over a
+two-level hash prefix so no directory holds more than a few hundred entries:
+
+    uploads/ab/cd/{job_id}/
+    reconstructions/ab/cd/{job_id}/
+    reports/ab/cd/{job_id}.pdf
+
+where ``abcd`` are the first hex digits of ``sha1(job_id)``. The legacy flat
+layout (``uploads/{job_id}``) is still resolved, so existing data keeps
+working while ``cli migrate-layout`` moves it across.
+
+The data directories are read from ``backend.core.config`` on every call so
+tests and tools can repoint them in one place.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from backend.core import config
+from backend.core.artifacts import GZIP_SUFFIX
+
+LAYOUTS = ("flat", "sharded")
+REPORT_SUFFIX = ".pdf"
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def shard_prefix(job_id: str) -> Tuple[str, str]:
+    """The two shard directory names for a job ID."""
+    digest = hashlib.sha1(job_id.encode("utf-8")).hexdigest()
+    return digest[:2], digest[2:4]
+
+
+def layout_path(root: Path, job_id: str, layout: str, name: str | None = None) -> Path:
+    """Where a job's entry (`name`, default the job ID) lives under `root` in the given layout."""
+    name = name or job_id
+    if layout == "flat":
+        return root / name
+    first, second = shard_prefix(job_id)
+    return root / first / second / name
+
+
+def _resolve(root: Path, job_id: str, name: str | None = None, cold_suffix: str = "") -> Path:
+    """
+    Existing path for a job entry, preferring the configured layout.
+
+    Falls back to the other layout for data that has not been migrated yet,
+    and to the configured layout when the job has nothing on disk (new jobs).
+    With `cold_suffix`, a compressed copy (``name + cold_suffix``) also counts
+    as existing; the uncompressed path is returned either way.
+    """
+    preferred = config.STORAGE_LAYOUT if config.STORAGE_LAYOUT in LAYOUTS else "sharded"
+    other = "flat" if preferred == "sharded" else "sharded"
+    candidates = [layout_path(root, job_id, layout, name) for layout in (preferred, other)]
+    for path in candidates:
+        if os.path.lexists(path):
+            return path
+    if cold_suffix:
+        for path in candidates:
+            if os.path.lexists(path.with_name(path.name + cold_suffix)):
+                return path
+    return candidates[0]
+
+
+def job_upload_dir(job_id: str) -> Path:
+    return _resolve(config.UPLOADS_DIR, job_id)
+
+
+def job_reconstruction_dir(job_id: str) -> Path:
+    return _resolve(config.RECONSTRUCTIONS_DIR, job_id)
+
+
+def job_report_path(job_id: str) -> Path:
+    """The job's PDF report path (the report may be stored gzip-compressed next to it)."""
+    return _resolve(config.REPORTS_DIR, job_id, f"{job_id}{REPORT_SUFFIX}", GZIP_SUFFIX)
+
+
+def is_shard_name(name: str) -> bool:
+    return len(name) == 2 and set(name) <= _HEX_DIGITS
+
+
+def scan_job_entries(root: Path, suffix: str = "") -> Iterator[Tuple[str, Path, str]]:
+    """
+    Yield ``(job_id, path, layout)`` for every job entry under `root`, in both layouts.
+
+    With a suffix (``.pdf``) only files ending in it, or in it plus ``.gz`` for
+    cold copies, are yielded and the suffix is stripped from the job ID;
+    otherwise only directories are yielded.
+    """
+    suffixes = (suffix + GZIP_SUFFIX, suffix) if suffix else ()
+
+    def matches(entry: os.DirEntry) -> bool:
+        if suffixes:
+            return entry.name.endswith(suffixes) and entry.is_file()
+        return entry.is_dir()
+
+    def job_id(name: str) -> str:
+        for candidate in suffixes:
+            if name.endswith(candidate):
+                return name[: -len(candidate)]
+        return name
+
+    if not root.exists():
+        return
+    with os.scandir(root) as top:
+        for entry in top:
+            if entry.is_dir() and is_shard_name(entry.name):
+                with os.scandir(entry.path) as shard:
+                    for sub in shard:
+                        if not (sub.is_dir() and is_shard_name(sub.name)):
+                            continue
+                        with os.scandir(sub.path) as leaf:
+                            for job_entry in leaf:
+                                if matches(job_entry):
+                                    yield job_id(job_entry.name), Path(job_entry.path), "sharded"
+            elif matches(entry):
+                yield job_id(entry.name), Path(entry.path), "flat"
+
+
+def iter_upload_dirs(root: Path | None = None) -> Iterator[Tuple[str, Path]]:
+    """Yield ``(job_id, upload_dir)`` for every job under the uploads root."""
+    for job_id, path, _ in scan_job_entries(config.UPLOADS_DIR if root is None else root):
+        yield job_id, path
+
+
+def iter_reconstruction_dirs() -> Iterator[Tuple[str, Path]]:
+    for job_id, path, _ in scan_job_entries(config.RECONSTRUCTIONS_DIR):
+        yield job_id, path
+
+
+def iter_report_files() -> Iterator[Tuple[str, Path]]:
+    for job_id, path, _ in scan_job_entries(config.REPORTS_DIR, REPORT_SUFFIX):
+        yield job_id, path
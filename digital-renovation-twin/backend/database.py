@@ -3,19 +3,46 @@ SQLite Database Layer for Job Persistence
 
 Provides a lightweight persistence layer using SQLAlchemy with SQLite.
 Jobs are stored in a database alongside the existing file-based metadata.
+
+Two access paths share the same schema:
+- Blocking helpers (``create_job_record`` etc.) used by the CLI and sync routes.
+- ``async_*`` helpers used by async request handlers. They run the blocking
+  helpers on a worker thread, or with ASYNC_DATABASE on an asyncio engine
+  (aiosqlite for SQLite) when its driver is available.
+
+With ``SQLITE_PROFILE=production`` (the default for file-backed SQLite) the
+database runs in WAL mode, reads go through a pool of read-only connections,
+and every write is handed to a single writer thread that group-commits
+concurrent writes instead of letting callers fight over the database lock.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from contextlib import contextmanager
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, List, Optional
+from urllib.parse import quote
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text, create_engine, func
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text, create_engine, event, func, inspect, select, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
-from backend.core.config import DATA_DIR, DATABASE_URL, PIPELINE_VERSION
+from backend.core.config import (
+    ASYNC_DATABASE_ENABLED,
+    DATA_DIR,
+    DATABASE_URL,
+    DB_READ_POOL_SIZE,
+    DB_WRITE_BATCH_MAX,
+    DB_WRITE_BATCH_WINDOW_MS,
+    PIPELINE_VERSION,
+    SQLITE_PROFILE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +67,7 @@ class Job(Base):
     pipeline_version = Column(String(20), default=PIPELINE_VERSION)
     error = Column(Text, nullable=True)
     file_count = Column(Integer, default=0)
+    deleted_at = Column(DateTime, nullable=True, index=True)  # Tombstone; files reclaimed in background
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert job to dictionary."""
@@ -59,9 +87,77 @@ class Job(Base):
         }
 
 
+# Columns added after the first release; created on existing databases at startup
+_ADDED_COLUMNS = {
+    "deleted_at": "DATETIME",
+}
+
+
+def _ensure_added_columns(engine) -> None:
+    """Add columns missing from databases created by older releases."""
+    existing = {column["name"] for column in inspect(engine).get_columns(Job.__tablename__)}
+    with engine.begin() as conn:
+        for name, ddl_type in _ADDED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {Job.__tablename__} ADD COLUMN {name} {ddl_type}"))
+                logger.info("Added column %s.%s", Job.__tablename__, name)
+        if "deleted_at" not in existing:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_jobs_deleted_at ON {Job.__tablename__} (deleted_at)"))
+
+
 # Database engine and session factory (lazy initialization)
 _engine = None
 _SessionLocal = None
+_read_engine = None
+_ReadSessionLocal = None
+
+# Applied to every connection in the production profile. WAL + synchronous=NORMAL
+# only fsyncs at checkpoints and stays consistent across application crashes.
+_SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16000",  # ~16 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=134217728",
+)
+
+
+def _is_memory_database(db_url: str) -> bool:
+    return db_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in db_url
+
+
+def _sqlite_file_path(db_url: str) -> Optional[str]:
+    """Return the database file path for file-backed SQLite URLs."""
+    if not db_url.startswith("sqlite:///") or _is_memory_database(db_url):
+        return None
+    return db_url.replace("sqlite:///", "")
+
+
+def _production_sqlite() -> bool:
+    """Whether the WAL / read pool / batched writer profile is active."""
+    return SQLITE_PROFILE == "production" and _sqlite_file_path(DATABASE_URL) is not None
+
+
+def _install_sqlite_pragmas(engine, read_only: bool) -> None:
+    """Apply the production pragmas whenever the pool opens a connection."""
+    def apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not read_only:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            for pragma in _SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+            if read_only:
+                cursor.execute("PRAGMA query_only=1")
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", apply)
+
+
+def _read_only_url(driver: str) -> str:
+    db_path = _sqlite_file_path(DATABASE_URL)
+    return f"{driver}:///file:{quote(db_path)}?mode=ro&uri=true"
 
 
 def _get_engine():
@@ -73,8 +169,8 @@ def _get_engine():
         
         # Handle SQLite path
         db_url = DATABASE_URL
-        if db_url.startswith("sqlite:///"):
-            db_path = db_url.replace("sqlite:///", "")
+        db_path = _sqlite_file_path(db_url)
+        if db_path:
             # Ensure the database file's directory exists
             from pathlib import Path
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -84,9 +180,12 @@ def _get_engine():
             connect_args={"check_same_thread": False} if "sqlite" in db_url else {},
             echo=False,  # Set to True for SQL debugging
         )
+        if _production_sqlite():
+            _install_sqlite_pragmas(_engine, read_only=False)
         # Create tables
         Base.metadata.create_all(bind=_engine)
-        logger.info("Database initialized at %s", db_url)
+        _ensure_added_columns(_engine)
+        logger.info("Database initialized at %s (profile=%s)", db_url, SQLITE_PROFILE)
     return _engine
 
 
@@ -94,10 +193,36 @@ def _get_session_factory():
     """Get or create the session factory."""
     global _SessionLocal
     if _SessionLocal is None:
-        _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_get_engine())
+        _SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=_get_engine())
     return _SessionLocal
 
 
+def _get_read_engine():
+    """Get or create the engine used for reads (a read-only pool in production)."""
+    global _read_engine
+    if _read_engine is None:
+        engine = _get_engine()
+        if not _production_sqlite():
+            return engine
+        _read_engine = create_engine(
+            _read_only_url("sqlite"),
+            connect_args={"check_same_thread": False},
+            pool_size=DB_READ_POOL_SIZE,
+            max_overflow=DB_READ_POOL_SIZE,
+            echo=False,
+        )
+        _install_sqlite_pragmas(_read_engine, read_only=True)
+    return _read_engine
+
+
+def _get_read_session_factory():
+    """Get or create the read session factory."""
+    global _ReadSessionLocal
+    if _ReadSessionLocal is None:
+        _ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_get_read_engine())
+    return _ReadSessionLocal
+
+
 @contextmanager
 def get_db() -> Generator[Session, None, None]:
     """
@@ -119,6 +244,116 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+@contextmanager
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Context manager for read-only sessions.
+
+    Usage:
+        with get_read_db() as db:
+            db.query(Job).all()
+    """
+    ReadSessionLocal = _get_read_session_factory()
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _async_database_url(db_url: str) -> str:
+    """Map a sync database URL onto its asyncio driver."""
+    if db_url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + db_url[len("sqlite:"):]
+    if db_url.startswith("postgresql:"):
+        return "postgresql+asyncpg:" + db_url[len("postgresql:"):]
+    return db_url
+
+
+# Async engine and session factory (lazy initialization)
+_async_engine = None
+_AsyncSessionLocal = None
+_async_unavailable = False
+
+
+def _get_async_engine():
+    """Get or create the asyncio database engine."""
+    global _async_engine
+    if _async_engine is None:
+        # The sync engine owns directory setup and table creation
+        _get_engine()
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        if _production_sqlite():
+            # Async handlers only read; writes go through the writer thread
+            _async_engine = create_async_engine(
+                _read_only_url("sqlite+aiosqlite"),
+                pool_size=DB_READ_POOL_SIZE,
+                max_overflow=DB_READ_POOL_SIZE,
+                echo=False,
+            )
+            _install_sqlite_pragmas(_async_engine.sync_engine, read_only=True)
+        else:
+            _async_engine = create_async_engine(_async_database_url(DATABASE_URL), echo=False)
+        logger.info("Async database engine initialized for %s", DATABASE_URL)
+    return _async_engine
+
+
+def _get_async_session_factory():
+    """Get or create the async session factory."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=_get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _AsyncSessionLocal
+
+
+def async_database_enabled() -> bool:
+    """
+    Whether async helpers run on the asyncio engine.
+
+    In-memory SQLite is excluded because a second engine would see a
+    different, empty database.
+    """
+    global _async_unavailable
+    if not ASYNC_DATABASE_ENABLED or _async_unavailable or _is_memory_database(DATABASE_URL):
+        return False
+    try:
+        _get_async_session_factory()
+    except ImportError as exc:
+        logger.warning("Async database driver unavailable, using worker threads: %s", exc)
+        _async_unavailable = True
+        return False
+    return True
+
+
+@asynccontextmanager
+async def get_async_db() -> AsyncGenerator[Any, None]:
+    """
+    Async context manager for database sessions.
+
+    Usage:
+        async with get_async_db() as db:
+            (await db.execute(select(Job))).scalars().all()
+    """
+    AsyncSessionLocal = _get_async_session_factory()
+    db = AsyncSessionLocal()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
 def get_db_dependency():
     """FastAPI dependency for database sessions."""
     SessionLocal = _get_session_factory()
@@ -134,16 +369,167 @@ def get_db_dependency():
 
 
 # =============================================================================
-# Job CRUD Operations
+# Batched Writer
 # =============================================================================
 
-def create_job_record(
-    job_id: str,
-    label: Optional[str] = None,
-    file_count: int = 0,
-) -> Job:
-    """Create a new job record in the database."""
+_LOCK_RETRIES = 5
+
+
+class _JobWriter:
+    """
+    Single writer thread that applies job writes in group commits.
+
+    Callers enqueue write operations (callables taking a Session) and receive a
+    Future. The writer drains up to ``max_batch`` queued operations, waiting at
+    most ``window_seconds`` for stragglers, and commits them in one
+    transaction so SQLite takes the write lock and syncs the WAL once per batch.
+    """
+
+    def __init__(self, session_factory, max_batch: int, window_seconds: float):
+        self._session_factory = session_factory
+        self._max_batch = max(1, max_batch)
+        self._window = max(0.0, window_seconds)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        self.stats = {"batches": 0, "writes": 0, "lock_retries": 0, "failed_writes": 0}
+        self._thread = threading.Thread(target=self._run, name="job-db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: Callable[[Session], Any]) -> Future:
+        if self._closed:
+            raise RuntimeError("Database writer is shut down")
+        future: Future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Commit everything already queued, then stop the writer thread."""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch, stop = self._collect_batch(item)
+            self._commit_batch(batch)
+            if stop:
+                return
+
+    def _collect_batch(self, first: tuple):
+        batch = [first]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit_batch(self, batch: List[tuple]) -> None:
+        try:
+            results = self._apply([op for op, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                self.stats["failed_writes"] += 1
+                batch[0][1].set_exception(exc)
+                return
+            # Isolate the failing write: replay each operation in its own transaction
+            logger.warning("Batched commit of %d writes failed (%s); retrying individually", len(batch), exc)
+            for op, future in batch:
+                self._commit_batch([(op, future)])
+            return
+        self.stats["batches"] += 1
+        self.stats["writes"] += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _apply(self, ops: List[Callable[[Session], Any]]) -> List[Any]:
+        for attempt in range(_LOCK_RETRIES):
+            db = self._session_factory()
+            try:
+                results = [op(db) for op in ops]
+                db.commit()
+                return results
+            except OperationalError as exc:
+                db.rollback()
+                # Another process (e.g. the CLI) may hold the lock past busy_timeout
+                if "locked" not in str(exc).lower() or attempt == _LOCK_RETRIES - 1:
+                    raise
+                self.stats["lock_retries"] += 1
+                time.sleep(0.05 * (2 ** attempt))
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        raise RuntimeError("unreachable")
+
+
+_job_writer: Optional[_JobWriter] = None
+_job_writer_lock = threading.Lock()
+
+
+def _get_job_writer() -> _JobWriter:
+    """Get or start the writer thread."""
+    global _job_writer
+    if _job_writer is None:
+        with _job_writer_lock:
+            if _job_writer is None:
+                _job_writer = _JobWriter(
+                    _get_session_factory(),
+                    max_batch=DB_WRITE_BATCH_MAX,
+                    window_seconds=DB_WRITE_BATCH_WINDOW_MS / 1000.0,
+                )
+    return _job_writer
+
+
+def shutdown_job_writer() -> None:
+    """Flush queued writes and stop the writer thread (no-op if never started)."""
+    global _job_writer
+    with _job_writer_lock:
+        writer, _job_writer = _job_writer, None
+    if writer is not None:
+        writer.close()
+
+
+def get_write_stats() -> Dict[str, int]:
+    """Counters for the batched writer (all zero when batching is inactive)."""
+    if _job_writer is None:
+        return {"batches": 0, "writes": 0, "lock_retries": 0, "failed_writes": 0}
+    return dict(_job_writer.stats)
+
+
+def _run_write(op: Callable[[Session], Any]) -> Any:
+    """Apply a write operation through the batched writer or a direct session."""
+    if _production_sqlite():
+        return _get_job_writer().submit(op).result()
     with get_db() as db:
+        return op(db)
+
+
+async def _run_write_async(op: Callable[[Session], Any]) -> Any:
+    """Async counterpart of _run_write."""
+    if _production_sqlite():
+        return await asyncio.wrap_future(_get_job_writer().submit(op))
+    if not async_database_enabled():
+        return await asyncio.to_thread(_run_write, op)
+    async with get_async_db() as db:
+        return await db.run_sync(op)
+
+
+# =============================================================================
+# Job CRUD Operations
+# =============================================================================
+
+def _create_job_op(job_id: str, label: Optional[str], file_count: int) -> Callable[[Session], Job]:
+    def op(db: Session) -> Job:
         job = Job(
             id=job_id,
             label=label,
@@ -155,12 +541,42 @@ def create_job_record(
         db.flush()
         logger.info("Created job record: %s", job_id)
         return job
+    return op
 
 
-def get_job_record(job_id: str) -> Optional[Job]:
-    """Get a job record by ID."""
-    with get_db() as db:
-        return db.query(Job).filter(Job.id == job_id).first()
+def _update_job_op(job_id: str, fields: Dict[str, Any]) -> Callable[[Session], Optional[Job]]:
+    def op(db: Session) -> Optional[Job]:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            return None
+        
+        for name, value in fields.items():
+            if value is not None:
+                setattr(job, name, value)
+        
+        job.updated_at = datetime.now(timezone.utc)
+        db.flush()
+        logger.info("Updated job record: %s (status=%s)", job_id, job.status)
+        return job
+    return op
+
+
+def create_job_record(
+    job_id: str,
+    label: Optional[str] = None,
+    file_count: int = 0,
+) -> Job:
+    """Create a new job record in the database."""
+    return _run_write(_create_job_op(job_id, label, file_count))
+
+
+def get_job_record(job_id: str, include_deleted: bool = False) -> Optional[Job]:
+    """Get a job record by ID (tombstoned jobs only when include_deleted)."""
+    with get_read_db() as db:
+        query = db.query(Job).filter(Job.id == job_id)
+        if not include_deleted:
+            query = query.filter(Job.deleted_at.is_(None))
+        return query.first()
 
 
 def update_job_record(
@@ -174,42 +590,45 @@ def update_job_record(
     label: Optional[str] = None,
 ) -> Optional[Job]:
     """Update a job record."""
-    with get_db() as db:
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            return None
-        
-        if status is not None:
-            job.status = status
-        if building_health_grade is not None:
-            job.building_health_grade = building_health_grade
-        if overall_risk_score is not None:
-            job.overall_risk_score = overall_risk_score
-        if overall_severity_index is not None:
-            job.overall_severity_index = overall_severity_index
-        if total_estimated_cost is not None:
-            job.total_estimated_cost = total_estimated_cost
-        if error is not None:
-            job.error = error
-        if label is not None:
-            job.label = label
-        
-        job.updated_at = datetime.now(timezone.utc)
-        db.flush()
-        logger.info("Updated job record: %s (status=%s)", job_id, job.status)
-        return job
+    fields = {
+        "status": status,
+        "building_health_grade": building_health_grade,
+        "overall_risk_score": overall_risk_score,
+        "overall_severity_index": overall_severity_index,
+        "total_estimated_cost": total_estimated_cost,
+        "error": error,
+        "label": label,
+    }
+    return _run_write(_update_job_op(job_id, fields))
 
 
 def list_job_records() -> List[Dict[str, Any]]:
     """List all job records, sorted by created_at DESC."""
-    with get_db() as db:
-        jobs = db.query(Job).order_by(Job.created_at.desc()).all()
+    with get_read_db() as db:
+        jobs = db.query(Job).filter(Job.deleted_at.is_(None)).order_by(Job.created_at.desc()).all()
         return [job.to_dict() for job in jobs]
 
 
+def list_job_states(include_deleted: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Status and timestamps of every job record, keyed by job ID (used by storage GC)."""
+    with get_read_db() as db:
+        query = db.query(Job.id, Job.status, Job.created_at, Job.updated_at, Job.deleted_at)
+        if not include_deleted:
+            query = query.filter(Job.deleted_at.is_(None))
+        return {
+            job_id: {
+                "status": status,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "deleted_at": deleted_at,
+            }
+            for job_id, status, created_at, updated_at, deleted_at in query.all()
+        }
+
+
 def delete_job_record(job_id: str) -> bool:
     """Delete a job record."""
-    with get_db() as db:
+    def op(db: Session) -> bool:
         job = db.query(Job).filter(Job.id == job_id).first()
         if not job:
             return False
@@ -217,26 +636,112 @@ def delete_job_record(job_id: str) -> bool:
         logger.info("Deleted job record: %s", job_id)
         return True
 
+    return _run_write(op)
+
 
 def delete_all_job_records() -> int:
     """Delete all job records. Returns count of deleted records."""
-    with get_db() as db:
+    def op(db: Session) -> int:
         count = db.query(Job).delete()
         logger.info("Deleted %d job records", count)
         return count
 
+    return _run_write(op)
+
+
+def tombstone_job_records(job_ids: List[str]) -> List[str]:
+    """Mark jobs as deleted. Returns the IDs that were live and are now tombstoned."""
+    def op(db: Session) -> List[str]:
+        live = [
+            job_id
+            for (job_id,) in db.query(Job.id).filter(Job.id.in_(job_ids), Job.deleted_at.is_(None))
+        ]
+        if live:
+            db.query(Job).filter(Job.id.in_(live)).update(
+                {Job.deleted_at: datetime.now(timezone.utc)}, synchronize_session=False
+            )
+            logger.info("Tombstoned %d job records", len(live))
+        return live
+
+    return _run_write(op)
+
+
+def tombstone_all_job_records() -> int:
+    """Mark every live job as deleted. Returns the number tombstoned."""
+    def op(db: Session) -> int:
+        count = db.query(Job).filter(Job.deleted_at.is_(None)).update(
+            {Job.deleted_at: datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        logger.info("Tombstoned %d job records", count)
+        return count
+
+    return _run_write(op)
+
+
+def purge_tombstoned_job_records(deleted_before: datetime) -> int:
+    """Hard-delete tombstoned rows whose files have been reclaimed."""
+    def op(db: Session) -> int:
+        count = db.query(Job).filter(
+            Job.deleted_at.is_not(None), Job.deleted_at <= deleted_before
+        ).delete(synchronize_session=False)
+        if count:
+            logger.info("Purged %d tombstoned job records", count)
+        return count
+
+    return _run_write(op)
+
+
+def _stats_from_counts(counts: Dict[str, int]) -> Dict[str, int]:
+    return {
+        "jobs_total": sum(counts.values()),
+        "jobs_completed": counts.get("completed", 0),
+        "jobs_failed": counts.get("failed", 0),
+        "jobs_processing": counts.get("processing", 0),
+    }
+
 
 def get_job_stats() -> Dict[str, int]:
     """Get job statistics for metrics endpoint."""
-    with get_db() as db:
-        total = db.query(func.count(Job.id)).scalar() or 0
-        completed = db.query(func.count(Job.id)).filter(Job.status == "completed").scalar() or 0
-        failed = db.query(func.count(Job.id)).filter(Job.status == "failed").scalar() or 0
-        processing = db.query(func.count(Job.id)).filter(Job.status == "processing").scalar() or 0
-        
-        return {
-            "jobs_total": total,
-            "jobs_completed": completed,
-            "jobs_failed": failed,
-            "jobs_processing": processing,
-        }
+    with get_read_db() as db:
+        rows = (
+            db.query(Job.status, func.count(Job.id))
+            .filter(Job.deleted_at.is_(None))
+            .group_by(Job.status)
+            .all()
+        )
+        return _stats_from_counts({status: count for status, count in rows})
+
+
+# =============================================================================
+# Async Job Operations
+# =============================================================================
+
+async def async_create_job_record(
+    job_id: str,
+    label: Optional[str] = None,
+    file_count: int = 0,
+) -> Job:
+    """Create a new job record without blocking the event loop."""
+    return await _run_write_async(_create_job_op(job_id, label, file_count))
+
+
+async def async_list_job_records() -> List[Dict[str, Any]]:
+    """List all job records, sorted by created_at DESC, without blocking the event loop."""
+    if not async_database_enabled():
+        return await asyncio.to_thread(list_job_records)
+    async with get_async_db() as db:
+        result = await db.execute(
+            select(Job).where(Job.deleted_at.is_(None)).order_by(Job.created_at.desc())
+        )
+        return [job.to_dict() for job in result.scalars().all()]
+
+
+async def async_get_job_stats() -> Dict[str, int]:
+    """Get job statistics for the metrics endpoint without blocking the event loop."""
+    if not async_database_enabled():
+        return await asyncio.to_thread(get_job_stats)
+    async with get_async_db() as db:
+        result = await db.execute(
+            select(Job.status, func.count(Job.id)).where(Job.deleted_at.is_(None)).group_by(Job.status)
+        )
+        return _stats_from_counts({status: count for status, count in result.all()})
@@ -13,11 +13,14 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 
+from backend.api.admission import AdmissionMiddleware, admission_stats
+from backend.api.compression import CompressionMiddleware
+from backend.api.responses import FastJSONRoute
 from backend.api.routes_results import router as results_router
 from backend.api.routes_upload import router as upload_router
+from backend.api.static_files import StaticSite
 from backend.core.config import DAMAGE_ANALYZER, PIPELINE_VERSION
 
 # Static files directory (built frontend)
@@ -52,6 +55,8 @@ app = FastAPI(
     description="AI-powered building facade assessment platform",
     version=PIPELINE_VERSION,
 )
+# Routes declared on the app itself (health, metrics) also skip jsonable_encoder
+app.router.route_class = FastJSONRoute
 
 
 @app.on_event("startup")
@@ -70,6 +75,35 @@ async def startup_event():
         logger.info("Database initialized successfully")
     except Exception as exc:
         logger.warning("Database initialization failed: %s", exc)
+    
+    # Reclaim files of deleted jobs in the background
+    from backend.services.reclaimer import start_reclaimer
+    start_reclaimer()
+    
+    # Apply the storage retention policy periodically (GC_INTERVAL_SECONDS > 0)
+    from backend.services.storage_gc import start_storage_gc
+    start_storage_gc()
+    
+    # Compress artifacts of cold jobs periodically (TIER_INTERVAL_SECONDS > 0)
+    from backend.services.cold_storage import start_cold_tiering
+    start_cold_tiering()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and flush batched database writes."""
+    from backend.database import shutdown_job_writer
+    from backend.services.reclaimer import stop_reclaimer
+    from backend.services.cold_storage import stop_cold_tiering
+    from backend.services.storage_gc import stop_storage_gc
+    from backend.services.portfolio_report import shutdown_portfolio_pool
+    from backend.services.photogrammetry_client import shutdown_photogrammetry
+    stop_cold_tiering()
+    stop_storage_gc()
+    stop_reclaimer()
+    shutdown_portfolio_pool()
+    shutdown_photogrammetry()
+    shutdown_job_writer()
 
 
 @app.exception_handler(Exception)
@@ -103,6 +137,10 @@ allowed_origins = [
 if os.environ.get("CORS_ALLOW_ALL", "").lower() in ("true", "1", "yes"):
     allowed_origins = ["*"]
 
+# Limits on concurrent uploads and jobs (see backend/api/admission.py). Added
+# first so it runs inside CORS and its 429/503 responses carry CORS headers.
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -111,6 +149,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for JSON and other text responses (see backend/api/compression.py)
+app.add_middleware(CompressionMiddleware)
+
 # =============================================================================
 # Routes
 # =============================================================================
@@ -125,15 +166,15 @@ def health():
 
 
 @app.get("/metrics")
-def metrics():
+async def metrics():
     """
     Metrics endpoint for monitoring.
     
-    Returns pipeline version and job statistics.
+    Returns pipeline version, job statistics and admission queue depths.
     """
+    from backend.database import async_get_job_stats, get_write_stats
     try:
-        from backend.database import get_job_stats
-        stats = get_job_stats()
+        stats = await async_get_job_stats()
     except Exception as exc:
         logger.warning("Failed to get job stats: %s", exc)
         stats = {
@@ -148,23 +189,21 @@ def metrics():
         "pipeline_version": PIPELINE_VERSION,
         "damage_analyzer": DAMAGE_ANALYZER,
         **stats,
+        "database_writes": get_write_stats(),
+        "admission": admission_stats(),
     }
 
 
 # =============================================================================
 # Static Frontend Serving (Production)
 # =============================================================================
-# Serve frontend static files if they exist (for containerized deployment)
+# Serve the built frontend if it exists (for containerized deployment). The
+# directory is scanned once, here; see backend/api/static_files.py.
 if STATIC_DIR.exists():
-    # Mount static assets (JS, CSS, images)
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
-    
+    static_site = StaticSite(STATIC_DIR)
+
     @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """Serve the SPA for all non-API routes."""
-        # Check if the file exists in static directory
-        file_path = STATIC_DIR / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        # Return index.html for SPA routing
-        return FileResponse(STATIC_DIR / "index.html")
+    async def serve_spa(full_path: str, request: Request):
+        """Serve the SPA for all non-API routes (assets, or index.html for client-side routes)."""
+        headers = request.headers
+        return static_site.response(full_path, headers.get("accept-encoding", ""), headers.get("if-none-match"))
@@ -9,7 +9,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from backend.core.config import RECONSTRUCTIONS_DIR, UPLOADS_DIR
+from backend.core.job_paths import job_reconstruction_dir, job_upload_dir
 
 VISION_MODEL = os.getenv("OPENAI_VISION_MODEL", "gpt-4o-mini")
 logger = logging.getLogger(__name__)
@@ -44,7 +44,7 @@ class DamageDetectionError(RuntimeError):
 
 
 def _list_images(job_id: str) -> List[Path]:
-    upload_dir = UPLOADS_DIR / job_id
+    upload_dir = job_upload_dir(job_id)
     if not upload_dir.exists():
         raise FileNotFoundError(f"No uploads for job {job_id}")
     images = sorted(p for p in upload_dir.iterdir() if p.is_file())
@@ -164,7 +164,7 @@ def run_damage_detection(job_id: str) -> Path:
     except DamageDetectionError as exc:
         logger.warning("OpenAI client unavailable, falling back to mock damages: %s", exc)
         client = None
-    recon_dir = RECONSTRUCTIONS_DIR / job_id
+    recon_dir = job_reconstruction_dir(job_id)
     recon_dir.mkdir(parents=True, exist_ok=True)
     damages_path = recon_dir / "damages.json"
 
@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Protocol, runtime_checkable
+from typing import List, Protocol, runtime_checkable
+
+from backend.services.storage import ObjectInfo
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 
 
 @runtime_checkable
@@ -38,3 +42,9 @@ class DamageAnalyzerProtocol(Protocol):
 class DamageAnalysisError(RuntimeError):
     """Raised when damage analysis fails."""
     pass
+
+
+def select_images(uploads: List[ObjectInfo]) -> List[ObjectInfo]:
+    """Uploads with a recognized image extension, or all of them if none has one."""
+    images = [upload for upload in uploads if Path(upload.name).suffix.lower() in IMAGE_EXTENSIONS]
+    return images or uploads
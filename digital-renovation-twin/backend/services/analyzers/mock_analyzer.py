@@ -3,14 +3,15 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 import random
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List
 
-from backend.core.config import RECONSTRUCTIONS_DIR, UPLOADS_DIR
+from backend.services.damage_records import DamageRecord, write_damages
+from backend.services.storage import list_job_uploads
+
+from .base import select_images
 
 logger = logging.getLogger(__name__)
 
@@ -158,19 +159,8 @@ class MockDamageAnalyzer:
         """
         logger.info("MockDamageAnalyzer: Analyzing job %s", job_id)
         
-        # Find images
-        upload_dir = UPLOADS_DIR / job_id
-        if not upload_dir.exists():
-            raise FileNotFoundError(f"No uploads for job {job_id}")
-        
-        images = sorted(
-            p for p in upload_dir.iterdir()
-            if p.is_file() and p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp", ".gif"}
-        )
-        
-        if not images:
-            # Include any file if no recognized image extensions
-            images = sorted(p for p in upload_dir.iterdir() if p.is_file() and not p.name.endswith('.json'))
+        # Find images (any uploaded file if none has a recognized image extension)
+        images = select_images(list_job_uploads(job_id))
         
         # Initialize RNG with deterministic seed
         rng = random.Random(self._get_seed_for_job(job_id))
@@ -192,20 +182,8 @@ class MockDamageAnalyzer:
                 "image": images[0].name,
             })
         
-        # Prepare output
-        recon_dir = RECONSTRUCTIONS_DIR / job_id
-        recon_dir.mkdir(parents=True, exist_ok=True)
-        damages_path = recon_dir / "damages.json"
-        
-        data = {
-            "job_id": job_id,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "analyzer": "mock",
-            "damages": all_damages,
-        }
-        
-        with damages_path.open("w", encoding="utf-8") as fp:
-            json.dump(data, fp, indent=2)
+        records = [DamageRecord.from_dict(damage) for damage in all_damages]
+        damages_path = write_damages(job_id, records, analyzer="mock")
         
         logger.info(
             "MockDamageAnalyzer: Generated %d damages for job %s",
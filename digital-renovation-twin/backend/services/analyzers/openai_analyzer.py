@@ -7,13 +7,14 @@ import json
 import logging
 import mimetypes
 import os
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from backend.core.config import OPENAI_VISION_MODEL, RECONSTRUCTIONS_DIR, UPLOADS_DIR
+from backend.core.config import OPENAI_VISION_MODEL
+from backend.services.damage_records import DamageRecord, write_damages
+from backend.services.storage import ObjectInfo, get_storage, list_job_uploads
 
-from .base import DamageAnalysisError
+from .base import DamageAnalysisError, select_images
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,11 @@ Respond with a JSON object containing a "damages" array. Each damage entry must
 If no damage is visible, return {"damages": []}."""
 
 
-def _encode_image(image_path: Path) -> str:
-    """Encode image to base64 data URL."""
-    mime_type, _ = mimetypes.guess_type(image_path.name)
+def _encode_image(image: ObjectInfo) -> str:
+    """Encode a stored image to a base64 data URL."""
+    mime_type, _ = mimetypes.guess_type(image.name)
     mime_type = mime_type or "image/jpeg"
-    data = base64.b64encode(image_path.read_bytes()).decode("utf-8")
+    data = base64.b64encode(get_storage().read(image.key)).decode("utf-8")
     return f"data:{mime_type};base64,{data}"
 
 
@@ -98,9 +99,9 @@ class OpenAIDamageAnalyzer:
             self._client = _load_openai_client(self._api_key)
         return self._client
     
-    def _analyze_image(self, image_path: Path) -> List[Dict]:
+    def _analyze_image(self, image: ObjectInfo) -> List[Dict]:
         """Analyze a single image using OpenAI Vision API."""
-        image_data_url = _encode_image(image_path)
+        image_data_url = _encode_image(image)
         
         try:
             response = self.client.chat.completions.create(
@@ -155,52 +156,28 @@ class OpenAIDamageAnalyzer:
         logger.info("OpenAIDamageAnalyzer: Analyzing job %s with model %s", job_id, self.model)
         
         # Find images
-        upload_dir = UPLOADS_DIR / job_id
-        if not upload_dir.exists():
-            raise FileNotFoundError(f"No uploads for job {job_id}")
-        
-        images = sorted(
-            p for p in upload_dir.iterdir()
-            if p.is_file() and p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp", ".gif"}
-        )
-        
-        if not images:
-            images = sorted(
-                p for p in upload_dir.iterdir()
-                if p.is_file() and not p.name.endswith('.json')
-            )
+        images = select_images(list_job_uploads(job_id))
         
         if not images:
             raise FileNotFoundError(f"Job {job_id} has no image files to analyze")
         
         # Analyze each image
-        all_damages: List[Dict] = []
+        all_damages: List[DamageRecord] = []
         for image in images:
             try:
                 damages = self._analyze_image(image)
                 for damage in damages:
+                    if not isinstance(damage, dict):
+                        logger.warning("Ignoring malformed finding for %s: %r", image.name, damage)
+                        continue
                     damage["image"] = image.name
-                    all_damages.append(damage)
+                    all_damages.append(DamageRecord.from_dict(damage))
                 logger.debug("Analyzed %s: %d damages found", image.name, len(damages))
             except DamageAnalysisError as exc:
                 logger.warning("Failed to analyze %s: %s", image.name, exc)
                 # Continue with other images rather than failing completely
         
-        # Prepare output
-        recon_dir = RECONSTRUCTIONS_DIR / job_id
-        recon_dir.mkdir(parents=True, exist_ok=True)
-        damages_path = recon_dir / "damages.json"
-        
-        data = {
-            "job_id": job_id,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "analyzer": "openai",
-            "model": self.model,
-            "damages": all_damages,
-        }
-        
-        with damages_path.open("w", encoding="utf-8") as fp:
-            json.dump(data, fp, indent=2)
+        damages_path = write_damages(job_id, all_damages, analyzer="openai", model=self.model)
         
         logger.info(
             "OpenAIDamageAnalyzer: Found %d damages across %d images for job %s",
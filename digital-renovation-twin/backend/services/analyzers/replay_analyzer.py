@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import json
 import logging
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from backend.core.config import FIXTURES_DIR, RECONSTRUCTIONS_DIR, UPLOADS_DIR
+from backend.core.config import FIXTURES_DIR
+from backend.services.damage_records import DamageRecord, write_damages
+from backend.services.storage import list_job_uploads
 
 from .base import DamageAnalysisError
 
@@ -93,41 +94,24 @@ class ReplayDamageAnalyzer:
         """
         logger.info("ReplayDamageAnalyzer: Replaying fixtures for job %s", job_id)
         
-        # Verify job exists
-        upload_dir = UPLOADS_DIR / job_id
-        if not upload_dir.exists():
-            raise FileNotFoundError(f"No uploads for job {job_id}")
-        
-        # Get image names for attribution
-        images = sorted(
-            p.name for p in upload_dir.iterdir()
-            if p.is_file() and not p.name.endswith('.json')
-        )
+        # Get image names for attribution (raises if the job does not exist)
+        images = [upload.name for upload in list_job_uploads(job_id)]
         
         # Load fixture
         fixture_path = self._find_fixture(job_id)
         damages = self._load_fixture(fixture_path)
         
-        # Assign images to damages if not already set
-        for i, damage in enumerate(damages):
-            if "image" not in damage and images:
-                damage["image"] = images[i % len(images)]
-        
-        # Prepare output
-        recon_dir = RECONSTRUCTIONS_DIR / job_id
-        recon_dir.mkdir(parents=True, exist_ok=True)
-        damages_path = recon_dir / "damages.json"
+        try:
+            records = [DamageRecord.from_dict(damage) for damage in damages]
+        except ValueError as exc:
+            raise DamageAnalysisError(f"Invalid damage in fixture {fixture_path}: {exc}") from exc
         
-        data = {
-            "job_id": job_id,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "analyzer": "replay",
-            "fixture_source": str(fixture_path.name),
-            "damages": damages,
-        }
+        # Assign images to damages if not already set
+        for i, record in enumerate(records):
+            if record.image is None and images:
+                record.image = images[i % len(images)]
         
-        with damages_path.open("w", encoding="utf-8") as fp:
-            json.dump(data, fp, indent=2)
+        damages_path = write_damages(job_id, records, analyzer="replay", fixture_source=str(fixture_path.name))
         
         logger.info(
             "ReplayDamageAnalyzer: Replayed %d damages from %s for job %s",
@@ -0,0 +1,351 @@
+"""
+Batch rescoring of risk summaries and cost estimates across many jobs.
+
+After TYPE_WEIGHTS, SEVERITY_MULTIPLIER or RATE_TABLE change, every job's
+risk_summary.json and cost_estimate.json is stale. Instead of calling
+compute_risk_summary() and generate_cost_estimate() per job, the damages of all
+jobs are loaded once into columnar NumPy arrays (DamageColumns: type and
+severity codes, quantities and per-job offsets) and scored with array
+operations:
+
+- weights, multipliers and rates are looked up per type and severity, then
+  gathered per damage, so changed tables need no reload;
+- per-job and per-(job, type) totals are segment sums over the columns.
+
+Results are exactly those of the per-job functions. The segment sums add each
+segment's values left to right (one vectorized step per position, across all
+segments at once) rather than with NumPy's pairwise summation, so every total is
+the same float the per-job loops produce, and rounding gives what Python's
+round() gives (see round_exact). The written files are byte-identical.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core import config
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services import cost_estimation, job_metadata, risk_scoring
+from backend.services.damage_records import DamageRecord, DamageType, Severity, load_damage_records
+from backend.services.risk_scoring import RISK_OUTPUT_FILENAME
+
+logger = logging.getLogger(__name__)
+
+COST_OUTPUT_FILENAME = "cost_estimate.json"
+
+# Grade boundaries of risk_scoring._grade_from_score (score < bound)
+_GRADE_BOUNDS = np.array([20.0, 40.0, 70.0])
+_GRADES = np.array(["A", "B", "C", "D"])
+
+
+@dataclass
+class DamageColumns:
+    """
+    Damages of many jobs as columns; job i owns rows offsets[i]:offsets[i + 1].
+
+    `type_codes` index `types` (every DamageType) and `severity_codes` index
+    `severities` (every Severity). `quantities` and `confidences` are the
+    records' quantities and detection confidences.
+    """
+
+    job_ids: List[str]
+    offsets: np.ndarray
+    type_codes: np.ndarray
+    severity_codes: np.ndarray
+    quantities: np.ndarray
+    confidences: np.ndarray
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+    types: ClassVar[List[DamageType]] = list(DamageType)
+    severities: ClassVar[List[Severity]] = list(Severity)
+
+    @property
+    def damage_count(self) -> int:
+        return len(self.type_codes)
+
+
+_TYPE_CODES = {member: code for code, member in enumerate(DamageColumns.types)}
+_SEVERITY_CODES = {member: code for code, member in enumerate(DamageColumns.severities)}
+
+
+def build_damage_columns(jobs: Iterable[Tuple[str, Iterable[DamageRecord]]]) -> DamageColumns:
+    """
+    Columns from (job_id, damage records) pairs. Jobs whose records cannot be
+    read (malformed JSON or records) are left out and listed in `skipped`.
+    """
+    job_ids: List[str] = []
+    offsets = [0]
+    type_codes: List[int] = []
+    severity_codes: List[int] = []
+    quantities: List[float] = []
+    confidences: List[float] = []
+    skipped: Dict[str, str] = {}
+
+    for job_id, damages in jobs:
+        try:
+            for damage in damages:
+                type_codes.append(_TYPE_CODES[damage.type])
+                severity_codes.append(_SEVERITY_CODES[damage.severity])
+                quantities.append(damage.quantity)
+                confidences.append(damage.confidence)
+        except ValueError as exc:
+            skipped[job_id] = str(exc)
+            # Drop the rows already added for this job
+            for column in (type_codes, severity_codes, quantities, confidences):
+                del column[offsets[-1]:]
+            continue
+        job_ids.append(job_id)
+        offsets.append(len(type_codes))
+
+    return DamageColumns(
+        job_ids=job_ids,
+        offsets=np.array(offsets, dtype=np.int64),
+        type_codes=np.array(type_codes, dtype=np.int32),
+        severity_codes=np.array(severity_codes, dtype=np.int32),
+        quantities=np.array(quantities, dtype=np.float64),
+        confidences=np.array(confidences, dtype=np.float64),
+        skipped=skipped,
+    )
+
+
+def load_damage_columns(job_ids: Iterable[str]) -> DamageColumns:
+    """Stream the damage records of every job (hot or cold) into columns; jobs without any are skipped."""
+    skipped: Dict[str, str] = {}
+
+    def damages_of_jobs():
+        for job_id in job_ids:
+            try:
+                yield job_id, load_damage_records(job_id)
+            except FileNotFoundError:
+                skipped[job_id] = "Damage summary missing"
+
+    columns = build_damage_columns(damages_of_jobs())
+    columns.skipped.update(skipped)
+    return columns
+
+
+def round_exact(values: np.ndarray, digits: int) -> List[float]:
+    """
+    Python's round(value, digits) of every value, vectorized.
+    
+    Scaling, rounding to an integer and dividing gives the same float as
+    round() whenever the scaled value is not within rounding error of a tie;
+    those few values (and huge or non-finite ones) go through round() itself.
+    """
+    scale = 10.0 ** digits
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * scale
+        rounded = (np.rint(scaled) / scale).tolist()
+        unsure = ~(np.abs(scaled) < 2.0 ** 52) | (np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 1e-15)
+    for index in np.flatnonzero(unsure).tolist():
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+
+def segment_sums(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Sum of values[start:start + length] for every segment, added left to right.
+
+    One vectorized step per position covers every segment still that long, so
+    each total matches a Python `total += value` loop bit for bit.
+    """
+    sums = np.zeros(len(starts), dtype=np.float64)
+    if not len(starts):
+        return sums
+    order = np.argsort(-lengths, kind="stable")
+    longest_first = lengths[order]
+    positions = starts[order].copy()
+    partial = np.zeros(len(starts), dtype=np.float64)
+    for step in range(int(longest_first[0])):
+        active = int(np.searchsorted(-longest_first, -step, side="left"))  # Segments longer than `step`
+        partial[:active] += values[positions[:active]]
+        positions[:active] += 1
+    sums[order] = partial
+    return sums
+
+
+def _grouped(columns: DamageColumns, keys: np.ndarray, values: Sequence[np.ndarray]):
+    """
+    Per-(job, key) groups in job order, then order of first appearance within
+    the job: (job indexes, keys, counts, sums of each of `values`).
+    """
+    job_of = np.repeat(np.arange(len(columns.job_ids), dtype=np.int64), np.diff(columns.offsets))
+    group = job_of * (int(keys.max(initial=0)) + 1) + keys
+    order = np.argsort(group, kind="stable")  # Keeps damage order within each group
+    sorted_group = group[order]
+    starts = np.flatnonzero(np.diff(sorted_group, prepend=-1)) if len(order) else np.zeros(0, dtype=np.int64)
+    counts = np.diff(np.append(starts, len(order)))
+    sums = [segment_sums(value[order], starts, counts) for value in values]
+
+    first_seen = np.argsort(order[starts], kind="stable")
+    return (
+        job_of[order[starts]][first_seen],
+        keys[order[starts]][first_seen],
+        counts[first_seen],
+        [total[first_seen] for total in sums],
+    )
+
+
+def score_risk(
+    columns: DamageColumns,
+    type_weights: Optional[Dict[str, float]] = None,
+    severity_multiplier: Optional[Dict[str, float]] = None,
+    severity_scale: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Risk summaries of every job in `columns`, as compute_risk_summary() writes them.
+
+    The tables default to the current risk_scoring.TYPE_WEIGHTS,
+    SEVERITY_MULTIPLIER and SEVERITY_SCALE.
+    """
+    weights = risk_scoring.TYPE_WEIGHTS if type_weights is None else type_weights
+    multipliers = risk_scoring.SEVERITY_MULTIPLIER if severity_multiplier is None else severity_multiplier
+    scale = risk_scoring.SEVERITY_SCALE if severity_scale is None else severity_scale
+
+    # Per type and severity: weight, severity factor
+    weight_of_type = np.array([weights.get(member.value, weights["unknown"]) for member in columns.types], dtype=np.float64)
+    factor_of_severity = np.array([multipliers.get(member.value, 1.0) for member in columns.severities], dtype=np.float64)
+
+    codes = columns.type_codes
+    points = weight_of_type[codes] * factor_of_severity[columns.severity_codes] * columns.quantities
+    totals = segment_sums(points, columns.offsets[:-1], np.diff(columns.offsets))
+    raw_index = totals / scale
+    capped = np.where(raw_index < 10.0, raw_index, 10.0)  # min(10.0, x), NaN included
+
+    severity_index = round_exact(capped, 2)
+    scaled = np.array(severity_index, dtype=np.float64) * 10.0
+    risk_score = round_exact(np.where(scaled < 100.0, scaled, 100.0), 1)
+    grades = _GRADES[np.searchsorted(_GRADE_BOUNDS, np.array(risk_score, dtype=np.float64), side="right")].tolist()
+
+    group_jobs, group_keys, group_counts, (group_points,) = _grouped(
+        columns, codes, [points],
+    )
+    by_type: List[Dict[str, Any]] = [{} for _ in columns.job_ids]
+    for job, key, count, total in zip(group_jobs.tolist(), group_keys.tolist(), group_counts.tolist(), round_exact(group_points, 2)):
+        by_type[job][columns.types[key].value] = {"count": count, "risk_points": total}
+
+    counts = np.diff(columns.offsets).tolist()
+    return [
+        {
+            "job_id": job_id,
+            "total_damage_count": counts[index],
+            "overall_severity_index": severity_index[index],
+            "overall_risk_score": risk_score[index],
+            "building_health_grade": grades[index],
+            "by_type": by_type[index],
+        }
+        for index, job_id in enumerate(columns.job_ids)
+    ]
+
+
+def cost_items(columns: DamageColumns) -> Tuple[List[str], np.ndarray]:
+    """
+    Cost line items of the damages: (the types present, in order of first
+    appearance, and the item index of every damage).
+    """
+    present, first_seen = np.unique(columns.type_codes, return_index=True)
+    in_order = present[np.argsort(first_seen, kind="stable")]
+    item_of_type = np.full(len(columns.types), -1, dtype=np.int64)
+    item_of_type[in_order] = np.arange(len(in_order))
+    return [columns.types[code].value for code in in_order.tolist()], item_of_type[columns.type_codes]
+
+
+def estimate_costs(
+    columns: DamageColumns,
+    rate_table: Optional[Dict[str, Dict[str, Any]]] = None,
+    currency: str = "USD",
+) -> List[Dict[str, Any]]:
+    """
+    Cost estimates of every job in `columns`, as generate_cost_estimate() writes them.
+
+    `rate_table` defaults to the current cost_estimation.RATE_TABLE.
+    """
+    rates = cost_estimation.RATE_TABLE if rate_table is None else rate_table
+
+    item_names, item_codes = cost_items(columns)
+    rate_of_item = np.array([rates.get(name, rates["default"])["rate"] for name in item_names], dtype=np.float64)
+    units = [rates.get(name, rates["default"])["unit"] for name in item_names]
+
+    costs = columns.quantities * rate_of_item[item_codes]
+    totals = round_exact(segment_sums(costs, columns.offsets[:-1], np.diff(columns.offsets)), 2)
+
+    group_jobs, group_keys, group_counts, (group_quantities, group_costs) = _grouped(
+        columns, item_codes, [columns.quantities, costs],
+    )
+    items: List[List[Dict[str, Any]]] = [[] for _ in columns.job_ids]
+    for job, key, count, quantity, cost in zip(
+        group_jobs.tolist(), group_keys.tolist(), group_counts.tolist(),
+        round_exact(group_quantities, 2), round_exact(group_costs, 2),
+    ):
+        name = item_names[key]
+        items[job].append({
+            "type": name,
+            "unit": units[key],
+            "count": count,
+            "total_quantity": quantity,
+            "cost": cost,
+        })
+
+    return [
+        {"job_id": job_id, "currency": currency, "total_cost": totals[index], "items": items[index]}
+        for index, job_id in enumerate(columns.job_ids)
+    ]
+
+
+def _write(job_id: str, filename: str, data: Dict[str, Any]) -> None:
+    output_dir = job_reconstruction_dir(job_id)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with (output_dir / filename).open("w", encoding="utf-8") as fp:
+        json.dump(data, fp, indent=2)
+
+
+def rescore_jobs(
+    job_ids: Optional[Iterable[str]] = None,
+    *,
+    dry_run: bool = False,
+    intervals: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Recompute and rewrite risk_summary.json and cost_estimate.json of many jobs
+    (every job by default) with the current tables, with uncertainty intervals
+    if `intervals` (default UNCERTAINTY_INTERVALS), as the per-job functions do.
+
+    Returns counts, the skipped jobs with reasons and the time spent per phase.
+    """
+    if job_ids is None:
+        job_ids = [meta["job_id"] for meta in job_metadata.list_jobs()]
+
+    start = time.perf_counter()
+    columns = load_damage_columns(job_ids)
+    loaded = time.perf_counter()
+    risks = score_risk(columns)
+    costs = estimate_costs(columns)
+    if (config.UNCERTAINTY_INTERVALS if intervals is None else intervals) and config.UNCERTAINTY_SAMPLES > 0:
+        from backend.services.uncertainty import simulate_intervals
+        for index, (risk, cost) in enumerate(zip(risks, costs)):
+            simulated = simulate_intervals(columns, index)
+            risk["overall_risk_score_interval"] = simulated["overall_risk_score"]
+            cost["total_cost_interval"] = simulated["total_cost"]
+    scored = time.perf_counter()
+    if not dry_run:
+        for risk, cost in zip(risks, costs):
+            _write(risk["job_id"], RISK_OUTPUT_FILENAME, risk)
+            _write(cost["job_id"], COST_OUTPUT_FILENAME, cost)
+    written = time.perf_counter()
+
+    for job_id, reason in columns.skipped.items():
+        logger.warning("Not rescoring job %s: %s", job_id, reason)
+    return {
+        "jobs": len(columns.job_ids),
+        "damages": columns.damage_count,
+        "skipped": columns.skipped,
+        "load_seconds": loaded - start,
+        "score_seconds": scored - loaded,
+        "write_seconds": written - scored,
+    }
@@ -0,0 +1,257 @@
+"""
+Cold-storage tiering for jobs that have not been touched in a while.
+
+Tiering a job rewrites its artifacts into the cold forms understood by
+``backend.core.artifacts``:
+
+- JSON artifacts (``job_meta.json``, ``damages.json``, ``cost_estimate.json``,
+  ...) are re-serialised without indentation and gzip-compressed to
+  ``name.json.gz``. With ``archive=True`` the reconstruction JSON is instead
+  packed into a single ``artifacts.zip`` per job, which also saves the
+  per-file block overhead of many small files.
+- The PDF report is gzip-compressed to ``{job_id}.pdf.gz`` and served to
+  clients with ``Content-Encoding: gzip``.
+
+Uploaded images are left alone: JPEG/PNG/WebP are already entropy-coded and
+gain next to nothing from a second compression pass.
+
+Hot jobs are unaffected because readers try the plain file first. Any later
+write of a plain file (a re-run, a rename) makes that artifact hot again.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.core.artifacts import ARCHIVE_NAME, GZIP_SUFFIX, gzip_path, read_json
+from backend.core.config import TIER_ARCHIVE, TIER_COLD_AFTER_DAYS, TIER_INTERVAL_SECONDS
+from backend.core.job_paths import iter_upload_dirs, job_reconstruction_dir, job_report_path
+from backend.services.job_metadata import META_FILENAME
+from backend.services.reclaimer import SweepThread
+
+logger = logging.getLogger(__name__)
+
+# Jobs whose pipeline may still be writing artifacts are never tiered
+ACTIVE_STATUSES = ("processing",)
+
+
+def _compact_json(path: Path) -> bytes:
+    data = json.loads(path.read_bytes())
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _unchanged(path: Path, before: os.stat_result) -> bool:
+    """True if `path` was not rewritten since `before` (a writer re-heated it)."""
+    try:
+        after = path.stat()
+    except FileNotFoundError:
+        return False
+    return (after.st_mtime_ns, after.st_size) == (before.st_mtime_ns, before.st_size)
+
+
+def _write_gzip(path: Path, *, compact_json: bool = False) -> int:
+    """
+    Replace `path` with ``path.gz``. Returns the compressed size (0 if skipped).
+
+    The original is only removed if nobody rewrote it while it was being
+    compressed; otherwise the fresh plain file wins and the copy is dropped.
+    """
+    before = path.stat()
+    target = gzip_path(path)
+    tmp_path = target.with_name(target.name + ".tmp")
+    with tmp_path.open("wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as gz:
+        if compact_json:
+            gz.write(_compact_json(path))
+        else:
+            with path.open("rb") as src:
+                shutil.copyfileobj(src, gz, 1024 * 1024)
+    if not _unchanged(path, before):
+        tmp_path.unlink(missing_ok=True)
+        return 0
+    os.replace(tmp_path, target)
+    path.unlink()
+    return target.stat().st_size
+
+
+def _pack_archive(directory: Path, paths: List[Path]) -> int:
+    """Fold JSON artifacts (plain or gzipped) into the directory's artifacts.zip."""
+    archive = directory / ARCHIVE_NAME
+    members: Dict[str, bytes] = {}
+    if archive.exists():
+        with zipfile.ZipFile(archive) as existing:
+            members = {name: existing.read(name) for name in existing.namelist()}
+    stats = {}
+    for path in paths:
+        stats[path] = path.stat()
+        if path.name.endswith(GZIP_SUFFIX):
+            name = path.name[: -len(GZIP_SUFFIX)]
+            with gzip.open(path, "rb") as fp:
+                members[name] = fp.read()
+        else:
+            name = path.name
+            members[name] = _compact_json(path)
+
+    tmp_path = archive.with_name(archive.name + ".tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as out:
+        for name in sorted(members):
+            out.writestr(name, members[name])
+    os.replace(tmp_path, archive)
+    for path, before in stats.items():
+        if _unchanged(path, before):
+            path.unlink()
+    return archive.stat().st_size
+
+
+def _plain_size(paths: Iterable[Path]) -> int:
+    return sum(path.stat().st_size for path in paths)
+
+
+def _job_updated_at(meta: Dict[str, Any], upload_dir: Path) -> float:
+    stamp = meta.get("updated_at") or meta.get("created_at")
+    if stamp:
+        try:
+            value = datetime.fromisoformat(str(stamp).replace("Z", "+00:00"))
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value.timestamp()
+        except ValueError:
+            pass
+    return upload_dir.stat().st_mtime
+
+
+def _job_artifacts(job_id: str, upload_dir: Path) -> Dict[str, List[Path]]:
+    """Plain or not-yet-archived files of a job, grouped by how they get tiered."""
+    recon_dir = job_reconstruction_dir(job_id)
+    recon_json: List[Path] = []
+    if recon_dir.is_dir():
+        recon_json = sorted(
+            path for path in recon_dir.iterdir()
+            if path.is_file() and (path.name.endswith(".json") or path.name.endswith(".json" + GZIP_SUFFIX))
+        )
+    meta_path = upload_dir / META_FILENAME
+    report_path = job_report_path(job_id)
+    return {
+        "metadata": [meta_path] if meta_path.exists() else [],
+        "reconstruction": recon_json,
+        "report": [report_path] if report_path.exists() else [],
+    }
+
+
+def tier_job(job_id: str, upload_dir: Path, *, archive: bool = TIER_ARCHIVE) -> Dict[str, int]:
+    """Move one job's artifacts to the cold tier. Returns bytes before and after."""
+    groups = _job_artifacts(job_id, upload_dir)
+    result = {"files": 0, "bytes_before": 0, "bytes_after": 0}
+
+    for path in groups["metadata"]:
+        result["bytes_before"] += path.stat().st_size
+        result["bytes_after"] += _write_gzip(path, compact_json=True)
+        result["files"] += 1
+
+    recon_json = groups["reconstruction"]
+    if archive and recon_json:
+        result["bytes_before"] += _plain_size(recon_json)
+        result["bytes_after"] += _pack_archive(recon_json[0].parent, recon_json)
+        result["files"] += len(recon_json)
+    else:
+        for path in recon_json:
+            if path.name.endswith(GZIP_SUFFIX):
+                continue  # Already cold
+            result["bytes_before"] += path.stat().st_size
+            result["bytes_after"] += _write_gzip(path, compact_json=True)
+            result["files"] += 1
+
+    for path in groups["report"]:
+        result["bytes_before"] += path.stat().st_size
+        result["bytes_after"] += _write_gzip(path)
+        result["files"] += 1
+    return result
+
+
+def tier_cold_jobs(
+    older_than_days: float = TIER_COLD_AFTER_DAYS,
+    *,
+    archive: bool = TIER_ARCHIVE,
+    dry_run: bool = False,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Tier every job not updated for `older_than_days` (<= 0 disables tiering).
+
+    Returns the jobs tiered and the bytes before/after; a dry run reports the
+    jobs and bytes that would be compressed.
+    """
+    now = time.time() if now is None else now
+    report = {
+        "dry_run": dry_run,
+        "jobs_tiered": 0,
+        "files": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+        "errors": 0,
+    }
+    if older_than_days <= 0:
+        return report
+
+    cutoff = now - older_than_days * 86400
+    for job_id, upload_dir in iter_upload_dirs():
+        try:
+            meta = read_json(upload_dir / META_FILENAME)
+        except (OSError, json.JSONDecodeError):
+            continue  # Half-created job: storage GC's business
+        if meta.get("status") in ACTIVE_STATUSES or _job_updated_at(meta, upload_dir) > cutoff:
+            continue
+        try:
+            if dry_run:
+                groups = _job_artifacts(job_id, upload_dir)
+                pending = [
+                    path for paths in groups.values() for path in paths
+                    if not path.name.endswith(GZIP_SUFFIX) or archive
+                ]
+                if not pending:
+                    continue
+                report["files"] += len(pending)
+                report["bytes_before"] += _plain_size(pending)
+                report["jobs_tiered"] += 1
+                continue
+            result = tier_job(job_id, upload_dir, archive=archive)
+        except (OSError, ValueError, zipfile.BadZipFile) as exc:
+            report["errors"] += 1
+            logger.warning("Failed to tier job %s: %s", job_id, exc)
+            continue
+        if result["files"]:
+            report["jobs_tiered"] += 1
+            for key in ("files", "bytes_before", "bytes_after"):
+                report[key] += result[key]
+
+    if report["jobs_tiered"] and not dry_run:
+        logger.info(
+            "Tiered %d cold job(s): %d -> %d bytes",
+            report["jobs_tiered"], report["bytes_before"], report["bytes_after"],
+        )
+    return report
+
+
+_tierer: Optional[SweepThread] = None
+
+
+def start_cold_tiering(interval: float = TIER_INTERVAL_SECONDS) -> None:
+    """Tier cold jobs periodically in the background (interval <= 0 disables)."""
+    global _tierer
+    if _tierer is None and interval > 0:
+        _tierer = SweepThread(tier_cold_jobs, interval, "cold-tiering")
+
+
+def stop_cold_tiering() -> None:
+    global _tierer
+    if _tierer is not None:
+        _tierer.stop()
+        _tierer = None
@@ -0,0 +1,312 @@
+"""
+COLMAP sparse reconstruction, run as asyncio subprocesses.
+
+Each step (feature extraction, matching, mapping) streams its merged
+stdout/stderr line by line into the job's ``colmap.log`` and a progress
+callback; only the last lines are kept in memory, for error messages.
+
+The matcher is picked by image count (see choose_matcher): exhaustive matching
+compares every pair of images, which stops scaling beyond a few hundred
+photos, so larger jobs match each image against its GPS neighbours, its
+neighbours in capture order, or its most similar images by vocabulary tree.
+
+Cancelling the task (or cancel_colmap() from another thread) terminates the
+running COLMAP process; deleting a job does so through job_metadata.
+
+COLMAP reads images from a directory. With local storage that is the job's
+upload directory; with object storage (STORAGE_BACKEND=s3) the images are
+staged into ``images/`` in the reconstruction directory for the run and
+removed afterwards.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import struct
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.core import config
+from backend.core.job_paths import job_reconstruction_dir, job_upload_dir
+from backend.services.reconstruction_service import ReconstructionError
+from backend.services.storage import ObjectInfo, get_storage, list_job_uploads
+
+logger = logging.getLogger(__name__)
+
+MATCHERS = ("exhaustive", "sequential", "spatial", "vocab_tree")
+LOG_FILENAME = "colmap.log"
+STAGING_DIRNAME = "images"  # Images copied out of object storage for a run
+
+# Lines of output kept for the error message of a failed step
+TAIL_LINES = 20
+# Output lines are reported to on_progress at most this often
+PROGRESS_INTERVAL_SECONDS = 1.0
+# How long a terminated COLMAP process gets before it is killed
+TERMINATE_GRACE_SECONDS = 5.0
+# COLMAP prints long lines (e.g. option dumps); asyncio's default limit is 64 KiB
+_LINE_LIMIT = 1024 * 1024
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+_active_lock = threading.Lock()
+_active: Dict[str, Tuple[asyncio.AbstractEventLoop, "asyncio.Task[Any]"]] = {}
+
+
+def has_gps(header: bytes) -> bool:
+    """Whether a JPEG's leading bytes hold EXIF with a GPS block (tag 0x8825 in IFD0)."""
+    start = header.find(b"Exif\x00\x00")
+    if start < 0:
+        return False
+    tiff = header[start + 6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return False
+    try:
+        (ifd,) = struct.unpack_from(order + "I", tiff, 4)
+        (count,) = struct.unpack_from(order + "H", tiff, ifd)
+        for index in range(count):
+            (tag,) = struct.unpack_from(order + "H", tiff, ifd + 2 + 12 * index)
+            if tag == 0x8825:
+                return True
+    except struct.error:
+        return False
+    return False
+
+
+def choose_matcher(images: Sequence[ObjectInfo]) -> str:
+    """The COLMAP matcher for a job's images (COLMAP_MATCHER, or picked by count when "auto")."""
+    if config.COLMAP_MATCHER != "auto":
+        if config.COLMAP_MATCHER not in MATCHERS:
+            raise ReconstructionError(f"Unknown COLMAP_MATCHER: {config.COLMAP_MATCHER}")
+        if config.COLMAP_MATCHER == "vocab_tree" and not config.COLMAP_VOCAB_TREE_PATH:
+            raise ReconstructionError("COLMAP_MATCHER=vocab_tree needs COLMAP_VOCAB_TREE_PATH.")
+        return config.COLMAP_MATCHER
+    if len(images) <= config.COLMAP_EXHAUSTIVE_MAX_IMAGES:
+        return "exhaustive"
+    storage = get_storage()
+    if all(has_gps(storage.read(image.key, length=4096)) for image in images):
+        return "spatial"
+    if config.COLMAP_VOCAB_TREE_PATH and len(images) >= config.COLMAP_VOCAB_TREE_MIN_IMAGES:
+        return "vocab_tree"
+    return "sequential"
+
+
+def _matcher_options(matcher: str) -> List[str]:
+    vocab_tree = config.COLMAP_VOCAB_TREE_PATH
+    if matcher == "sequential":
+        options = ["--SequentialMatching.overlap", str(config.COLMAP_SEQUENTIAL_OVERLAP)]
+        if vocab_tree:
+            options += ["--SequentialMatching.loop_detection", "1", "--SequentialMatching.vocab_tree_path", vocab_tree]
+        return options
+    if matcher == "vocab_tree":
+        return ["--VocabTreeMatching.vocab_tree_path", vocab_tree]
+    return []
+
+
+def stage_images(job_id: str, images: Sequence[ObjectInfo]) -> Optional[Path]:
+    """
+    Copy images without a local path (object storage) into the job's staging
+    directory and return it; None when they are all local files already.
+    """
+    storage = get_storage()
+    if all(storage.local_path(image.key) is not None for image in images):
+        return None
+    staging = job_reconstruction_dir(job_id) / STAGING_DIRNAME
+    staging.mkdir(parents=True, exist_ok=True)
+    for image in images:
+        target = staging / image.name
+        tmp_path = target.with_name(f".{image.name}.tmp")
+        with tmp_path.open("wb") as fp:
+            for chunk in storage.iter_bytes(image.key):
+                fp.write(chunk)
+        os.replace(tmp_path, target)
+    return staging
+
+
+def colmap_commands(job_id: str, matcher: str, image_dir: Optional[Path] = None) -> List[Tuple[str, List[str]]]:
+    """(step name, argv) of each COLMAP step, run locally or in Docker (see config)."""
+    image_dir = (image_dir or job_upload_dir(job_id)).resolve()
+    workspace = job_reconstruction_dir(job_id).resolve()
+    if config.COLMAP_EXECUTABLE:
+        base = [config.COLMAP_EXECUTABLE]
+        image_path, workspace_path = str(image_dir), str(workspace)
+    else:
+        data_dir = config.DATA_DIR.resolve()
+        base = ["docker", "run", "--rm", "-v", f"{data_dir}:/data", config.COLMAP_DOCKER_IMAGE, "colmap"]
+        image_path = f"/data/{image_dir.relative_to(data_dir).as_posix()}"
+        workspace_path = f"/data/{workspace.relative_to(data_dir).as_posix()}"
+    database_path = f"{workspace_path}/database.db"
+    threads = str(config.COLMAP_NUM_THREADS)
+    return [
+        ("feature_extractor", base + [
+            "feature_extractor",
+            "--database_path", database_path,
+            "--image_path", image_path,
+            "--image_list_path", f"{workspace_path}/image_list.txt",
+            "--SiftExtraction.num_threads", threads,
+        ]),
+        (f"{matcher}_matcher", base + [
+            f"{matcher}_matcher",
+            "--database_path", database_path,
+            "--SiftMatching.num_threads", threads,
+            *_matcher_options(matcher),
+        ]),
+        ("mapper", base + [
+            "mapper",
+            "--database_path", database_path,
+            "--image_path", image_path,
+            "--output_path", f"{workspace_path}/sparse",
+            "--Mapper.num_threads", threads,
+        ]),
+    ]
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    try:
+        process.terminate()
+    except ProcessLookupError:
+        return
+    try:
+        await asyncio.wait_for(process.wait(), TERMINATE_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+async def run_command(argv: Sequence[str], log_file, on_line: Callable[[str], None]) -> Tuple[int, List[str]]:
+    """
+    Run `argv`, writing each output line to `log_file` and `on_line` as it arrives.
+
+    Returns the exit code and the last TAIL_LINES lines. Raises FileNotFoundError
+    if the executable is missing; on cancellation the process is terminated.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=_LINE_LIMIT,
+    )
+    tail: deque = deque(maxlen=TAIL_LINES)
+    try:
+        async for raw in process.stdout:
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            log_file.write(line + "\n")
+            tail.append(line)
+            on_line(line)
+        return await process.wait(), list(tail)
+    except BaseException:
+        await asyncio.shield(_terminate(process))
+        raise
+
+
+def _register(job_id: str) -> None:
+    with _active_lock:
+        _active[job_id] = (asyncio.get_running_loop(), asyncio.current_task())
+
+
+def _unregister(job_id: str) -> None:
+    with _active_lock:
+        _active.pop(job_id, None)
+
+
+def cancel_colmap(job_id: str) -> bool:
+    """Cancel the job's running reconstruction (from any thread). Returns whether one was running."""
+    with _active_lock:
+        entry = _active.get(job_id)
+    if entry is None:
+        return False
+    loop, task = entry
+    loop.call_soon_threadsafe(task.cancel)
+    return True
+
+
+def cancel_all_colmap() -> int:
+    """Cancel every running reconstruction (from any thread). Returns how many were running."""
+    with _active_lock:
+        entries = list(_active.values())
+    for loop, task in entries:
+        loop.call_soon_threadsafe(task.cancel)
+    return len(entries)
+
+
+async def run_colmap(job_id: str, on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Run COLMAP sparse reconstruction for a job and return its reconstruction metadata.
+
+    `on_progress` gets {"step", "step_index", "steps", "line"} when each step
+    starts and, throttled, as output arrives. Raises ReconstructionError if a
+    step fails and FileNotFoundError if the job has no images. Images in
+    object storage are staged locally for the run (see stage_images).
+    """
+    images = list_job_uploads(job_id)
+    if not images:
+        raise FileNotFoundError(f"No images to process for job {job_id}")
+    matcher = choose_matcher(images)
+    output_dir = job_reconstruction_dir(job_id)
+    (output_dir / "sparse").mkdir(parents=True, exist_ok=True)
+    (output_dir / "image_list.txt").write_text("".join(f"{image.name}\n" for image in images), encoding="utf-8")
+    report = on_progress or (lambda event: None)
+
+    steps: List[Dict[str, Any]] = []
+    log_path = output_dir / LOG_FILENAME
+    _register(job_id)
+    staging = None
+    try:
+        staging = await asyncio.to_thread(stage_images, job_id, images)
+        commands = colmap_commands(job_id, matcher, staging)
+        with log_path.open("w", encoding="utf-8", buffering=1) as log_file:
+            for index, (step, argv) in enumerate(commands):
+                command = " ".join(argv)
+                logger.info("Running COLMAP step %s for job %s (%d images): %s", step, job_id, len(images), command)
+                log_file.write(f"$ {command}\n")
+                event = {"step": step, "step_index": index, "steps": len(commands), "line": None}
+                report(dict(event))
+                last_report = time.monotonic()
+
+                def on_line(line: str) -> None:
+                    nonlocal last_report
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                        last_report = now
+                        report({**event, "line": line})
+
+                started = time.monotonic()
+                try:
+                    returncode, tail = await run_command(argv, log_file, on_line)
+                except FileNotFoundError as exc:
+                    log_file.write(f"[ERROR] Executable not found: {exc}\n")
+                    raise ReconstructionError(f"COLMAP could not be started ({argv[0]} not found).") from exc
+                except asyncio.CancelledError:
+                    log_file.write(f"[CANCELLED] {step}\n")
+                    raise
+                steps.append({"step": step, "returncode": returncode, "seconds": round(time.monotonic() - started, 3)})
+                if returncode != 0:
+                    message = "\n".join(tail) or f"exit code {returncode}"
+                    log_file.write(f"[ERROR] {step} failed with exit code {returncode}\n")
+                    logger.error("COLMAP %s failed for job %s: %s", step, job_id, message)
+                    raise ReconstructionError(f"COLMAP reconstruction failed in {step}: {message}")
+    finally:
+        _unregister(job_id)
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    return {
+        "engine": "colmap_docker" if not config.COLMAP_EXECUTABLE else "colmap",
+        "provider": "colmap",
+        "viewer_url": None,
+        "asset_url": None,
+        "asset_local_path": None,
+        "mesh_workspace_path": str(output_dir / "sparse"),
+        "job_reference": None,
+        "matcher": matcher,
+        "image_count": len(images),
+        "colmap_steps": steps,
+        "colmap_log_file": str(log_path),
+    }
@@ -3,9 +3,11 @@ from __future__ import annotations
 import json
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Optional
 
-from backend.core.config import RECONSTRUCTIONS_DIR
+from backend.core import config
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services.damage_records import load_damage_records
 
 RATE_TABLE = {
     "crack": {"unit": "meter", "rate": 20.0},
@@ -16,25 +18,18 @@ RATE_TABLE = {
 }
 
 
-def _load_damages(job_id: str) -> List[Dict]:
-    path = RECONSTRUCTIONS_DIR / job_id / "damages.json"
-    if not path.exists():
-        raise FileNotFoundError(f"Damage summary missing for job {job_id}")
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)["damages"]
+def generate_cost_estimate(job_id: str, currency: str = "USD", intervals: Optional[bool] = None) -> Path:
+    """
+    Price the job's damages with RATE_TABLE and write cost_estimate.json.
 
-
-def _calc_quantity(entry: Dict) -> float:
-    if entry.get("approx_length_m"):
-        return float(entry["approx_length_m"])
-    if entry.get("approx_area_m2"):
-        return float(entry["approx_area_m2"])
-    return 1.0
-
-
-def generate_cost_estimate(job_id: str, currency: str = "USD") -> Path:
-    damages = _load_damages(job_id)
-    output_dir = RECONSTRUCTIONS_DIR / job_id
+    With `intervals` (default UNCERTAINTY_INTERVALS) the estimate also carries
+    "total_cost_interval", the P10/P50/P90 of the total (see uncertainty).
+    """
+    with_intervals = (config.UNCERTAINTY_INTERVALS if intervals is None else intervals) and config.UNCERTAINTY_SAMPLES > 0
+    damages = load_damage_records(job_id)
+    if with_intervals:
+        damages = list(damages)  # Simulated below too
+    output_dir = job_reconstruction_dir(job_id)
     output_dir.mkdir(parents=True, exist_ok=True)
     estimate_path = output_dir / "cost_estimate.json"
 
@@ -42,9 +37,9 @@ def generate_cost_estimate(job_id: str, currency: str = "USD") -> Path:
     total_cost = 0.0
 
     for damage in damages:
-        damage_type = damage.get("type", "default")
+        damage_type = damage.type.value
         rate_info = RATE_TABLE.get(damage_type, RATE_TABLE["default"])
-        quantity = _calc_quantity(damage)
+        quantity = damage.quantity
         cost = quantity * rate_info["rate"]
 
         info = summary[damage_type]
@@ -72,6 +67,9 @@ def generate_cost_estimate(job_id: str, currency: str = "USD") -> Path:
         "total_cost": round(total_cost, 2),
         "items": items,
     }
+    if with_intervals:
+        from backend.services.uncertainty import damage_intervals
+        result["total_cost_interval"] = damage_intervals(job_id, damages)["total_cost"]
 
     with estimate_path.open("w", encoding="utf-8") as fp:
         json.dump(result, fp, indent=2)
@@ -0,0 +1,190 @@
+"""
+What-if cost scenarios: one job's repair cost under several rate tables.
+
+Each scenario is a partial rate table laid over the current RATE_TABLE, with a
+currency and an optional exchange rate into a common base currency. All
+scenarios are evaluated together: the job's damages, kept parsed in columnar
+form (batch_scoring.DamageColumns) in a small LRU cache, are costed as one
+scenarios x damages matrix and reduced per line item. Nothing is written; a
+scenario identical to RATE_TABLE gives exactly generate_cost_estimate()'s
+figures.
+
+The cache is keyed by job and validated against the damages file's stat
+(whichever of the plain, gzip or archive copies holds it), so rescoring or
+re-running the analysis is picked up on the next request.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core import config
+from backend.core.artifacts import archive_path, stored_variant
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services import cost_estimation
+from backend.services.batch_scoring import DamageColumns, build_damage_columns, cost_items, round_exact
+from backend.services.damage_records import load_damage_records
+
+_cache_lock = threading.Lock()
+_columns_cache: "OrderedDict[str, Tuple[Tuple[Any, ...], DamageColumns]]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class CostScenario:
+    """A named rate table (type -> {"unit", "rate"}) in a currency."""
+
+    name: str
+    currency: str
+    rates: Dict[str, Dict[str, Any]]
+    exchange_rate: float = 1.0  # Base currency per unit of `currency`
+
+
+def _damages_signature(job_id: str) -> Optional[Tuple[Any, ...]]:
+    path = job_reconstruction_dir(job_id) / "damages.json"
+    variant = stored_variant(path)
+    if variant is None and archive_path(path).exists():
+        variant = archive_path(path)
+    if variant is None:
+        return None
+    stat = variant.stat()
+    return (str(variant), stat.st_mtime_ns, stat.st_size)
+
+
+def job_damage_columns(job_id: str) -> DamageColumns:
+    """
+    A job's parsed damages as columns, from the cache while damages.json is unchanged.
+
+    Raises:
+        FileNotFoundError: If the job has no damages yet
+        ValueError: If a damage record cannot be costed
+    """
+    signature = _damages_signature(job_id)
+    if signature is None:
+        raise FileNotFoundError(f"Damage summary missing for job {job_id}")
+    with _cache_lock:
+        cached = _columns_cache.get(job_id)
+        if cached is not None and cached[0] == signature:
+            _columns_cache.move_to_end(job_id)
+            return cached[1]
+
+    columns = build_damage_columns([(job_id, load_damage_records(job_id))])
+    if columns.skipped:
+        raise ValueError(columns.skipped[job_id])
+
+    with _cache_lock:
+        _columns_cache[job_id] = (signature, columns)
+        _columns_cache.move_to_end(job_id)
+        while len(_columns_cache) > config.COST_SCENARIO_CACHE_SIZE:
+            _columns_cache.popitem(last=False)
+    return columns
+
+
+def _number(value: Any, what: str, *, positive: bool = False) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{what} must be a finite number")
+    if value < 0 or (positive and value == 0):
+        raise ValueError(f"{what} must be {'positive' if positive else 'zero or more'}")
+    return float(value)
+
+
+def parse_scenarios(raw: Any) -> List[CostScenario]:
+    """
+    Validate scenarios given as JSON:
+    ``{"name", "currency", "exchange_rate", "rates": {type: rate | {"rate", "unit"}}}``.
+
+    Rates not given come from RATE_TABLE; a bare number keeps that type's unit.
+
+    Raises ValueError describing the first invalid field.
+    """
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("At least one scenario is required")
+    if len(raw) > config.COST_SCENARIOS_MAX:
+        raise ValueError(f"At most {config.COST_SCENARIOS_MAX} scenarios per request")
+
+    scenarios = []
+    for index, entry in enumerate(raw, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Scenario {index} must be an object")
+        rates = {name: dict(info) for name, info in cost_estimation.RATE_TABLE.items()}
+        overrides = entry.get("rates") or {}
+        if not isinstance(overrides, dict):
+            raise ValueError(f"Scenario {index}: rates must be an object")
+        for damage_type, value in overrides.items():
+            base = rates.get(damage_type, rates["default"])
+            if isinstance(value, dict):
+                rate = _number(value.get("rate"), f"Scenario {index}: rate of {damage_type}")
+                unit = str(value.get("unit") or base["unit"])
+            else:
+                rate = _number(value, f"Scenario {index}: rate of {damage_type}")
+                unit = base["unit"]
+            rates[damage_type] = {"unit": unit, "rate": rate}
+        scenarios.append(CostScenario(
+            name=str(entry.get("name") or f"Scenario {index}"),
+            currency=str(entry.get("currency") or "USD"),
+            rates=rates,
+            exchange_rate=_number(entry.get("exchange_rate", 1.0), f"Scenario {index}: exchange_rate", positive=True),
+        ))
+    return scenarios
+
+
+def _left_to_right_sums(values: np.ndarray) -> np.ndarray:
+    """Row sums added left to right (as generate_cost_estimate's += loop does)."""
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0], dtype=np.float64)
+    return np.cumsum(values, axis=1)[:, -1]
+
+
+def evaluate_scenarios(columns: DamageColumns, scenarios: Sequence[CostScenario], base_currency: str = "USD") -> Dict[str, Any]:
+    """
+    Cost one job's damages under every scenario in one pass.
+
+    Returns the line items (type, count, quantity) shared by all scenarios and,
+    per scenario, its units, the cost of each line item and the total, also
+    converted to `base_currency`.
+    """
+    item_names, item_codes = cost_items(columns)
+    rate_matrix = np.array(
+        [[scenario.rates.get(name, scenario.rates["default"])["rate"] for name in item_names] for scenario in scenarios],
+        dtype=np.float64,
+    ).reshape(len(scenarios), len(item_names))
+    costs = columns.quantities[np.newaxis, :] * rate_matrix[:, item_codes]  # scenarios x damages
+
+    totals = _left_to_right_sums(costs)
+    item_costs = np.zeros((len(scenarios), len(item_names)), dtype=np.float64)
+    counts, quantities = [], []
+    for item in range(len(item_names)):
+        members = np.flatnonzero(item_codes == item)
+        item_costs[:, item] = _left_to_right_sums(costs[:, members])
+        quantities.append(float(np.cumsum(columns.quantities[members])[-1]))
+        counts.append(len(members))
+
+    exchange = np.array([scenario.exchange_rate for scenario in scenarios], dtype=np.float64)
+    rounded_totals = round_exact(totals, 2)
+    base_totals = round_exact(np.array(rounded_totals, dtype=np.float64) * exchange, 2)
+    return {
+        "job_id": columns.job_ids[0],
+        "damage_count": columns.damage_count,
+        "base_currency": base_currency,
+        "items": [
+            {"type": name, "count": count, "total_quantity": quantity}
+            for name, count, quantity in zip(item_names, counts, round_exact(np.array(quantities, dtype=np.float64), 2))
+        ],
+        "scenarios": [
+            {
+                "name": scenario.name,
+                "currency": scenario.currency,
+                "exchange_rate": scenario.exchange_rate,
+                "units": [scenario.rates.get(name, scenario.rates["default"])["unit"] for name in item_names],
+                "costs": round_exact(item_costs[index], 2),
+                "total_cost": rounded_totals[index],
+                "total_cost_base": base_totals[index],
+            }
+            for index, scenario in enumerate(scenarios)
+        ],
+    }
@@ -0,0 +1,213 @@
+"""
+Typed damage records shared by every pipeline stage.
+
+Analyzers turn each finding into a DamageRecord once and write damages.json
+from to_dict(); cost estimation, risk scoring, reports and batch scoring read
+the records back (streamed, see load_damage_records()) and use their fields
+as they are, so all stages see the same type, severity and quantity:
+
+- type: a DamageType; other or missing types are UNKNOWN (the reported label
+  is kept as "reported_type").
+- severity: a Severity; labels in any case, numbers on the report's 0-10
+  scale (< 4 low, < 6.5 medium, else high), anything else medium.
+- quantity: approx_length_m, else approx_area_m2, whichever is first a
+  positive number; 1 when neither is.
+- confidence: clamped to [0, 1]; 1 when absent or unreadable.
+
+Records use __slots__ and enum members (one object per type and severity),
+a fraction of the memory of the parsed JSON dicts.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from backend.core.artifacts import iter_json_items
+from backend.core.job_paths import job_reconstruction_dir
+
+
+class DamageType(str, Enum):
+    CRACK = "crack"
+    SPALLING = "spalling"
+    WATER_DAMAGE = "water_damage"
+    MOISTURE = "moisture"
+    DISCOLORATION = "discoloration"
+    CORROSION = "corrosion"
+    EFFLORESCENCE = "efflorescence"
+    UNKNOWN = "unknown"
+
+
+class Severity(str, Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
+_TYPES = {member.value: member for member in DamageType}
+_SEVERITIES = {member.value: member for member in Severity}
+
+# Fields a record holds itself; any others are carried through unchanged
+_RECORD_FIELDS = frozenset({"type", "severity", "description", "approx_length_m", "approx_area_m2", "confidence", "image"})
+
+
+def _damage_type(value: Any) -> DamageType:
+    if not isinstance(value, str):
+        return DamageType.UNKNOWN
+    member = _TYPES.get(value)
+    if member is None:
+        member = _TYPES.get(value.strip().lower().replace(" ", "_").replace("-", "_"), DamageType.UNKNOWN)
+    return member
+
+
+def _severity(value: Any) -> Severity:
+    if isinstance(value, str):
+        member = _SEVERITIES.get(value)
+        return member if member is not None else _SEVERITIES.get(value.strip().lower(), Severity.MEDIUM)
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        if value < 4:
+            return Severity.LOW
+        return Severity.MEDIUM if value < 6.5 else Severity.HIGH
+    return Severity.MEDIUM
+
+
+def _positive_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 and math.isfinite(number) else None
+
+
+def _confidence(value: Any) -> float:
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return 1.0
+    if not math.isfinite(confidence):
+        return 1.0
+    return min(1.0, max(0.0, confidence))
+
+
+class DamageRecord:
+    """One detected damage, normalized (see the module docstring)."""
+
+    __slots__ = ("type", "severity", "length_m", "area_m2", "confidence", "description", "image", "extra")
+
+    def __init__(
+        self,
+        type: DamageType,
+        severity: Severity = Severity.MEDIUM,
+        *,
+        length_m: Optional[float] = None,
+        area_m2: Optional[float] = None,
+        confidence: float = 1.0,
+        description: Optional[str] = None,
+        image: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.type = type
+        self.severity = severity
+        self.length_m = length_m
+        self.area_m2 = area_m2
+        self.confidence = confidence
+        self.description = description
+        self.image = image
+        self.extra = extra
+
+    @property
+    def quantity(self) -> float:
+        """Length, else area, else 1: what the damage is costed and weighted by."""
+        return self.length_m or self.area_m2 or 1.0
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "DamageRecord":
+        """
+        Normalize a damage as analyzers report it or damages.json holds it.
+
+        Raises ValueError if `data` is not a JSON object.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid damage record: expected an object, got {type(data).__name__}")
+        damage_type = _damage_type(data.get("type"))
+        extra = None
+        if not _RECORD_FIELDS.issuperset(data):
+            extra = {key: value for key, value in data.items() if key not in _RECORD_FIELDS}
+        if damage_type is DamageType.UNKNOWN and data.get("type") not in (None, DamageType.UNKNOWN.value):
+            extra = {**(extra or {}), "reported_type": data["type"]}
+        description = data.get("description")
+        image = data.get("image")
+        return cls(
+            damage_type,
+            _severity(data.get("severity")),
+            length_m=_positive_float(data.get("approx_length_m")),
+            area_m2=_positive_float(data.get("approx_area_m2")),
+            confidence=_confidence(data.get("confidence", 1.0)),
+            description=None if description is None else str(description),
+            image=None if image is None else str(image),
+            extra=extra,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The damages.json entry of this record."""
+        data: Dict[str, Any] = {"type": self.type.value, "severity": self.severity.value}
+        if self.description is not None:
+            data["description"] = self.description
+        if self.length_m is not None:
+            data["approx_length_m"] = self.length_m
+        if self.area_m2 is not None:
+            data["approx_area_m2"] = self.area_m2
+        data["confidence"] = self.confidence
+        if self.image is not None:
+            data["image"] = self.image
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DamageRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"DamageRecord({self.type.value}, {self.severity.value}, quantity={self.quantity}, confidence={self.confidence})"
+
+
+def load_damage_records(job_id: str) -> Iterator[DamageRecord]:
+    """
+    The job's damages, streamed from damages.json (any tier) one record at a time.
+
+    Raises FileNotFoundError if the job has no damages.json; a malformed file
+    or record raises ValueError from the iterator.
+    """
+    path = job_reconstruction_dir(job_id) / "damages.json"
+    try:
+        items = iter_json_items(path, "damages")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Damage summary missing for job {job_id}") from None
+    return map(DamageRecord.from_dict, items)
+
+
+def write_damages(job_id: str, records: Iterable[DamageRecord], **fields: Any) -> Path:
+    """
+    Write the job's damages.json: job ID, generation time, `fields` (analyzer
+    name and the like) and the records. Returns its path.
+    """
+    recon_dir = job_reconstruction_dir(job_id)
+    recon_dir.mkdir(parents=True, exist_ok=True)
+    damages_path = recon_dir / "damages.json"
+    data = {
+        "job_id": job_id,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **fields,
+        "damages": [record.to_dict() for record in records],
+    }
+    with damages_path.open("w", encoding="utf-8") as fp:
+        json.dump(data, fp, indent=2)
+    return damages_path
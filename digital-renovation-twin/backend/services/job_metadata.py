@@ -1,41 +1,54 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from backend.core.config import UPLOADS_DIR, ensure_data_directories
+from backend.core import config
+from backend.core.artifacts import read_json
+from backend.core.config import TRASH_DIR, ensure_data_directories
+from backend.core.job_paths import iter_upload_dirs, job_upload_dir
 
 META_FILENAME = "job_meta.json"
 
+# Serializes read-modify-write updates (the pipeline and background reconstructions)
+_update_lock = threading.RLock()
 
-def _job_upload_dir(job_id: str) -> Path:
-    return UPLOADS_DIR / job_id
+
+def is_valid_job_id(job_id: str) -> bool:
+    """Reject IDs that would escape the uploads directory (e.g. '../x')."""
+    return bool(job_id) and job_id not in (".", "..") and Path(job_id).name == job_id
 
 
 def get_metadata_path(job_id: str) -> Path:
-    return _job_upload_dir(job_id) / META_FILENAME
+    return job_upload_dir(job_id) / META_FILENAME
 
 
 def job_exists(job_id: str) -> bool:
-    return _job_upload_dir(job_id).exists()
+    return job_upload_dir(job_id).exists()
 
 
 def load_metadata(job_id: str) -> Dict[str, Any]:
-    meta_path = get_metadata_path(job_id)
-    if not meta_path.exists():
-        raise FileNotFoundError(f"Metadata for job {job_id} not found")
-    with meta_path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
+    try:
+        return read_json(get_metadata_path(job_id))
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Metadata for job {job_id} not found") from None
 
 
 def save_metadata(job_id: str, metadata: Dict[str, Any]) -> None:
     ensure_data_directories()
     meta_path = get_metadata_path(job_id)
     meta_path.parent.mkdir(parents=True, exist_ok=True)
-    with meta_path.open("w", encoding="utf-8") as fp:
+    # Swapped in atomically, as background reconstructions update it while it is read.
+    # The temporary name ends in .json, so it is never listed as an upload.
+    tmp_path = meta_path.with_name(f".{threading.get_ident()}.{META_FILENAME}")
+    with tmp_path.open("w", encoding="utf-8") as fp:
         json.dump(metadata, fp, indent=2)
+    os.replace(tmp_path, meta_path)
 
 
 def _now_iso() -> str:
@@ -58,45 +71,49 @@ def create_job_metadata(job_id: str, filenames: List[str], *, label: Optional[st
 
 
 def update_status(job_id: str, status: str, *, error: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
-    metadata = load_metadata(job_id)
-    metadata["status"] = status
-    metadata["updated_at"] = _now_iso()
-    if error:
-        metadata["error"] = error
-    elif "error" in metadata:
-        metadata["error"] = None
-    if fields:
-        metadata.setdefault("outputs", {})
-        for key, value in fields.items():
-            metadata[key] = value
-    save_metadata(job_id, metadata)
-    return metadata
+    with _update_lock:
+        metadata = load_metadata(job_id)
+        metadata["status"] = status
+        metadata["updated_at"] = _now_iso()
+        if error:
+            metadata["error"] = error
+        elif "error" in metadata:
+            metadata["error"] = None
+        if fields:
+            metadata.setdefault("outputs", {})
+            for key, value in fields.items():
+                metadata[key] = value
+        save_metadata(job_id, metadata)
+        return metadata
+
+
+def update_fields(job_id: str, **fields: Any) -> Dict[str, Any]:
+    """Set top-level fields (e.g. reconstruction_progress) without touching the status."""
+    with _update_lock:
+        metadata = load_metadata(job_id)
+        metadata.update(fields)
+        metadata["updated_at"] = _now_iso()
+        save_metadata(job_id, metadata)
+        return metadata
 
 
 def update_outputs(job_id: str, **outputs: Any) -> Dict[str, Any]:
-    metadata = load_metadata(job_id)
-    metadata.setdefault("outputs", {})
-    metadata["outputs"].update(outputs)
-    metadata["updated_at"] = _now_iso()
-    save_metadata(job_id, metadata)
-    return metadata
+    with _update_lock:
+        metadata = load_metadata(job_id)
+        metadata.setdefault("outputs", {})
+        metadata["outputs"].update(outputs)
+        metadata["updated_at"] = _now_iso()
+        save_metadata(job_id, metadata)
+        return metadata
 
 
 def list_jobs() -> List[Dict[str, Any]]:
     ensure_data_directories()
     jobs: List[Dict[str, Any]] = []
-    if not UPLOADS_DIR.exists():
-        return jobs
-    for job_dir in UPLOADS_DIR.iterdir():
-        if not job_dir.is_dir():
-            continue
-        meta_path = job_dir / META_FILENAME
-        if not meta_path.exists():
-            continue
+    for _, job_dir in iter_upload_dirs():
         try:
-            with meta_path.open("r", encoding="utf-8") as fp:
-                jobs.append(json.load(fp))
-        except json.JSONDecodeError:
+            jobs.append(read_json(job_dir / META_FILENAME))
+        except (FileNotFoundError, json.JSONDecodeError):
             continue
     jobs.sort(key=lambda item: item.get("created_at", ""), reverse=True)
     return jobs
@@ -104,32 +121,69 @@ def list_jobs() -> List[Dict[str, Any]]:
 
 def rename_job(job_id: str, new_label: str) -> Dict[str, Any]:
     """Rename a job by updating its label."""
-    metadata = load_metadata(job_id)
-    metadata["label"] = new_label
-    metadata["updated_at"] = _now_iso()
-    save_metadata(job_id, metadata)
-    return metadata
+    with _update_lock:
+        metadata = load_metadata(job_id)
+        metadata["label"] = new_label
+        metadata["updated_at"] = _now_iso()
+        save_metadata(job_id, metadata)
+        return metadata
 
 
 def delete_job(job_id: str) -> bool:
-    """Delete a job and all its associated files."""
-    import shutil
-    job_dir = _job_upload_dir(job_id)
+    """Delete a job and all its associated files (uploads, reconstructions, report)."""
+    from backend.services.colmap_runner import cancel_colmap
+    from backend.services.reclaimer import reclaim_job_files
+    job_dir = job_upload_dir(job_id)
     if not job_dir.exists():
         return False
-    shutil.rmtree(job_dir)
+    cancel_colmap(job_id)
+    reclaim_job_files(job_id, job_dir)
     return True
 
 
 def delete_all_jobs() -> int:
     """Delete all jobs. Returns the number of jobs deleted."""
-    import shutil
     ensure_data_directories()
     count = 0
-    if not UPLOADS_DIR.exists():
-        return count
-    for job_dir in UPLOADS_DIR.iterdir():
-        if job_dir.is_dir():
-            shutil.rmtree(job_dir)
+    for job_id, _ in list(iter_upload_dirs()):
+        if delete_job(job_id):
             count += 1
     return count
+
+
+TRASH_BATCH_PREFIX = "batch-"
+
+
+def tombstone_job(job_id: str) -> bool:
+    """
+    Hide a job instantly by moving its upload directory into the trash.
+
+    The rename is atomic on the same filesystem; the background reclaimer
+    removes the trashed directory and the job's other artifacts later. A
+    COLMAP reconstruction still running for the job is cancelled, so it stops
+    writing into a directory that is about to be reclaimed.
+    """
+    from backend.services.colmap_runner import cancel_colmap
+    job_dir = job_upload_dir(job_id)
+    if not job_dir.exists():
+        return False
+    cancel_colmap(job_id)
+    TRASH_DIR.mkdir(parents=True, exist_ok=True)
+    os.replace(job_dir, TRASH_DIR / job_id)
+    return True
+
+
+def tombstone_all_jobs() -> int:
+    """
+    Hide every job at once by moving the whole uploads directory into the trash.
+
+    Returns the number of job directories moved. Running COLMAP reconstructions
+    are cancelled.
+    """
+    from backend.services.colmap_runner import cancel_all_colmap
+    ensure_data_directories()
+    cancel_all_colmap()
+    batch_dir = TRASH_DIR / f"{TRASH_BATCH_PREFIX}{uuid.uuid4().hex}"
+    os.replace(config.UPLOADS_DIR, batch_dir)
+    config.UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    return sum(1 for _ in iter_upload_dirs(batch_dir))
@@ -0,0 +1,474 @@
+"""
+Level-of-detail binary glTF (GLB) packages of reconstructions for the 3D viewer.
+
+After reconstruction, package_reconstruction() reads the job's model (an OBJ
+or PLY mesh or point cloud, or a COLMAP sparse model's points3D), builds
+coarser levels with NumPy and writes each level as a GLB under ``lod/`` in
+the job's reconstruction directory, with a ``mesh_lods.json`` manifest that
+lists them coarsest first. The viewer loads level 0 (at most the first
+MESH_LOD_BUDGETS entry of triangles or points, a few hundred kilobytes) for a
+first render, then refines with the finer levels.
+
+Levels are made by vertex clustering: vertices are snapped to a uniform grid
+and every occupied cell becomes one vertex at the mean position (and colour)
+of its members. Triangles are remapped onto the cells, and collapsed or
+duplicate triangles are dropped. Point clouds are voxel-downsampled the same
+way. The cell size is searched until a level fits its budget. Each level is
+clustered from the next finer one, so a multi-million-vertex model is only
+clustered in full once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core import config
+from backend.core.artifacts import read_json
+from backend.core.job_paths import job_reconstruction_dir
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "mesh_lods.json"
+LOD_DIRNAME = "lod"
+
+# Cell-size search: attempts per level, and margin when shrinking towards a budget
+_BUDGET_ATTEMPTS = 6
+_BUDGET_MARGIN = 1.1
+
+_GLB_MAGIC = 0x46546C67  # "glTF"
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+
+@dataclass
+class Geometry:
+    """A triangle mesh (`faces` set) or a point cloud (`faces` None), with optional RGB colours."""
+
+    positions: np.ndarray  # (n, 3) float
+    faces: Optional[np.ndarray] = None  # (m, 3) int64 vertex indices
+    colors: Optional[np.ndarray] = None  # (n, 3) uint8
+
+    @property
+    def primitive(self) -> str:
+        return "points" if self.faces is None else "triangles"
+
+    @property
+    def size(self) -> int:
+        """What budgets count: triangles of a mesh, points of a point cloud."""
+        return len(self.positions) if self.faces is None else len(self.faces)
+
+
+# =============================================================================
+# Readers
+# =============================================================================
+
+def _to_colors(values: np.ndarray) -> np.ndarray:
+    """RGB as uint8, from 0-1 floats (OBJ vertex colours) or 0-255 values."""
+    if values.dtype.kind == "f" and values.size and values.max() <= 1.0:
+        values = values * 255.0
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+
+def _fan(polygons: Sequence[Sequence[int]]) -> np.ndarray:
+    """Triangles of convex polygons, fanned from their first vertex."""
+    triangles = [(polygon[0], polygon[i], polygon[i + 1]) for polygon in polygons for i in range(1, len(polygon) - 1)]
+    return np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+
+def read_obj(path: Path) -> Geometry:
+    """Vertices (with `v x y z r g b` colours) and faces of a Wavefront OBJ file."""
+    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    vertex_lines = [line[2:] for line in lines if line.startswith("v ")]
+    face_lines = [line[2:] for line in lines if line.startswith("f ")]
+    if not vertex_lines:
+        raise ValueError(f"{path.name} has no vertices")
+
+    values = np.array(" ".join(vertex_lines).split(), dtype=np.float64)
+    colors = None
+    if values.size == 3 * len(vertex_lines):
+        positions = values.reshape(-1, 3)
+    elif values.size == 6 * len(vertex_lines):
+        values = values.reshape(-1, 6)
+        positions, colors = values[:, :3], _to_colors(values[:, 3:])
+    else:  # Mixed vertex formats
+        positions = np.array([line.split()[:3] for line in vertex_lines], dtype=np.float64)
+
+    faces = None
+    if face_lines:
+        # Keep only the vertex index of each v/vt/vn corner
+        tokens = re.sub(r"/\S*", "", " ".join(face_lines)).split()
+        if len(tokens) == 3 * len(face_lines):
+            faces = np.array(tokens, dtype=np.int64).reshape(-1, 3)
+        else:
+            faces = _fan([[int(token.split("/", 1)[0]) for token in line.split()] for line in face_lines])
+        # OBJ indices are 1-based; negative ones count back from the last vertex so far
+        faces = np.where(faces > 0, faces - 1, faces + len(positions))
+        if faces.size and (faces.min() < 0 or faces.max() >= len(positions)):
+            raise ValueError(f"{path.name} has faces referring to missing vertices")
+    return Geometry(positions, faces, colors)
+
+
+def _ply_header(fp) -> Tuple[str, List[Tuple[str, int, List[Tuple[str, ...]]]]]:
+    if fp.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    fmt = ""
+    elements: List[Tuple[str, int, List[Tuple[str, ...]]]] = []
+    while True:
+        line = fp.readline()
+        if not line:
+            raise ValueError("PLY header has no end_header")
+        words = line.decode("ascii", "replace").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            return fmt, elements
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and elements:
+            elements[-1][2].append(tuple(words[1:]))
+
+
+def read_ply(path: Path) -> Geometry:
+    """Vertices (with red/green/blue colours) and faces of an ASCII or binary PLY file."""
+    with path.open("rb") as fp:
+        fmt, elements = _ply_header(fp)
+        body = fp.read()
+    if fmt not in ("ascii", "binary_little_endian", "binary_big_endian"):
+        raise ValueError(f"Unsupported PLY format: {fmt}")
+    order = ">" if fmt == "binary_big_endian" else "<"
+
+    vertices: Optional[np.ndarray] = None
+    faces = None
+    offset = 0
+    lines = body.decode("ascii", "replace").split("\n") if fmt == "ascii" else None
+    for name, count, properties in elements:
+        scalar = all(prop[0] != "list" for prop in properties)
+        if lines is not None:
+            rows, lines = lines[:count], lines[count:]
+            if name == "vertex":
+                table = np.array(" ".join(rows).split(), dtype=np.float64).reshape(count, len(properties))
+                vertices = np.empty(count, dtype=[(prop[1], "f8") for prop in properties])
+                for index, prop in enumerate(properties):
+                    vertices[prop[1]] = table[:, index]
+            elif name == "face":
+                faces = _fan([[int(value) for value in row.split()[1:]] for row in rows])
+            continue
+        if scalar:
+            dtype = np.dtype([(prop[1], order + _PLY_TYPES[prop[0]]) for prop in properties])
+            data = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+            offset += dtype.itemsize * count
+            if name == "vertex":
+                vertices = data
+            continue
+        if name != "face" or len(properties) != 1:
+            if vertices is not None and faces is not None:
+                break  # Trailing elements are not needed
+            raise ValueError(f"Unsupported PLY element: {name}")
+        _, count_type, item_type, _ = properties[0]
+        count_dtype, item_dtype = np.dtype(order + _PLY_TYPES[count_type]), np.dtype(order + _PLY_TYPES[item_type])
+        triangles = np.dtype([("n", count_dtype), ("i", item_dtype, 3)])
+        if len(body) - offset >= triangles.itemsize * count:
+            data = np.frombuffer(body, dtype=triangles, count=count, offset=offset)
+            if count == 0 or (data["n"] == 3).all():
+                faces = data["i"].astype(np.int64)
+                offset += triangles.itemsize * count
+                continue
+        polygons = []
+        for _ in range(count):  # Mixed polygon sizes: walk the list one face at a time
+            (size,) = np.frombuffer(body, dtype=count_dtype, count=1, offset=offset)
+            offset += count_dtype.itemsize
+            polygons.append(np.frombuffer(body, dtype=item_dtype, count=int(size), offset=offset).tolist())
+            offset += item_dtype.itemsize * int(size)
+        faces = _fan(polygons)
+
+    if vertices is None or not {"x", "y", "z"} <= set(vertices.dtype.names or ()):
+        raise ValueError(f"{path.name} has no vertex positions")
+    positions = np.column_stack([vertices["x"], vertices["y"], vertices["z"]]).astype(np.float64)
+    colors = None
+    names = set(vertices.dtype.names)
+    for channels in (("red", "green", "blue"), ("diffuse_red", "diffuse_green", "diffuse_blue")):
+        if set(channels) <= names:
+            colors = _to_colors(np.column_stack([vertices[channel] for channel in channels]).astype(np.float64))
+            break
+    if faces is not None and faces.size and (faces.min() < 0 or faces.max() >= len(positions)):
+        raise ValueError(f"{path.name} has faces referring to missing vertices")
+    return Geometry(positions, faces, colors)
+
+
+def read_colmap_points(path: Path) -> Geometry:
+    """The point cloud of a COLMAP sparse model (points3D.bin or points3D.txt)."""
+    if path.suffix == ".txt":
+        rows = [line.split()[1:7] for line in path.read_text(encoding="utf-8").splitlines() if line and line[0] != "#"]
+        table = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        return Geometry(table[:, :3], None, table[:, 3:].astype(np.uint8))
+
+    data = path.read_bytes()
+    (count,) = struct.unpack_from("<Q", data, 0)
+    record = struct.Struct("<Q3d3BdQ")  # id, xyz, rgb, error, track length (then the track)
+    positions = np.empty((count, 3), dtype=np.float64)
+    colors = np.empty((count, 3), dtype=np.uint8)
+    offset = 8
+    for index in range(count):
+        _, x, y, z, r, g, b, _, track_length = record.unpack_from(data, offset)
+        positions[index] = (x, y, z)
+        colors[index] = (r, g, b)
+        offset += record.size + 8 * track_length
+    return Geometry(positions, None, colors)
+
+
+def load_geometry(path: Path) -> Geometry:
+    """Read a model by file type. Raises ValueError for unsupported or malformed files."""
+    suffix = path.suffix.lower()
+    if path.name.startswith("points3D") and suffix in (".bin", ".txt"):
+        return read_colmap_points(path)
+    if suffix == ".obj":
+        return read_obj(path)
+    if suffix == ".ply":
+        return read_ply(path)
+    raise ValueError(f"Unsupported model format: {path.name}")
+
+
+# =============================================================================
+# Levels of detail
+# =============================================================================
+
+def cluster(geometry: Geometry, cell_size: float) -> Geometry:
+    """Vertex clustering of `geometry` on a grid of `cell_size` (see the module docstring)."""
+    positions = geometry.positions
+    cells = np.floor((positions - positions.min(axis=0)) / cell_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    def mean(values: np.ndarray) -> np.ndarray:
+        return np.column_stack([np.bincount(inverse, weights=values[:, axis]) for axis in range(3)]) / counts[:, None]
+
+    clustered = mean(positions)
+    colors = None if geometry.colors is None else _to_colors(mean(geometry.colors.astype(np.float64)))
+    if geometry.faces is None:
+        return Geometry(clustered, None, colors)
+
+    faces = inverse[geometry.faces]
+    a, b, c = faces[:, 0], faces[:, 1], faces[:, 2]
+    faces = faces[(a != b) & (b != c) & (a != c)]
+    # Drop duplicates (same three vertices in any order), keeping the first winding
+    ordered = np.sort(faces, axis=1)
+    n = len(clustered)
+    if n < 2 ** 21:
+        keys = (ordered[:, 0] * n + ordered[:, 1]) * n + ordered[:, 2]
+        _, first = np.unique(keys, return_index=True)
+    else:
+        _, first = np.unique(ordered, axis=0, return_index=True)
+    faces = faces[np.sort(first)]
+    # Keep only the vertices some triangle still uses
+    used = np.unique(faces)
+    remap = np.full(n, -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    return Geometry(clustered[used], remap[faces], None if colors is None else colors[used])
+
+
+def decimate(geometry: Geometry, budget: int) -> Geometry:
+    """`geometry` clustered to at most `budget` triangles (meshes) or points (point clouds)."""
+    extent = np.ptp(geometry.positions, axis=0)
+    diagonal = float(np.linalg.norm(extent)) or 1.0
+    # Surfaces occupy about (diagonal / cell)^2 cells, with about two triangles per cell
+    per_cell = 2.0 if geometry.faces is not None else 1.0
+    cell = diagonal / max(1.0, np.sqrt(budget / per_cell))
+    result = geometry
+    for _ in range(_BUDGET_ATTEMPTS):
+        result = cluster(geometry, cell)
+        if result.size <= budget:
+            return result
+        cell *= np.sqrt(result.size / budget) * _BUDGET_MARGIN
+    while result.size > budget:  # Pathological inputs (e.g. volumes): coarsen until it fits
+        cell *= 2.0
+        result = cluster(geometry, cell)
+    return result
+
+
+def build_levels(geometry: Geometry, budgets: Sequence[int]) -> List[Geometry]:
+    """Levels of detail, coarsest first: one per budget it exceeds, then `geometry` itself."""
+    levels = [geometry]
+    for budget in sorted(set(budgets), reverse=True):
+        if budget > 0 and levels[-1].size > budget:
+            levels.append(decimate(levels[-1], budget))
+    return levels[::-1]
+
+
+# =============================================================================
+# GLB
+# =============================================================================
+
+def encode_glb(geometry: Geometry) -> bytes:
+    """`geometry` as a binary glTF 2.0 file: one mesh of triangles or points."""
+    positions = np.ascontiguousarray(geometry.positions, dtype="<f4")
+    buffers: List[bytes] = []
+    views: List[Dict[str, Any]] = []
+    accessors: List[Dict[str, Any]] = []
+    offset = 0
+
+    def add(data: bytes, target: int, **accessor: Any) -> int:
+        nonlocal offset
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": len(data), "target": target})
+        accessors.append({"bufferView": len(views) - 1, **accessor})
+        padding = -len(data) % 4
+        buffers.append(data + b"\x00" * padding)
+        offset += len(data) + padding
+        return len(accessors) - 1
+
+    count = len(positions)
+    attributes = {"POSITION": add(
+        positions.tobytes(), _ARRAY_BUFFER, componentType=5126, count=count, type="VEC3",
+        min=positions.min(axis=0).tolist() if count else [0, 0, 0],
+        max=positions.max(axis=0).tolist() if count else [0, 0, 0],
+    )}
+    if geometry.colors is not None:
+        colors = np.ascontiguousarray(geometry.colors, dtype=np.uint8)
+        # Vertex attributes must be 4-byte aligned per element, so RGB bytes are padded to RGBA
+        rgba = np.concatenate([colors, np.full((count, 1), 255, dtype=np.uint8)], axis=1)
+        attributes["COLOR_0"] = add(
+            rgba.tobytes(), _ARRAY_BUFFER, componentType=5121, normalized=True, count=count, type="VEC4"
+        )
+    primitive: Dict[str, Any] = {"attributes": attributes, "mode": 0 if geometry.faces is None else 4}
+    if geometry.faces is not None:
+        wide = count > 65535
+        indices = np.ascontiguousarray(geometry.faces, dtype="<u4" if wide else "<u2")
+        primitive["indices"] = add(
+            indices.tobytes(), _ELEMENT_ARRAY_BUFFER,
+            componentType=5125 if wide else 5123, count=int(indices.size), type="SCALAR",
+        )
+
+    binary = b"".join(buffers)
+    document = {
+        "asset": {"version": "2.0", "generator": "digital-renovation-twin"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "meshes": [{"primitives": [primitive]}],
+        "buffers": [{"byteLength": len(binary)}],
+        "bufferViews": views,
+        "accessors": accessors,
+    }
+    header = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-len(header) % 4)
+    total = 12 + 8 + len(header) + 8 + len(binary)
+    return b"".join([
+        struct.pack("<III", _GLB_MAGIC, 2, total),
+        struct.pack("<II", len(header), _CHUNK_JSON), header,
+        struct.pack("<II", len(binary), _CHUNK_BIN), binary,
+    ])
+
+
+# =============================================================================
+# Jobs
+# =============================================================================
+
+def find_model(job_id: str, reconstruction: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    """
+    The job's model to package: the reconstruction's local asset when it is an
+    OBJ or PLY file, else the largest COLMAP sparse model. None if there is neither.
+    """
+    asset = (reconstruction or {}).get("asset_local_path")
+    if asset and Path(asset).suffix.lower() in (".obj", ".ply") and Path(asset).is_file():
+        return Path(asset)
+    sparse = job_reconstruction_dir(job_id) / "sparse"
+    models = [path for path in sparse.glob("*/points3D.*") if path.suffix in (".bin", ".txt")] if sparse.is_dir() else []
+    return max(models, key=lambda path: path.stat().st_size, default=None)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def package_model(job_id: str, model: Path, budgets: Optional[Sequence[int]] = None) -> Path:
+    """
+    Write the GLB levels of `model` and their manifest for a job; returns the manifest path.
+
+    Raises ValueError if the model cannot be read.
+    """
+    geometry = load_geometry(model)
+    levels = build_levels(geometry, config.MESH_LOD_BUDGETS if budgets is None else budgets)
+    output_dir = job_reconstruction_dir(job_id)
+    lod_dir = output_dir / LOD_DIRNAME
+    lod_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = []
+    for index, level in enumerate(levels):
+        data = encode_glb(level)
+        name = f"lod{index}.glb"
+        _write_atomic(lod_dir / name, data)
+        entries.append({
+            "level": index,
+            "file": f"{LOD_DIRNAME}/{name}",
+            "primitive": level.primitive,
+            "vertices": len(level.positions),
+            "primitives": level.size,
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+    current = {Path(entry["file"]).name for entry in entries}
+    for stale in lod_dir.glob("lod*.glb"):
+        if stale.name not in current:
+            stale.unlink()  # Left by an earlier, more detailed package
+
+    manifest = {
+        "job_id": job_id,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "source": model.name,
+        "levels": entries,
+    }
+    manifest_path = output_dir / MANIFEST_FILENAME
+    _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+    logger.info(
+        "Packaged %s for job %s: %s", model.name, job_id,
+        ", ".join(f"{entry['primitives']} {entry['primitive']}" for entry in entries),
+    )
+    return manifest_path
+
+
+def package_reconstruction(job_id: str, reconstruction: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    """Package the job's model for the viewer (see package_model); None if disabled or there is none."""
+    if not config.MESH_PACKAGING:
+        return None
+    model = find_model(job_id, reconstruction)
+    if model is None:
+        return None
+    return package_model(job_id, model)
+
+
+def load_lod_manifest(job_id: str) -> Dict[str, Any]:
+    """The job's GLB manifest. Raises FileNotFoundError if the job has not been packaged."""
+    return read_json(job_reconstruction_dir(job_id) / MANIFEST_FILENAME)
+
+
+def lod_level(job_id: str, level: int) -> Tuple[Path, str]:
+    """The GLB of one level and its SHA-256. Raises FileNotFoundError if the job or level does not exist."""
+    for entry in load_lod_manifest(job_id)["levels"]:
+        if entry["level"] == level:
+            return job_reconstruction_dir(job_id) / entry["file"], entry["sha256"]
+    raise FileNotFoundError(f"No level {level} for job {job_id}")
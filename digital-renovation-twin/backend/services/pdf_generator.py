@@ -1,51 +1,333 @@
 from __future__ import annotations
 
-import json
+import hashlib
+import logging
+import mmap
+import queue
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 
-from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+from backend.core import config
+from backend.core.artifacts import artifact_exists, read_json
+from backend.core.job_paths import job_reconstruction_dir, job_report_path, job_upload_dir
+from backend.services.damage_records import DamageRecord, Severity, load_damage_records
+from backend.services.storage import ObjectInfo, get_storage, list_job_uploads, report_key
+from backend.services.thumbnails import report_photo
+
+logger = logging.getLogger(__name__)
+
+# zlib level for content streams: 6 is within a few percent of 9 at a fraction of the CPU
+_FLATE_LEVEL = 6
+
+# Chunks stream_pdf() lets the layout thread run ahead of a slow consumer
+_STREAM_QUEUE_SIZE = 8
+
+# Slice size when passing embedded image data through to the output
+_PASS_THROUGH_CHUNK = 1024 * 1024
+
+# Static blocks recorded by PDFBuilder.add_static(), shared by every builder in
+# the process: key -> (joined operators, graphics state after, y after)
+_STATIC_CACHE_SIZE = 4096
+_static_blocks: Dict[Tuple[Any, ...], Tuple[str, Tuple[Tuple[str, str], ...], float]] = {}
+
+# JPEG frame types DCTDecode can read: baseline, extended and progressive Huffman
+_JPEG_SOF_MARKERS = (0xC0, 0xC1, 0xC2)
+_JPEG_COLOR_SPACES = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}
+
+# Report severity (0-10) of each damage severity
+SEVERITY_SCORES = {Severity.LOW: 3, Severity.MEDIUM: 5, Severity.HIGH: 8}
 
 
 def _load_json(path: Path) -> dict:
-    if not path.exists():
-        raise FileNotFoundError(f"Expected file missing: {path}")
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
+    return read_json(path)
 
 
 def _escape_pdf_text(text: str) -> str:
     return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
 
 
+class _PDFWriter:
+    """
+    Serializes indirect objects to `output` as they are added.
+    
+    Byte offsets for the cross-reference table are recorded as each object is
+    written, so nothing but the (small) xref entries is kept once a chunk has
+    been handed to `output`. With object_streams, dictionaries are held back and
+    packed into one object stream when the document is finished.
+    """
+    
+    def __init__(self, output: Callable[[bytes], Any], *, compress: bool, object_streams: bool):
+        self._output = output
+        self.compress = compress
+        self.object_streams = object_streams
+        self._buffer: List[bytes] = []
+        self._offset = 0
+        self._next_number = 1
+        # xref entries as (type, field2, field3): 1 = at offset, 2 = in object stream
+        self._entries: Dict[int, Tuple[int, int, int]] = {}
+        self._packed: List[Tuple[int, bytes]] = []
+        self._emit(self._header("1.5" if object_streams else "1.4"))
+    
+    def reserve(self) -> int:
+        """Allocate the next object number; the object itself may be added later."""
+        number = self._next_number
+        self._next_number += 1
+        return number
+    
+    def add(self, number: int, dictionary: bytes, stream: Optional[bytes] = None) -> None:
+        if stream is None and self.object_streams:
+            self._packed.append((number, dictionary))
+            return
+        self._entries[number] = (1, self._offset, 0)
+        self._emit(self._indirect(number, dictionary, stream))
+    
+    def add_pass_through(self, number: int, dictionary: bytes, data: Any) -> None:
+        """
+        Add a stream object whose data (bytes or a memory map) is handed to the
+        output as memoryview slices instead of being copied into the buffer.
+        """
+        self._entries[number] = (1, self._offset, 0)
+        self._emit(b"%d 0 obj\n%s\nstream\n" % (number, dictionary))
+        self.flush()
+        view = memoryview(data)
+        for start in range(0, len(view), _PASS_THROUGH_CHUNK):
+            chunk = view[start:start + _PASS_THROUGH_CHUNK]
+            self._output(chunk)
+            self._offset += len(chunk)
+        self._emit(b"\nendstream\nendobj\n")
+    
+    def stream(self, data: bytes, extra: str = "") -> Tuple[bytes, bytes]:
+        """(dictionary, data) of a stream object, Flate-compressed if enabled."""
+        if self.compress:
+            data = zlib.compress(data, _FLATE_LEVEL)
+            return f"<< /Length {len(data)} /Filter /FlateDecode{extra} >>".encode("ascii"), data
+        return f"<< /Length {len(data)}{extra} >>".encode("ascii"), data
+    
+    def flush(self) -> None:
+        """Hand everything written so far to the output in one chunk."""
+        if self._buffer:
+            chunk = b"".join(self._buffer)
+            self._buffer = []
+            self._output(chunk)
+    
+    def finish(self, root: int) -> None:
+        """Write the cross-reference section and trailer, then flush."""
+        if self.object_streams:
+            self._finish_with_xref_stream(root)
+        else:
+            self._finish_with_xref_table(root)
+        self.flush()
+    
+    def _emit(self, chunk: bytes) -> None:
+        self._buffer.append(chunk)
+        self._offset += len(chunk)
+    
+    def _header(self, version: str) -> bytes:
+        header = f"%PDF-{version}\n".encode("ascii")
+        if self.compress or self.object_streams:
+            header += b"%\xe2\xe3\xcf\xd3\n"  # Marks the file as binary for transfer tools
+        return header
+    
+    @staticmethod
+    def _indirect(number: int, dictionary: bytes, stream: Optional[bytes]) -> bytes:
+        if stream is None:
+            return b"%d 0 obj\n%s\nendobj\n" % (number, dictionary)
+        eol = b"" if stream.endswith(b"\n") else b"\n"
+        return b"%d 0 obj\n%s\nstream\n%s%sendstream\nendobj\n" % (number, dictionary, stream, eol)
+    
+    def _finish_with_xref_table(self, root: int) -> None:
+        """Classic layout: every object at top level and a plain-text xref table."""
+        size = self._next_number
+        xref = [f"xref\n0 {size}\n0000000000 65535 f \n"]
+        xref.extend(f"{self._entries[number][1]:010d} 00000 n \n" for number in range(1, size))
+        xref.append(f"trailer\n<< /Size {size} /Root {root} 0 R >>\nstartxref\n{self._offset}\n%%EOF")
+        self._emit("".join(xref).encode("ascii"))
+    
+    def _finish_with_xref_stream(self, root: int) -> None:
+        """PDF 1.5 layout: dictionaries in one object stream, offsets in an xref stream."""
+        if self._packed:
+            objstm_number = self.reserve()
+            packed_index: List[str] = []
+            packed_offset = 0
+            for position, (number, dictionary) in enumerate(self._packed):
+                self._entries[number] = (2, objstm_number, position)
+                packed_index.append(f"{number} {packed_offset}")
+                packed_offset += len(dictionary) + 1
+            index = (" ".join(packed_index) + "\n").encode("ascii")
+            dictionary, stream = self.stream(
+                index + b"\n".join(dictionary for _, dictionary in self._packed) + b"\n",
+                f" /Type /ObjStm /N {len(self._packed)} /First {len(index)}",
+            )
+            self._packed = []
+            self.add(objstm_number, dictionary, stream)
+        
+        xref_number = self.reserve()
+        xref_offset = self._offset
+        self._entries[xref_number] = (1, xref_offset, 0)
+        entries = [(0, 0, 65535)] + [self._entries[number] for number in range(1, xref_number + 1)]
+        xref_data = b"".join(struct.pack(">BIH", *entry) for entry in entries)
+        dictionary, stream = self.stream(
+            xref_data,
+            f" /Type /XRef /Size {xref_number + 1} /W [1 4 2] /Root {root} 0 R",
+        )
+        self._emit(self._indirect(xref_number, dictionary, stream))
+        self._emit(f"startxref\n{xref_offset}\n%%EOF".encode("ascii"))
+
+
+@dataclass(frozen=True)
+class PDFImage:
+    """An image XObject embedded in a PDFBuilder document; draw it with draw_image()."""
+    
+    name: str
+    width: int
+    height: int
+
+
+def jpeg_info(data: Any) -> Tuple[int, int, int, bool]:
+    """
+    (width, height, components, adobe) from a JPEG's frame header.
+    
+    `data` may be bytes or a memory map; only the marker segments before the
+    frame header are touched. `adobe` is True if an Adobe APP14 segment is
+    present (its CMYK data is stored inverted).
+    
+    Raises ValueError for anything DCTDecode cannot embed as-is.
+    """
+    if data[:2] != b"\xff\xd8":
+        raise ValueError("Not a JPEG file")
+    adobe = False
+    pos = 2
+    size = len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            raise ValueError("Corrupt JPEG marker stream")
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        if marker == 0xEE and data[pos + 4:pos + 9] == b"Adobe":
+            adobe = True
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if marker not in _JPEG_SOF_MARKERS:
+                raise ValueError("Unsupported JPEG encoding (lossless or arithmetic coded)")
+            precision = data[pos + 4]
+            height = int.from_bytes(data[pos + 5:pos + 7], "big")
+            width = int.from_bytes(data[pos + 7:pos + 9], "big")
+            components = data[pos + 9]
+            if precision != 8 or not width or not height or components not in _JPEG_COLOR_SPACES:
+                raise ValueError("Unsupported JPEG frame")
+            return width, height, components, adobe
+        elif marker == 0xDA:
+            break
+        pos += 2 + length
+    raise ValueError("No frame header in JPEG")
+
+
 class PDFBuilder:
-    """Professional PDF builder with multi-page support and formatting."""
+    """
+    Professional PDF builder with multi-page support and formatting.
+
+    Output options:
+    - compress: FlateDecode page content streams.
+    - object_streams: PDF 1.5 output with the non-stream objects packed into one
+      compressed object stream and a compressed cross-reference stream.
+    - dedupe_state: only emit color, line width and font operators when the
+      value actually changes within a page.
+    - static_cache: replay the recorded operators of add_static() blocks
+      instead of laying them out again (the output is the same either way).
+    - output: a callable (e.g. ``file.write``) that receives the document in
+      chunks. Each page is written to it as soon as the layout moves past it,
+      so memory stays flat however long the report is; call close() at the end.
+      Without it the document is buffered and returned by render().
+
+    Pages are written as they are finished, so the page tree and the resource
+    dictionary they share (fonts and images) come last.
+    """
     
-    def __init__(self, width: int = 612, height: int = 792):
+    def __init__(
+        self,
+        width: int = 612,
+        height: int = 792,
+        *,
+        compress: bool = True,
+        object_streams: bool = False,
+        dedupe_state: bool = True,
+        static_cache: bool = True,
+        output: Optional[Callable[[bytes], Any]] = None,
+    ):
         self.width = width
         self.height = height
-        self.pages: List[str] = []
+        self.compress = compress
+        self.object_streams = object_streams
+        self.dedupe_state = dedupe_state
+        self.static_cache = static_cache
         self.current_page: List[str] = []
+        self._state: Dict[str, str] = {}
         self.y = height - 72  # Start with 1-inch top margin
         self.left_margin = 60
         self.line_height = 16
         
+        self._chunks: Optional[List[bytes]] = None
+        if output is None:
+            self._chunks = []
+            output = self._chunks.append
+        self._writer = _PDFWriter(output, compress=compress, object_streams=object_streams)
+        self._closed = False
+        self._page_refs: List[int] = []
+        
+        self._images: Dict[str, PDFImage] = {}
+        self._image_objs: Dict[str, int] = {}
+        
+        writer = self._writer
+        self._catalog_obj = writer.reserve()
+        self._pages_obj = writer.reserve()
+        self._resources_obj = writer.reserve()
+        self._font_objs = (writer.reserve(), writer.reserve())
+        writer.add(self._catalog_obj, f"<< /Type /Catalog /Pages {self._pages_obj} 0 R >>".encode("ascii"))
+        writer.add(self._font_objs[0], b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        writer.add(self._font_objs[1], b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+        self._resources = f"/Resources {self._resources_obj} 0 R"
+    
+    @property
+    def page_count(self) -> int:
+        """Pages finished so far (the page being laid out is not counted)."""
+        return len(self._page_refs)
+    
+    def _set_state(self, key: str, operator: str) -> None:
+        """Emit a graphics state operator unless it is already in effect on this page."""
+        if self.dedupe_state and self._state.get(key) == operator:
+            return
+        self._state[key] = operator
+        self.current_page.append(operator)
+        
     def _add_text(self, text: str, x: int, y: int, font: str = "F1", size: int = 11, color: Tuple[float, float, float] = (0, 0, 0)) -> None:
         escaped = _escape_pdf_text(text)
         r, g, b = color
-        self.current_page.append(f"{r} {g} {b} rg")
+        self._set_state("fill", f"{r} {g} {b} rg")
+        if self.dedupe_state:
+            # Tf is text state, which carries over between BT/ET blocks
+            font_op = f"/{font} {size} Tf"
+            if self._state.get("font") == font_op:
+                self.current_page.append(f"BT {x} {y} Td ({escaped}) Tj ET")
+                return
+            self._state["font"] = font_op
         self.current_page.append(f"BT /{font} {size} Tf {x} {y} Td ({escaped}) Tj ET")
         
     def _draw_line(self, x1: int, y1: int, x2: int, y2: int, width: float = 0.5, color: Tuple[float, float, float] = (0.8, 0.8, 0.8)) -> None:
         r, g, b = color
-        self.current_page.append(f"{r} {g} {b} RG")
-        self.current_page.append(f"{width} w")
+        self._set_state("stroke", f"{r} {g} {b} RG")
+        self._set_state("width", f"{width} w")
         self.current_page.append(f"{x1} {y1} m {x2} {y2} l S")
         
     def _draw_rect(self, x: int, y: int, w: int, h: int, fill_color: Tuple[float, float, float], stroke: bool = False) -> None:
         r, g, b = fill_color
-        self.current_page.append(f"{r} {g} {b} rg")
+        self._set_state("fill", f"{r} {g} {b} rg")
         if stroke:
             self.current_page.append(f"{x} {y} {w} {h} re B")
         else:
@@ -56,17 +338,87 @@ class PDFBuilder:
             self._new_page()
     
     def _new_page(self) -> None:
+        self._flush_page()
+        self.y = self.height - 72
+    
+    def _flush_page(self) -> None:
+        """Write the page being laid out (content stream and page object) to the output."""
         if self.current_page:
-            self.pages.append("\n".join(self.current_page) + "\n")
+            self._write_page(self._encode_current_page())
         self.current_page = []
-        self.y = self.height - 72
-        
-    def add_header(self, title: str, subtitle: str = "") -> None:
-        # Header background
-        self._draw_rect(0, self.height - 120, self.width, 120, (0.11, 0.11, 0.11))
-        
-        # Title
-        self._add_text(title, self.left_margin, self.height - 55, "F2", 24, (1, 1, 1))
+        self._state = {}  # Each content stream starts from the default graphics state
+    
+    def _encode_current_page(self) -> Tuple[bytes, bytes]:
+        return self._writer.stream(("\n".join(self.current_page) + "\n").encode("utf-8"))
+    
+    def _write_page(self, content: Tuple[bytes, bytes]) -> None:
+        writer = self._writer
+        content_obj = writer.reserve()
+        page_obj = writer.reserve()
+        writer.add(content_obj, *content)
+        writer.add(
+            page_obj,
+            f"<< /Type /Page /Parent {self._pages_obj} 0 R /MediaBox [0 0 {self.width} {self.height}] "
+            f"/Contents {content_obj} 0 R {self._resources} >>".encode("ascii"),
+        )
+        self._page_refs.append(page_obj)
+        writer.flush()
+    
+    def add_encoded_pages(self, pages: Iterable[Tuple[bytes, bytes]]) -> None:
+        """
+        Append pages laid out elsewhere (PageCollector.encoded_pages) after the current page.
+        
+        They share this document's font objects; the collector must have used the
+        same page size and compress option.
+        """
+        self._new_page()
+        for content in pages:
+            self._write_page(content)
+        
+    def add_static(self, key: Hashable, draw: Callable[[], Any]) -> None:
+        """
+        Lay out a block whose content never changes (boilerplate text, section
+        titles, table headings) by calling `draw`, or replay its operators.
+        
+        The operators `draw` emits are recorded per `key`, position (y) and
+        incoming graphics state, and appended as one cached fragment the next
+        time the same block is laid out there, by this or any other builder.
+        `key` must identify everything `draw` lays out; variable fields belong
+        outside the block. Blocks that break the page are not recorded.
+        """
+        if not self.static_cache:
+            draw()
+            return
+        cache_key = (key, self.y, self.width, self.height, self.left_margin, self.dedupe_state, frozenset(self._state.items()))
+        block = _static_blocks.get(cache_key)
+        if block is not None:
+            operators, state, self.y = block
+            self.current_page.append(operators)
+            self._state = dict(state)
+            return
+        
+        pages = self.page_count
+        start = len(self.current_page)
+        draw()
+        if self.page_count != pages or len(self.current_page) == start:
+            return
+        if len(_static_blocks) >= _STATIC_CACHE_SIZE:
+            _static_blocks.clear()
+        _static_blocks[cache_key] = ("\n".join(self.current_page[start:]), tuple(self._state.items()), self.y)
+    
+    def add_header(self, title: str, subtitle: str = "", *, static: bool = False) -> None:
+        """Dark header bar with title and subtitle; `static` caches the bar and title (see add_static)."""
+        def draw_bar() -> None:
+            # Header background
+            self._draw_rect(0, self.height - 120, self.width, 120, (0.11, 0.11, 0.11))
+            
+            # Title
+            self._add_text(title, self.left_margin, self.height - 55, "F2", 24, (1, 1, 1))
+        
+        if static:
+            self.add_static(("header", title), draw_bar)
+        else:
+            draw_bar()
         
         # Subtitle
         if subtitle:
@@ -141,123 +493,398 @@ class PDFBuilder:
     def add_spacer(self, height: int = 20) -> None:
         self.y -= height
         
+    def embed_jpeg(self, source: Union[Path, bytes], key: Optional[str] = None) -> PDFImage:
+        """
+        Embed JPEG data as a DCTDecode image XObject, once per `key`.
+        
+        The JPEG bytes are passed through untouched. A Path is memory-mapped and
+        its pages are handed to the output without being read into Python
+        bytes. `key` defaults to the resolved path or a hash of the bytes;
+        embedding the same key again returns the existing image.
+        
+        Raises ValueError if the data is not a JPEG DCTDecode can display.
+        """
+        if key is None:
+            key = str(Path(source).resolve()) if isinstance(source, Path) else hashlib.sha1(source).hexdigest()
+        image = self._images.get(key)
+        if image is not None:
+            return image
+        
+        if isinstance(source, Path):
+            with source.open("rb") as fp:
+                data: Any = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = source
+        width, height, components, adobe = jpeg_info(data)
+        
+        image = PDFImage(f"Im{len(self._images) + 1}", width, height)
+        number = self._writer.reserve()
+        dictionary = (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {_JPEG_COLOR_SPACES[components]} /BitsPerComponent 8"
+            + (" /Decode [1 0 1 0 1 0 1 0]" if components == 4 and adobe else "")
+            + f" /Filter /DCTDecode /Length {len(data)} >>"
+        ).encode("ascii")
+        # The memory map closes itself once the output has released its slices
+        self._writer.add_pass_through(number, dictionary, data)
+        self._images[key] = image
+        self._image_objs[image.name] = number
+        return image
+    
+    def draw_image(self, image: PDFImage, x: float, y: float, width: float, height: float) -> None:
+        """Draw an embedded image with its lower-left corner at (x, y), scaled to width x height."""
+        self.current_page.append(f"q {width:g} 0 0 {height:g} {x:g} {y:g} cm /{image.name} Do Q")
+    
+    def add_image_grid(self, images: List[Tuple[PDFImage, str]], columns: int = 2, cell_height: int = 200) -> None:
+        """Lay out images with captions in a grid, scaled to fit their cells, breaking pages as needed."""
+        gap = 12
+        caption_height = 16
+        cell_width = (self.width - 2 * self.left_margin - gap * (columns - 1)) / columns
+        box_height = cell_height - caption_height - gap
+        for index in range(0, len(images), columns):
+            self._check_page_break(cell_height + 40)
+            top = self.y
+            for column, (image, caption) in enumerate(images[index:index + columns]):
+                x = self.left_margin + column * (cell_width + gap)
+                scale = min(cell_width / image.width, box_height / image.height)
+                width, height = image.width * scale, image.height * scale
+                self.draw_image(image, round(x + (cell_width - width) / 2, 2), round(top - height, 2), round(width, 2), round(height, 2))
+                self._add_text(caption[:40], round(x), round(top - box_height - caption_height + 4), "F1", 9, (0.5, 0.5, 0.5))
+            self.y = top - cell_height
+        
     def add_footer(self, text: str) -> None:
         self._add_text(text, self.left_margin, 40, "F1", 9, (0.6, 0.6, 0.6))
-        self._add_text(f"Page {len(self.pages) + 1}", self.width - 100, 40, "F1", 9, (0.6, 0.6, 0.6))
+        self._add_text(f"Page {self.page_count + 1}", self.width - 100, 40, "F1", 9, (0.6, 0.6, 0.6))
         
     def build(self, path: Path) -> None:
-        # Finalize current page
-        if self.current_page:
-            self.pages.append("\n".join(self.current_page) + "\n")
-        
-        # Build PDF with multiple pages
-        objects = [
-            "1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n",
-        ]
-        
-        # Pages object
-        page_refs = " ".join([f"{i + 3} 0 R" for i in range(len(self.pages))])
-        objects.append(f"2 0 obj\n<< /Type /Pages /Count {len(self.pages)} /Kids [{page_refs}] >>\nendobj\n")
-        
-        # Page objects and content streams
-        content_start = 3 + len(self.pages)
-        font_obj = content_start + len(self.pages)
-        font_bold_obj = font_obj + 1
-        
-        for i, _ in enumerate(self.pages):
-            content_ref = content_start + i
-            objects.append(
-                f"{3 + i} 0 obj\n"
-                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.width} {self.height}] "
-                f"/Contents {content_ref} 0 R /Resources << /Font << /F1 {font_obj} 0 R /F2 {font_bold_obj} 0 R >> >> >>\n"
-                "endobj\n"
-            )
-        
-        # Content streams
-        for page_content in self.pages:
-            content_bytes = page_content.encode("utf-8")
-            objects.append(f"<< /Length {len(content_bytes)} >>\nstream\n{page_content}endstream\nendobj\n")
-        
-        # Fonts
-        objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\nendobj\n")
-        objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>\nendobj\n")
-        
-        # Assign object numbers
-        numbered_objects = []
-        for i, obj in enumerate(objects):
-            if not obj.startswith(f"{i + 1} 0 obj"):
-                numbered_objects.append(f"{i + 1} 0 obj\n{obj}")
-            else:
-                numbered_objects.append(obj)
-        
-        # Build final PDF
-        pdf_bytes = bytearray(b"%PDF-1.4\n")
-        offsets = []
-        for obj in numbered_objects:
-            offsets.append(len(pdf_bytes))
-            pdf_bytes.extend(obj.encode("utf-8"))
-        
-        xref_start = len(pdf_bytes)
-        pdf_bytes.extend(f"xref\n0 {len(numbered_objects) + 1}\n".encode("ascii"))
-        pdf_bytes.extend(b"0000000000 65535 f \n")
-        for offset in offsets:
-            pdf_bytes.extend(f"{offset:010d} 00000 n \n".encode("ascii"))
-        pdf_bytes.extend(
-            (
-                "trailer\n"
-                f"<< /Size {len(numbered_objects) + 1} /Root 1 0 R >>\n"
-                "startxref\n"
-                f"{xref_start}\n"
-                "%%EOF"
-            ).encode("ascii")
-        )
-        
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(pdf_bytes)
+        path.write_bytes(self.render())
+    
+    def close(self) -> None:
+        """Finish the last page and write the page tree and cross-reference section."""
+        if self._closed:
+            return
+        self._flush_page()
+        page_refs = " ".join(f"{number} 0 R" for number in self._page_refs)
+        self._writer.add(
+            self._pages_obj,
+            f"<< /Type /Pages /Count {self.page_count} /Kids [{page_refs}] >>".encode("ascii"),
+        )
+        resources = f"<< /Font << /F1 {self._font_objs[0]} 0 R /F2 {self._font_objs[1]} 0 R >>"
+        if self._image_objs:
+            xobjects = " ".join(f"/{name} {number} 0 R" for name, number in self._image_objs.items())
+            resources += f" /XObject << {xobjects} >>"
+        self._writer.add(self._resources_obj, (resources + " >>").encode("ascii"))
+        self._writer.finish(self._catalog_obj)
+        self._closed = True
+        
+    def render(self) -> bytes:
+        """Close the document and return it (only for builders without an output)."""
+        if self._chunks is None:
+            raise RuntimeError("render() is not available when the builder writes to an output")
+        self.close()
+        if len(self._chunks) > 1:
+            self._chunks[:] = [b"".join(self._chunks)]
+        return self._chunks[0]
+
+
+class PageCollector(PDFBuilder):
+    """
+    Lays out pages like PDFBuilder but keeps each page's encoded content stream
+    instead of writing a document.
+    
+    Lets independent parts of a document (e.g. one building of a portfolio) be
+    laid out and compressed in worker processes; pass `encoded_pages` to
+    PDFBuilder.add_encoded_pages() to add them to the real document. Collected
+    pages may use the fonts but not embedded images.
+    """
+    
+    def __init__(self, width: int = 612, height: int = 792, *, compress: bool = True, dedupe_state: bool = True):
+        super().__init__(width, height, compress=compress, dedupe_state=dedupe_state, output=lambda chunk: None)
+        self.encoded_pages: List[Tuple[bytes, bytes]] = []
+    
+    @property
+    def page_count(self) -> int:
+        return len(self.encoded_pages)
+    
+    def _flush_page(self) -> None:
+        if self.current_page:
+            self.encoded_pages.append(self._encode_current_page())
+        self.current_page = []
+        self._state = {}
+    
+    def close(self) -> None:
+        """Finish the last page."""
+        self._flush_page()
+
+
+class _StreamCancelled(Exception):
+    """Raised inside the layout thread once the consumer of stream_pdf() has gone away."""
+
+
+_STREAM_DONE = object()
+
+
+def stream_pdf(compose: Callable[[PDFBuilder], Any], **options: Any) -> Iterator[bytes]:
+    """
+    Lay out a document with `compose` and yield it chunk by chunk as pages are finished.
+    
+    `compose` is called with a streaming PDFBuilder (built with `options`) on a
+    worker thread. A small bounded queue sits between the two, so the first
+    bytes are available after the first page and the layout never runs more than
+    a few pages ahead of the consumer. Suitable as the body of a StreamingResponse
+    or as the source of StorageBackend.put(). Errors raised by `compose` are
+    re-raised from the iterator.
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=_STREAM_QUEUE_SIZE)
+    cancelled = threading.Event()
+    
+    def put(item: Any) -> None:
+        while not cancelled.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _StreamCancelled()
+    
+    def run() -> None:
+        try:
+            pdf = PDFBuilder(output=put, **options)
+            compose(pdf)
+            pdf.close()
+            result: Any = _STREAM_DONE
+        except _StreamCancelled:
+            return
+        except BaseException as exc:
+            result = exc
+        try:
+            put(result)
+        except _StreamCancelled:
+            pass
+    
+    worker = threading.Thread(target=run, name="pdf-stream", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            # Embedded images arrive as memoryview slices of a memory map
+            yield bytes(item) if isinstance(item, memoryview) else item
+    finally:
+        cancelled.set()
 
 
-def generate_pdf_report(job_id: str) -> Path:
-    recon_dir = RECONSTRUCTIONS_DIR / job_id
-    report_path = REPORTS_DIR / f"{job_id}.pdf"
+def report_options() -> Dict[str, Any]:
+    return {"compress": config.PDF_COMPRESS, "object_streams": config.PDF_OBJECT_STREAMS}
+
+
+def stream_report(job_id: str, inputs: Optional[Dict[str, Any]] = None) -> Iterator[bytes]:
+    """Yield a job's PDF report in chunks as it is laid out (see stream_pdf)."""
+    return stream_pdf(lambda pdf: compose_report(job_id, pdf, inputs=inputs), **report_options())
+
+
+def generate_pdf_report(job_id: str, inputs: Optional[Dict[str, Any]] = None) -> Path:
+    report_path = job_report_path(job_id)
+    get_storage().put(report_key(job_id), stream_report(job_id, inputs), content_type="application/pdf")
+    return report_path
+
+
+def report_label(job_id: str, metadata: Dict[str, Any]) -> str:
+    """The building name a report is titled with: the job's label, or a name derived from its ID."""
+    return metadata.get("label") or f"Assessment {job_id[:8]}"
+
+
+def load_report_inputs(job_id: str) -> Dict[str, Any]:
+    """
+    Everything a job's report is laid out from.
+    
+    Damages are streamed and only their summary (summarize_damages) is kept.
+    
+    Raises FileNotFoundError if the damages or cost estimate are missing.
+    """
+    recon_dir = job_reconstruction_dir(job_id)
     
     # Load data
-    damages = _load_json(recon_dir / "damages.json").get("damages", [])
+    damage_summary = summarize_damages(load_damage_records(job_id))
     cost_data = _load_json(recon_dir / "cost_estimate.json")
     
     risk_data = None
     risk_path = recon_dir / "risk_summary.json"
-    if risk_path.exists():
+    if artifact_exists(risk_path):
         try:
             risk_data = _load_json(risk_path)
         except Exception:
             risk_data = None
     
     # Load job metadata for file count
-    job_meta_path = UPLOADS_DIR / job_id / "job_meta.json"
+    job_meta_path = job_upload_dir(job_id) / "job_meta.json"
     file_count = 0
-    job_label = f"Assessment {job_id[:8]}"
-    if job_meta_path.exists():
+    job_label = report_label(job_id, {})
+    if artifact_exists(job_meta_path):
         try:
             meta = _load_json(job_meta_path)
             file_count = len(meta.get("uploaded_files", []))
-            job_label = meta.get("label") or job_label
+            job_label = report_label(job_id, meta)
         except Exception:
             pass
     
+    # Uploaded photos, identified by their storage metadata so that a replaced
+    # photo changes the inputs
+    photos = []
+    if config.REPORT_PHOTOS != "off":
+        from backend.services.analyzers.base import select_images
+        try:
+            uploads = list_job_uploads(job_id)
+        except FileNotFoundError:
+            uploads = []
+        photos = [
+            {"key": info.key, "size": info.size, "modified": info.modified, "etag": info.etag}
+            for info in select_images(uploads)
+        ]
+    
+    # Cost and risk intervals, as stored when the job was scored (see uncertainty)
+    intervals = {}
+    if cost_data.get("total_cost_interval"):
+        intervals["total_cost"] = cost_data["total_cost_interval"]
+    if risk_data and risk_data.get("overall_risk_score_interval"):
+        intervals["overall_risk_score"] = risk_data["overall_risk_score_interval"]
+    
+    return {
+        "damage_summary": damage_summary,
+        "cost": cost_data,
+        "risk": risk_data,
+        "file_count": file_count,
+        "label": job_label,
+        "photos": photos,
+        "intervals": intervals or None,
+    }
+
+
+def compose_report(job_id: str, pdf: Optional[PDFBuilder] = None, *, inputs: Optional[Dict[str, Any]] = None) -> PDFBuilder:
+    """
+    Lay out a job's report into `pdf` (a builder with the configured output options by default).
+    
+    `inputs` are the job's load_report_inputs(), loaded here when not given.
+    Pass a streaming builder to write pages out as they are laid out; the caller closes it.
+    """
+    if inputs is None:
+        inputs = load_report_inputs(job_id)
+    
     # Build professional PDF
-    pdf = PDFBuilder()
+    if pdf is None:
+        pdf = PDFBuilder(**report_options())
     
     # Header
     generated_date = datetime.now(timezone.utc).strftime("%B %d, %Y at %H:%M UTC")
     pdf.add_header(
         "Building Facade Assessment Report",
-        f"Generated: {generated_date}  |  Reference: {job_id[:8].upper()}"
+        f"Generated: {generated_date}  |  Reference: {job_id[:8].upper()}",
+        static=True,
     )
     
+    add_report_sections(pdf, inputs)
+    add_photo_section(pdf, job_id, inputs.get("photos") or [])
+    
+    # Footer
+    pdf.add_footer("Facade Risk Analyzer - AI-Powered Building Assessment")
+    return pdf
+
+
+def add_photo_section(pdf: PDFBuilder, job_id: str, photos: List[Dict[str, Any]]) -> None:
+    """
+    Lay out the inspected photos (load_report_inputs()["photos"]) in a captioned grid.
+    
+    Each photo's JPEG (a thumbnail by default, see report_photo) is embedded
+    once without re-encoding. Photos that cannot be embedded are left out.
+    """
+    images = []
+    for photo in photos:
+        upload = ObjectInfo(**photo)
+        try:
+            source = report_photo(job_id, upload)
+            if source is not None:
+                images.append((pdf.embed_jpeg(source, key=upload.key), upload.name))
+        except (OSError, ValueError) as exc:
+            logger.warning("Leaving %s out of the report for job %s: %s", upload.name, job_id, exc)
+    if not images:
+        return
+    
+    add_static_section_title(pdf, "Inspection Photos")
+    pdf.add_image_grid(images)
+    pdf.add_spacer(20)
+
+
+def grade_color(grade: Any) -> Tuple[float, float, float]:
+    """Background color for a building health grade."""
+    return (0.88, 0.95, 0.88) if grade == "A" else (0.88, 0.92, 0.98) if grade == "B" else (1.0, 0.95, 0.88) if grade == "C" else (0.98, 0.88, 0.88)
+
+
+# Recommendation bullets by building health grade
+RECOMMENDATIONS = {
+    "urgent": (
+        "Immediate attention recommended for critical damage areas",
+        "Schedule professional structural assessment within 30 days",
+        "Prioritize repairs based on severity index ratings",
+    ),
+    "monitor": (
+        "Monitor identified damage areas for progression",
+        "Schedule preventive maintenance within 90 days",
+        "Consider waterproofing treatments for affected areas",
+    ),
+    "routine": (
+        "Continue regular maintenance schedule",
+        "Re-assess facade condition annually",
+        "Document any new damage for future reference",
+    ),
+}
+
+COST_TABLE_COLUMNS = ["Damage Type", "Count", "Quantity", "Cost"]
+COST_TABLE_WIDTHS = [150, 80, 100, 100]
+
+
+def add_static_section_title(pdf: PDFBuilder, title: str) -> None:
+    """A section title laid out as a static block (see PDFBuilder.add_static)."""
+    pdf.add_static(("section", title), lambda: pdf.add_section_title(title))
+
+
+def summarize_damages(damages: Iterable[DamageRecord]) -> Dict[str, Any]:
+    """
+    The damage statistics a report shows, in one pass (`damages` may be a stream):
+    the count and, per type in order of first appearance, its count and average severity.
+    """
+    count = 0
+    by_type: Dict[str, List[int]] = {}  # type -> [count, severity total]
+    for damage in damages:
+        count += 1
+        stats = by_type.setdefault(damage.type.value, [0, 0])
+        stats[0] += 1
+        stats[1] += SEVERITY_SCORES[damage.severity]
+    return {
+        "count": count,
+        "by_type": [
+            {"type": damage_type, "count": type_count, "average_severity": total / type_count}
+            for damage_type, (type_count, total) in by_type.items()
+        ],
+    }
+
+
+def add_report_sections(pdf: PDFBuilder, inputs: Dict[str, Any]) -> None:
+    """Lay out the body of a building report (summary through recommendations) from load_report_inputs()."""
+    damage_summary = inputs["damage_summary"]
+    damage_count = damage_summary["count"]
+    cost_data = inputs["cost"]
+    risk_data = inputs["risk"]
+    file_count = inputs["file_count"]
+    job_label = inputs["label"]
+    
     # Executive Summary
-    pdf.add_section_title("Executive Summary")
+    add_static_section_title(pdf, "Executive Summary")
     pdf.add_paragraph(f"This report presents the findings of an AI-powered analysis of building facade images")
-    pdf.add_paragraph(f"for the assessment labeled \"{job_label}\". The analysis detected {len(damages)} damage instances")
+    pdf.add_paragraph(f"for the assessment labeled \"{job_label}\". The analysis detected {damage_count} damage instances")
     pdf.add_paragraph(f"across {file_count} uploaded images, with an estimated total repair cost of")
     pdf.add_paragraph(f"${cost_data.get('total_cost', 0):,.2f} {cost_data.get('currency', 'USD')}.")
     pdf.add_spacer(10)
@@ -268,52 +895,48 @@ def generate_pdf_report(job_id: str) -> Path:
         risk_score = risk_data.get("overall_risk_score", "N/A")
         severity = risk_data.get("overall_severity_index", "N/A")
         
-        # Color coding for grade
-        grade_color = (0.88, 0.95, 0.88) if grade == "A" else (0.88, 0.92, 0.98) if grade == "B" else (1.0, 0.95, 0.88) if grade == "C" else (0.98, 0.88, 0.88)
-        
         pdf.add_metrics_row([
-            ("HEALTH GRADE", grade, grade_color),
+            ("HEALTH GRADE", grade, grade_color(grade)),
             ("RISK SCORE", f"{risk_score}/100", (0.95, 0.95, 0.95)),
             ("SEVERITY INDEX", f"{severity}/10", (0.95, 0.95, 0.95)),
             ("FILES ANALYZED", str(file_count), (0.95, 0.95, 0.95)),
         ])
     
     # Damage Detection Results
-    pdf.add_section_title("Damage Detection Results")
-    pdf.add_paragraph(f"The AI analysis identified {len(damages)} instances of damage across the facade images.")
+    add_static_section_title(pdf, "Damage Detection Results")
+    pdf.add_paragraph(f"The AI analysis identified {damage_count} instances of damage across the facade images.")
     pdf.add_spacer(10)
     
-    if damages:
+    if damage_count:
         # Summary by type
-        severity_map = {"low": 3, "medium": 5, "high": 8}
-        damage_types = {}
-        for d in damages:
-            dtype = d.get("type", "Unknown")
-            if dtype not in damage_types:
-                damage_types[dtype] = {"count": 0, "severities": []}
-            damage_types[dtype]["count"] += 1
-            sev = d.get("severity", "medium")
-            sev_value = severity_map.get(str(sev).lower(), 5) if isinstance(sev, str) else float(sev) if sev else 5
-            damage_types[dtype]["severities"].append(sev_value)
-        
-        for dtype, info in damage_types.items():
-            avg_severity = sum(info["severities"]) / len(info["severities"]) if info["severities"] else 0
-            pdf.add_bullet_point(f"{dtype}: {info['count']} instance(s) detected, average severity {avg_severity:.1f}/10")
+        for info in damage_summary["by_type"]:
+            pdf.add_bullet_point(
+                f"{info['type']}: {info['count']} instance(s) detected, average severity {info['average_severity']:.1f}/10"
+            )
     else:
-        pdf.add_paragraph("No significant damage was detected in the analyzed images.")
+        pdf.add_static("no-damage", lambda: pdf.add_paragraph("No significant damage was detected in the analyzed images."))
     
     pdf.add_spacer(20)
     
     # Cost Estimation
-    pdf.add_section_title("Cost Estimation Breakdown")
+    add_static_section_title(pdf, "Cost Estimation Breakdown")
     pdf.add_paragraph(f"Total estimated repair cost: ${cost_data.get('total_cost', 0):,.2f} {cost_data.get('currency', 'USD')}")
+    intervals = inputs.get("intervals") or {}
+    if intervals.get("total_cost"):
+        cost_range = intervals["total_cost"]
+        pdf.add_paragraph(
+            f"Likely range (P10-P90): ${cost_range['p10']:,.2f} - ${cost_range['p90']:,.2f}, median ${cost_range['p50']:,.2f}"
+        )
     pdf.add_spacer(15)
     
     items = cost_data.get("items", [])
     if items:
         # Table header
-        widths = [150, 80, 100, 100]
-        pdf.add_table_row(["Damage Type", "Count", "Quantity", "Cost"], widths, is_header=True, bg_color=(0.18, 0.55, 0.34))
+        widths = COST_TABLE_WIDTHS
+        pdf.add_static(
+            "cost-table-header",
+            lambda: pdf.add_table_row(COST_TABLE_COLUMNS, widths, is_header=True, bg_color=(0.18, 0.55, 0.34)),
+        )
         
         for i, item in enumerate(items):
             bg = (0.97, 0.97, 0.97) if i % 2 == 0 else None
@@ -328,15 +951,20 @@ def generate_pdf_report(job_id: str) -> Path:
     
     # Risk Assessment
     if risk_data:
-        pdf.add_section_title("Risk Assessment")
+        add_static_section_title(pdf, "Risk Assessment")
         pdf.add_key_value("Overall Risk Score", f"{risk_data.get('overall_risk_score', 'N/A')} out of 100")
+        if intervals.get("overall_risk_score"):
+            score_range = intervals["overall_risk_score"]
+            pdf.add_key_value(
+                "Risk Score Range (P10-P90)", f"{score_range['p10']} - {score_range['p90']}, median {score_range['p50']}"
+            )
         pdf.add_key_value("Severity Index", f"{risk_data.get('overall_severity_index', 'N/A')} out of 10")
         pdf.add_key_value("Building Health Grade", risk_data.get("building_health_grade", "N/A"))
         pdf.add_spacer(15)
         
         by_type = risk_data.get("by_type") or {}
         if by_type:
-            pdf.add_paragraph("Risk contribution by damage type:")
+            pdf.add_static("risk-by-type", lambda: pdf.add_paragraph("Risk contribution by damage type:"))
             pdf.add_spacer(5)
             for damage_type, stats in by_type.items():
                 pdf.add_bullet_point(
@@ -347,24 +975,18 @@ def generate_pdf_report(job_id: str) -> Path:
     pdf.add_spacer(30)
     
     # Recommendations
-    pdf.add_section_title("Recommendations")
+    add_static_section_title(pdf, "Recommendations")
     if risk_data and risk_data.get("building_health_grade") in ["C", "D"]:
-        pdf.add_bullet_point("Immediate attention recommended for critical damage areas")
-        pdf.add_bullet_point("Schedule professional structural assessment within 30 days")
-        pdf.add_bullet_point("Prioritize repairs based on severity index ratings")
+        tier = "urgent"
     elif risk_data and risk_data.get("building_health_grade") == "B":
-        pdf.add_bullet_point("Monitor identified damage areas for progression")
-        pdf.add_bullet_point("Schedule preventive maintenance within 90 days")
-        pdf.add_bullet_point("Consider waterproofing treatments for affected areas")
+        tier = "monitor"
     else:
-        pdf.add_bullet_point("Continue regular maintenance schedule")
-        pdf.add_bullet_point("Re-assess facade condition annually")
-        pdf.add_bullet_point("Document any new damage for future reference")
+        tier = "routine"
     
-    pdf.add_spacer(40)
+    def add_recommendations() -> None:
+        for bullet in RECOMMENDATIONS[tier]:
+            pdf.add_bullet_point(bullet)
     
-    # Footer
-    pdf.add_footer("Facade Risk Analyzer - AI-Powered Building Assessment")
+    pdf.add_static(("recommendations", tier), add_recommendations)
     
-    pdf.build(report_path)
-    return report_path
+    pdf.add_spacer(40)
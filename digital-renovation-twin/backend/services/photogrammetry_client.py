@@ -0,0 +1,377 @@
+"""
+Client for the hosted photogrammetry API (RECONSTRUCTION_ENGINE "external_api").
+
+Images are posted as a multipart body streamed from open file handles, never
+read into memory, over one pooled ``httpx.Client`` shared by every job. The
+API reconstructs asynchronously, and so does the pipeline: start_reconstruction()
+records the job as submitted and returns at once, and a background worker
+uploads the images, polls the reconstruction with exponential backoff and
+writes the outcome to reconstruction_meta.json and the job's outputs while
+damage analysis, costing and scoring carry on. An OBJ or PLY result asset is
+downloaded into the job's reconstruction directory and packaged for the viewer
+(see mesh_packaging) before the reconstruction is reported completed.
+
+API contract: ``POST {url}/reconstructions`` (multipart fields job_id and
+provider, images as ``files``) returns ``{"id", "status"}``;
+``GET {url}/reconstructions/{id}`` returns ``{"status", "viewer_url",
+"asset_url", "error"}``. camelCase keys are accepted too.
+"""
+
+from __future__ import annotations
+
+import logging
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend.core import config
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services import job_metadata
+from backend.services.mesh_packaging import package_reconstruction
+from backend.services.reconstruction_service import PhotogrammetryAPIError, _save_metadata
+from backend.services.storage import get_storage, list_job_uploads
+
+logger = logging.getLogger(__name__)
+
+DONE_STATES = {"completed", "complete", "succeeded", "success", "done", "ready"}
+FAILED_STATES = {"failed", "error", "cancelled", "canceled"}
+# Responses worth retrying; anything else from the API is final
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Result assets mesh_packaging can read; others (e.g. GLB) are only linked by asset_url
+PACKAGEABLE_SUFFIXES = (".obj", ".ply")
+
+
+class _TransientAPIError(PhotogrammetryAPIError):
+    """A failure that may go away on retry (connection error, 5xx, 429)."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0  # HTTP-date form; the backoff delay applies
+
+
+def _state(payload: Dict[str, Any]) -> str:
+    return str(payload.get("status") or payload.get("state") or "").lower()
+
+
+class PhotogrammetryClient:
+    """Pooled connection to the photogrammetry API."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        timeout = config.PHOTOGRAMMETRY_TIMEOUT_SECONDS if timeout is None else timeout
+        connections = max_connections or max(1, config.PHOTOGRAMMETRY_WORKERS)
+        self._client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            transport=transport,
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        try:
+            response = self._client.request(method, path, **kwargs)
+        except httpx.TransportError as exc:
+            raise _TransientAPIError(f"Photogrammetry API unreachable: {exc}") from exc
+        if response.status_code in TRANSIENT_STATUS_CODES:
+            raise _TransientAPIError(
+                f"Photogrammetry API returned {response.status_code}", retry_after=_retry_after(response)
+            )
+        if response.is_error:
+            raise PhotogrammetryAPIError(
+                f"Photogrammetry API rejected the request ({response.status_code}): {response.text[:500]}"
+            )
+        try:
+            payload = response.json()
+        except ValueError as exc:
+            raise PhotogrammetryAPIError("Photogrammetry API returned invalid JSON.") from exc
+        if not isinstance(payload, dict):
+            raise PhotogrammetryAPIError("Photogrammetry API returned an unexpected response.")
+        return payload
+
+    def submit(
+        self,
+        job_id: str,
+        images: Sequence[Path],
+        *,
+        provider: Optional[str] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a job's images, streamed from disk, and return the API's response.
+
+        Transient failures are retried up to PHOTOGRAMMETRY_RETRIES times with
+        backoff, reopening the files each time; the job ID is sent as the
+        Idempotency-Key so a retried upload is not reconstructed twice.
+        """
+        stop = stop or threading.Event()
+        data = {"job_id": job_id, "provider": provider or config.PHOTOGRAMMETRY_PROVIDER}
+        delay = config.PHOTOGRAMMETRY_POLL_INITIAL_SECONDS
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                with ExitStack() as stack:
+                    files = [
+                        ("files", (
+                            image.name,
+                            stack.enter_context(image.open("rb")),
+                            mimetypes.guess_type(image.name)[0] or "application/octet-stream",
+                        ))
+                        for image in images
+                    ]
+                    return self._request(
+                        "POST", "/reconstructions", data=data, files=files, headers={"Idempotency-Key": job_id}
+                    )
+            except _TransientAPIError as exc:
+                if attempts > config.PHOTOGRAMMETRY_RETRIES:
+                    raise PhotogrammetryAPIError(f"Upload failed after {attempts} attempts: {exc}") from exc
+                logger.warning("Photogrammetry upload for job %s failed (%s); retrying", job_id, exc)
+                if stop.wait(max(delay, exc.retry_after)):
+                    raise PhotogrammetryAPIError("Photogrammetry client shut down.") from exc
+                delay = min(delay * 2, config.PHOTOGRAMMETRY_POLL_MAX_SECONDS)
+
+    def status(self, reference: str) -> Dict[str, Any]:
+        """The reconstruction's current state as the API reports it."""
+        return self._request("GET", f"/reconstructions/{reference}")
+
+    def download(self, url: str, destination: Path) -> Path:
+        """
+        Stream a result asset to `destination`, via a temporary file so a failed
+        download leaves nothing behind. The API key is only sent when the asset
+        is on the API's own host. Raises PhotogrammetryAPIError if it fails.
+        """
+        request = self._client.build_request("GET", url)
+        if request.url.netloc != self._client.base_url.netloc:
+            del request.headers["Authorization"]  # Pre-signed storage URLs must not see the key
+        try:
+            response = self._client.send(request, stream=True, follow_redirects=True)
+        except httpx.TransportError as exc:
+            raise PhotogrammetryAPIError(f"Asset download failed: {exc}") from exc
+        tmp_path = destination.with_name(f".{destination.name}.tmp")
+        try:
+            if response.is_error:
+                raise PhotogrammetryAPIError(f"Asset download failed ({response.status_code})")
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as handle:
+                for chunk in response.iter_bytes():
+                    handle.write(chunk)
+            os.replace(tmp_path, destination)
+        except httpx.TransportError as exc:
+            raise PhotogrammetryAPIError(f"Asset download failed: {exc}") from exc
+        finally:
+            response.close()
+            tmp_path.unlink(missing_ok=True)
+        return destination
+
+    def wait_for_result(self, reference: str, *, stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Poll the reconstruction until it completes and return its final state.
+
+        Polls back off exponentially from PHOTOGRAMMETRY_POLL_INITIAL_SECONDS to
+        PHOTOGRAMMETRY_POLL_MAX_SECONDS; transient errors count as a poll. Raises
+        PhotogrammetryAPIError if it fails, takes longer than
+        PHOTOGRAMMETRY_MAX_WAIT_SECONDS or `stop` is set.
+        """
+        stop = stop or threading.Event()
+        delay = config.PHOTOGRAMMETRY_POLL_INITIAL_SECONDS
+        deadline = time.monotonic() + config.PHOTOGRAMMETRY_MAX_WAIT_SECONDS
+        while True:
+            try:
+                payload = self.status(reference)
+            except _TransientAPIError as exc:
+                logger.warning("Polling reconstruction %s failed (%s); backing off", reference, exc)
+                wait = max(delay, exc.retry_after)
+            else:
+                state = _state(payload)
+                if state in DONE_STATES:
+                    return payload
+                if state in FAILED_STATES:
+                    raise PhotogrammetryAPIError(f"Reconstruction {reference} {state}: {payload.get('error') or 'no details'}")
+                wait = delay
+            if time.monotonic() + wait > deadline:
+                raise PhotogrammetryAPIError(f"Reconstruction {reference} did not finish in time.")
+            if stop.wait(wait):
+                raise PhotogrammetryAPIError("Photogrammetry client shut down.")
+            delay = min(delay * 2, config.PHOTOGRAMMETRY_POLL_MAX_SECONDS)
+
+
+_lock = threading.Lock()
+_client: Optional[PhotogrammetryClient] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_stop = threading.Event()
+
+
+def get_client() -> PhotogrammetryClient:
+    """The shared client, created on first use. Raises PhotogrammetryAPIError if not configured."""
+    global _client
+    if not config.PHOTOGRAMMETRY_API_URL or not config.PHOTOGRAMMETRY_API_KEY:
+        raise PhotogrammetryAPIError(
+            "Photogrammetry API credentials not configured. "
+            "Set PHOTOGRAMMETRY_API_URL and PHOTOGRAMMETRY_API_KEY."
+        )
+    with _lock:
+        if _client is None:
+            _client = PhotogrammetryClient(config.PHOTOGRAMMETRY_API_URL, config.PHOTOGRAMMETRY_API_KEY)
+        return _client
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, config.PHOTOGRAMMETRY_WORKERS), thread_name_prefix="photogrammetry"
+            )
+        return _executor
+
+
+def shutdown_photogrammetry() -> None:
+    """Stop tracking reconstructions (interrupting backoff waits) and close the connections."""
+    global _client, _executor
+    _stop.set()
+    with _lock:
+        executor, client = _executor, _client
+        _executor = _client = None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    if client is not None:
+        client.close()
+    _stop.clear()
+
+
+def _image_paths(job_id: str) -> List[Path]:
+    storage = get_storage()
+    paths = []
+    for upload in list_job_uploads(job_id):
+        path = storage.local_path(upload.key)
+        if path is None:
+            raise PhotogrammetryAPIError("The photogrammetry API uploads images from local storage.")
+        paths.append(path)
+    if not paths:
+        raise FileNotFoundError(f"No images to process for job {job_id}")
+    return paths
+
+
+def _record(job_id: str, metadata: Dict[str, Any], **fields: Any) -> None:
+    """Update reconstruction_meta.json and the job's outputs, unless the job was deleted."""
+    if not job_metadata.job_exists(job_id):
+        return
+    metadata.update(fields)
+    _save_metadata(job_id, metadata)
+    try:
+        job_metadata.update_outputs(
+            job_id,
+            reconstruction_status=metadata["status"],
+            reconstruction_job=metadata["job_reference"],
+            viewer_url=metadata["viewer_url"],
+            asset_url=metadata["asset_url"],
+            asset_local_path=metadata.get("asset_local_path"),
+            reconstruction_error=metadata["error"],
+        )
+    except FileNotFoundError:
+        pass
+
+
+def _package(client: PhotogrammetryClient, job_id: str, metadata: Dict[str, Any]) -> None:
+    """
+    Download an OBJ or PLY result asset and package it for the viewer, recording
+    mesh_lods in the job's outputs. The viewer is optional, so failures are only logged.
+    """
+    if not job_metadata.job_exists(job_id):
+        return
+    asset_url = metadata.get("asset_url")
+    suffix = Path(urlsplit(asset_url).path).suffix.lower() if asset_url else ""
+    try:
+        if suffix in PACKAGEABLE_SUFFIXES:
+            asset = client.download(asset_url, job_reconstruction_dir(job_id) / f"asset{suffix}")
+            metadata["asset_local_path"] = str(asset)
+        mesh_lods_path = package_reconstruction(job_id, metadata)
+        if mesh_lods_path:
+            job_metadata.update_outputs(job_id, mesh_lods=str(mesh_lods_path))
+    except (PhotogrammetryAPIError, ValueError, OSError) as exc:
+        logger.warning("Mesh packaging failed for job %s: %s", job_id, exc)
+
+
+def _track(job_id: str, images: List[Path], metadata: Dict[str, Any]) -> None:
+    try:
+        client = get_client()
+        submitted = client.submit(job_id, images, provider=metadata["provider"], stop=_stop)
+        reference = submitted.get("id") or submitted.get("job_id")
+        if not reference:
+            raise PhotogrammetryAPIError("Photogrammetry API returned no reconstruction ID.")
+        reference = str(reference)
+        _record(job_id, metadata, status="processing", job_reference=reference)
+        result = submitted if _state(submitted) in DONE_STATES else client.wait_for_result(reference, stop=_stop)
+        metadata.update(
+            viewer_url=result.get("viewer_url") or result.get("viewerUrl"),
+            asset_url=result.get("asset_url") or result.get("assetUrl"),
+            raw_response=result,
+        )
+        _package(client, job_id, metadata)
+        _record(job_id, metadata, status="completed")
+        logger.info("Reconstruction %s for job %s completed", reference, job_id)
+        if metadata.get("cache_key"):
+            from backend.services.reconstruction_cache import store
+
+            store(metadata["cache_key"], job_id, metadata)
+    except (PhotogrammetryAPIError, OSError) as exc:
+        logger.error("External reconstruction failed for job %s: %s", job_id, exc)
+        _record(job_id, metadata, status="failed", error=str(exc))
+
+
+def start_reconstruction(job_id: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Submit a job to the photogrammetry API in the background and return its metadata.
+
+    The metadata has status "submitted"; it and the job's outputs move on to
+    "processing" (with job_reference) and "completed" (with viewer_url,
+    asset_url and, for an OBJ or PLY asset, asset_local_path and the packaged
+    mesh_lods) or "failed" (with error) as the API reports progress. A
+    completed reconstruction is cached under `cache_key`, when given. Raises
+    PhotogrammetryAPIError if the API is not configured.
+    """
+    get_client()
+    images = _image_paths(job_id)
+    metadata: Dict[str, Any] = {
+        "engine": "external_api",
+        "provider": config.PHOTOGRAMMETRY_PROVIDER,
+        "status": "submitted",
+        "viewer_url": None,
+        "asset_url": None,
+        "asset_local_path": None,
+        "job_reference": None,
+        "mesh_workspace_path": str(job_reconstruction_dir(job_id)),
+        "error": None,
+    }
+    if cache_key:
+        metadata["cache_key"] = cache_key
+    _record(job_id, metadata)
+    _get_executor().submit(_track, job_id, images, dict(metadata))
+    return metadata
+
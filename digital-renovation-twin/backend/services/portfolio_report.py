@@ -0,0 +1,232 @@
+"""
+Portfolio reports: one PDF covering many buildings (jobs).
+
+The cover page and a summary table (grade, risk, damages and cost per
+building) are laid out in this process while a pool of worker processes lays
+out and compresses each building's section with a PageCollector. The encoded
+pages are appended in job order and share the document's font objects, so the
+expensive part scales with cores and the document still streams page by page.
+
+The summary table only needs each building's label, cost estimate and risk
+summary, which are small; this process reads just those before the first page
+is sent. Each worker loads its building's full report inputs itself (streaming
+the damages, listing the photos) in parallel with the others. Workers are sent
+this process's config settings with every building, so they resolve job files
+exactly as the server does. The pool uses the "spawn" start method (forking a
+server with database and sweeper threads is unsafe) and is kept for the life
+of the process; shut it down with shutdown_portfolio_pool().
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.core import config
+from backend.core.artifacts import artifact_exists, read_json
+from backend.core.config import PORTFOLIO_WORKERS
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services import job_metadata
+from backend.services.pdf_generator import (
+    PageCollector,
+    PDFBuilder,
+    add_report_sections,
+    grade_color,
+    load_report_inputs,
+    report_label,
+    report_options,
+    stream_pdf,
+)
+
+logger = logging.getLogger(__name__)
+
+Building = Tuple[str, Dict[str, Any]]  # (job_id, building_summary())
+
+SUMMARY_COLUMNS = ["Building", "Grade", "Risk", "Damages", "Est. Cost"]
+SUMMARY_WIDTHS = [200, 60, 60, 70, 100]
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """Worker processes to use: `workers`, else PORTFOLIO_WORKERS, where 0 means one per CPU."""
+    count = PORTFOLIO_WORKERS if workers is None else workers
+    return count if count > 0 else (os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+            logger.info("Started portfolio report pool with %d worker(s)", workers)
+        return _pool
+
+
+def shutdown_portfolio_pool() -> None:
+    """Stop the worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def portfolio_job_ids() -> List[str]:
+    """Every completed job, oldest first."""
+    return [meta["job_id"] for meta in reversed(job_metadata.list_jobs()) if meta.get("status") == "completed"]
+
+
+def building_summary(job_id: str) -> Dict[str, Any]:
+    """
+    What the summary table shows for a job: label, cost estimate, risk summary and damage count.
+
+    Raises:
+        FileNotFoundError: If the job has no damages or cost estimate
+    """
+    recon_dir = job_reconstruction_dir(job_id)
+    if not artifact_exists(recon_dir / "damages.json"):
+        raise FileNotFoundError(f"Damage summary missing for job {job_id}")
+    cost = read_json(recon_dir / "cost_estimate.json")
+    try:
+        risk = read_json(recon_dir / "risk_summary.json")
+    except (FileNotFoundError, ValueError):
+        risk = None
+    return {
+        "label": report_label(job_id, job_metadata.load_metadata(job_id)),
+        "cost": cost,
+        "risk": risk,
+        "damage_count": sum(item.get("count", 0) for item in cost.get("items", [])),
+    }
+
+
+def load_portfolio_inputs(job_ids: Sequence[str]) -> List[Building]:
+    """
+    Summary-table inputs of every job, in order (building sections load their own).
+
+    Raises:
+        FileNotFoundError: If a job has not been processed (no damages or cost estimate)
+    """
+    buildings = []
+    for job_id in job_ids:
+        try:
+            buildings.append((job_id, building_summary(job_id)))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Job {job_id} has no damages or cost estimate yet") from None
+    return buildings
+
+
+def _config_settings() -> Dict[str, Any]:
+    """This process's config values, to apply in a worker before it reads job files."""
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+def render_building_section(
+    job_id: str, compress: bool = True, settings: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[bytes, bytes]]:
+    """Load and lay out one building's section; returns its encoded page content streams. Runs in a worker."""
+    for name, value in (settings or {}).items():
+        setattr(config, name, value)
+    inputs = load_report_inputs(job_id)
+    pdf = PageCollector(compress=compress)
+    pdf.add_header(inputs["label"], f"Reference: {job_id[:8].upper()}")
+    add_report_sections(pdf, inputs)
+    pdf.close()
+    return pdf.encoded_pages
+
+
+def _money(value: float) -> str:
+    if value >= 1_000_000:
+        return f"${value / 1_000_000:,.1f}M"
+    if value >= 10_000:
+        return f"${value / 1_000:,.1f}K"
+    return f"${value:,.0f}"
+
+
+def _add_summary(pdf: PDFBuilder, buildings: Sequence[Building], title: str, now: datetime) -> None:
+    risks = [summary["risk"] or {} for _, summary in buildings]
+    scores = [risk["overall_risk_score"] for risk in risks if isinstance(risk.get("overall_risk_score"), (int, float))]
+    total_cost = sum(summary["cost"].get("total_cost", 0) or 0 for _, summary in buildings)
+    attention = sum(1 for risk in risks if risk.get("building_health_grade") in ("C", "D"))
+
+    pdf.add_header(title, f"Generated: {now.strftime('%B %d, %Y at %H:%M UTC')}  |  {len(buildings)} buildings")
+    pdf.add_metrics_row([
+        ("BUILDINGS", str(len(buildings)), (0.95, 0.95, 0.95)),
+        ("TOTAL COST", _money(total_cost), (0.95, 0.95, 0.95)),
+        ("AVG RISK", f"{sum(scores) / len(scores):.0f}/100" if scores else "N/A", (0.95, 0.95, 0.95)),
+        ("GRADE C OR D", str(attention), grade_color("D") if attention else grade_color("A")),
+    ])
+
+    pdf.add_section_title("Buildings")
+    pdf.add_table_row(SUMMARY_COLUMNS, SUMMARY_WIDTHS, is_header=True, bg_color=(0.18, 0.55, 0.34))
+    for index, ((_, summary), risk) in enumerate(zip(buildings, risks)):
+        grade = risk.get("building_health_grade")
+        score = risk.get("overall_risk_score")
+        pdf.add_table_row([
+            summary["label"],
+            grade or "N/A",
+            "N/A" if score is None else str(score),
+            str(summary["damage_count"]),
+            f"${summary['cost'].get('total_cost', 0) or 0:,.2f}",
+        ], SUMMARY_WIDTHS, bg_color=(0.97, 0.97, 0.97) if index % 2 == 0 else None)
+    pdf.add_table_row(["Total", "", "", str(sum(summary["damage_count"] for _, summary in buildings)), f"${total_cost:,.2f}"], SUMMARY_WIDTHS)
+    pdf.add_footer("Facade Risk Analyzer - Portfolio Assessment")
+
+
+def compose_portfolio(
+    pdf: PDFBuilder,
+    buildings: Sequence[Building],
+    *,
+    workers: Optional[int] = None,
+    title: str = "Portfolio Assessment Report",
+    now: Optional[datetime] = None,
+) -> PDFBuilder:
+    """
+    Lay out a portfolio report into `pdf`: cover and summary table, then one section per building.
+
+    Sections are loaded and rendered by `workers` processes (see resolve_workers)
+    while the summary is laid out here; with one worker, or one building, they
+    are rendered inline.
+    """
+    workers = resolve_workers(workers)
+    job_ids = [job_id for job_id, _ in buildings]
+    if workers > 1 and len(buildings) > 1:
+        chunksize = max(1, len(buildings) // (workers * 4))
+        sections: Iterator[List[Tuple[bytes, bytes]]] = _get_pool(workers).map(
+            render_building_section, job_ids, repeat(pdf.compress), repeat(_config_settings()), chunksize=chunksize,
+        )
+    else:
+        sections = map(render_building_section, job_ids, repeat(pdf.compress))
+
+    _add_summary(pdf, buildings, title, now or datetime.now(timezone.utc))
+    for pages in sections:
+        pdf.add_encoded_pages(pages)
+    return pdf
+
+
+def stream_portfolio_report(buildings: Sequence[Building], *, workers: Optional[int] = None) -> Iterator[bytes]:
+    """Yield a portfolio report in chunks as it is laid out (see stream_pdf)."""
+    return stream_pdf(lambda pdf: compose_portfolio(pdf, buildings, workers=workers), **report_options())
+
+
+def generate_portfolio_report(job_ids: Sequence[str], output: Path, *, workers: Optional[int] = None) -> int:
+    """Write a portfolio report for `job_ids` to `output`. Returns the page count."""
+    buildings = load_portfolio_inputs(job_ids)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("wb") as fp:
+        pdf = PDFBuilder(output=fp.write, **report_options())
+        compose_portfolio(pdf, buildings, workers=workers)
+        pdf.close()
+    return pdf.page_count
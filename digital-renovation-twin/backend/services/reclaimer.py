@@ -0,0 +1,213 @@
+"""
+Background reclamation of deleted jobs.
+
+Deleting a job only tombstones it: the database row gets ``deleted_at`` and
+the upload directory is moved into ``TRASH_DIR``. The reclaimer later removes
+the trashed uploads together with the job's reconstruction directory and PDF
+report, in parallel but capped at ``RECLAIM_MAX_JOBS_PER_SECOND`` so a large
+purge never saturates the data volume.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from backend.core.config import (
+    RECLAIM_INTERVAL_SECONDS,
+    RECLAIM_MAX_JOBS_PER_SECOND,
+    RECLAIM_WORKERS,
+    TRASH_DIR,
+)
+from backend.core.artifacts import GZIP_SUFFIX, gzip_path
+from backend.core.job_paths import iter_upload_dirs, job_reconstruction_dir, job_report_path
+from backend.services.job_metadata import TRASH_BATCH_PREFIX
+from backend.services.storage import StorageError, get_storage, report_key, upload_prefix
+
+logger = logging.getLogger(__name__)
+
+
+class _RateLimiter:
+    """Spaces out calls to at most `rate` per second (rate <= 0 disables limiting)."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+        self._next = max(self._next, now) + self._interval
+
+
+def tree_size(path: Path) -> int:
+    """Total size in bytes of the files under path (or of path itself)."""
+    if path.is_symlink() or not path.is_dir():
+        return path.lstat().st_size
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def remove_path(path: Path) -> int:
+    """Remove a file or directory tree. Returns the bytes freed (0 if missing)."""
+    if not os.path.lexists(path):
+        return 0
+    size = tree_size(path)
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+    return size
+
+
+def reclaim_job_files(job_id: str, trashed_upload_dir: Optional[Path] = None) -> int:
+    """Remove every on-disk artifact of a deleted job. Returns the bytes freed."""
+    storage = get_storage()
+    if storage.name != "local":
+        # Uploads and the report live in the bucket. Delete them first so a
+        # failure keeps the trashed directory and the job is retried next sweep.
+        storage.delete_prefix(upload_prefix(job_id))
+        storage.delete(report_key(job_id))
+        storage.delete(report_key(job_id) + GZIP_SUFFIX)
+
+    freed = 0
+    report_path = job_report_path(job_id)
+    for path in (job_reconstruction_dir(job_id), report_path, gzip_path(report_path), trashed_upload_dir):
+        if path is not None:
+            freed += remove_path(path)
+    return freed
+
+
+def _trashed_jobs() -> Iterator[Tuple[str, Path]]:
+    """Yield (job_id, trashed upload dir) for every job in the trash."""
+    if not TRASH_DIR.exists():
+        return
+    for entry in sorted(TRASH_DIR.iterdir()):
+        if entry.name.startswith(TRASH_BATCH_PREFIX) and entry.is_dir():
+            # A whole uploads tree moved by delete-all, possibly sharded
+            yield from iter_upload_dirs(entry)
+        else:
+            yield entry.name, entry
+
+
+def _remove_empty_batches() -> None:
+    for entry in TRASH_DIR.iterdir():
+        if entry.name.startswith(TRASH_BATCH_PREFIX) and entry.is_dir():
+            if any(iter_upload_dirs(entry)):
+                continue  # Not empty yet (a job failed to reclaim)
+            shutil.rmtree(entry, ignore_errors=True)  # Only empty shard directories remain
+
+
+def reclaim_trash(
+    max_jobs_per_second: float = RECLAIM_MAX_JOBS_PER_SECOND,
+    workers: int = RECLAIM_WORKERS,
+) -> Dict[str, int]:
+    """
+    Reclaim every tombstoned job once.
+
+    Removes trashed uploads plus reconstructions and reports in a thread pool,
+    then hard-deletes the tombstoned database rows.
+    """
+    started = datetime.now(timezone.utc)
+    limiter = _RateLimiter(max_jobs_per_second)
+    stats = {"jobs_reclaimed": 0, "bytes_freed": 0, "errors": 0, "records_purged": 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="reclaim") as pool:
+        futures = []
+        for job_id, trashed_dir in _trashed_jobs():
+            limiter.wait()
+            futures.append((job_id, pool.submit(reclaim_job_files, job_id, trashed_dir)))
+        for job_id, future in futures:
+            try:
+                stats["bytes_freed"] += future.result()
+                stats["jobs_reclaimed"] += 1
+            except (OSError, StorageError) as exc:
+                stats["errors"] += 1
+                logger.warning("Failed to reclaim files for job %s: %s", job_id, exc)
+
+    if TRASH_DIR.exists():
+        _remove_empty_batches()
+
+    try:
+        from backend.database import purge_tombstoned_job_records
+        stats["records_purged"] = purge_tombstoned_job_records(started)
+    except Exception as exc:
+        logger.warning("Failed to purge tombstoned job records: %s", exc)
+
+    if stats["jobs_reclaimed"] or stats["records_purged"]:
+        logger.info(
+            "Reclaimed %d job(s), %d bytes, purged %d record(s)",
+            stats["jobs_reclaimed"], stats["bytes_freed"], stats["records_purged"],
+        )
+    return stats
+
+
+class SweepThread:
+    """Runs `target` in a daemon thread when woken, or every `interval` seconds."""
+
+    def __init__(self, target: Callable[[], Any], interval: float, name: str):
+        self._target = target
+        self._interval = interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def request(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self._target()
+            except Exception:
+                logger.exception("%s sweep failed", self._thread.name)
+
+
+_reclaimer: Optional[SweepThread] = None
+
+
+def start_reclaimer() -> None:
+    """Start the background reclaimer and sweep anything left from earlier runs."""
+    global _reclaimer
+    if _reclaimer is None:
+        _reclaimer = SweepThread(reclaim_trash, RECLAIM_INTERVAL_SECONDS, "job-reclaimer")
+        _reclaimer.request()
+
+
+def stop_reclaimer() -> None:
+    global _reclaimer
+    if _reclaimer is not None:
+        _reclaimer.stop()
+        _reclaimer = None
+
+
+def request_reclaim() -> None:
+    """Wake the reclaimer after a deletion (no-op when it is not running, e.g. in the CLI)."""
+    if _reclaimer is not None:
+        _reclaimer.request()
@@ -0,0 +1,238 @@
+"""
+Reconstruction results cached by image set.
+
+Reconstructing with a real engine (COLMAP, the photogrammetry API) takes minutes
+to hours, and re-processing a job, or uploading the same photos as a new job,
+would redo it. ``cache_key(job_id, engine)`` is a SHA-256 over the engine, the
+engine parameters that change its result and the sorted SHA-256s of the job's
+photos, so file names and upload order don't matter.
+
+After a successful run, ``store`` hardlinks the engine's outputs (the sparse
+model, the COLMAP database and the mesh asset) into
+``RECONSTRUCTION_CACHE_DIR/{key}/``, next to an ``entry.json`` holding the
+reconstruction metadata. Nothing else in the job's reconstruction directory is
+cached: damage analysis, costing and scoring rewrite their results there in
+place, which would write through a shared link into every job using it. A later run with
+the same key ``restore``s instead: the files are hardlinked into the new job's
+reconstruction directory (copied across filesystems) and the metadata's paths
+are pointed at it.
+
+Entries are evicted least recently used first once they hold more than
+RECONSTRUCTION_CACHE_MAX_BYTES; a hit refreshes its entry's mtime. Linked files
+share their contents with jobs, so ``release`` unlinks a job's shared files
+before an engine writes into its directory again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.core import config
+from backend.core.artifacts import read_json
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services.storage import get_storage, list_job_uploads
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of entries or the meaning of a key changes
+CACHE_VERSION = 2
+
+ENTRY_FILENAME = "entry.json"
+FILES_DIRNAME = "files"
+
+# Engine outputs shared with the cache, besides the reconstruction's asset
+CACHED_OUTPUTS = ("sparse", "database.db")
+
+_evict_lock = threading.Lock()
+
+
+def _engine_parameters(engine: str) -> Dict[str, Any]:
+    """The settings that change what `engine` reconstructs from a set of photos."""
+    if engine == "colmap_docker":
+        return {
+            "colmap": config.COLMAP_EXECUTABLE or config.COLMAP_DOCKER_IMAGE,
+            "matcher": config.COLMAP_MATCHER,
+            "exhaustive_max_images": config.COLMAP_EXHAUSTIVE_MAX_IMAGES,
+            "sequential_overlap": config.COLMAP_SEQUENTIAL_OVERLAP,
+            "vocab_tree_path": config.COLMAP_VOCAB_TREE_PATH,
+            "vocab_tree_min_images": config.COLMAP_VOCAB_TREE_MIN_IMAGES,
+        }
+    if engine == "external_api":
+        return {"api_url": config.PHOTOGRAMMETRY_API_URL, "provider": config.PHOTOGRAMMETRY_PROVIDER}
+    return {}
+
+
+def _image_digest(key: str) -> str:
+    storage = get_storage()
+    local = storage.local_path(key)
+    if local is not None:
+        with local.open("rb") as fp:
+            return hashlib.file_digest(fp, "sha256").hexdigest()
+    digest = hashlib.sha256()
+    for chunk in storage.iter_bytes(key):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(job_id: str, engine: str) -> str:
+    """Key of the reconstruction `engine` would produce from the job's photos."""
+    images = sorted(_image_digest(info.key) for info in list_job_uploads(job_id))
+    payload = {"version": CACHE_VERSION, "engine": engine, "parameters": _engine_parameters(engine), "images": images}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _entry_dir(key: str) -> Path:
+    return Path(config.RECONSTRUCTION_CACHE_DIR) / key
+
+
+def _link(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)  # Another filesystem, or no hardlinks
+
+
+def _job_files(output_dir: Path, metadata: Dict[str, Any]) -> List[Path]:
+    """The engine outputs to cache: CACHED_OUTPUTS and a local asset inside `output_dir`."""
+    outputs = [output_dir / name for name in CACHED_OUTPUTS]
+    asset = metadata.get("asset_local_path")
+    if asset and Path(asset).is_relative_to(output_dir):
+        outputs.append(Path(asset))
+    files = []
+    for path in outputs:
+        if path.is_dir():
+            files.extend(sorted(child for child in path.rglob("*") if child.is_file()))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def _relocate(metadata: Dict[str, Any], source_dir: str, target_dir: str) -> Dict[str, Any]:
+    """Point the metadata's paths inside the source job's reconstruction directory at the target's."""
+    relocated = {}
+    for name, value in metadata.items():
+        if isinstance(value, str) and (value == source_dir or value.startswith(source_dir + os.sep)):
+            value = target_dir + value[len(source_dir):]
+        relocated[name] = value
+    return relocated
+
+
+def restore(key: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Link a cached reconstruction into the job's reconstruction directory.
+
+    Returns its metadata (with `cache_key` and `cached_from`, the job it was
+    reconstructed for), or None on a miss.
+    """
+    entry_dir = _entry_dir(key)
+    try:
+        entry = read_json(entry_dir / ENTRY_FILENAME)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    output_dir = job_reconstruction_dir(job_id)
+    try:
+        for name in entry["files"]:
+            target = output_dir / name
+            if target.exists():
+                target.unlink()
+            _link(entry_dir / FILES_DIRNAME / name, target)
+        os.utime(entry_dir / ENTRY_FILENAME)  # Most recently used
+    except FileNotFoundError:
+        return None  # Evicted meanwhile
+
+    metadata = _relocate(entry["metadata"], entry["source_dir"], str(output_dir))
+    metadata.update(cache_key=key, cached_from=entry["job_id"])
+    logger.info("Reusing the reconstruction of job %s for job %s", entry["job_id"], job_id)
+    return metadata
+
+
+def store(key: str, job_id: str, metadata: Dict[str, Any]) -> bool:
+    """
+    Cache the job's reconstruction files and metadata under `key`, then evict down to the budget.
+
+    Returns False when the entry exists already, is larger than the whole
+    budget or could not be written; caching never fails a reconstruction.
+    """
+    output_dir = job_reconstruction_dir(job_id)
+    files = _job_files(output_dir, metadata)
+    size = sum(path.stat().st_size for path in files)
+    entry_dir = _entry_dir(key)
+    if size > config.RECONSTRUCTION_CACHE_MAX_BYTES or entry_dir.exists():
+        return False
+
+    staging = entry_dir.with_name(f".staging-{uuid.uuid4().hex}")
+    try:
+        for path in files:
+            _link(path, staging / FILES_DIRNAME / path.relative_to(output_dir))
+        entry = {
+            "key": key,
+            "job_id": job_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "source_dir": str(output_dir),
+            "bytes": size,
+            "files": [path.relative_to(output_dir).as_posix() for path in files],
+            "metadata": {name: value for name, value in metadata.items() if name not in ("cache_key", "cached_from")},
+        }
+        staging.mkdir(parents=True, exist_ok=True)
+        (staging / ENTRY_FILENAME).write_text(json.dumps(entry, indent=2, default=str), encoding="utf-8")
+        os.rename(staging, entry_dir)  # Fails when another run cached the same key first
+    except OSError as exc:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not entry_dir.exists():
+            logger.warning("Could not cache the reconstruction of job %s: %s", job_id, exc)
+        return False
+
+    evict()
+    return True
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """Remove least recently used entries until the cache holds at most `max_bytes`. Returns how many."""
+    budget = config.RECONSTRUCTION_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    cache_dir = Path(config.RECONSTRUCTION_CACHE_DIR)
+    with _evict_lock:
+        entries = []
+        if cache_dir.exists():
+            for entry_dir in cache_dir.iterdir():
+                if entry_dir.name.startswith("."):
+                    continue  # Being staged
+                try:
+                    used = (entry_dir / ENTRY_FILENAME).stat().st_mtime
+                    entries.append((used, read_json(entry_dir / ENTRY_FILENAME)["bytes"], entry_dir))
+                except (FileNotFoundError, KeyError, json.JSONDecodeError):
+                    continue
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry_dir in entries:
+            if total <= budget:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            evicted += 1
+    if evicted:
+        logger.info("Evicted %d cached reconstructions", evicted)
+    return evicted
+
+
+def release(job_id: str) -> None:
+    """Unlink the job's reconstruction files shared with the cache, before an engine rewrites them."""
+    output_dir = job_reconstruction_dir(job_id)
+    if not output_dir.exists():
+        return
+    for path in output_dir.rglob("*"):
+        if path.is_file() and path.stat().st_nlink > 1:
+            path.unlink()
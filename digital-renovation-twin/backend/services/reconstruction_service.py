@@ -1,24 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import mimetypes
-import os
-import subprocess
-from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from backend.core.config import DATA_DIR, RECONSTRUCTIONS_DIR, UPLOADS_DIR
+from backend.core import config
+from backend.core.job_paths import job_reconstruction_dir, job_upload_dir
 
-try:
-    import requests
-except ImportError:  # pragma: no cover - runtime dependency
-    requests = None  # type: ignore
-
-PHOTOGRAMMETRY_API_URL = os.getenv("PHOTOGRAMMETRY_API_URL")
-PHOTOGRAMMETRY_API_KEY = os.getenv("PHOTOGRAMMETRY_API_KEY")
-PHOTOGRAMMETRY_PROVIDER = os.getenv("PHOTOGRAMMETRY_PROVIDER", "polycam")
 # Force mock engine locally to avoid accidental COLMAP/external invocations.
 RECONSTRUCTION_ENGINE = "mock"
 
@@ -36,7 +26,7 @@ class ReconstructionError(RuntimeError):
 
 
 def _collect_images(job_id: str) -> List[Path]:
-    upload_dir = UPLOADS_DIR / job_id
+    upload_dir = job_upload_dir(job_id)
     if not upload_dir.exists():
         raise FileNotFoundError(f"No uploads found for job {job_id}")
     images = sorted(p for p in upload_dir.iterdir() if p.is_file())
@@ -60,7 +50,7 @@ def _placeholder_mesh(output_dir: Path) -> Path:
 
 
 def _save_metadata(job_id: str, metadata: Dict) -> Path:
-    output_dir = RECONSTRUCTIONS_DIR / job_id
+    output_dir = job_reconstruction_dir(job_id)
     output_dir.mkdir(parents=True, exist_ok=True)
     meta_path = output_dir / META_FILENAME
     with meta_path.open("w", encoding="utf-8") as fp:
@@ -68,50 +58,13 @@ def _save_metadata(job_id: str, metadata: Dict) -> Path:
     return meta_path
 
 
-def _call_external_api(job_id: str, images: List[Path]) -> Dict[str, Optional[str]]:
-    if not PHOTOGRAMMETRY_API_URL or not PHOTOGRAMMETRY_API_KEY:
-        raise PhotogrammetryAPIError(
-            "Photogrammetry API credentials not configured. "
-            "Set PHOTOGRAMMETRY_API_URL and PHOTOGRAMMETRY_API_KEY."
-        )
-    if requests is None:
-        raise PhotogrammetryAPIError("The 'requests' package is required. Install it in the backend environment.")
-
-    files = []
-    for image in images:
-        mime, _ = mimetypes.guess_type(image.name)
-        buffer = BytesIO(image.read_bytes())
-        files.append(("files", (image.name, buffer, mime or "application/octet-stream")))
-
-    headers = {"Authorization": f"Bearer {PHOTOGRAMMETRY_API_KEY}"}
-    data = {"job_id": job_id, "provider": PHOTOGRAMMETRY_PROVIDER}
-    url = PHOTOGRAMMETRY_API_URL.rstrip("/") + "/reconstructions"
-
-    response = requests.post(url, headers=headers, data=data, files=files, timeout=300)
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as exc:  # type: ignore[attr-defined]
-        raise PhotogrammetryAPIError(f"Photogrammetry API rejected the request: {exc}") from exc
-
-    payload = response.json()
-    return {
-        "engine": "external_api",
-        "provider": PHOTOGRAMMETRY_PROVIDER,
-        "viewer_url": payload.get("viewer_url") or payload.get("viewerUrl"),
-        "asset_url": payload.get("asset_url") or payload.get("assetUrl"),
-        "job_reference": payload.get("id") or payload.get("job_id"),
-        "raw_response": payload,
-        "mesh_workspace_path": str(RECONSTRUCTIONS_DIR / job_id),
-    }
-
-
 def _mock_metadata(job_id: str, reason: Optional[str] = None) -> Dict[str, Optional[str]]:
-    output_dir = RECONSTRUCTIONS_DIR / job_id
+    output_dir = job_reconstruction_dir(job_id)
     output_dir.mkdir(parents=True, exist_ok=True)
     placeholder_mesh = _placeholder_mesh(output_dir)
     metadata: Dict[str, Optional[str]] = {
         "engine": "mock",
-        "provider": PHOTOGRAMMETRY_PROVIDER,
+        "provider": config.PHOTOGRAMMETRY_PROVIDER,
         "viewer_url": None,
         "asset_url": None,
         "asset_local_path": str(placeholder_mesh),
@@ -122,83 +75,70 @@ def _mock_metadata(job_id: str, reason: Optional[str] = None) -> Dict[str, Optio
     return metadata
 
 
+def _metadata_progress(job_id: str):
+    """on_progress callback recording COLMAP progress in the job metadata (the status feed)."""
+    from backend.services import job_metadata
+
+    def report(event: Dict) -> None:
+        try:
+            job_metadata.update_fields(job_id, reconstruction_progress=event)
+        except FileNotFoundError:
+            pass
+
+    return report
+
+
 def run_colmap_reconstruction_in_docker(job_id: str) -> Dict[str, Optional[str]]:
-    """Run COLMAP sparse reconstruction (CPU only) inside the official Docker image."""
-    _collect_images(job_id)
-    output_dir = RECONSTRUCTIONS_DIR / job_id
-    output_dir.mkdir(parents=True, exist_ok=True)
+    """
+    Run COLMAP sparse reconstruction (CPU only), in Docker unless COLMAP_EXECUTABLE is set.
 
-    data_dir = DATA_DIR.resolve()
-    image_path = f"/data/uploads/{job_id}"
-    workspace_path = f"/data/reconstructions/{job_id}"
-    database_path = f"/data/reconstructions/{job_id}/database.db"
-    sparse_path = f"/data/reconstructions/{job_id}/sparse"
-
-    docker_base = [
-        "docker", "run", "--rm", "-v", f"{data_dir}:/data", "graffitytech/colmap:3.8-cpu-ubuntu22.04"
-    ]
-    commands = [
-        docker_base + [
-            "colmap", "feature_extractor",
-            "--database_path", database_path,
-            "--image_path", image_path,
-        ],
-        docker_base + [
-            "colmap", "exhaustive_matcher",
-            "--database_path", database_path,
-        ],
-        docker_base + [
-            "colmap", "mapper",
-            "--database_path", database_path,
-            "--image_path", image_path,
-            "--output_path", sparse_path
-        ]
-    ]
-
-    logs = []
-    log_path = output_dir / "colmap_docker.log"
-    with log_path.open("w", encoding="utf-8") as log_file:
-        for cmd in commands:
-            logger.info("Running COLMAP Docker command: %s", " ".join(cmd))
-            log_file.write(f"$ {' '.join(cmd)}\n")
-            try:
-                process = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                logs.append({"cmd": " ".join(cmd), "stdout": process.stdout, "stderr": process.stderr})
-                log_file.write(f"--- STDOUT ---\n{process.stdout}\n")
-                log_file.write(f"--- STDERR ---\n{process.stderr}\n")
-            except FileNotFoundError as exc:
-                log_file.write(f"[ERROR] Docker not found: {exc}\n")
-                raise ReconstructionError("Docker executable not found. Please install Docker Desktop.") from exc
-            except subprocess.CalledProcessError as exc:
-                stderr = exc.stderr or exc.stdout or "Unknown COLMAP error."
-                log_file.write(f"[ERROR] COLMAP Docker failed: {stderr}\n")
-                logger.error("COLMAP Docker failed for job %s: %s", job_id, stderr.strip())
-                raise ReconstructionError(f"COLMAP reconstruction failed: {stderr}") from exc
+    Blocking wrapper around colmap_runner.run_colmap(); progress is recorded in
+    the job metadata as `reconstruction_progress`. Raises ReconstructionError
+    if a step fails or the run is cancelled (colmap_runner.cancel_colmap()).
+    """
+    from backend.services.colmap_runner import run_colmap
 
-    metadata: Dict[str, Optional[str]] = {
-        "engine": "colmap_docker",
-        "provider": "colmap",
-        "viewer_url": None,
-        "asset_url": None,
-        "asset_local_path": None,
-        "mesh_workspace_path": str(output_dir / "sparse"),
-        "job_reference": None,
-        "docker_logs": logs,
-        "docker_log_file": str(log_path),
-    }
-    return metadata
+    _collect_images(job_id)
+    try:
+        return asyncio.run(run_colmap(job_id, on_progress=_metadata_progress(job_id)))
+    except asyncio.CancelledError:
+        raise ReconstructionError(f"COLMAP reconstruction cancelled for job {job_id}") from None
 
 
 def submit_reconstruction_job(job_id: str) -> Dict[str, Optional[str]]:
     """
-    Run the (forced) mock reconstruction engine and persist the metadata.
+    Run the reconstruction engine (mock unless RECONSTRUCTION_ENGINE is changed) and persist the metadata.
+
+    The external API runs in the background: its metadata comes back with
+    status "submitted" and is completed in place (see photogrammetry_client).
+    Both real engines reuse the result of an earlier run on the same photos
+    when RECONSTRUCTION_CACHE is on (see reconstruction_cache).
     """
-    output_dir = RECONSTRUCTIONS_DIR / job_id
+    key = None
+    if RECONSTRUCTION_ENGINE in ("external_api", "colmap_docker") and config.RECONSTRUCTION_CACHE:
+        from backend.services import reconstruction_cache
+
+        key = reconstruction_cache.cache_key(job_id, RECONSTRUCTION_ENGINE)
+        cached = reconstruction_cache.restore(key, job_id)
+        if cached is not None:
+            _save_metadata(job_id, cached)
+            return cached
+        reconstruction_cache.release(job_id)
+
+    if RECONSTRUCTION_ENGINE == "external_api":
+        from backend.services.photogrammetry_client import start_reconstruction
+
+        return start_reconstruction(job_id, cache_key=key)
+    if RECONSTRUCTION_ENGINE == "colmap_docker":
+        metadata = run_colmap_reconstruction_in_docker(job_id)
+        if key:
+            metadata["cache_key"] = key
+        _save_metadata(job_id, metadata)
+        if key:
+            reconstruction_cache.store(key, job_id, metadata)
+        return metadata
+
+    output_dir = job_reconstruction_dir(job_id)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     metadata = _mock_metadata(job_id, reason="Mock engine forced for local development.")
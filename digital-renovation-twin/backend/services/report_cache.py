@@ -0,0 +1,160 @@
+"""
+Lazily rendered, cached PDF reports.
+
+The processing pipeline no longer renders reports; most are never downloaded.
+The first download renders the report into storage under ``report_key(job_id)``
+and records a fingerprint of its inputs in the job metadata
+(``outputs.report_digest``). The fingerprint is a SHA-256 over everything the
+report is laid out from (damages, cost estimate, risk summary, label, file
+count, photo metadata), the PDF output and photo options and
+REPORT_LAYOUT_VERSION. Later downloads
+re-render only when the fingerprint of the current inputs differs, and use it as
+the report's strong ETag.
+
+Loading the inputs streams every damage and lists the job's photos, which is
+far too slow to repeat for each 304 revalidation or Range request. So
+``outputs.report_sources`` also records a cheap fingerprint of where the inputs
+come from: the size and mtime of damages.json, cost_estimate.json and
+risk_summary.json (whichever tier holds them), the job's label and uploaded
+file names, each photo's size and storage ETag (nanosecond mtime and size on
+local storage, the content hash on S3), and the options. While it matches, downloads trust the stored
+digest without loading anything. When it changes, the inputs are loaded and
+hashed, and the report is re-rendered only if their fingerprint changed too.
+
+Inputs are hashed as parsed JSON, so cold-tier compaction of the artifacts does
+not invalidate a cached report (it only costs one reload).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.core import config
+from backend.core.artifacts import GZIP_SUFFIX, archive_path, stored_variant
+from backend.core.job_paths import job_reconstruction_dir, job_report_path
+from backend.services import job_metadata
+from backend.services.pdf_generator import generate_pdf_report, load_report_inputs, report_options
+from backend.services.storage import get_storage, list_job_uploads, report_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when compose_report's layout changes so cached reports are re-rendered
+REPORT_LAYOUT_VERSION = 2
+
+# Artifacts the report is laid out from, fingerprinted by stat for report_sources
+SOURCE_ARTIFACTS = ("damages.json", "cost_estimate.json", "risk_summary.json")
+
+_locks_guard = threading.Lock()
+_render_locks: Dict[str, List[Any]] = {}  # job_id -> [lock, holders and waiters]
+
+
+def _fingerprint(payload: Dict[str, Any]) -> str:
+    payload = {
+        "layout": REPORT_LAYOUT_VERSION,
+        "options": report_options(),
+        "photos": {"mode": config.REPORT_PHOTOS, "size": config.REPORT_THUMBNAIL_SIZE, "quality": config.REPORT_THUMBNAIL_QUALITY},
+        **payload,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def report_digest(inputs: Dict[str, Any]) -> str:
+    """Fingerprint of a report's inputs (load_report_inputs) and output options."""
+    return _fingerprint({"inputs": inputs})
+
+
+def report_sources(job_id: str, metadata: Dict[str, Any]) -> str:
+    """Cheap fingerprint of where a report's inputs come from (see the module docstring); no file is read."""
+    recon_dir = job_reconstruction_dir(job_id)
+    files: Dict[str, Optional[List[Any]]] = {}
+    for name in SOURCE_ARTIFACTS:
+        path = stored_variant(recon_dir / name) or archive_path(recon_dir / name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            files[name] = None
+        else:
+            files[name] = [path.name, stat.st_size, stat.st_mtime_ns]
+    photos: List[List[Any]] = []
+    if config.REPORT_PHOTOS != "off":
+        try:
+            photos = [[info.key, info.size, info.etag or info.modified] for info in list_job_uploads(job_id)]
+        except FileNotFoundError:
+            pass
+    return _fingerprint({
+        "files": files,
+        "label": metadata.get("label"),
+        "uploaded_files": metadata.get("uploaded_files", []),
+        "uploads": photos,
+    })
+
+
+def _report_stored(job_id: str) -> bool:
+    storage = get_storage()
+    key = report_key(job_id)
+    return storage.exists(key) or storage.exists(key + GZIP_SUFFIX)
+
+
+@contextmanager
+def _job_lock(job_id: str) -> Iterator[None]:
+    """Serialize renders of one job; the lock is dropped once nobody holds or waits for it."""
+    with _locks_guard:
+        entry = _render_locks.setdefault(job_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _render_locks[job_id]
+
+
+def _cached_digest(job_id: str, metadata: Dict[str, Any], sources: str) -> Optional[str]:
+    outputs = metadata.get("outputs") or {}
+    digest = outputs.get("report_digest")
+    if digest and outputs.get("report_sources") == sources and _report_stored(job_id):
+        return digest
+    return None
+
+
+def ensure_report(job_id: str) -> str:
+    """
+    Make sure the stored report matches the job's current inputs, rendering it if not.
+
+    Concurrent requests for the same job render it once. Returns the report digest.
+
+    Raises:
+        FileNotFoundError: If the job has no damages or cost estimate yet
+    """
+    metadata = job_metadata.load_metadata(job_id)
+    sources = report_sources(job_id, metadata)
+    digest = _cached_digest(job_id, metadata, sources)
+    if digest is not None:
+        return digest
+
+    with _job_lock(job_id):
+        metadata = job_metadata.load_metadata(job_id)
+        sources = report_sources(job_id, metadata)
+        digest = _cached_digest(job_id, metadata, sources)
+        if digest is not None:  # Rendered by a concurrent request
+            return digest
+
+        inputs = load_report_inputs(job_id)
+        digest = report_digest(inputs)
+        outputs = metadata.get("outputs") or {}
+        if outputs.get("report_digest") != digest or not _report_stored(job_id):
+            logger.info("Rendering report for job %s", job_id)
+            generate_pdf_report(job_id, inputs=inputs)
+        job_metadata.update_outputs(
+            job_id, report=str(job_report_path(job_id)), report_digest=digest, report_sources=sources,
+        )
+    return digest
@@ -3,9 +3,11 @@ from __future__ import annotations
 import json
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Optional
 
-from backend.core.config import RECONSTRUCTIONS_DIR
+from backend.core import config
+from backend.core.job_paths import job_reconstruction_dir
+from backend.services.damage_records import load_damage_records
 
 RISK_OUTPUT_FILENAME = "risk_summary.json"
 
@@ -25,14 +27,6 @@ SEVERITY_MULTIPLIER = {"low": 0.8, "medium": 1.0, "high": 1.4}
 SEVERITY_SCALE = 5.0  # Higher -> lower severity index for same risk points
 
 
-def _load_damages(job_id: str) -> Dict[str, Any]:
-    path = RECONSTRUCTIONS_DIR / job_id / "damages.json"
-    if not path.exists():
-        raise FileNotFoundError(f"Damage summary missing for job {job_id}")
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
-
-
 def _grade_from_score(score: float) -> str:
     if score < 20:
         return "A"
@@ -43,49 +37,37 @@ def _grade_from_score(score: float) -> str:
     return "D"
 
 
-def _safe_float(value: Any, default: float = 1.0) -> float:
-    try:
-        number = float(value)
-        if number <= 0:
-            return default
-        return number
-    except (TypeError, ValueError):
-        return default
-
-
-def compute_risk_summary(job_id: str) -> Path:
+def compute_risk_summary(job_id: str, intervals: Optional[bool] = None) -> Path:
     """
     Analyze detected damages and compute aggregate risk/health scores.
+    With `intervals` (default UNCERTAINTY_INTERVALS) the summary also carries
+    "overall_risk_score_interval", the P10/P50/P90 of the score.
     Returns the path to risk_summary.json.
     """
-    payload = _load_damages(job_id)
-    damages = payload.get("damages", [])
-    output_dir = RECONSTRUCTIONS_DIR / job_id
+    with_intervals = (config.UNCERTAINTY_INTERVALS if intervals is None else intervals) and config.UNCERTAINTY_SAMPLES > 0
+    damages = load_damage_records(job_id)
+    if with_intervals:
+        damages = list(damages)  # Simulated below too
+    output_dir = job_reconstruction_dir(job_id)
     output_dir.mkdir(parents=True, exist_ok=True)
     risk_path = output_dir / RISK_OUTPUT_FILENAME
 
     totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"count": 0, "risk_points": 0.0})
     total_risk_points = 0.0
+    total_damage_count = 0
 
     for damage in damages:
-        damage_type = damage.get("type", "unknown")
-        normalized_type = damage_type if damage_type in TYPE_WEIGHTS else "unknown"
-        base_weight = TYPE_WEIGHTS.get(normalized_type, TYPE_WEIGHTS["unknown"])
-        severity_label = str(damage.get("severity", "medium")).lower()
-        severity_factor = SEVERITY_MULTIPLIER.get(severity_label, 1.0)
-
-        magnitude = damage.get("approx_length_m")
-        if magnitude is None:
-            magnitude = damage.get("approx_area_m2")
-        magnitude_value = _safe_float(magnitude, default=1.0)
+        total_damage_count += 1
+        damage_type = damage.type.value
+        base_weight = TYPE_WEIGHTS.get(damage_type, TYPE_WEIGHTS["unknown"])
+        severity_factor = SEVERITY_MULTIPLIER.get(damage.severity.value, 1.0)
 
-        risk_points = base_weight * severity_factor * magnitude_value
+        risk_points = base_weight * severity_factor * damage.quantity
 
-        totals[normalized_type]["count"] += 1
-        totals[normalized_type]["risk_points"] += risk_points
+        totals[damage_type]["count"] += 1
+        totals[damage_type]["risk_points"] += risk_points
         total_risk_points += risk_points
 
-    total_damage_count = len(damages)
     overall_severity_index = round(min(10.0, total_risk_points / SEVERITY_SCALE), 2)
     overall_risk_score = round(min(100.0, overall_severity_index * 10.0), 1)
     health_grade = _grade_from_score(overall_risk_score)
@@ -104,6 +86,9 @@ def compute_risk_summary(job_id: str) -> Path:
             for damage_type, stats in totals.items()
         },
     }
+    if with_intervals:
+        from backend.services.uncertainty import damage_intervals
+        summary["overall_risk_score_interval"] = damage_intervals(job_id, damages)["overall_risk_score"]
 
     with risk_path.open("w", encoding="utf-8") as fp:
         json.dump(summary, fp, indent=2)
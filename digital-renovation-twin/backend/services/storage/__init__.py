@@ -0,0 +1,31 @@
+"""
+Object Storage Abstraction Layer
+
+Uploads and PDF reports are read and written through a pluggable backend
+instead of raw paths under ``DATA_DIR``:
+- LocalStorage: files under the data directory (default)
+- S3Storage: any S3-compatible bucket (AWS S3, MinIO, R2)
+
+Use get_storage() to obtain the configured backend and the key helpers
+(upload_key(), report_key()) to address a job's objects.
+"""
+
+from .base import ObjectInfo, ObjectNotFoundError, StorageBackend, StorageError
+from .factory import get_storage
+from .keys import list_job_uploads, report_key, storage_key, thumbnail_key, upload_key, upload_prefix
+from .local import LocalStorage
+
+__all__ = [
+    "LocalStorage",
+    "ObjectInfo",
+    "ObjectNotFoundError",
+    "StorageBackend",
+    "StorageError",
+    "get_storage",
+    "list_job_uploads",
+    "report_key",
+    "storage_key",
+    "thumbnail_key",
+    "upload_key",
+    "upload_prefix",
+]
@@ -0,0 +1,116 @@
+"""Base interface for object storage backends."""
+
+from __future__ import annotations
+
+import abc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+# Chunk size for streaming reads and writes
+CHUNK_SIZE = 1024 * 1024
+
+# What put() accepts: raw bytes, a binary file object, or an iterable of byte chunks
+PutSource = Union[bytes, bytearray, memoryview, BinaryIO, Iterable[bytes]]
+
+
+class StorageError(RuntimeError):
+    """Raised when a storage backend request fails."""
+
+
+class ObjectNotFoundError(StorageError, FileNotFoundError):
+    """Raised when reading an object that does not exist."""
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    """Metadata of a stored object."""
+
+    key: str
+    size: int
+    modified: float  # POSIX timestamp
+    etag: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Last path component of the key (the file name)."""
+        return self.key.rsplit("/", 1)[-1]
+
+
+def iter_source(source: PutSource, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the content of a put() source in chunks without loading it whole."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset:offset + chunk_size])
+        return
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)  # type: ignore[union-attr]
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for chunk in source:  # type: ignore[union-attr]
+            if chunk:
+                yield bytes(chunk)
+
+
+class StorageBackend(abc.ABC):
+    """
+    Key/value object storage with streaming reads and writes.
+
+    Keys are "/"-separated paths relative to the data directory, for example
+    ``uploads/ab/cd/{job_id}/facade.jpg`` (see ``storage_key``).
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def put(self, key: str, source: PutSource, *, content_type: Optional[str] = None) -> int:
+        """Store `source` under `key`, streaming it in chunks. Returns the bytes written."""
+
+    @abc.abstractmethod
+    def iter_bytes(
+        self,
+        key: str,
+        *,
+        start: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Stream an object's bytes, optionally only `length` bytes from offset `start`.
+
+        Raises ObjectNotFoundError if the object does not exist.
+        """
+
+    @abc.abstractmethod
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        """Metadata of an object, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        """Yield every object whose key starts with `prefix`, in key order."""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete an object. Deleting a missing object is not an error."""
+
+    def read(self, key: str, *, start: int = 0, length: Optional[int] = None) -> bytes:
+        """Read an object (or a byte range of it) into memory."""
+        return b"".join(self.iter_bytes(key, start=start, length=length))
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every object under `prefix`. Returns the number of objects deleted."""
+        keys = [info.key for info in self.list(prefix)]
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """The file backing `key` if the backend is a local filesystem, else None."""
+        return None
@@ -0,0 +1,64 @@
+"""Factory for the configured object storage backend."""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+
+from backend.core import config
+
+from .base import StorageBackend
+from .local import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("local", "s3")
+
+
+@lru_cache(maxsize=4)
+def _s3_storage(
+    bucket: str,
+    endpoint_url: str,
+    region: str,
+    access_key_id: str,
+    secret_access_key: str,
+    key_prefix: str,
+) -> StorageBackend:
+    from .s3 import S3Storage
+
+    logger.info("Using S3 object storage: %s/%s", endpoint_url, bucket)
+    return S3Storage(
+        bucket,
+        endpoint_url=endpoint_url,
+        region=region,
+        access_key_id=access_key_id,
+        secret_access_key=secret_access_key,
+        key_prefix=key_prefix,
+    )
+
+
+def get_storage(backend: str | None = None) -> StorageBackend:
+    """
+    Return the object storage backend selected by `backend` or ``STORAGE_BACKEND``.
+
+    - "local": files under ``DATA_DIR`` (default)
+    - "s3": an S3-compatible bucket configured with the ``S3_*`` settings
+
+    The S3 backend is built once per configuration so its connection pool is shared.
+
+    Raises:
+        ValueError: If an unknown backend is specified
+    """
+    backend = (backend or config.STORAGE_BACKEND).lower()
+    if backend == "local":
+        return LocalStorage()
+    if backend == "s3":
+        return _s3_storage(
+            config.S3_BUCKET,
+            config.S3_ENDPOINT_URL,
+            config.S3_REGION,
+            config.S3_ACCESS_KEY_ID,
+            config.S3_SECRET_ACCESS_KEY,
+            config.S3_KEY_PREFIX,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}. Valid options: {', '.join(BACKENDS)}")
@@ -0,0 +1,56 @@
+"""Storage keys for per-job objects."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+from backend.core import config
+from backend.core.artifacts import is_json_artifact
+from backend.core.job_paths import job_report_path, job_upload_dir
+
+from .base import ObjectInfo
+from .factory import get_storage
+
+
+def storage_key(path: Path) -> str:
+    """
+    Key of a data-directory path: its location relative to ``DATA_DIR``.
+
+    Paths come from ``backend.core.job_paths``, so keys follow the configured
+    storage layout (``uploads/ab/cd/{job_id}/facade.jpg``).
+    """
+    return path.relative_to(config.DATA_DIR).as_posix()
+
+
+def upload_prefix(job_id: str) -> str:
+    return storage_key(job_upload_dir(job_id)) + "/"
+
+
+def upload_key(job_id: str, filename: str) -> str:
+    return upload_prefix(job_id) + filename
+
+
+def thumbnail_key(job_id: str, filename: str) -> str:
+    """Key of the report thumbnail of an upload: ``thumbs/{filename}.jpg`` under the job's uploads."""
+    return upload_prefix(job_id) + "thumbs/" + filename + ".jpg"
+
+
+def report_key(job_id: str) -> str:
+    return storage_key(job_report_path(job_id))
+
+
+def list_job_uploads(job_id: str) -> List[ObjectInfo]:
+    """
+    Files uploaded for a job, sorted by name (JSON artifacts such as job_meta.json excluded).
+
+    Raises FileNotFoundError if the job has no uploads and no job directory.
+    """
+    prefix = upload_prefix(job_id)
+    uploads = [
+        info for info in get_storage().list(prefix)
+        if "/" not in info.key[len(prefix):] and not is_json_artifact(info.name)
+    ]
+    if not uploads and not job_upload_dir(job_id).exists():
+        raise FileNotFoundError(f"No uploads for job {job_id}")
+    return uploads
@@ -0,0 +1,121 @@
+"""Object storage on the local filesystem (the default backend)."""
+
+from __future__ import annotations
+
+import os
+import stat
+import uuid
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Optional
+
+from backend.core import config
+
+from .base import CHUNK_SIZE, ObjectInfo, ObjectNotFoundError, PutSource, StorageBackend, StorageError, iter_source
+
+
+class LocalStorage(StorageBackend):
+    """
+    Stores each object as a file under a root directory (``DATA_DIR`` by default).
+
+    Keys map one-to-one onto paths, so objects written here are the same files
+    the path-based maintenance tools (GC, tiering, layout migration) work on.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        # Read at call time so a repointed DATA_DIR (tests, tools) is honoured
+        return self._root if self._root is not None else config.DATA_DIR
+
+    def _path(self, key: str) -> Path:
+        parts = PurePosixPath(key).parts
+        if not parts or key.startswith("/") or ".." in parts:
+            raise StorageError(f"Invalid storage key: {key!r}")
+        return self.root.joinpath(*parts)
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def put(self, key: str, source: PutSource, *, content_type: Optional[str] = None) -> int:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write next to the target and rename so readers never see a partial file
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        written = 0
+        try:
+            with tmp_path.open("wb") as fp:
+                for chunk in iter_source(source):
+                    fp.write(chunk)
+                    written += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return written
+
+    def iter_bytes(
+        self,
+        key: str,
+        *,
+        start: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        try:
+            fp = self._path(key).open("rb")
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            raise ObjectNotFoundError(f"Object not found: {key}") from None
+        return self._read_chunks(fp, start, length, chunk_size)
+
+    @staticmethod
+    def _read_chunks(fp, start: int, length: Optional[int], chunk_size: int) -> Iterator[bytes]:
+        with fp:
+            if start:
+                fp.seek(start)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = fp.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            st = self._path(key).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return ObjectInfo(key=key, size=st.st_size, modified=st.st_mtime, etag=f"{st.st_mtime_ns:x}-{st.st_size:x}")
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        # Walk only the deepest directory the prefix names
+        directory = prefix.rsplit("/", 1)[0] if "/" in prefix else ""
+        base = self._path(directory) if directory else self.root
+        if not base.is_dir():
+            return
+        keys = []
+        for dirpath, dirnames, filenames in os.walk(base):
+            for filename in filenames:
+                key = self._key(Path(dirpath) / filename)
+                if key.startswith(prefix) and not filename.endswith(".tmp"):
+                    keys.append(key)
+        for key in sorted(keys):
+            info = self.stat(key)
+            if info is not None:
+                yield info
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
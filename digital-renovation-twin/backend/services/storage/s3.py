@@ -0,0 +1,324 @@
+"""
+S3-compatible object storage (AWS S3, MinIO, Cloudflare R2, ...).
+
+Requests are signed with AWS Signature Version 4 and sent over a pooled
+``httpx.Client`` using path-style URLs (``{endpoint}/{bucket}/{key}``), which
+every S3-compatible server accepts. Writes larger than one part are sent as a
+multipart upload so an upload is never held in memory as a whole; reads are
+streamed and support byte ranges.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from .base import CHUNK_SIZE, ObjectInfo, ObjectNotFoundError, PutSource, StorageBackend, StorageError, iter_source
+
+logger = logging.getLogger(__name__)
+
+# S3 requires every multipart part but the last to be at least 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_request(
+    method: str,
+    url: str,
+    params: Dict[str, str],
+    headers: Dict[str, str],
+    payload_hash: str,
+    *,
+    access_key_id: str,
+    secret_access_key: str,
+    region: str,
+    now: Optional[datetime] = None,
+) -> Dict[str, str]:
+    """
+    Return `headers` plus the ``x-amz-*`` and ``Authorization`` headers of a SigV4 signature.
+
+    `url` carries no query string; query parameters are passed in `params`.
+    """
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = now.strftime("%Y%m%d")
+    parts = urlsplit(url)
+
+    signed = {key.lower(): value.strip() for key, value in headers.items()}
+    signed["host"] = parts.netloc
+    signed["x-amz-date"] = amz_date
+    signed["x-amz-content-sha256"] = payload_hash
+
+    canonical_query = "&".join(
+        f"{_uri_encode(key)}={_uri_encode(value)}" for key, value in sorted(params.items())
+    )
+    header_names = sorted(signed)
+    canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in header_names)
+    signed_headers = ";".join(header_names)
+    canonical_request = "\n".join([
+        method,
+        parts.path or "/",  # Already URI-encoded by the caller
+        canonical_query,
+        canonical_headers,
+        signed_headers,
+        payload_hash,
+    ])
+
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256",
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+    ])
+    key = _hmac(("AWS4" + secret_access_key).encode("utf-8"), date_stamp)
+    for part in (region, "s3", "aws4_request"):
+        key = _hmac(key, part)
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    result = dict(headers)
+    result["x-amz-date"] = amz_date
+    result["x-amz-content-sha256"] = payload_hash
+    result["Authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key_id}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return result
+
+
+class S3Storage(StorageBackend):
+    """Object storage in an S3-compatible bucket."""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        *,
+        endpoint_url: str,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str = "us-east-1",
+        key_prefix: str = "",
+        part_size: int = DEFAULT_PART_SIZE,
+        timeout: float = 30.0,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        if not bucket:
+            raise ValueError("S3 storage requires a bucket name")
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.region = region
+        self.key_prefix = key_prefix.strip("/") + "/" if key_prefix.strip("/") else ""
+        self.part_size = part_size
+        self._access_key_id = access_key_id
+        self._secret_access_key = secret_access_key
+        self._client = httpx.Client(timeout=timeout, transport=transport)
+
+    def close(self) -> None:
+        self._client.close()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _url(self, key: str = "") -> str:
+        url = f"{self.endpoint_url}/{self.bucket}"
+        if key:
+            url += "/" + _uri_encode(self.key_prefix + key, safe="/-_.~")
+        return url
+
+    def _build(
+        self,
+        method: str,
+        key: str = "",
+        *,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        content: bytes = b"",
+    ) -> httpx.Request:
+        url = self._url(key)
+        params = params or {}
+        payload_hash = hashlib.sha256(content).hexdigest() if content else _EMPTY_SHA256
+        signed = sign_request(
+            method, url, params, headers or {}, payload_hash,
+            access_key_id=self._access_key_id,
+            secret_access_key=self._secret_access_key,
+            region=self.region,
+        )
+        query = "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(params.items()))
+        return self._client.build_request(
+            method, url + ("?" + query if query else ""), headers=signed, content=content or None,
+        )
+
+    def _send(self, request: httpx.Request, *, stream: bool = False, ok: Tuple[int, ...] = (200,)) -> httpx.Response:
+        try:
+            response = self._client.send(request, stream=stream)
+        except httpx.HTTPError as exc:
+            raise StorageError(f"S3 {request.method} {request.url.path} failed: {exc}") from exc
+        if response.status_code not in ok:
+            if stream:
+                response.read()
+                response.close()
+            if response.status_code == 404:
+                raise ObjectNotFoundError(f"Object not found: {request.url.path}")
+            raise StorageError(
+                f"S3 {request.method} {request.url.path} returned {response.status_code}: {response.text[:200]}"
+            )
+        return response
+
+    def _strip_prefix(self, key: str) -> str:
+        return key[len(self.key_prefix):] if self.key_prefix and key.startswith(self.key_prefix) else key
+
+    # ------------------------------------------------------------------
+    # StorageBackend
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, source: PutSource, *, content_type: Optional[str] = None) -> int:
+        headers = {"Content-Type": content_type} if content_type else {}
+        parts = self._parts(source)
+        first = next(parts, b"")
+        second = next(parts, None)
+        if second is None:
+            # Fits in one part: a single signed PUT
+            self._send(self._build("PUT", key, headers=headers, content=first))
+            return len(first)
+
+        response = self._send(self._build("POST", key, params={"uploads": ""}, headers=headers))
+        upload_id = ET.fromstring(response.content).findtext(f"{_S3_NS}UploadId") or ""
+        if not upload_id:
+            raise StorageError(f"S3 did not return an upload ID for {key}")
+        etags: List[str] = []
+        written = 0
+        try:
+            for number, part in enumerate(_chain(first, second, parts), start=1):
+                response = self._send(self._build(
+                    "PUT", key, params={"partNumber": str(number), "uploadId": upload_id}, content=part,
+                ))
+                etags.append(response.headers.get("ETag", ""))
+                written += len(part)
+            body = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in enumerate(etags, start=1)
+            )
+            self._send(self._build(
+                "POST", key, params={"uploadId": upload_id},
+                content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode("utf-8"),
+            ))
+        except BaseException:
+            try:
+                self._send(self._build("DELETE", key, params={"uploadId": upload_id}), ok=(200, 204, 404))
+            except StorageError as exc:
+                logger.warning("Failed to abort multipart upload of %s: %s", key, exc)
+            raise
+        return written
+
+    def _parts(self, source: PutSource) -> Iterator[bytes]:
+        """Re-chunk a source into part_size pieces (the last one may be shorter)."""
+        buffer = bytearray()
+        for chunk in iter_source(source):
+            buffer.extend(chunk)
+            while len(buffer) >= self.part_size:
+                yield bytes(buffer[:self.part_size])
+                del buffer[:self.part_size]
+        if buffer:
+            yield bytes(buffer)
+
+    def iter_bytes(
+        self,
+        key: str,
+        *,
+        start: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        headers = {}
+        if start or length is not None:
+            end = "" if length is None else str(start + length - 1)
+            headers["Range"] = f"bytes={start}-{end}"
+        # Send eagerly so a missing object raises here, not on first iteration
+        response = self._send(self._build("GET", key, headers=headers), stream=True, ok=(200, 206))
+        return self._stream(response, chunk_size)
+
+    @staticmethod
+    def _stream(response: httpx.Response, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from response.iter_bytes(chunk_size)
+        finally:
+            response.close()
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            response = self._send(self._build("HEAD", key))
+        except ObjectNotFoundError:
+            return None
+        return ObjectInfo(
+            key=key,
+            size=int(response.headers.get("Content-Length", 0)),
+            modified=_parse_http_date(response.headers.get("Last-Modified")),
+            etag=response.headers.get("ETag", "").strip('"') or None,
+        )
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        params = {"list-type": "2", "prefix": self.key_prefix + prefix}
+        while True:
+            response = self._send(self._build("GET", params=params))
+            root = ET.fromstring(response.content)
+            for item in root.iter(f"{_S3_NS}Contents"):
+                modified = item.findtext(f"{_S3_NS}LastModified") or ""
+                yield ObjectInfo(
+                    key=self._strip_prefix(item.findtext(f"{_S3_NS}Key") or ""),
+                    size=int(item.findtext(f"{_S3_NS}Size") or 0),
+                    modified=_parse_iso_date(modified),
+                    etag=(item.findtext(f"{_S3_NS}ETag") or "").strip('"') or None,
+                )
+            token = root.findtext(f"{_S3_NS}NextContinuationToken")
+            if root.findtext(f"{_S3_NS}IsTruncated") != "true" or not token:
+                return
+            params = {**params, "continuation-token": token}
+
+    def delete(self, key: str) -> None:
+        self._send(self._build("DELETE", key), ok=(200, 204, 404))
+
+
+def _chain(first: bytes, second: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    yield first
+    yield second
+    yield from rest
+
+
+def _parse_http_date(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_iso_date(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
@@ -0,0 +1,268 @@
+"""
+Storage garbage collection and orphan reconciliation.
+
+A job's bytes live in three places: its upload directory (images and
+metadata), its reconstruction directory (pipeline JSON) and its PDF report
+(see ``backend.core.job_paths``), plus a row in the jobs table. Crashes, older
+delete paths and manual cleanups leave these out of sync. The collector
+joins all four sources per job ID and plans removals for:
+
+- ``orphan``: reconstruction or report files of a job with no upload
+  directory and no database row.
+- ``incomplete_upload``: an upload directory without ``job_meta.json``.
+- ``dangling_record``: a live database row whose upload directory is gone.
+- ``expired``: jobs older than the retention age (by last update).
+- ``over_quota``: oldest jobs evicted until the total fits the byte budget.
+
+Age and quota rules only touch jobs whose status is in the policy's
+statuses, so queued or processing jobs are never collected. Orphans and
+incomplete uploads younger than the grace period are skipped because an
+upload may still be in flight. Tombstoned jobs are left to the reclaimer.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.core.config import (
+    GC_INTERVAL_SECONDS,
+    GC_MAX_AGE_DAYS,
+    GC_MAX_BYTES,
+    GC_ORPHAN_GRACE_SECONDS,
+    GC_STATUSES,
+)
+from backend.core.artifacts import read_json
+from backend.core.job_paths import iter_reconstruction_dirs, iter_report_files, iter_upload_dirs
+from backend.services.job_metadata import META_FILENAME
+from backend.services.reclaimer import SweepThread, remove_path, tree_size
+
+logger = logging.getLogger(__name__)
+
+GC_REASONS = ("orphan", "incomplete_upload", "dangling_record", "expired", "over_quota")
+
+
+def _as_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds from a datetime or ISO string (naive values are UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _read_metadata(upload_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return read_json(upload_dir / META_FILENAME)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _load_records() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Job rows keyed by ID, or None when the database is unavailable."""
+    try:
+        from backend.database import list_job_states
+        return list_job_states(include_deleted=True)
+    except Exception as exc:
+        logger.warning("Storage GC running without database records: %s", exc)
+        return None
+
+
+def scan_storage() -> Dict[str, Dict[str, Any]]:
+    """
+    Inventory every job present on disk or in the database.
+
+    Returns a dict keyed by job ID with the job's paths, total bytes, status,
+    last-activity timestamp and whether a (live or tombstoned) record exists.
+    """
+    jobs: Dict[str, Dict[str, Any]] = {}
+
+    def entry(job_id: str) -> Dict[str, Any]:
+        return jobs.setdefault(job_id, {
+            "job_id": job_id,
+            "paths": [],
+            "bytes": 0,
+            "upload_dir": None,
+            "has_metadata": False,
+            "status": None,
+            "updated_at": None,
+            "mtime": None,
+            "record": None,
+        })
+
+    def add_path(job_id: str, path: Path, stat_result) -> Dict[str, Any]:
+        job = entry(job_id)
+        job["paths"].append(path)
+        job["bytes"] += tree_size(path)
+        job["mtime"] = max(job["mtime"] or 0.0, stat_result.st_mtime)
+        return job
+
+    for job_id, path in iter_upload_dirs():
+        job = add_path(job_id, path, path.stat())
+        job["upload_dir"] = path
+        meta = _read_metadata(path)
+        if meta is not None:
+            job["has_metadata"] = True
+            job["status"] = meta.get("status")
+            job["updated_at"] = _as_timestamp(meta.get("updated_at") or meta.get("created_at"))
+
+    for job_id, path in iter_reconstruction_dirs():
+        add_path(job_id, path, path.stat())
+
+    for job_id, path in iter_report_files():
+        add_path(job_id, path, path.stat())
+
+    records = _load_records()
+    for job_id, record in (records or {}).items():
+        job = entry(job_id)
+        job["record"] = record
+        # The database is the source of truth for status when it has the job;
+        # age counts from the most recent activity seen in either place.
+        job["status"] = record["status"] or job["status"]
+        stamps = [_as_timestamp(record["updated_at"] or record["created_at"]), job["updated_at"]]
+        job["updated_at"] = max((stamp for stamp in stamps if stamp is not None), default=None)
+
+    for job in jobs.values():
+        if job["updated_at"] is None:
+            job["updated_at"] = job["mtime"]
+    return jobs
+
+
+def _classify(job: Dict[str, Any], now: float, grace_seconds: float) -> Optional[str]:
+    """Reason a job is garbage regardless of retention policy, or None."""
+    record = job["record"]
+    if record is not None and record["deleted_at"] is not None:
+        return None  # Tombstoned: the reclaimer owns it
+    settled = (now - (job["mtime"] or now)) >= grace_seconds
+    if job["upload_dir"] is None:
+        if record is None:
+            return "orphan" if settled else None
+        age = now - (job["updated_at"] or now)
+        return "dangling_record" if age >= grace_seconds else None
+    if not job["has_metadata"] and settled:
+        return "incomplete_upload"
+    return None
+
+
+def plan_gc(
+    *,
+    max_age_days: float = GC_MAX_AGE_DAYS,
+    max_total_bytes: int = GC_MAX_BYTES,
+    statuses: Iterable[str] = GC_STATUSES,
+    grace_seconds: float = GC_ORPHAN_GRACE_SECONDS,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Work out what a GC pass would remove without touching anything.
+
+    Returns a report with the candidate jobs (oldest first within each
+    reason), the bytes they hold, and the total bytes scanned.
+    """
+    now = time.time() if now is None else now
+    statuses = set(statuses)
+    jobs = scan_storage()
+    total_bytes = sum(job["bytes"] for job in jobs.values())
+
+    candidates: List[Dict[str, Any]] = []
+    kept: List[Dict[str, Any]] = []
+    for job in sorted(jobs.values(), key=lambda item: item["updated_at"] or 0.0):
+        reason = _classify(job, now, grace_seconds)
+        if reason is None and job["status"] in statuses and job["upload_dir"] is not None:
+            if max_age_days > 0 and now - (job["updated_at"] or now) > max_age_days * 86400:
+                reason = "expired"
+        if reason is not None:
+            candidates.append(_candidate(job, reason))
+        elif job["record"] is None or job["record"]["deleted_at"] is None:
+            kept.append(job)
+
+    if max_total_bytes > 0:
+        remaining = sum(job["bytes"] for job in kept)
+        for job in kept:  # Oldest first
+            if remaining <= max_total_bytes:
+                break
+            if job["status"] in statuses and job["upload_dir"] is not None:
+                candidates.append(_candidate(job, "over_quota"))
+                remaining -= job["bytes"]
+
+    by_reason = {reason: {"jobs": 0, "bytes": 0} for reason in GC_REASONS}
+    for candidate in candidates:
+        by_reason[candidate["reason"]]["jobs"] += 1
+        by_reason[candidate["reason"]]["bytes"] += candidate["bytes"]
+
+    return {
+        "jobs_scanned": len(jobs),
+        "bytes_scanned": total_bytes,
+        "candidates": candidates,
+        "by_reason": by_reason,
+        "bytes_reclaimable": sum(candidate["bytes"] for candidate in candidates),
+    }
+
+
+def _candidate(job: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    return {
+        "job_id": job["job_id"],
+        "reason": reason,
+        "status": job["status"],
+        "bytes": job["bytes"],
+        "paths": [str(path) for path in job["paths"]],
+        "has_record": job["record"] is not None,
+    }
+
+
+def run_gc(*, dry_run: bool = False, **policy: Any) -> Dict[str, Any]:
+    """
+    Plan and (unless dry_run) apply one GC pass.
+
+    Removes the candidates' files and their database rows. The returned
+    report is the plan plus ``bytes_freed``, ``jobs_removed`` and ``errors``.
+    """
+    report = plan_gc(**policy)
+    report.update({"dry_run": dry_run, "bytes_freed": 0, "jobs_removed": 0, "errors": 0})
+    if dry_run:
+        return report
+
+    for candidate in report["candidates"]:
+        try:
+            freed = sum(remove_path(Path(path)) for path in candidate["paths"])
+            if candidate["has_record"]:
+                from backend.database import delete_job_record
+                delete_job_record(candidate["job_id"])
+        except Exception as exc:
+            report["errors"] += 1
+            logger.warning("Storage GC failed for job %s: %s", candidate["job_id"], exc)
+            continue
+        report["bytes_freed"] += freed
+        report["jobs_removed"] += 1
+
+    if report["jobs_removed"]:
+        logger.info(
+            "Storage GC removed %d job(s), freed %d bytes",
+            report["jobs_removed"], report["bytes_freed"],
+        )
+    return report
+
+
+_collector: Optional[SweepThread] = None
+
+
+def start_storage_gc(interval: float = GC_INTERVAL_SECONDS) -> None:
+    """Run the retention policy periodically in the background (interval <= 0 disables)."""
+    global _collector
+    if _collector is None and interval > 0:
+        _collector = SweepThread(run_gc, interval, "storage-gc")
+
+
+def stop_storage_gc() -> None:
+    global _collector
+    if _collector is not None:
+        _collector.stop()
+        _collector = None
@@ -0,0 +1,197 @@
+"""
+Online migration between the flat and sharded job layouts.
+
+Each job entry (upload dir, reconstruction dir, report) is moved with a
+single ``os.replace`` into its place in the target layout. Path resolution
+in ``backend.core.job_paths`` checks both layouts, so the API keeps serving
+every job while the migration runs and the tool can be interrupted and
+re-run at any time. Jobs that are currently processing are skipped (their
+pipeline holds resolved paths) and picked up by the next run.
+
+Absolute paths stored in ``job_meta.json`` and ``reconstruction_meta.json``
+are rewritten to the new locations after a job's entries move.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from backend.core import config
+from backend.core.artifacts import GZIP_SUFFIX, read_json, stored_variant
+from backend.core.job_paths import LAYOUTS, REPORT_SUFFIX, is_shard_name, layout_path, scan_job_entries
+from backend.services.job_metadata import META_FILENAME
+
+logger = logging.getLogger(__name__)
+
+RECONSTRUCTION_META_FILENAME = "reconstruction_meta.json"
+
+
+def _roots() -> List[Tuple[Path, str]]:
+    return [
+        (config.UPLOADS_DIR, ""),
+        (config.RECONSTRUCTIONS_DIR, ""),
+        (config.REPORTS_DIR, REPORT_SUFFIX),
+    ]
+
+
+def _pending_moves(target: str) -> Dict[str, List[Tuple[Path, Path]]]:
+    """(src, dst) moves per job ID for every entry not yet in the target layout."""
+    moves: Dict[str, List[Tuple[Path, Path]]] = {}
+    for root, suffix in _roots():
+        for job_id, path, layout in scan_job_entries(root, suffix):
+            if layout != target:
+                dst = layout_path(root, job_id, target, path.name)
+                moves.setdefault(job_id, []).append((path, dst))
+    return moves
+
+
+def _job_status(moves: Iterable[Tuple[Path, Path]]) -> Any:
+    """Status from job_meta.json, looked up wherever the upload dir currently is."""
+    for src, dst in moves:
+        for candidate in (src / META_FILENAME, dst / META_FILENAME):
+            try:
+                return read_json(candidate).get("status")
+            except (OSError, json.JSONDecodeError):
+                continue
+    return None
+
+
+def _move(src: Path, dst: Path) -> int:
+    """
+    Move src to dst, merging into an existing directory. Returns the conflicts left behind.
+
+    A file that exists on both sides is kept at dst and left at src.
+    """
+    if not os.path.lexists(dst):
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src, dst)
+        return 0
+    if not (src.is_dir() and dst.is_dir()):
+        logger.warning("Layout migration conflict, keeping %s and leaving %s", dst, src)
+        return 1
+    conflicts = sum(_move(child, dst / child.name) for child in list(src.iterdir()))
+    if not conflicts:
+        src.rmdir()
+    return conflicts
+
+
+def _rewrite(value: Any, replacements: List[Tuple[str, str]]) -> Any:
+    if isinstance(value, dict):
+        return {key: _rewrite(item, replacements) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rewrite(item, replacements) for item in value]
+    if isinstance(value, str):
+        for old, new in replacements:
+            if value == old or value.startswith(old + os.sep):
+                return new + value[len(old):]
+    return value
+
+
+def _rewrite_stored_paths(json_path: Path, replacements: List[Tuple[str, str]]) -> None:
+    """Point absolute paths stored in a JSON file (plain or cold-tier gzip) at the migrated locations."""
+    stored = stored_variant(json_path)
+    if stored is None:
+        return
+    compressed = stored.name.endswith(GZIP_SUFFIX)
+    opener = gzip.open if compressed else open
+    try:
+        with opener(stored, "rt", encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, json.JSONDecodeError):
+        return
+    updated = _rewrite(data, replacements)
+    if updated == data:
+        return
+    tmp_path = stored.with_name(stored.name + ".tmp")
+    with opener(tmp_path, "wt", encoding="utf-8") as fp:
+        if compressed:
+            json.dump(updated, fp, separators=(",", ":"))
+        else:
+            json.dump(updated, fp, indent=2)
+    os.replace(tmp_path, stored)
+
+
+def _prune_empty_shards(root: Path) -> None:
+    """Remove shard directories left empty after migrating to the flat layout."""
+    if not root.exists():
+        return
+    for first in root.iterdir():
+        if not (first.is_dir() and is_shard_name(first.name)):
+            continue
+        for second in first.iterdir():
+            if second.is_dir() and is_shard_name(second.name):
+                try:
+                    second.rmdir()
+                except OSError:
+                    continue
+        try:
+            first.rmdir()
+        except OSError:
+            continue
+
+
+def migrate_layout(
+    target: str = "sharded",
+    *,
+    dry_run: bool = False,
+    skip_statuses: Iterable[str] = ("processing",),
+) -> Dict[str, Any]:
+    """
+    Move every job into the `target` layout ("sharded" or "flat").
+
+    Returns counts of jobs moved and skipped, entries moved, conflicts and errors.
+    """
+    if target not in LAYOUTS:
+        raise ValueError(f"Unknown storage layout '{target}'. Expected one of: {', '.join(LAYOUTS)}")
+
+    skip_statuses = set(skip_statuses)
+    stats = {
+        "target": target,
+        "dry_run": dry_run,
+        "jobs_pending": 0,
+        "jobs_moved": 0,
+        "jobs_skipped": 0,
+        "entries_moved": 0,
+        "conflicts": 0,
+        "errors": 0,
+    }
+
+    pending = _pending_moves(target)
+    stats["jobs_pending"] = len(pending)
+    if dry_run:
+        stats["entries_moved"] = sum(len(moves) for moves in pending.values())
+        return stats
+
+    for job_id, moves in sorted(pending.items()):
+        if _job_status(moves) in skip_statuses:
+            stats["jobs_skipped"] += 1
+            continue
+        try:
+            for src, dst in moves:
+                stats["conflicts"] += _move(src, dst)
+                stats["entries_moved"] += 1
+            replacements = [(str(src), str(dst)) for src, dst in moves]
+            for _, dst in moves:
+                if dst.is_dir():
+                    for name in (META_FILENAME, RECONSTRUCTION_META_FILENAME):
+                        _rewrite_stored_paths(dst / name, replacements)
+        except OSError as exc:
+            stats["errors"] += 1
+            logger.warning("Failed to migrate job %s: %s", job_id, exc)
+            continue
+        stats["jobs_moved"] += 1
+
+    if target == "flat":
+        for root, _ in _roots():
+            _prune_empty_shards(root)
+
+    logger.info(
+        "Layout migration to %s: moved %d job(s), skipped %d, %d conflict(s), %d error(s)",
+        target, stats["jobs_moved"], stats["jobs_skipped"], stats["conflicts"], stats["errors"],
+    )
+    return stats
@@ -0,0 +1,97 @@
+"""
+Photos for PDF reports.
+
+Reports embed JPEG data as-is (DCTDecode), so a photo costs its file size and
+no decoding. Full-resolution uploads would make a 40-photo report tens of
+megabytes, so by default reports use thumbnail derivatives: downscaled JPEG
+copies made with Pillow on first use and stored under the job's ``thumbs/``
+prefix (see thumbnail_key), where later renders find them.
+
+Pillow is optional. Without it, thumbnails that already exist are still used,
+JPEG uploads without one are embedded at full size and other formats are
+left out of the report.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+from backend.core import config
+from backend.services.storage import ObjectInfo, get_storage, thumbnail_key
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+JPEG_EXTENSIONS = {".jpg", ".jpeg"}
+
+# What PDFBuilder.embed_jpeg() takes: a local file (memory-mapped) or the bytes
+PhotoSource = Union[Path, bytes]
+
+_warned_no_pillow = False
+
+
+def _source(key: str) -> PhotoSource:
+    """The local file behind `key` when storage is on disk, else the object's bytes."""
+    storage = get_storage()
+    return storage.local_path(key) or storage.read(key)
+
+
+def make_thumbnail(data: bytes, size: int, quality: int) -> bytes:
+    """
+    A JPEG of `data` (any format Pillow reads) no larger than size x size.
+
+    Raises RuntimeError if Pillow is not installed, OSError if the image cannot be read.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed. Run `pip install Pillow`.")
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (size, size))  # Lets JPEGs decode at a fraction of full size
+        image.thumbnail((size, size))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def report_photo(job_id: str, upload: ObjectInfo, mode: Optional[str] = None) -> Optional[PhotoSource]:
+    """
+    The JPEG to embed in a report for `upload`, or None to leave it out.
+
+    `mode` is REPORT_PHOTOS by default. In "thumbnail" mode the stored thumbnail
+    is used while it is newer than the upload, and made (and stored) otherwise.
+    """
+    global _warned_no_pillow
+    mode = mode or config.REPORT_PHOTOS
+    is_jpeg = Path(upload.name).suffix.lower() in JPEG_EXTENSIONS
+    if mode == "original":
+        return _source(upload.key) if is_jpeg else None
+    if mode != "thumbnail":
+        return None
+
+    storage = get_storage()
+    key = thumbnail_key(job_id, upload.name)
+    thumbnail = storage.stat(key)
+    if thumbnail is not None and thumbnail.modified >= upload.modified:
+        return _source(key)
+
+    if Image is None:
+        if not _warned_no_pillow:
+            logger.warning("Pillow is not installed; reports embed JPEG photos at full size and skip other formats")
+            _warned_no_pillow = True
+        return _source(upload.key) if is_jpeg else None
+
+    try:
+        data = make_thumbnail(storage.read(upload.key), config.REPORT_THUMBNAIL_SIZE, config.REPORT_THUMBNAIL_QUALITY)
+    except OSError as exc:
+        logger.warning("Could not make a thumbnail of %s: %s", upload.key, exc)
+        return None
+    storage.put(key, data, content_type="image/jpeg")
+    return _source(key)
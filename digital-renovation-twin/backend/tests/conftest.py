@@ -25,6 +25,7 @@ def temp_data_dir(monkeypatch):
     recon_dir = temp_path / "reconstructions"
     reports_dir = temp_path / "reports"
     fixtures_dir = temp_path / "fixtures"
+    trash_dir = temp_path / "trash"
     
     uploads_dir.mkdir()
     recon_dir.mkdir()
@@ -37,12 +38,13 @@ def temp_data_dir(monkeypatch):
     monkeypatch.setattr("backend.core.config.RECONSTRUCTIONS_DIR", recon_dir)
     monkeypatch.setattr("backend.core.config.REPORTS_DIR", reports_dir)
     monkeypatch.setattr("backend.core.config.FIXTURES_DIR", fixtures_dir)
+    monkeypatch.setattr("backend.core.config.TRASH_DIR", trash_dir)
+    monkeypatch.setattr("backend.core.config.RECONSTRUCTION_CACHE_DIR", temp_path / "reconstruction_cache")
     
-    # Also patch the services that import these at module level
-    monkeypatch.setattr("backend.services.risk_scoring.RECONSTRUCTIONS_DIR", recon_dir)
-    monkeypatch.setattr("backend.services.cost_estimation.RECONSTRUCTIONS_DIR", recon_dir)
-    monkeypatch.setattr("backend.services.pdf_generator.RECONSTRUCTIONS_DIR", recon_dir)
-    monkeypatch.setattr("backend.services.pdf_generator.REPORTS_DIR", reports_dir)
+    # Job paths resolve through backend.core.job_paths, which reads the config
+    # module at call time; only the trash dir is still imported at module level
+    monkeypatch.setattr("backend.services.job_metadata.TRASH_DIR", trash_dir)
+    monkeypatch.setattr("backend.services.reclaimer.TRASH_DIR", trash_dir)
     
     yield temp_path
     
@@ -50,6 +52,34 @@ def temp_data_dir(monkeypatch):
     shutil.rmtree(temp_dir, ignore_errors=True)
 
 
+@pytest.fixture
+def temp_database(temp_data_dir, monkeypatch):
+    """Point the database layer at a fresh SQLite file inside the temp data dir."""
+    import asyncio
+
+    from backend import database
+
+    db_url = f"sqlite:///{temp_data_dir / 'test.db'}"
+    monkeypatch.setattr(database, "DATABASE_URL", db_url)
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_SessionLocal", None)
+    monkeypatch.setattr(database, "_read_engine", None)
+    monkeypatch.setattr(database, "_ReadSessionLocal", None)
+    monkeypatch.setattr(database, "_job_writer", None)
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "_AsyncSessionLocal", None)
+    monkeypatch.setattr(database, "_async_unavailable", False)
+    
+    yield database
+    
+    database.shutdown_job_writer()
+    if database._async_engine is not None:
+        asyncio.run(database._async_engine.dispose())
+    for engine in (database._read_engine, database._engine):
+        if engine is not None:
+            engine.dispose()
+
+
 @pytest.fixture
 def sample_job_id():
     """Generate a sample job ID."""
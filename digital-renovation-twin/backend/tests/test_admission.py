@@ -0,0 +1,216 @@
+"""Tests for admission control on uploads and job processing."""
+
+import asyncio
+import time
+
+import pytest
+
+
+@pytest.fixture
+def gates(monkeypatch):
+    """Fresh upload/processing gates (limits 1 and 1 + 1 queued) behind the middleware."""
+    from backend.api import admission
+    from backend.core import config
+
+    monkeypatch.setattr(config, "MAX_CONCURRENT_UPLOADS", 1)
+    monkeypatch.setattr(config, "MAX_INFLIGHT_JOBS", 1)
+    monkeypatch.setattr(config, "MAX_QUEUED_JOBS", 1)
+    monkeypatch.setattr(config, "ADMISSION_QUEUE_TIMEOUT_SECONDS", 5.0)
+    uploads = admission.Gate("upload", lambda: config.MAX_CONCURRENT_UPLOADS)
+    processing = admission.Gate("processing", lambda: config.MAX_INFLIGHT_JOBS, lambda: config.MAX_QUEUED_JOBS)
+    monkeypatch.setattr(admission, "UPLOADS", uploads)
+    monkeypatch.setattr(admission, "PROCESSING", processing)
+    fresh = {gate.name: gate for gate in (uploads, processing)}
+    monkeypatch.setattr(admission, "_ROUTES", tuple(
+        (method, pattern, fresh[gate.name], timeout) for method, pattern, gate, timeout in admission._ROUTES
+    ))
+    return uploads, processing
+
+
+def _app(release: asyncio.Event, calls: list):
+    from fastapi import FastAPI, Request
+
+    from backend.api.admission import AdmissionMiddleware
+
+    app = FastAPI()
+
+    @app.post("/jobs")
+    async def create_job(request: Request):
+        calls.append(("upload", len(await request.body())))
+        await release.wait()
+        return {"job_id": "job-1"}
+
+    @app.post("/jobs/{job_id}/process")
+    async def process_job(job_id: str):
+        calls.append(("process", job_id))
+        await release.wait()
+        return {"job_id": job_id, "status": "completed"}
+
+    @app.post("/jobs/batch-delete")
+    async def batch_delete():
+        return {"deleted": []}
+
+    app.add_middleware(AdmissionMiddleware)
+    return app
+
+
+async def _burst(requests):
+    """Send (method, path) requests concurrently; the endpoints finish once all have been answered or queued."""
+    import httpx
+
+    release = asyncio.Event()
+    calls = []
+    transport = httpx.ASGITransport(app=_app(release, calls))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        tasks = [asyncio.create_task(client.request(method, path, content=b"x" * 1000)) for method, path in requests]
+        for _ in range(50):  # Let every request reach its endpoint, the queue or a rejection
+            await asyncio.sleep(0)
+        release.set()
+        responses = await asyncio.gather(*tasks)
+    return responses, calls
+
+
+class TestGate:
+    """Tests for the Gate queue."""
+
+    def test_queues_in_order_then_rejects(self):
+        from backend.api.admission import AdmissionRejected, Gate
+
+        gate = Gate("processing", lambda: 1, lambda: 1)
+
+        async def scenario():
+            first = await gate.acquire()
+            second = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0)
+            assert (gate.active, gate.queued) == (1, 1)
+            with pytest.raises(AdmissionRejected) as rejected:
+                await gate.acquire()
+            assert rejected.value.status_code == 429 and rejected.value.retry_after >= 1
+
+            gate.release(first)
+            gate.release(await second)
+            assert (gate.active, gate.queued) == (0, 0)
+
+        asyncio.run(scenario())
+
+        assert gate.stats == {"admitted": 2, "completed": 2, "rejected": 1, "timed_out": 0}
+
+    def test_queue_timeout_is_a_503_and_frees_the_place(self):
+        from backend.api.admission import AdmissionRejected, Gate
+
+        gate = Gate("processing", lambda: 1, lambda: 1)
+
+        async def scenario():
+            first = await gate.acquire()
+            with pytest.raises(AdmissionRejected) as timed_out:
+                await gate.acquire(timeout=0.01)
+            assert timed_out.value.status_code == 503
+            assert gate.queued == 0
+            gate.release(first)
+            assert gate.active == 0
+            gate.release(await gate.acquire())
+
+        asyncio.run(scenario())
+
+        assert gate.stats["timed_out"] == 1
+
+    def test_cancelled_waiters_are_skipped(self):
+        from backend.api.admission import Gate
+
+        gate = Gate("processing", lambda: 1, lambda: 2)
+
+        async def scenario():
+            first = await gate.acquire()
+            gone = asyncio.create_task(gate.acquire())
+            waiting = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0)
+            gone.cancel()
+            await asyncio.sleep(0)
+            assert gate.queued == 1
+            gate.release(first)
+            gate.release(await waiting)
+
+        asyncio.run(scenario())
+
+        assert gate.active == 0
+
+    def test_unlimited(self):
+        from backend.api.admission import Gate
+
+        gate = Gate("upload", lambda: 0)
+
+        async def scenario():
+            return [await gate.acquire() for _ in range(100)]
+
+        asyncio.run(scenario())
+
+        assert gate.active == 100 and gate.stats["rejected"] == 0
+
+    def test_retry_after_follows_the_drain_rate(self, monkeypatch):
+        from backend.api import admission
+        from backend.core import config
+
+        monkeypatch.setattr(config, "ADMISSION_RETRY_AFTER_MAX_SECONDS", 600)
+        gate = admission.Gate("processing", lambda: 2, lambda: 10)
+        assert gate.retry_after() == admission.DEFAULT_RETRY_AFTER_SECONDS
+
+        # Two jobs of about a minute, long ago: half the mean duration, with two slots
+        gate.release(time.monotonic() - 59.9)
+        gate.release(time.monotonic() - 59.9)
+        gate._completions.clear()
+        assert gate.retry_after() == 30
+
+        # 30 completions in the window: one every 10 s
+        gate._completions.extend([time.monotonic()] * 30)
+        assert gate.retry_after() == 10
+        gate._waiters.extend([None] * 5)  # Five queued ahead
+        assert gate.retry_after() == 60
+        monkeypatch.setattr(config, "ADMISSION_RETRY_AFTER_MAX_SECONDS", 45)
+        assert gate.retry_after() == 45
+
+
+class TestAdmissionMiddleware:
+    """Tests for AdmissionMiddleware on the upload and process routes."""
+
+    def test_processing_burst_is_queued_then_shed(self, gates):
+        _, processing = gates
+
+        responses, calls = asyncio.run(_burst([("POST", f"/jobs/job-{index}/process") for index in range(4)]))
+
+        assert [response.status_code for response in responses] == [200, 200, 429, 429]
+        assert calls == [("process", "job-0"), ("process", "job-1")]
+        assert int(responses[2].headers["retry-after"]) >= 1
+        assert "try again later" in responses[3].json()["detail"]
+        assert processing.stats == {"admitted": 2, "completed": 2, "rejected": 2, "timed_out": 0}
+        assert (processing.active, processing.queued) == (0, 0)
+
+    def test_uploads_are_rejected_before_the_body_is_read(self, gates):
+        uploads, _ = gates
+
+        responses, calls = asyncio.run(_burst([("POST", "/jobs")] * 3))
+
+        assert [response.status_code for response in responses] == [200, 429, 429]
+        assert calls == [("upload", 1000)]
+        assert uploads.stats["rejected"] == 2
+
+    def test_other_routes_and_disabled_pass_through(self, gates, monkeypatch):
+        from backend.core import config
+
+        responses, _ = asyncio.run(_burst([("POST", "/jobs/batch-delete")] * 3))
+        assert all(response.status_code == 200 for response in responses)
+
+        monkeypatch.setattr(config, "ADMISSION_CONTROL", False)
+        responses, _ = asyncio.run(_burst([("POST", "/jobs")] * 3))
+        assert all(response.status_code == 200 for response in responses)
+
+    def test_stats(self, gates):
+        from backend.api.admission import admission_stats
+
+        asyncio.run(_burst([("POST", "/jobs/job-1/process")] * 3))
+        stats = admission_stats()
+
+        assert stats["enabled"] is True
+        assert stats["processing"]["rejected"] == 1
+        assert stats["processing"]["max_queued"] == 1
+        assert stats["processing"]["drain_rate_per_minute"] > 0
+        assert stats["uploads"]["admitted"] == 0
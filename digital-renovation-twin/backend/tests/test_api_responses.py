@@ -0,0 +1,229 @@
+"""Tests for fast JSON responses and response compression."""
+
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+def _app():
+    from fastapi import APIRouter, FastAPI
+    from fastapi.responses import Response, StreamingResponse
+    from pydantic import BaseModel
+
+    from backend.api.compression import CompressionMiddleware
+    from backend.api.responses import FastJSONRoute
+
+    class Job(BaseModel):
+        job_id: str
+
+    router = APIRouter(route_class=FastJSONRoute)
+    rows = [{"job_id": f"job-{index:05d}", "status": "completed", "label": "Façade"} for index in range(200)]
+
+    @router.get("/jobs")
+    async def jobs():
+        return rows
+
+    @router.post("/jobs", status_code=201)
+    def create():
+        return {"job_id": "job-1", "path": Path("/data/uploads/job-1")}
+
+    @router.get("/typed", response_model=Job)
+    def typed():
+        return {"job_id": "job-1", "secret": "filtered out"}
+
+    @router.get("/small")
+    def small():
+        return {"status": "ok"}
+
+    @router.get("/report.pdf")
+    def report():
+        return Response(b"%PDF-" + b"0" * 5000, media_type="application/pdf")
+
+    @router.get("/partial")
+    def partial():
+        return Response(b"{" * 5000, status_code=206, media_type="application/json")
+
+    @router.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"{}" * 5000), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @router.get("/tagged")
+    def tagged():
+        return Response(b"{}" * 5000, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @router.get("/stream")
+    def stream():
+        return StreamingResponse((b'{"line": %d}\n' % index for index in range(1000)), media_type="application/x-ndjson")
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+@pytest.fixture
+def raw_client():
+    """A client that shows the bytes on the wire (no transparent decoding)."""
+    import httpx
+
+    transport = httpx.ASGITransport(app=_app())
+
+    async def request(path, accept_encoding="gzip"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+                return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+    return lambda *args, **kwargs: asyncio.run(request(*args, **kwargs))
+
+
+class TestDumps:
+    """Tests for responses.dumps."""
+
+    def test_matches_stdlib_json(self):
+        from backend.api.responses import dumps
+
+        payload = {"job_id": "a", "score": 1.5, "nested": [{"none": None, "ok": True}], "label": "Façade"}
+
+        assert json.loads(dumps(payload)) == payload
+
+    def test_encodes_what_jsonable_encoder_did(self):
+        from backend.api.responses import dumps
+        from backend.services.damage_records import DamageRecord
+
+        record = DamageRecord.from_dict({"id": "d1", "type": "crack", "severity": "high", "image": "a.jpg"})
+        payload = {
+            "path": Path("/data/x.json"),
+            "at": datetime(2026, 1, 2, tzinfo=timezone.utc),
+            "tags": {"a"},
+            "scores": np.array([1, 2]),
+            "mean": np.float64(0.5),
+            "record": record,
+            1: "non-string key",
+        }
+
+        decoded = json.loads(dumps(payload))
+
+        assert decoded["path"] == "/data/x.json"
+        assert decoded["at"].startswith("2026-01-02T00:00:00")
+        assert decoded["tags"] == ["a"]
+        assert decoded["scores"] == [1, 2] and decoded["mean"] == 0.5
+        assert decoded["record"] == json.loads(json.dumps(record.to_dict()))
+        assert decoded["1"] == "non-string key"
+
+
+class TestFastJSONRoute:
+    """Routes return their values through dumps, keeping status codes and response models."""
+
+    def test_plain_values_skip_jsonable_encoder(self, monkeypatch):
+        from fastapi import routing
+        from fastapi.testclient import TestClient
+
+        def no_encoder(*args, **kwargs):
+            raise AssertionError("jsonable_encoder must not run")
+
+        monkeypatch.setattr(routing, "jsonable_encoder", no_encoder)
+        client = TestClient(_app())
+
+        response = client.get("/jobs")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()[0] == {"job_id": "job-00000", "status": "completed", "label": "Façade"}
+        created = client.post("/jobs")
+        assert created.status_code == 201
+        assert created.json() == {"job_id": "job-1", "path": "/data/uploads/job-1"}
+
+    def test_response_models_still_filter(self):
+        from fastapi.testclient import TestClient
+
+        assert TestClient(_app()).get("/typed").json() == {"job_id": "job-1"}
+
+    def test_api_routers_use_it(self):
+        from backend.api import routes_results, routes_upload
+        from backend.api.responses import FastJSONRoute
+
+        for router in (routes_results.router, routes_upload.router):
+            assert all(isinstance(route, FastJSONRoute) for route in router.routes)
+
+
+class TestCompression:
+    """Tests for CompressionMiddleware."""
+
+    def test_gzip_above_the_threshold(self, raw_client):
+        response, body = raw_client("/jobs")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(body)
+        assert json.loads(gzip.decompress(body))[199]["job_id"] == "job-00199"
+        assert len(body) < len(gzip.decompress(body)) / 5
+
+    def test_brotli_preferred_when_installed(self, raw_client):
+        brotli = pytest.importorskip("brotli")
+
+        response, body = raw_client("/jobs", "gzip, br")
+
+        assert response.headers["content-encoding"] == "br"
+        assert json.loads(brotli.decompress(body))[0]["job_id"] == "job-00000"
+
+    @pytest.mark.parametrize("accept", ["", "identity", "gzip;q=0", "deflate"])
+    def test_identity_when_gzip_not_accepted(self, raw_client, accept):
+        response, body = raw_client("/jobs", accept)
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert json.loads(body)[0]["job_id"] == "job-00000"
+
+    @pytest.mark.parametrize("path", ["/small", "/report.pdf", "/partial"])
+    def test_small_binary_and_partial_responses_pass_through(self, raw_client, path):
+        response, body = raw_client(path)
+
+        assert "content-encoding" not in response.headers
+        assert len(body) == int(response.headers["content-length"])
+
+    def test_encoded_responses_are_not_compressed_twice(self, raw_client):
+        response, body = raw_client("/encoded")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == b"{}" * 5000
+
+    def test_compressed_responses_get_weak_etags(self, raw_client):
+        compressed, body = raw_client("/tagged")
+        identity, _ = raw_client("/tagged", "identity")
+
+        assert compressed.headers["content-encoding"] == "gzip" and gzip.decompress(body) == b"{}" * 5000
+        assert compressed.headers["etag"] == 'W/"v1"'
+        assert identity.headers["etag"] == '"v1"'
+
+    def test_streams_are_compressed_incrementally(self, raw_client):
+        response, body = raw_client("/stream")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = gzip.decompress(body).splitlines()
+        assert len(lines) == 1000 and json.loads(lines[-1]) == {"line": 999}
+
+    def test_disabled(self, raw_client, monkeypatch):
+        from backend.core import config
+
+        monkeypatch.setattr(config, "RESPONSE_COMPRESSION", False)
+        response, _ = raw_client("/jobs")
+
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "br"),
+        ("*;q=0.2, br;q=0", "gzip"),
+        ("identity", None),
+        ("GZIP;Q=0.8", "gzip"),
+    ])
+    def test_negotiation(self, header, expected):
+        from backend.api.compression import negotiate_encoding
+
+        assert negotiate_encoding(header, ["br", "gzip"]) == expected
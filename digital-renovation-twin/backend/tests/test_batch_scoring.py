@@ -0,0 +1,163 @@
+"""Tests for vectorized batch rescoring of risk and cost."""
+
+import json
+import random
+
+import pytest
+
+TYPES = ["crack", "spalling", "water_damage", "moisture", "discoloration", "corrosion", "efflorescence", None]
+SEVERITIES = ["low", "Medium", "HIGH", "critical", 3, None]
+MAGNITUDES = [0.1, 0.7, 1.3, 2.45, 12, "3.3", -1, 0, None]
+
+
+def _random_damage(rng):
+    damage = {"severity": rng.choice(SEVERITIES)}
+    if rng.random() < 0.9:
+        damage["type"] = rng.choice(TYPES)
+    if rng.random() < 0.5:
+        damage["approx_length_m"] = rng.choice(MAGNITUDES)
+    if rng.random() < 0.5:
+        damage["approx_area_m2"] = rng.choice(MAGNITUDES)
+    if rng.random() < 0.1:
+        damage.pop("severity")
+    return damage
+
+
+@pytest.fixture
+def damaged_jobs(temp_data_dir):
+    """Write damages.json for `count` jobs with varied (and untidy) records; returns their IDs."""
+    from backend.core.job_paths import job_reconstruction_dir
+
+    def _make(count, seed=7):
+        rng = random.Random(seed)
+        job_ids = []
+        for index in range(count):
+            job_id = f"job-{index:04d}"
+            recon_dir = job_reconstruction_dir(job_id)
+            recon_dir.mkdir(parents=True)
+            damages = [_random_damage(rng) for _ in range(rng.randint(0, 60))]
+            (recon_dir / "damages.json").write_text(json.dumps({"job_id": job_id, "damages": damages}))
+            job_ids.append(job_id)
+        return job_ids
+
+    return _make
+
+
+def _outputs(job_ids):
+    from backend.core.job_paths import job_reconstruction_dir
+
+    return {
+        job_id: (
+            (job_reconstruction_dir(job_id) / "risk_summary.json").read_bytes(),
+            (job_reconstruction_dir(job_id) / "cost_estimate.json").read_bytes(),
+        )
+        for job_id in job_ids
+    }
+
+
+def _per_job(job_ids):
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.risk_scoring import compute_risk_summary
+
+    for job_id in job_ids:
+        compute_risk_summary(job_id)
+        generate_cost_estimate(job_id)
+    return _outputs(job_ids)
+
+
+class TestBatchRescoring:
+    """Tests for batch_scoring matching the per-job functions."""
+
+    def test_files_are_identical_to_per_job_scoring(self, damaged_jobs):
+        from backend.services.batch_scoring import rescore_jobs
+
+        job_ids = damaged_jobs(120)
+        expected = _per_job(job_ids)
+
+        result = rescore_jobs(job_ids)
+
+        assert result["jobs"] == 120
+        assert result["skipped"] == {}
+        assert _outputs(job_ids) == expected
+
+    def test_changed_tables_are_picked_up(self, damaged_jobs, monkeypatch):
+        from backend.services import cost_estimation, risk_scoring
+        from backend.services.batch_scoring import rescore_jobs
+
+        job_ids = damaged_jobs(40, seed=11)
+        monkeypatch.setitem(risk_scoring.TYPE_WEIGHTS, "efflorescence", 1.1)
+        monkeypatch.setitem(risk_scoring.TYPE_WEIGHTS, "crack", 3.7)
+        monkeypatch.setitem(risk_scoring.SEVERITY_MULTIPLIER, "critical", 2.2)
+        monkeypatch.setattr(risk_scoring, "SEVERITY_SCALE", 3.0)
+        monkeypatch.setitem(cost_estimation.RATE_TABLE, "corrosion", {"unit": "m2", "rate": 42.5})
+        expected = _per_job(job_ids)
+
+        rescore_jobs(job_ids)
+
+        assert _outputs(job_ids) == expected
+
+    def test_intervals_only_when_asked(self, damaged_jobs, monkeypatch):
+        from backend.cli import rescore_cmd
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services import uncertainty
+
+        job_ids = damaged_jobs(3, seed=5)
+        simulated = []
+        monkeypatch.setattr(uncertainty, "simulate_intervals", lambda columns, index: simulated.append(index) or {
+            "total_cost": {"p10": 1.0, "p50": 2.0, "p90": 3.0},
+            "overall_risk_score": {"p10": 1.0, "p50": 2.0, "p90": 3.0},
+        })
+
+        rescore_cmd(job_ids)
+        assert simulated == []
+        cost = json.loads((job_reconstruction_dir(job_ids[0]) / "cost_estimate.json").read_text())
+        assert "total_cost_interval" not in cost
+
+        rescore_cmd(job_ids, intervals=True)
+        assert simulated == [0, 1, 2]
+
+    def test_unscorable_jobs_are_skipped(self, damaged_jobs):
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.batch_scoring import rescore_jobs
+
+        good, bad = damaged_jobs(2)
+        (job_reconstruction_dir(bad) / "damages.json").write_text(json.dumps({"damages": [{"type": "crack"}, "crack"]}))
+
+        result = rescore_jobs([good, bad, "missing-job"], dry_run=True)
+
+        assert result["jobs"] == 1
+        assert set(result["skipped"]) == {bad, "missing-job"}
+
+    def test_segment_sums_add_left_to_right(self):
+        import numpy as np
+
+        from backend.services.batch_scoring import segment_sums
+
+        rng = np.random.default_rng(3)
+        values = rng.random(12000) * 10.0 ** rng.integers(-3, 6, 12000)
+        lengths = rng.integers(0, 200, 60)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        values = values[:lengths.sum()]
+
+        expected = []
+        for start, length in zip(starts.tolist(), lengths.tolist()):
+            total = 0.0
+            for value in values[start:start + length].tolist():
+                total += value
+            expected.append(total)
+
+        assert segment_sums(values, starts, lengths).tolist() == expected
+
+    def test_round_exact_matches_round(self):
+        import numpy as np
+
+        from backend.services.batch_scoring import round_exact
+
+        rng = np.random.default_rng(5)
+        ties = np.arange(-20000, 20000) / 1000  # Many x.xx5 values, most not exactly representable
+        values = np.concatenate((ties, rng.random(20000) * 1e6, [0.0, -0.0, 1e300, float("inf"), float("nan")]))
+
+        for digits in (1, 2):
+            expected = [round(value, digits) for value in values.tolist()]
+            actual = round_exact(values, digits)
+            assert [repr(value) for value in actual] == [repr(value) for value in expected]
@@ -0,0 +1,186 @@
+"""Tests for cold-storage tiering and transparent reads of tiered artifacts."""
+
+import gzip
+import time
+import zipfile
+
+import pytest
+
+DAY = 86400
+
+
+@pytest.fixture
+def finished_job(temp_data_dir):
+    """Run a job through the mock pipeline and backdate it by `age_days`."""
+    from backend.core.job_paths import job_upload_dir
+    from backend.services import job_metadata
+    from backend.services.analyzers import get_damage_analyzer
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.report_cache import ensure_report
+    from backend.services.risk_scoring import compute_risk_summary
+
+    def _make(job_id, age_days=120, status="completed"):
+        upload_dir = job_upload_dir(job_id)
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "facade.jpg").write_bytes(b"\xff\xd8jpeg")
+        job_metadata.create_job_metadata(job_id, ["facade.jpg"], label=job_id)
+        get_damage_analyzer(mode="mock").analyze(job_id)
+        generate_cost_estimate(job_id)
+        compute_risk_summary(job_id)
+        ensure_report(job_id)
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(time.time() - age_days * DAY))
+        metadata = job_metadata.load_metadata(job_id)
+        metadata.update(status=status, updated_at=stamp)
+        job_metadata.save_metadata(job_id, metadata)
+        return job_id
+
+    return _make
+
+
+@pytest.fixture
+def client(temp_data_dir, temp_database):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes_results import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def _footprint(*roots):
+    return sum(path.stat().st_size for root in roots for path in root.rglob("*") if path.is_file())
+
+
+class TestColdTiering:
+    """Tests for cold_storage.tier_cold_jobs."""
+
+    def test_cold_job_is_compressed_and_still_readable(self, finished_job):
+        """Test that tiered JSON and PDF artifacts are gzipped and read back unchanged."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, UPLOADS_DIR
+        from backend.core.job_paths import job_reconstruction_dir, job_report_path, job_upload_dir
+        from backend.services import job_metadata
+        from backend.services.cold_storage import tier_cold_jobs
+        from backend.services.risk_scoring import compute_risk_summary
+
+        job_id = finished_job("job-cold")
+        before_meta = job_metadata.load_metadata(job_id)
+        before_risk = compute_risk_summary(job_id)
+        report_bytes = job_report_path(job_id).read_bytes()
+        before_size = _footprint(UPLOADS_DIR, RECONSTRUCTIONS_DIR)
+
+        report = tier_cold_jobs(90)
+
+        assert report["jobs_tiered"] == 1
+        assert report["bytes_after"] < report["bytes_before"]
+        assert not (job_upload_dir(job_id) / "job_meta.json").exists()
+        assert (job_upload_dir(job_id) / "job_meta.json.gz").exists()
+        assert (job_upload_dir(job_id) / "facade.jpg").exists()
+        assert not (job_reconstruction_dir(job_id) / "damages.json").exists()
+        assert _footprint(UPLOADS_DIR, RECONSTRUCTIONS_DIR) < before_size
+
+        assert job_metadata.load_metadata(job_id) == before_meta
+        assert compute_risk_summary(job_id) == before_risk
+        assert [job["job_id"] for job in job_metadata.list_jobs()] == [job_id]
+        with gzip.open(job_report_path(job_id).with_suffix(".pdf.gz")) as fp:
+            assert fp.read() == report_bytes
+
+    def test_archive_mode_packs_reconstruction_json(self, finished_job):
+        """Test that TIER_ARCHIVE folds reconstruction JSON into one zip that readers use."""
+        from backend.core.artifacts import read_json
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.cold_storage import tier_cold_jobs
+        from backend.services.pdf_generator import generate_pdf_report
+
+        job_id = finished_job("job-archive")
+        recon_dir = job_reconstruction_dir(job_id)
+        damages = read_json(recon_dir / "damages.json")
+
+        tier_cold_jobs(90, archive=True)
+
+        assert not any(path.name.endswith((".json", ".json.gz")) for path in recon_dir.iterdir())
+        with zipfile.ZipFile(recon_dir / "artifacts.zip") as archive:
+            assert "damages.json" in archive.namelist()
+        assert read_json(recon_dir / "damages.json") == damages
+        # Regenerating a report from a cold job works and writes a hot PDF again
+        assert generate_pdf_report(job_id).read_bytes().startswith(b"%PDF")
+
+    def test_hot_and_processing_jobs_are_left_alone(self, finished_job):
+        from backend.core.job_paths import job_upload_dir
+        from backend.services.cold_storage import tier_cold_jobs
+
+        finished_job("job-hot", age_days=5)
+        finished_job("job-busy", status="processing")
+
+        assert tier_cold_jobs(90)["jobs_tiered"] == 0
+        assert (job_upload_dir("job-hot") / "job_meta.json").exists()
+        assert (job_upload_dir("job-busy") / "job_meta.json").exists()
+
+    def test_dry_run_changes_nothing(self, finished_job):
+        from backend.core.job_paths import job_upload_dir
+        from backend.services.cold_storage import tier_cold_jobs
+
+        finished_job("job-cold")
+        report = tier_cold_jobs(90, dry_run=True)
+
+        assert report["jobs_tiered"] == 1
+        assert report["files"] > 0
+        assert (job_upload_dir("job-cold") / "job_meta.json").exists()
+
+    def test_rewritten_artifact_is_hot_again(self, finished_job):
+        """Test that a plain file written after tiering wins over the cold copy."""
+        from backend.services import job_metadata
+        from backend.services.cold_storage import tier_cold_jobs
+
+        job_id = finished_job("job-reheat")
+        tier_cold_jobs(90)
+        job_metadata.rename_job(job_id, "Renamed")
+
+        assert job_metadata.load_metadata(job_id)["label"] == "Renamed"
+        assert tier_cold_jobs(90)["jobs_tiered"] == 0  # Just updated, so hot again
+
+    def test_deleting_cold_job_reclaims_compressed_copies(self, finished_job):
+        from backend.core.job_paths import job_reconstruction_dir, job_report_path
+        from backend.services import job_metadata
+        from backend.services.cold_storage import tier_cold_jobs
+
+        job_id = finished_job("job-gone")
+        tier_cold_jobs(90)
+        job_metadata.delete_job(job_id)
+
+        assert not job_reconstruction_dir(job_id).exists()
+        assert not job_report_path(job_id).with_suffix(".pdf.gz").exists()
+
+
+class TestColdReportDownload:
+    """Tests for serving a cold-tier PDF report."""
+
+    def test_gzip_client_gets_compressed_report(self, finished_job, client):
+        """Test that the .pdf.gz is sent with Content-Encoding and decodes to the original PDF."""
+        from backend.core.job_paths import job_report_path
+        from backend.services.cold_storage import tier_cold_jobs
+
+        job_id = finished_job("job-pdf")
+        original = job_report_path(job_id).read_bytes()
+        tier_cold_jobs(90)
+
+        response = client.get(f"/jobs/{job_id}/report.pdf", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == original  # The test client decodes gzip
+
+    def test_identity_client_gets_decompressed_report(self, finished_job, client):
+        from backend.core.job_paths import job_report_path
+        from backend.services.cold_storage import tier_cold_jobs
+
+        job_id = finished_job("job-pdf")
+        original = job_report_path(job_id).read_bytes()
+        tier_cold_jobs(90)
+
+        response = client.get(f"/jobs/{job_id}/report.pdf", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.content == original
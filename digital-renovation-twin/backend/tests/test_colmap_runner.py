@@ -0,0 +1,226 @@
+"""Tests for the asyncio COLMAP runner, against a fake colmap executable."""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+
+import pytest
+
+# Prints its command and some log lines, then fails or hangs when asked to
+FAKE_COLMAP = """#!{python}
+import os, sys, time
+step = sys.argv[1]
+print("fake colmap", " ".join(sys.argv[1:]), flush=True)
+for index in range(int(os.environ.get("FAKE_COLMAP_LINES", "3"))):
+    print(f"{{step}} line {{index}}", file=sys.stderr if index % 2 else sys.stdout)
+if step == os.environ.get("FAKE_COLMAP_FAIL"):
+    print(f"{{step}} exploded", file=sys.stderr)
+    sys.exit(3)
+if step == os.environ.get("FAKE_COLMAP_HANG"):
+    with open(os.environ["FAKE_COLMAP_PIDFILE"], "w") as fp:
+        fp.write(str(os.getpid()))
+    print("waiting", flush=True)
+    time.sleep(60)
+"""
+
+
+def _exif_header(with_gps):
+    """Leading bytes of a little-endian EXIF JPEG whose IFD0 holds one tag."""
+    tag = 0x8825 if with_gps else 0x010F
+    ifd = struct.pack("<H", 1) + struct.pack("<HHII", tag, 4, 1, 26) + struct.pack("<I", 0)
+    tiff = b"II*\x00" + struct.pack("<I", 8) + ifd
+    return b"\xff\xd8\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\x00\x00" + tiff
+
+
+@pytest.fixture
+def colmap_job(temp_data_dir, tmp_path, monkeypatch):
+    """A job with uploads and metadata, and COLMAP_EXECUTABLE pointing at the fake."""
+    from backend.core import config
+    from backend.core.job_paths import job_upload_dir
+    from backend.services.job_metadata import create_job_metadata
+
+    fake = tmp_path / "colmap"
+    fake.write_text(FAKE_COLMAP.format(python=sys.executable))
+    fake.chmod(0o755)
+    monkeypatch.setattr(config, "COLMAP_EXECUTABLE", str(fake))
+
+    def _create(job_id="colmap-job", count=3, header=b"\xff\xd8\xff\xe0"):
+        upload_dir = job_upload_dir(job_id)
+        upload_dir.mkdir(parents=True)
+        names = [f"img{index:04d}.jpg" for index in range(count)]
+        for name in names:
+            (upload_dir / name).write_bytes(header + b"\x00" * 64)
+        create_job_metadata(job_id, names)
+        return job_id
+
+    return _create
+
+
+class TestChooseMatcher:
+    """Tests for colmap_runner.choose_matcher."""
+
+    def test_detects_gps(self):
+        from backend.services.colmap_runner import has_gps
+
+        assert has_gps(_exif_header(True))
+        assert not has_gps(_exif_header(False))
+        assert not has_gps(b"\xff\xd8\xff\xe0 JFIF")
+        assert not has_gps(b"Exif\x00\x00II*\x00\xff\xff\x00\x00")
+
+    def test_picks_by_image_count(self, colmap_job, monkeypatch):
+        from backend.core import config
+        from backend.services.colmap_runner import choose_matcher
+        from backend.services.storage import list_job_uploads
+
+        monkeypatch.setattr(config, "COLMAP_EXHAUSTIVE_MAX_IMAGES", 5)
+        monkeypatch.setattr(config, "COLMAP_VOCAB_TREE_MIN_IMAGES", 20)
+        small = list_job_uploads(colmap_job("small", 5))
+        large = list_job_uploads(colmap_job("large", 20))
+        geotagged = list_job_uploads(colmap_job("geotagged", 20, header=_exif_header(True)))
+
+        assert choose_matcher(small) == "exhaustive"
+        assert choose_matcher(large) == "sequential"
+        assert choose_matcher(geotagged) == "spatial"
+        monkeypatch.setattr(config, "COLMAP_VOCAB_TREE_PATH", "/vocab.bin")
+        assert choose_matcher(large) == "vocab_tree"
+        assert choose_matcher(large[:19]) == "sequential"
+
+    def test_explicit_matcher(self, colmap_job, monkeypatch):
+        from backend.core import config
+        from backend.services.colmap_runner import choose_matcher
+        from backend.services.reconstruction_service import ReconstructionError
+        from backend.services.storage import list_job_uploads
+
+        images = list_job_uploads(colmap_job())
+        monkeypatch.setattr(config, "COLMAP_MATCHER", "sequential")
+        assert choose_matcher(images) == "sequential"
+        monkeypatch.setattr(config, "COLMAP_MATCHER", "vocab_tree")
+        with pytest.raises(ReconstructionError):
+            choose_matcher(images)
+
+
+class TestRunColmap:
+    """Tests for colmap_runner.run_colmap and its blocking wrapper."""
+
+    def test_streams_logs_and_progress(self, colmap_job, monkeypatch):
+        from backend.core import config
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services import colmap_runner
+        from backend.services.job_metadata import load_metadata
+        from backend.services.reconstruction_service import run_colmap_reconstruction_in_docker
+
+        monkeypatch.setattr(config, "COLMAP_NUM_THREADS", 2)
+        monkeypatch.setattr(colmap_runner, "PROGRESS_INTERVAL_SECONDS", 0.0)
+        monkeypatch.setenv("FAKE_COLMAP_LINES", "5")
+        job_id = colmap_job()
+
+        metadata = run_colmap_reconstruction_in_docker(job_id)
+
+        recon_dir = job_reconstruction_dir(job_id)
+        assert metadata["matcher"] == "exhaustive"
+        assert [step["step"] for step in metadata["colmap_steps"]] == ["feature_extractor", "exhaustive_matcher", "mapper"]
+        assert all(step["returncode"] == 0 for step in metadata["colmap_steps"])
+        log = (recon_dir / "colmap.log").read_text()
+        assert "mapper line 4" in log and "exhaustive_matcher line 3" in log
+        assert "--SiftMatching.num_threads 2" in log
+        assert (recon_dir / "image_list.txt").read_text().split() == ["img0000.jpg", "img0001.jpg", "img0002.jpg"]
+        progress = load_metadata(job_id)["reconstruction_progress"]
+        assert progress["step"] == "mapper" and progress["steps"] == 3
+        assert json.dumps(metadata)  # Metadata stays serializable and holds no full output
+
+    def test_object_storage_images_are_staged_for_the_run(self, colmap_job, monkeypatch):
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services import colmap_runner
+        from backend.services.reconstruction_service import run_colmap_reconstruction_in_docker
+        from backend.services.storage import get_storage
+
+        job_id = colmap_job()
+        staging = job_reconstruction_dir(job_id) / colmap_runner.STAGING_DIRNAME
+        monkeypatch.setattr(type(get_storage()), "local_path", lambda self, key: None)  # Like S3
+        staged = []
+        commands = colmap_runner.colmap_commands
+
+        def recording(job_id, matcher, image_dir=None):
+            staged.extend(sorted(path.name for path in image_dir.iterdir()))
+            return commands(job_id, matcher, image_dir)
+
+        monkeypatch.setattr(colmap_runner, "colmap_commands", recording)
+
+        run_colmap_reconstruction_in_docker(job_id)
+
+        assert staged == ["img0000.jpg", "img0001.jpg", "img0002.jpg"]
+        log = (job_reconstruction_dir(job_id) / "colmap.log").read_text()
+        assert f"--image_path {staging.resolve()}" in log
+        assert not staging.exists()  # Removed after the run
+
+    def test_failed_step_raises_with_its_output(self, colmap_job, monkeypatch):
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.reconstruction_service import ReconstructionError, run_colmap_reconstruction_in_docker
+
+        monkeypatch.setenv("FAKE_COLMAP_FAIL", "exhaustive_matcher")
+        job_id = colmap_job()
+
+        with pytest.raises(ReconstructionError, match="exhaustive_matcher exploded"):
+            run_colmap_reconstruction_in_docker(job_id)
+        log = (job_reconstruction_dir(job_id) / "colmap.log").read_text()
+        assert "failed with exit code 3" in log
+        assert "fake colmap mapper" not in log  # Later steps are not run
+
+    def test_missing_executable(self, colmap_job, monkeypatch):
+        from backend.core import config
+        from backend.services.reconstruction_service import ReconstructionError, run_colmap_reconstruction_in_docker
+
+        monkeypatch.setattr(config, "COLMAP_EXECUTABLE", "/nonexistent/colmap")
+        with pytest.raises(ReconstructionError, match="not found"):
+            run_colmap_reconstruction_in_docker(colmap_job())
+
+    def test_cancellation_terminates_colmap(self, colmap_job, monkeypatch, tmp_path):
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.colmap_runner import cancel_colmap, run_colmap
+
+        pidfile = tmp_path / "colmap.pid"
+        monkeypatch.setenv("FAKE_COLMAP_HANG", "feature_extractor")
+        monkeypatch.setenv("FAKE_COLMAP_PIDFILE", str(pidfile))
+        job_id = colmap_job()
+
+        async def scenario():
+            task = asyncio.ensure_future(run_colmap(job_id))
+            while not pidfile.exists() or not pidfile.read_text():
+                await asyncio.sleep(0.02)
+            assert cancel_colmap(job_id)
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        started = time.monotonic()
+        asyncio.run(scenario())
+
+        assert time.monotonic() - started < 10
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pidfile.read_text()), 0)
+        assert "[CANCELLED] feature_extractor" in (job_reconstruction_dir(job_id) / "colmap.log").read_text()
+        assert not cancel_colmap(job_id)
+
+    def test_deleting_the_job_cancels_colmap(self, colmap_job, monkeypatch, tmp_path):
+        from backend.services import job_metadata
+        from backend.services.colmap_runner import run_colmap
+
+        pidfile = tmp_path / "colmap.pid"
+        monkeypatch.setenv("FAKE_COLMAP_HANG", "feature_extractor")
+        monkeypatch.setenv("FAKE_COLMAP_PIDFILE", str(pidfile))
+        job_id = colmap_job()
+
+        async def scenario():
+            task = asyncio.ensure_future(run_colmap(job_id))
+            while not pidfile.exists() or not pidfile.read_text():
+                await asyncio.sleep(0.02)
+            await asyncio.to_thread(job_metadata.tombstone_job, job_id)  # As DELETE /jobs/{id} does
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pidfile.read_text()), 0)
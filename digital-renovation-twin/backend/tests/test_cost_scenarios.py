@@ -0,0 +1,128 @@
+"""Tests for what-if cost scenarios."""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def client(temp_data_dir, temp_database):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes_results import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def job_id(sample_job_with_damages):
+    from backend.services import cost_scenarios
+
+    cost_scenarios._columns_cache.clear()
+    yield sample_job_with_damages["job_id"]
+    cost_scenarios._columns_cache.clear()
+
+
+def _estimate(job_id):
+    from backend.core.job_paths import job_reconstruction_dir
+    from backend.services.cost_estimation import generate_cost_estimate
+
+    generate_cost_estimate(job_id)
+    return json.loads((job_reconstruction_dir(job_id) / "cost_estimate.json").read_text())
+
+
+class TestEvaluateScenarios:
+    """Tests for cost_scenarios.evaluate_scenarios."""
+
+    def test_matches_generate_cost_estimate(self, job_id):
+        from backend.services import cost_estimation
+        from backend.services.cost_scenarios import evaluate_scenarios, job_damage_columns, parse_scenarios
+
+        overrides = {"crack": 27.5, "spalling": {"rate": 61.0, "unit": "m2"}, "default": 12.25}
+        result = evaluate_scenarios(job_damage_columns(job_id), parse_scenarios([{}, {"rates": overrides}]))
+
+        for scenario, rates in zip(result["scenarios"], [{}, overrides]):
+            with pytest.MonkeyPatch.context() as patch:
+                for damage_type, value in rates.items():
+                    rate = value["rate"] if isinstance(value, dict) else value
+                    patch.setitem(cost_estimation.RATE_TABLE, damage_type, {**cost_estimation.RATE_TABLE[damage_type], "rate": rate})
+                estimate = _estimate(job_id)
+
+            assert scenario["total_cost"] == estimate["total_cost"]
+            assert [item["type"] for item in result["items"]] == [item["type"] for item in estimate["items"]]
+            assert scenario["costs"] == [item["cost"] for item in estimate["items"]]
+            assert scenario["units"] == [item["unit"] for item in estimate["items"]]
+            assert [item["total_quantity"] for item in result["items"]] == [item["total_quantity"] for item in estimate["items"]]
+
+    def test_exchange_rate_converts_totals(self, job_id):
+        from backend.services.cost_scenarios import evaluate_scenarios, job_damage_columns, parse_scenarios
+
+        usd, eur = evaluate_scenarios(
+            job_damage_columns(job_id),
+            parse_scenarios([{"name": "US"}, {"name": "EU", "currency": "EUR", "exchange_rate": 2.0}]),
+        )["scenarios"]
+
+        assert eur["currency"] == "EUR"
+        assert eur["total_cost"] == usd["total_cost"]
+        assert eur["total_cost_base"] == round(usd["total_cost"] * 2, 2)
+
+    @pytest.mark.parametrize("scenarios", [
+        [],
+        [{"rates": {"crack": -1}}],
+        [{"rates": {"crack": "cheap"}}],
+        [{"exchange_rate": 0}],
+        [{"rates": ["crack"]}],
+    ])
+    def test_invalid_scenarios(self, scenarios):
+        from backend.services.cost_scenarios import parse_scenarios
+
+        with pytest.raises(ValueError):
+            parse_scenarios(scenarios)
+
+    def test_parsed_damages_are_cached_until_the_file_changes(self, job_id, sample_job_with_damages, monkeypatch):
+        from backend.services import cost_scenarios
+
+        reads = []
+        original = cost_scenarios.load_damage_records
+        monkeypatch.setattr(cost_scenarios, "load_damage_records", lambda job: reads.append(job) or original(job))
+
+        first = cost_scenarios.job_damage_columns(job_id)
+        assert cost_scenarios.job_damage_columns(job_id) is first
+        assert len(reads) == 1
+
+        damages = sample_job_with_damages["damages"]
+        damages["damages"].append({"type": "crack", "severity": "high", "approx_length_m": 4.0})
+        sample_job_with_damages["damages_path"].write_text(json.dumps(damages))
+
+        assert cost_scenarios.job_damage_columns(job_id).damage_count == first.damage_count + 1
+        assert len(reads) == 2
+
+
+class TestCostScenariosEndpoint:
+    """Tests for POST /jobs/{job_id}/cost-scenarios."""
+
+    def test_compares_scenarios_without_writing(self, job_id, client):
+        from backend.core.job_paths import job_reconstruction_dir
+
+        response = client.post(f"/jobs/{job_id}/cost-scenarios", json={
+            "scenarios": [{"name": "Current"}, {"name": "Premium", "rates": {"crack": 40}}],
+        })
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [scenario["name"] for scenario in body["scenarios"]] == ["Current", "Premium"]
+        assert body["scenarios"][1]["total_cost"] > body["scenarios"][0]["total_cost"]
+        assert all(len(scenario["costs"]) == len(body["items"]) for scenario in body["scenarios"])
+        assert not (job_reconstruction_dir(job_id) / "cost_estimate.json").exists()
+
+    def test_errors(self, job_id, client, temp_data_dir):
+        from backend.services import job_metadata
+
+        assert client.post(f"/jobs/{job_id}/cost-scenarios", json={"scenarios": [{"rates": {"crack": -5}}]}).status_code == 400
+        assert client.post("/jobs/missing/cost-scenarios", json={"scenarios": [{}]}).status_code == 404
+
+        job_metadata.create_job_metadata("unprocessed-job", [])
+        assert client.post("/jobs/unprocessed-job/cost-scenarios", json={"scenarios": [{}]}).status_code == 409
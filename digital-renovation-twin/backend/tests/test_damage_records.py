@@ -0,0 +1,103 @@
+"""Tests for the typed damage records shared by the pipeline stages."""
+
+import json
+import tracemalloc
+
+import pytest
+
+MESSY_DAMAGES = [
+    {"type": "Crack", "severity": "HIGH", "approx_length_m": "2.5", "confidence": 0.9},
+    {"type": "water damage", "severity": 2, "approx_area_m2": 1.2},
+    {"type": "bulging", "severity": "critical", "approx_length_m": 0, "approx_area_m2": 3.0},
+    {"severity": None, "approx_length_m": -1, "confidence": 7},
+    {"type": "efflorescence", "severity": 9.5, "approx_area_m2": "lots"},
+]
+
+
+class TestDamageRecord:
+    """Tests for DamageRecord normalization."""
+
+    def test_normalizes_once(self):
+        from backend.services.damage_records import DamageRecord, DamageType, Severity
+
+        records = [DamageRecord.from_dict(damage) for damage in MESSY_DAMAGES]
+
+        assert [record.type for record in records] == [
+            DamageType.CRACK, DamageType.WATER_DAMAGE, DamageType.UNKNOWN, DamageType.UNKNOWN, DamageType.EFFLORESCENCE,
+        ]
+        assert [record.severity for record in records] == [
+            Severity.HIGH, Severity.LOW, Severity.MEDIUM, Severity.MEDIUM, Severity.HIGH,
+        ]
+        assert [record.quantity for record in records] == [2.5, 1.2, 3.0, 1.0, 1.0]
+        assert [record.confidence for record in records] == [0.9, 1.0, 1.0, 1.0, 1.0]
+        assert records[0].type is DamageType("crack")  # Interned enum members
+
+    def test_round_trips_through_damages_json(self):
+        from backend.services.damage_records import DamageRecord
+
+        damage = {
+            "type": "spalling", "severity": "low", "description": "Corner",
+            "approx_area_m2": 0.5, "confidence": 0.8, "image": "a.jpg", "bbox": [1, 2, 3, 4],
+        }
+        record = DamageRecord.from_dict(damage)
+
+        assert record.to_dict() == damage
+        assert DamageRecord.from_dict(record.to_dict()) == record
+        assert DamageRecord.from_dict({"type": "bulging"}).to_dict()["reported_type"] == "bulging"
+
+    def test_rejects_non_objects(self):
+        from backend.services.damage_records import DamageRecord
+
+        with pytest.raises(ValueError):
+            DamageRecord.from_dict(["crack"])
+
+    def test_records_are_compact(self):
+        from backend.services.damage_records import DamageRecord
+
+        damages = [dict(MESSY_DAMAGES[0], description=f"Crack {index}") for index in range(2000)]
+
+        def allocated(build):
+            tracemalloc.start()
+            try:
+                kept = build()
+                return tracemalloc.get_traced_memory()[0], kept
+            finally:
+                tracemalloc.stop()
+
+        as_dicts, _ = allocated(lambda: [json.loads(json.dumps(damage)) for damage in damages])
+        as_records, _ = allocated(lambda: [DamageRecord.from_dict(damage) for damage in damages])
+        assert as_records < as_dicts / 2
+
+
+class TestStagesAgree:
+    """Cost, risk and report read the same records the same way."""
+
+    def test_types_and_counts_match_across_stages(self, sample_job_with_damages):
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.pdf_generator import load_report_inputs
+        from backend.services.risk_scoring import compute_risk_summary
+
+        job_id = sample_job_with_damages["job_id"]
+        sample_job_with_damages["damages_path"].write_text(json.dumps({"job_id": job_id, "damages": MESSY_DAMAGES}))
+
+        cost = json.loads(generate_cost_estimate(job_id).read_text())
+        risk = json.loads(compute_risk_summary(job_id).read_text())
+        summary = load_report_inputs(job_id)["damage_summary"]
+
+        cost_counts = {item["type"]: item["count"] for item in cost["items"]}
+        risk_counts = {damage_type: stats["count"] for damage_type, stats in risk["by_type"].items()}
+        report_counts = {info["type"]: info["count"] for info in summary["by_type"]}
+        assert cost_counts == risk_counts == report_counts == {"crack": 1, "water_damage": 1, "unknown": 2, "efflorescence": 1}
+
+    def test_analyzers_write_normalized_records(self, sample_job_with_damages):
+        from backend.services.analyzers import MockDamageAnalyzer
+        from backend.services.damage_records import DamageType, Severity
+
+        path = MockDamageAnalyzer().analyze(sample_job_with_damages["job_id"])
+
+        damages = json.loads(path.read_text())["damages"]
+        assert damages
+        for damage in damages:
+            assert DamageType(damage["type"]) is not DamageType.UNKNOWN
+            assert Severity(damage["severity"])
+            assert 0 <= damage["confidence"] <= 1
@@ -0,0 +1,146 @@
+"""Tests for streaming damages.json and the single-pass aggregators."""
+
+import gzip
+import json
+import random
+import tracemalloc
+
+import pytest
+
+
+def _random_damage(rng):
+    damage = {
+        "type": rng.choice(["crack", "spalling", "moisture", "décollement", "quote\"d"]),
+        "severity": rng.choice(["low", "medium", "high", 7, 0, None]),
+        "confidence": round(rng.random(), 3),
+        "description": "x" * rng.randint(0, 300) + " \\ [ ] { } , :",
+        "bbox": [rng.randint(0, 4000) for _ in range(4)],
+    }
+    if rng.random() < 0.5:
+        damage["approx_length_m"] = rng.choice([1, 12345678901234567890, 1.5e-3, -0.0, 2.0])
+    return damage
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    from backend.core import artifacts
+
+    monkeypatch.setattr(artifacts, "STREAM_CHUNK_CHARS", 7)
+
+
+class TestIterJsonItems:
+    """Tests for artifacts.iter_json_items."""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_matches_json_load_across_chunk_boundaries(self, tmp_path, small_chunks, indent):
+        from backend.core.artifacts import iter_json_items
+
+        rng = random.Random(1)
+        document = {
+            "job_id": "job-1",
+            "meta": {"damages": ["not", "these"]},
+            "damages": [_random_damage(rng) for _ in range(60)],
+            "trailer": [1, 2, 3],
+        }
+        path = tmp_path / "damages.json"
+        path.write_text(json.dumps(document, indent=indent, ensure_ascii=False), encoding="utf-8")
+
+        assert list(iter_json_items(path, "damages")) == document["damages"]
+
+    @pytest.mark.parametrize("text,items", [
+        ('{"damages": []}', []),
+        ('{}', []),
+        ('{"job_id": "a"}', []),
+        (' \n{ "damages" : [ 1 , 22 , 333 ] } \n', [1, 22, 333]),
+    ])
+    def test_edge_cases(self, tmp_path, small_chunks, text, items):
+        from backend.core.artifacts import iter_json_items
+
+        path = tmp_path / "damages.json"
+        path.write_text(text)
+        assert list(iter_json_items(path, "damages")) == items
+
+    @pytest.mark.parametrize("text", ['', '[]', '{"damages": [1, 2', '{"damages": [1 2]}', '{"damages": [{"a": }]}'])
+    def test_malformed_documents_raise(self, tmp_path, text):
+        from backend.core.artifacts import iter_json_items
+
+        path = tmp_path / "damages.json"
+        path.write_text(text)
+        with pytest.raises(ValueError):
+            list(iter_json_items(path, "damages"))
+
+    def test_missing_file_raises_before_iterating(self, tmp_path):
+        from backend.core.artifacts import iter_json_items
+
+        with pytest.raises(FileNotFoundError):
+            iter_json_items(tmp_path / "damages.json", "damages")
+
+    def test_reads_cold_copies(self, tmp_path):
+        from backend.core.artifacts import iter_json_items
+
+        path = tmp_path / "damages.json"
+        with gzip.open(str(path) + ".gz", "wt", encoding="utf-8") as fp:
+            json.dump({"damages": [{"type": "crack"}]}, fp)
+        assert list(iter_json_items(path, "damages")) == [{"type": "crack"}]
+
+    def test_memory_does_not_grow_with_the_document(self, tmp_path):
+        from backend.core.artifacts import iter_json_items
+
+        rng = random.Random(2)
+        damages = [_random_damage(rng) for _ in range(200)]
+
+        def peak(copies):
+            path = tmp_path / f"damages-{copies}.json"
+            path.write_text(json.dumps({"damages": damages * copies}))
+            tracemalloc.start()
+            try:
+                for _ in iter_json_items(path, "damages"):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small, large = peak(10), peak(100)
+        assert large < small * 1.5
+        assert large < 1024 * 1024
+
+
+class TestStreamingAggregators:
+    """Tests for cost, risk and report statistics computed from the stream."""
+
+    def test_report_summary(self):
+        from backend.services.damage_records import DamageRecord
+        from backend.services.pdf_generator import summarize_damages
+
+        summary = summarize_damages(map(DamageRecord.from_dict, [
+            {"type": "crack", "severity": "high"},
+            {"type": "crack", "severity": "low"},
+            {"severity": 9},
+            {"type": "crack"},
+        ]))
+
+        assert summary == {
+            "count": 4,
+            "by_type": [
+                {"type": "crack", "count": 3, "average_severity": 16 / 3},
+                {"type": "unknown", "count": 1, "average_severity": 8.0},
+            ],
+        }
+
+    def test_large_job_is_scored_from_the_stream(self, sample_job_with_damages):
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.pdf_generator import load_report_inputs
+        from backend.services.risk_scoring import compute_risk_summary
+
+        job_id = sample_job_with_damages["job_id"]
+        damages = sample_job_with_damages["damages"]["damages"] * 5000
+        sample_job_with_damages["damages_path"].write_text(json.dumps({"job_id": job_id, "damages": damages}))
+
+        risk = json.loads(compute_risk_summary(job_id).read_text())
+        cost = json.loads(generate_cost_estimate(job_id).read_text())
+        inputs = load_report_inputs(job_id)
+
+        assert risk["total_damage_count"] == len(damages)
+        assert sum(item["count"] for item in cost["items"]) == len(damages)
+        assert inputs["damage_summary"]["count"] == len(damages)
+        assert "damages" not in inputs
@@ -0,0 +1,187 @@
+"""Tests for the database layer (sync and async access paths)."""
+
+import asyncio
+
+import pytest
+
+
+class TestAsyncJobRecords:
+    """Tests for the async_* job helpers."""
+
+    @pytest.fixture(autouse=True)
+    def async_engine(self, temp_database, monkeypatch):
+        monkeypatch.setattr(temp_database, "ASYNC_DATABASE_ENABLED", True)
+
+    def test_async_path_uses_asyncio_engine(self, temp_database):
+        """Test that a file-backed SQLite database enables the async engine."""
+        assert temp_database.async_database_enabled()
+
+    def test_async_create_visible_to_sync_helpers(self, temp_database):
+        """Test that rows written through the async engine are read by the sync path."""
+        async def scenario():
+            await temp_database.async_create_job_record("job-async-1", label="Async", file_count=3)
+
+        asyncio.run(scenario())
+
+        job = temp_database.get_job_record("job-async-1")
+        assert job is not None
+        assert job.label == "Async"
+        assert job.file_count == 3
+        assert job.status == "uploaded"
+
+    def test_async_list_matches_sync_list(self, temp_database):
+        """Test that async listing returns the same rows and order as the sync helper."""
+        for i in range(5):
+            temp_database.create_job_record(f"job-{i}", label=f"Building {i}")
+
+        async def scenario():
+            return await temp_database.async_list_job_records()
+
+        async_jobs = asyncio.run(scenario())
+        sync_jobs = temp_database.list_job_records()
+
+        assert [job["job_id"] for job in async_jobs] == [job["job_id"] for job in sync_jobs]
+        assert len(async_jobs) == 5
+
+    def test_async_stats(self, temp_database):
+        """Test that async stats count jobs by status."""
+        temp_database.create_job_record("job-a")
+        temp_database.create_job_record("job-b")
+        temp_database.update_job_record("job-b", status="completed")
+
+        async def scenario():
+            return await temp_database.async_get_job_stats()
+
+        stats = asyncio.run(scenario())
+        assert stats == {
+            "jobs_total": 2,
+            "jobs_completed": 1,
+            "jobs_failed": 0,
+            "jobs_processing": 0,
+        }
+        assert stats == temp_database.get_job_stats()
+
+    def test_falls_back_to_worker_threads_when_disabled(self, temp_database, monkeypatch):
+        """Test that disabling the async engine still serves the async helpers."""
+        monkeypatch.setattr(temp_database, "ASYNC_DATABASE_ENABLED", False)
+
+        async def scenario():
+            await temp_database.async_create_job_record("job-threaded", label="Threaded")
+            return await temp_database.async_list_job_records()
+
+        jobs = asyncio.run(scenario())
+        assert [job["job_id"] for job in jobs] == ["job-threaded"]
+        assert temp_database._async_engine is None
+
+    def test_memory_database_skips_async_engine(self, monkeypatch):
+        """Test that in-memory SQLite never gets a second (empty) async engine."""
+        from backend import database
+
+        monkeypatch.setattr(database, "DATABASE_URL", "sqlite:///:memory:")
+        assert not database.async_database_enabled()
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for sync-to-async URL mapping."""
+
+    @pytest.mark.parametrize(
+        "url,expected",
+        [
+            ("sqlite:////tmp/jobs.db", "sqlite+aiosqlite:////tmp/jobs.db"),
+            ("postgresql://user@host/db", "postgresql+asyncpg://user@host/db"),
+            ("postgresql+asyncpg://user@host/db", "postgresql+asyncpg://user@host/db"),
+        ],
+    )
+    def test_maps_driver(self, url, expected):
+        from backend.database import _async_database_url
+
+        assert _async_database_url(url) == expected
+
+
+class TestProductionSqliteProfile:
+    """Tests for WAL mode, the read-only pool and the batched writer."""
+
+    def test_database_runs_in_wal_mode(self, temp_database):
+        """Test that the production profile switches the journal to WAL."""
+        from sqlalchemy import text
+
+        with temp_database.get_db() as db:
+            mode = db.execute(text("PRAGMA journal_mode")).scalar()
+        assert mode == "wal"
+
+    def test_reads_use_read_only_connections(self, temp_database):
+        """Test that read sessions cannot write."""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        temp_database.create_job_record("job-ro")
+        with temp_database.get_read_db() as db:
+            with pytest.raises(OperationalError):
+                db.execute(text("DELETE FROM jobs"))
+        assert temp_database.get_job_record("job-ro") is not None
+
+    def test_failed_write_does_not_sink_its_batch(self, temp_database):
+        """Test that a duplicate insert fails alone while batched neighbours commit."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        temp_database.create_job_record("job-dup")
+
+        def create(job_id):
+            try:
+                temp_database.create_job_record(job_id)
+                return True
+            except Exception:
+                return False
+
+        ids = ["job-dup"] + [f"job-ok-{i}" for i in range(15)]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            outcomes = dict(zip(ids, pool.map(create, ids)))
+
+        assert outcomes.pop("job-dup") is False
+        assert all(outcomes.values())
+        assert len(temp_database.list_job_records()) == 16
+
+    def test_64_concurrent_writers(self, temp_database):
+        """Stress test: 64 threads updating jobs concurrently never hit 'database is locked'."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        writers = 64
+        updates_per_writer = 20
+        for i in range(writers):
+            temp_database.create_job_record(f"job-{i}")
+
+        def writer(i):
+            job_id = f"job-{i}"
+            for step in range(updates_per_writer):
+                temp_database.update_job_record(
+                    job_id,
+                    status="processing",
+                    overall_risk_score=float(step),
+                )
+            temp_database.update_job_record(job_id, status="completed", total_estimated_cost=float(i))
+
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            list(pool.map(writer, range(writers)))
+
+        jobs = {job["job_id"]: job for job in temp_database.list_job_records()}
+        assert len(jobs) == writers
+        for i in range(writers):
+            job = jobs[f"job-{i}"]
+            assert job["status"] == "completed"
+            assert job["overall_risk_score"] == float(updates_per_writer - 1)
+            assert job["total_estimated_cost"] == float(i)
+
+        stats = temp_database.get_write_stats()
+        assert stats["failed_writes"] == 0
+        assert stats["writes"] == writers * (updates_per_writer + 2)
+        # Concurrent writers must have been grouped into shared commits
+        assert stats["batches"] < stats["writes"]
+        assert temp_database.get_job_stats()["jobs_completed"] == writers
+
+    def test_default_profile_writes_directly(self, temp_database, monkeypatch):
+        """Test that SQLITE_PROFILE=default bypasses the writer thread."""
+        monkeypatch.setattr(temp_database, "SQLITE_PROFILE", "default")
+
+        temp_database.create_job_record("job-direct")
+        assert temp_database._job_writer is None
+        assert temp_database.get_job_record("job-direct") is not None
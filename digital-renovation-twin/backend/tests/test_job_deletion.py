@@ -0,0 +1,180 @@
+"""Tests for tombstone deletion and background reclamation."""
+
+import pytest
+
+
+@pytest.fixture
+def client(temp_data_dir, temp_database):
+    """API client for the results routes, backed by the temp data dir and database."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes_results import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_job(temp_data_dir, temp_database):
+    """Create a job with uploads, reconstruction artifacts, a report and a DB row."""
+    from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+    from backend.services import job_metadata
+
+    def _make(job_id):
+        upload_dir = UPLOADS_DIR / job_id
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "facade.jpg").write_bytes(b"x" * 1000)
+        job_metadata.create_job_metadata(job_id, ["facade.jpg"], label=job_id)
+        recon_dir = RECONSTRUCTIONS_DIR / job_id
+        recon_dir.mkdir(parents=True)
+        (recon_dir / "damages.json").write_text('{"damages": []}')
+        (REPORTS_DIR / f"{job_id}.pdf").write_bytes(b"%PDF-1.4")
+        temp_database.create_job_record(job_id, label=job_id)
+        return job_id
+
+    return _make
+
+
+class TestTombstoneDeletion:
+    """Deletion hides jobs immediately and leaves file removal to the reclaimer."""
+
+    def test_delete_hides_job_immediately(self, client, make_job, temp_database):
+        """Test that a deleted job disappears from listings before files are reclaimed."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, TRASH_DIR
+
+        make_job("job-keep")
+        make_job("job-drop")
+
+        response = client.delete("/jobs/job-drop")
+        assert response.status_code == 200
+
+        listed = [job["job_id"] for job in client.get("/jobs").json()]
+        assert listed == ["job-keep"]
+        assert client.get("/jobs/job-drop").status_code == 404
+        assert temp_database.get_job_record("job-drop") is None
+        assert temp_database.get_job_record("job-drop", include_deleted=True) is not None
+
+        # Files are still on disk until the reclaimer runs
+        assert (TRASH_DIR / "job-drop").exists()
+        assert (RECONSTRUCTIONS_DIR / "job-drop").exists()
+
+    def test_delete_unknown_job_is_404(self, client):
+        assert client.delete("/jobs/missing").status_code == 404
+
+    def test_batch_delete(self, client, make_job):
+        """Test that batch delete reports deleted and unknown IDs separately."""
+        for job_id in ("job-a", "job-b", "job-c"):
+            make_job(job_id)
+
+        response = client.post(
+            "/jobs/batch-delete",
+            json={"job_ids": ["job-a", "job-c", "job-missing", "../uploads", "job-a"]},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["deleted"] == ["job-a", "job-c"]
+        assert body["not_found"] == ["job-missing", "../uploads"]
+        assert body["deleted_count"] == 2
+
+        listed = [job["job_id"] for job in client.get("/jobs").json()]
+        assert listed == ["job-b"]
+
+    def test_delete_all_moves_uploads_in_one_step(self, client, make_job, temp_database):
+        """Test that delete-all empties listings and leaves a single trash batch."""
+        from backend.core.config import TRASH_DIR, UPLOADS_DIR
+
+        for i in range(5):
+            make_job(f"job-{i}")
+
+        response = client.delete("/jobs")
+        assert response.json()["deleted_count"] == 5
+        assert client.get("/jobs").json() == []
+        assert list(UPLOADS_DIR.iterdir()) == []
+        assert len(list(TRASH_DIR.iterdir())) == 1
+        assert temp_database.get_job_stats()["jobs_total"] == 0
+
+
+class TestReclaimer:
+    """Tests for reclaim_trash."""
+
+    def test_reclaims_all_artifacts_and_purges_rows(self, client, make_job, temp_database):
+        """Test that reclamation removes uploads, reconstructions, reports and DB rows."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, TRASH_DIR
+        from backend.services.reclaimer import reclaim_trash
+
+        make_job("job-1")
+        make_job("job-2")
+        make_job("job-3")
+        client.delete("/jobs/job-1")
+        client.post("/jobs/batch-delete", json={"job_ids": ["job-2"]})
+
+        stats = reclaim_trash(max_jobs_per_second=0)
+
+        assert stats["jobs_reclaimed"] == 2
+        assert stats["records_purged"] == 2
+        assert stats["bytes_freed"] > 2000
+        assert list(TRASH_DIR.iterdir()) == []
+        for job_id in ("job-1", "job-2"):
+            assert not (RECONSTRUCTIONS_DIR / job_id).exists()
+            assert not (REPORTS_DIR / f"{job_id}.pdf").exists()
+            assert temp_database.get_job_record(job_id, include_deleted=True) is None
+        assert (RECONSTRUCTIONS_DIR / "job-3").exists()
+
+    def test_reclaims_delete_all_batch(self, client, make_job):
+        """Test that a delete-all trash batch is reclaimed job by job."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, TRASH_DIR
+        from backend.services.reclaimer import reclaim_trash
+
+        for i in range(4):
+            make_job(f"job-{i}")
+        client.delete("/jobs")
+
+        stats = reclaim_trash(max_jobs_per_second=0, workers=2)
+
+        assert stats["jobs_reclaimed"] == 4
+        assert list(TRASH_DIR.iterdir()) == []
+        assert list(RECONSTRUCTIONS_DIR.iterdir()) == []
+
+    def test_rate_limit_spaces_out_jobs(self, temp_data_dir):
+        """Test that the reclaimer honours its jobs-per-second cap."""
+        import time
+
+        from backend.core.config import TRASH_DIR
+        from backend.services.reclaimer import reclaim_trash
+
+        for i in range(5):
+            (TRASH_DIR / f"job-{i}").mkdir(parents=True)
+
+        start = time.monotonic()
+        stats = reclaim_trash(max_jobs_per_second=50)
+        elapsed = time.monotonic() - start
+
+        assert stats["jobs_reclaimed"] == 5
+        assert elapsed >= 4 / 50
+
+
+class TestSchemaUpgrade:
+    """Databases created before the tombstone column get it added at startup."""
+
+    def test_adds_deleted_at_column(self, temp_database):
+        import sqlite3
+
+        db_path = temp_database.DATABASE_URL.replace("sqlite:///", "")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE jobs (id VARCHAR(36) PRIMARY KEY, label VARCHAR(255), created_at DATETIME, "
+            "updated_at DATETIME, status VARCHAR(50), building_health_grade VARCHAR(1), "
+            "overall_risk_score FLOAT, overall_severity_index FLOAT, total_estimated_cost FLOAT, "
+            "pipeline_version VARCHAR(20), error TEXT, file_count INTEGER)"
+        )
+        conn.execute("INSERT INTO jobs (id, status) VALUES ('legacy', 'completed')")
+        conn.commit()
+        conn.close()
+
+        from sqlalchemy import inspect
+
+        columns = {column["name"] for column in inspect(temp_database._get_engine()).get_columns("jobs")}
+        assert "deleted_at" in columns
+        assert temp_database.tombstone_job_records(["legacy"]) == ["legacy"]
@@ -0,0 +1,180 @@
+"""Tests for job path resolution, the sharded layout and layout migration."""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def legacy_job(temp_data_dir):
+    """Create a job in the old flat layout with absolute paths stored in its metadata."""
+    from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+
+    def _make(job_id, status="completed"):
+        upload_dir = UPLOADS_DIR / job_id
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "facade.jpg").write_bytes(b"jpeg")
+        recon_dir = RECONSTRUCTIONS_DIR / job_id
+        recon_dir.mkdir(parents=True)
+        (recon_dir / "damages.json").write_text('{"damages": []}')
+        report_path = REPORTS_DIR / f"{job_id}.pdf"
+        report_path.write_bytes(b"%PDF-1.4")
+        (upload_dir / "job_meta.json").write_text(json.dumps({
+            "job_id": job_id,
+            "status": status,
+            "created_at": "2024-01-15T09:00:00Z",
+            "uploaded_files": ["facade.jpg"],
+            "outputs": {
+                "damages": str(recon_dir / "damages.json"),
+                "report": str(report_path),
+            },
+        }))
+        return job_id
+
+    return _make
+
+
+class TestJobPaths:
+    """Tests for backend.core.job_paths."""
+
+    def test_new_jobs_are_sharded(self, temp_data_dir):
+        """Test that a job with nothing on disk resolves to its hash-prefixed location."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+        from backend.core.job_paths import job_reconstruction_dir, job_report_path, job_upload_dir, shard_prefix
+
+        first, second = shard_prefix("job-new")
+        assert job_upload_dir("job-new") == UPLOADS_DIR / first / second / "job-new"
+        assert job_reconstruction_dir("job-new") == RECONSTRUCTIONS_DIR / first / second / "job-new"
+        assert job_report_path("job-new") == REPORTS_DIR / first / second / "job-new.pdf"
+
+    def test_flat_jobs_still_resolve(self, legacy_job):
+        """Test that unmigrated jobs are found in the flat layout."""
+        from backend.core.config import UPLOADS_DIR
+        from backend.core.job_paths import job_upload_dir
+
+        legacy_job("job-old")
+        assert job_upload_dir("job-old") == UPLOADS_DIR / "job-old"
+
+    def test_flat_layout_setting(self, temp_data_dir, monkeypatch):
+        """Test that STORAGE_LAYOUT=flat writes new jobs directly under the root."""
+        from backend.core import config
+        from backend.core.job_paths import job_upload_dir
+
+        monkeypatch.setattr(config, "STORAGE_LAYOUT", "flat")
+        assert job_upload_dir("job-new") == config.UPLOADS_DIR / "job-new"
+
+    def test_listing_spans_both_layouts(self, legacy_job):
+        """Test that job listings include flat and sharded jobs."""
+        from backend.services import job_metadata
+
+        legacy_job("job-old")
+        job_metadata.create_job_metadata("job-new", ["a.jpg"])
+
+        assert {job["job_id"] for job in job_metadata.list_jobs()} == {"job-old", "job-new"}
+
+    def test_pipeline_runs_in_sharded_layout(self, temp_data_dir):
+        """Test that every pipeline step writes through the sharded paths."""
+        from backend.core.config import RECONSTRUCTIONS_DIR
+        from backend.core.job_paths import job_reconstruction_dir, job_report_path, job_upload_dir
+        from backend.services import job_metadata
+        from backend.services.analyzers import get_damage_analyzer
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.pdf_generator import generate_pdf_report
+        from backend.services.risk_scoring import compute_risk_summary
+
+        job_id = "job-sharded"
+        job_upload_dir(job_id).mkdir(parents=True)
+        (job_upload_dir(job_id) / "facade.jpg").write_bytes(b"jpeg")
+        job_metadata.create_job_metadata(job_id, ["facade.jpg"])
+
+        get_damage_analyzer(mode="mock").analyze(job_id)
+        generate_cost_estimate(job_id)
+        compute_risk_summary(job_id)
+        report_path = generate_pdf_report(job_id)
+
+        assert report_path == job_report_path(job_id)
+        assert report_path.exists()
+        assert (job_reconstruction_dir(job_id) / "risk_summary.json").exists()
+        assert not (RECONSTRUCTIONS_DIR / job_id).exists()
+
+
+class TestLayoutMigration:
+    """Tests for storage_migration.migrate_layout."""
+
+    def test_migrates_flat_jobs_and_rewrites_stored_paths(self, legacy_job):
+        """Test that all three entries move and metadata points at the new files."""
+        from backend.core.config import UPLOADS_DIR
+        from backend.core.job_paths import job_report_path, job_upload_dir
+        from backend.services import job_metadata
+        from backend.services.storage_migration import migrate_layout
+
+        legacy_job("job-1")
+        legacy_job("job-2")
+
+        stats = migrate_layout("sharded")
+
+        assert stats["jobs_moved"] == 2
+        assert stats["entries_moved"] == 6
+        assert not (UPLOADS_DIR / "job-1").exists()
+        assert job_upload_dir("job-1").parent.parent.parent == UPLOADS_DIR
+        meta = job_metadata.load_metadata("job-1")
+        assert meta["outputs"]["report"] == str(job_report_path("job-1"))
+        assert job_report_path("job-1").exists()
+        assert migrate_layout("sharded")["jobs_pending"] == 0
+
+    def test_dry_run_moves_nothing(self, legacy_job):
+        from backend.core.config import UPLOADS_DIR
+        from backend.services.storage_migration import migrate_layout
+
+        legacy_job("job-1")
+        stats = migrate_layout("sharded", dry_run=True)
+
+        assert stats["jobs_pending"] == 1
+        assert stats["entries_moved"] == 3
+        assert (UPLOADS_DIR / "job-1").exists()
+
+    def test_processing_jobs_are_skipped(self, legacy_job):
+        """Test that jobs with a running pipeline stay put until the next run."""
+        from backend.core.config import UPLOADS_DIR
+        from backend.services.storage_migration import migrate_layout
+
+        legacy_job("job-busy", status="processing")
+        stats = migrate_layout("sharded")
+
+        assert stats["jobs_skipped"] == 1
+        assert (UPLOADS_DIR / "job-busy").exists()
+
+    def test_round_trip_to_flat(self, legacy_job):
+        """Test that migrating back to flat restores the old paths and prunes shards."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+        from backend.services.storage_migration import migrate_layout
+
+        legacy_job("job-1")
+        migrate_layout("sharded")
+        migrate_layout("flat")
+
+        assert sorted(path.name for path in UPLOADS_DIR.iterdir()) == ["job-1"]
+        assert sorted(path.name for path in RECONSTRUCTIONS_DIR.iterdir()) == ["job-1"]
+        assert sorted(path.name for path in REPORTS_DIR.iterdir()) == ["job-1.pdf"]
+
+
+class TestShardedDeletion:
+    """Deletion and reclamation with sharded job directories."""
+
+    def test_delete_all_reclaims_only_deleted_jobs(self, temp_data_dir):
+        """Test that a sharded delete-all batch is reclaimed per job, not per shard directory."""
+        from backend.core.config import TRASH_DIR
+        from backend.core.job_paths import job_reconstruction_dir, job_upload_dir
+        from backend.services import job_metadata
+        from backend.services.reclaimer import reclaim_trash
+
+        for i in range(3):
+            job_upload_dir(f"job-{i}").mkdir(parents=True)
+            job_reconstruction_dir(f"job-{i}").mkdir(parents=True)
+
+        assert job_metadata.tombstone_all_jobs() == 3
+        stats = reclaim_trash(max_jobs_per_second=0)
+
+        assert stats["jobs_reclaimed"] == 3
+        assert list(TRASH_DIR.iterdir()) == []
+        assert not any(job_reconstruction_dir(f"job-{i}").exists() for i in range(3))
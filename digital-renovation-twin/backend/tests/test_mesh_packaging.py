@@ -0,0 +1,246 @@
+"""Tests for level-of-detail GLB packaging of reconstructions."""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+
+def _grid(n, colors=True):
+    """A wavy n x n vertex surface: 2 (n - 1)^2 triangles."""
+    from backend.services.mesh_packaging import Geometry
+
+    x, y = np.meshgrid(np.linspace(0, 30, n), np.linspace(0, 10, n))
+    positions = np.column_stack([x.ravel(), y.ravel(), (0.2 * np.sin(3 * x) * np.cos(2 * y)).ravel()])
+    index = np.arange(n * n).reshape(n, n)
+    a, b, c, d = index[:-1, :-1].ravel(), index[:-1, 1:].ravel(), index[1:, :-1].ravel(), index[1:, 1:].ravel()
+    faces = np.concatenate([np.column_stack([a, b, c]), np.column_stack([b, d, c])])
+    rgb = (np.arange(n * n * 3).reshape(-1, 3) % 256).astype(np.uint8) if colors else None
+    return Geometry(positions, faces, rgb)
+
+
+def _parse_glb(data):
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    assert (magic, version, length) == (0x46546C67, 2, len(data))
+    json_length, json_type = struct.unpack_from("<II", data, 12)
+    assert json_type == 0x4E4F534A and json_length % 4 == 0
+    document = json.loads(data[20:20 + json_length])
+    bin_length, bin_type = struct.unpack_from("<II", data, 20 + json_length)
+    assert bin_type == 0x004E4942
+    binary = data[28 + json_length:28 + json_length + bin_length]
+    assert document["buffers"][0]["byteLength"] == len(binary)
+
+    def accessor(index):
+        info = document["accessors"][index]
+        view = document["bufferViews"][info["bufferView"]]
+        assert view["byteOffset"] % 4 == 0
+        dtype = {5126: "<f4", 5125: "<u4", 5123: "<u2", 5121: "u1"}[info["componentType"]]
+        width = {"SCALAR": 1, "VEC3": 3, "VEC4": 4}[info["type"]]
+        raw = binary[view["byteOffset"]:view["byteOffset"] + view["byteLength"]]
+        return np.frombuffer(raw, dtype=dtype).reshape(info["count"] // width if width == 1 else info["count"], -1)
+
+    primitive = document["meshes"][0]["primitives"][0]
+    return document, primitive, accessor
+
+
+class TestReaders:
+    """Tests for the OBJ, PLY and COLMAP readers."""
+
+    def test_obj_polygons_corners_and_colors(self, tmp_path):
+        from backend.services.mesh_packaging import load_geometry
+
+        path = tmp_path / "model.obj"
+        path.write_text(
+            "# quad and triangle\n"
+            "v 0 0 0 1 0 0\nv 1 0 0 0 1 0\nv 1 1 0 0 0 1\nv 0 1 0 1 1 1\n"
+            "vt 0 0\nvn 0 0 1\n"
+            "f 1/1/1 2/1/1 3/1/1 4/1/1\n"
+            "f -4 -2 -1\n"
+        )
+
+        geometry = load_geometry(path)
+
+        assert geometry.positions.shape == (4, 3)
+        assert geometry.faces.tolist() == [[0, 1, 2], [0, 2, 3], [0, 2, 3]]
+        assert geometry.colors.tolist() == [[255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 255]]
+
+    @pytest.mark.parametrize("fmt", ["ascii", "binary_little_endian", "binary_big_endian"])
+    def test_ply(self, tmp_path, fmt):
+        from backend.services.mesh_packaging import load_geometry
+
+        vertices = [(0.0, 0.0, 0.0, 10, 20, 30), (1.0, 0.0, 0.0, 40, 50, 60), (1.0, 1.0, 0.5, 70, 80, 90), (0.0, 1.0, 0.0, 1, 2, 3)]
+        faces = [[0, 1, 2], [0, 2, 3, 1]]
+        header = (
+            f"ply\nformat {fmt} 1.0\ncomment test\nelement vertex 4\n"
+            "property float x\nproperty float y\nproperty float z\n"
+            "property uchar red\nproperty uchar green\nproperty uchar blue\n"
+            "element face 2\nproperty list uchar int vertex_indices\nend_header\n"
+        ).encode()
+        if fmt == "ascii":
+            body = "".join(" ".join(map(str, vertex)) + "\n" for vertex in vertices)
+            body += "".join(f"{len(face)} " + " ".join(map(str, face)) + "\n" for face in faces)
+            body = body.encode()
+        else:
+            order = "<" if fmt == "binary_little_endian" else ">"
+            body = b"".join(struct.pack(order + "fffBBB", *vertex) for vertex in vertices)
+            body += b"".join(struct.pack(order + "B" + "i" * len(face), len(face), *face) for face in faces)
+        path = tmp_path / "model.ply"
+        path.write_bytes(header + body)
+
+        geometry = load_geometry(path)
+
+        assert geometry.positions.tolist()[2] == [1.0, 1.0, 0.5]
+        assert geometry.faces.tolist() == [[0, 1, 2], [0, 2, 3], [0, 3, 1]]
+        assert geometry.colors.tolist()[1] == [40, 50, 60]
+
+    def test_colmap_points(self, tmp_path):
+        from backend.services.mesh_packaging import load_geometry
+
+        points = [(1, (0.5, 1.5, 2.5), (10, 20, 30), 2), (7, (3.0, 4.0, 5.0), (40, 50, 60), 0)]
+        data = struct.pack("<Q", len(points))
+        for point_id, xyz, rgb, track in points:
+            data += struct.pack("<Q3d3BdQ", point_id, *xyz, *rgb, 0.5, track) + b"\x00" * (8 * track)
+        (tmp_path / "points3D.bin").write_bytes(data)
+        (tmp_path / "points3D.txt").write_text(
+            "# 3D point list\n1 0.5 1.5 2.5 10 20 30 0.5 1 2 3 4\n7 3 4 5 40 50 60 0.5\n"
+        )
+
+        for name in ("points3D.bin", "points3D.txt"):
+            geometry = load_geometry(tmp_path / name)
+            assert geometry.faces is None
+            assert geometry.positions.tolist() == [[0.5, 1.5, 2.5], [3.0, 4.0, 5.0]]
+            assert geometry.colors.tolist() == [[10, 20, 30], [40, 50, 60]]
+
+    def test_rejects_unknown_formats(self, tmp_path):
+        from backend.services.mesh_packaging import load_geometry
+
+        (tmp_path / "model.stl").write_bytes(b"solid")
+        with pytest.raises(ValueError):
+            load_geometry(tmp_path / "model.stl")
+
+
+class TestLevels:
+    """Tests for decimation, levels and GLB encoding."""
+
+    def test_levels_fit_their_budgets_coarsest_first(self):
+        from backend.services.mesh_packaging import build_levels
+
+        geometry = _grid(300)  # 178,802 triangles
+
+        levels = build_levels(geometry, [20000, 2000])
+
+        assert [level.size <= budget for level, budget in zip(levels, [2000, 20000])] == [True, True]
+        assert levels[-1] is geometry
+        assert levels[0].size > 200  # Not collapsed to nothing
+        for level in levels:
+            assert level.faces.max() < len(level.positions)
+            assert len(np.unique(np.sort(level.faces, axis=1), axis=0)) == len(level.faces)
+            assert np.ptp(level.positions, axis=0)[0] > 25  # Keeps the overall shape
+
+    def test_point_clouds_are_voxel_downsampled(self):
+        from backend.services.mesh_packaging import Geometry, build_levels
+
+        rng = np.random.default_rng(1)
+        cloud = Geometry(rng.random((50000, 3)) * [20, 10, 0.1], None, rng.integers(0, 256, (50000, 3), dtype=np.uint8))
+
+        coarse, full = build_levels(cloud, [5000])
+
+        assert coarse.faces is None and coarse.size <= 5000
+        assert coarse.colors.shape == (coarse.size, 3)
+        assert full is cloud
+
+    def test_small_models_are_a_single_level(self):
+        from backend.services.mesh_packaging import build_levels
+
+        assert len(build_levels(_grid(10), [20000, 200000])) == 1
+
+    @pytest.mark.parametrize("n,index_type", [(20, 5123), (300, 5125)])
+    def test_glb_round_trip(self, n, index_type):
+        from backend.services.mesh_packaging import encode_glb
+
+        geometry = _grid(n)
+
+        document, primitive, accessor = _parse_glb(encode_glb(geometry))
+
+        assert primitive["mode"] == 4
+        positions = accessor(primitive["attributes"]["POSITION"])
+        assert np.allclose(positions, geometry.positions, atol=1e-5)
+        assert document["accessors"][primitive["indices"]]["componentType"] == index_type
+        assert accessor(primitive["indices"]).reshape(-1, 3).tolist() == geometry.faces.tolist()
+        assert accessor(primitive["attributes"]["COLOR_0"])[:, :3].tolist() == geometry.colors.tolist()
+        assert document["accessors"][0]["min"] == pytest.approx(geometry.positions.min(axis=0).tolist())
+
+    def test_point_cloud_glb(self):
+        from backend.services.mesh_packaging import Geometry, encode_glb
+
+        _, primitive, accessor = _parse_glb(encode_glb(Geometry(np.eye(3), None, None)))
+
+        assert primitive["mode"] == 0 and "indices" not in primitive
+        assert accessor(primitive["attributes"]["POSITION"]).tolist() == np.eye(3).tolist()
+
+    def test_first_level_of_a_large_model_is_small(self):
+        from backend.services.mesh_packaging import build_levels, encode_glb
+
+        geometry = _grid(1000, colors=False)  # 1M vertices, 2M triangles
+
+        first = encode_glb(build_levels(geometry, [20000, 200000])[0])
+
+        assert len(first) < 512 * 1024
+
+
+@pytest.fixture
+def client(temp_data_dir, temp_database):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes_results import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+class TestMeshEndpoints:
+    """Tests for packaging jobs and serving their levels."""
+
+    def test_package_and_serve_levels(self, client, sample_job_with_damages, monkeypatch):
+        from backend.core import config
+        from backend.services.mesh_packaging import package_reconstruction
+
+        job_id = sample_job_with_damages["job_id"]
+        assert client.get(f"/jobs/{job_id}/mesh").status_code == 404
+        monkeypatch.setattr(config, "MESH_LOD_BUDGETS", (500, 5000))
+        model = sample_job_with_damages["recon_dir"] / "model.obj"
+        geometry = _grid(80)
+        model.write_text(
+            "".join(f"v {x} {y} {z}\n" for x, y, z in geometry.positions)
+            + "".join(f"f {a + 1} {b + 1} {c + 1}\n" for a, b, c in geometry.faces)
+        )
+
+        package_reconstruction(job_id, {"asset_local_path": str(model)})
+        levels = client.get(f"/jobs/{job_id}/mesh").json()["levels"]
+
+        assert [level["level"] for level in levels] == [0, 1, 2]
+        assert [level["primitives"] for level in levels] == sorted(level["primitives"] for level in levels)
+        assert levels[0]["primitives"] <= 500 and levels[2]["primitives"] == len(geometry.faces)
+        response = client.get(levels[0]["url"])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "model/gltf-binary"
+        assert len(response.content) == levels[0]["bytes"]
+        _parse_glb(response.content)
+        assert client.get(levels[0]["url"], headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+        assert client.get(f"/jobs/{job_id}/mesh/9.glb").status_code == 404
+
+    def test_pipeline_packages_the_reconstruction(self, client, sample_job_with_damages):
+        from backend.core.job_paths import job_upload_dir
+
+        job_id = sample_job_with_damages["job_id"]
+        for image in ("facade1.jpg", "facade2.jpg"):
+            (job_upload_dir(job_id) / image).write_bytes(b"\xff\xd8\xff\xe0\x00\x10JFIF" + b"\x00" * 64)
+
+        outputs = client.post(f"/jobs/{job_id}/process").json()["outputs"]
+
+        assert outputs["mesh_lods"].endswith("mesh_lods.json")
+        levels = client.get(f"/jobs/{job_id}/mesh").json()["levels"]
+        assert [(level["primitive"], level["primitives"]) for level in levels] == [("triangles", 1)]
@@ -65,3 +65,373 @@ class TestGeneratePdfReport:
             header = f.read(8)
         
         assert header.startswith(b"%PDF-")
+
+
+def _sample_builder(**options):
+    from backend.services.pdf_generator import PDFBuilder
+
+    pdf = PDFBuilder(**options)
+    pdf.add_header("Report", "Subtitle")
+    for section in range(6):
+        pdf.add_section_title(f"Section {section}")
+        for i in range(10):
+            pdf.add_paragraph(f"Paragraph {i}")
+            pdf.add_table_row(["crack", "1", "2 m", "$10.00"], [150, 80, 100, 100], bg_color=(0.97, 0.97, 0.97))
+    pdf.add_footer("Footer")
+    return pdf
+
+
+def _streams(pdf_bytes):
+    """(dictionary, raw data) of every stream object in the file."""
+    import re
+
+    for match in re.finditer(rb"<<([^>]*?/Length (\d+)[^>]*)>>\nstream\n", pdf_bytes):
+        start = match.end()
+        yield match.group(1), pdf_bytes[start:start + int(match.group(2))]
+
+
+class TestPDFBuilderOutput:
+    """Tests for compression, object streams and graphics state deduplication."""
+
+    def test_legacy_options_keep_uncompressed_pdf_14(self):
+        pdf_bytes = _sample_builder(compress=False, dedupe_state=False).render()
+
+        assert pdf_bytes.startswith(b"%PDF-1.4\n1 0 obj")
+        assert b"/FlateDecode" not in pdf_bytes
+        assert b"\nxref\n0 " in pdf_bytes
+
+    def test_content_streams_are_flate_compressed(self):
+        """Test that compressed streams inflate to the same operators as the uncompressed output."""
+        import zlib
+
+        plain = [data for _, data in _streams(_sample_builder(compress=False).render())]
+        compressed = list(_streams(_sample_builder().render()))
+
+        assert all(b"/FlateDecode" in dictionary for dictionary, _ in compressed)
+        assert [zlib.decompress(data) for _, data in compressed] == plain
+
+    def test_repeated_graphics_state_is_emitted_once(self):
+        plain = b"".join(data for _, data in _streams(_sample_builder(compress=False, dedupe_state=False).render()))
+        deduped = b"".join(data for _, data in _streams(_sample_builder(compress=False).render()))
+
+        assert deduped.count(b"0.32 0.32 0.32 rg") < plain.count(b"0.32 0.32 0.32 rg")
+        assert deduped.count(b"/F1 10 Tf") < plain.count(b"/F1 10 Tf")
+        assert deduped.count(b"Tj ET") == plain.count(b"Tj ET")
+        assert len(deduped) < len(plain)
+
+    def test_object_streams_and_xref_stream(self):
+        """Test that every xref stream entry points at its object."""
+        import re
+        import struct
+        import zlib
+
+        pdf_bytes = _sample_builder(object_streams=True).render()
+
+        assert pdf_bytes.startswith(b"%PDF-1.5\n")
+        assert b"/Type /ObjStm" in pdf_bytes
+        assert b"\nxref\n" not in pdf_bytes
+        startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF$", pdf_bytes).group(1))
+        dictionary, data = next(
+            (dictionary, data) for dictionary, data in _streams(pdf_bytes[startxref:])
+        )
+        assert b"/Type /XRef" in dictionary
+        entries = zlib.decompress(data)
+        size = int(re.search(rb"/Size (\d+)", dictionary).group(1))
+        assert len(entries) == size * 7
+        for number in range(1, size):
+            kind, field2, _ = struct.unpack(">BIH", entries[number * 7:(number + 1) * 7])
+            if kind == 1:
+                assert pdf_bytes[field2:].startswith(b"%d 0 obj" % number)
+
+    def test_compressed_report_is_much_smaller(self):
+        legacy = len(_sample_builder(compress=False, dedupe_state=False).render())
+
+        assert len(_sample_builder().render()) < legacy / 3
+        assert len(_sample_builder(object_streams=True).render()) < len(_sample_builder().render())
+
+
+def _compose_long(pdf, pages=60):
+    pdf.add_header("Portfolio", "Subtitle")
+    for page in range(pages):
+        pdf.add_section_title(f"Building {page}")
+        for i in range(40):
+            pdf.add_paragraph(f"Finding {i}")
+    pdf.add_footer("Footer")
+
+
+class TestStreamingPDF:
+    """Tests for writing pages to an output as they are finished."""
+
+    @pytest.mark.parametrize("options", [{"compress": False, "dedupe_state": False}, {}, {"object_streams": True}])
+    def test_streamed_output_matches_render(self, options):
+        from backend.services.pdf_generator import PDFBuilder, stream_pdf
+
+        buffered = PDFBuilder(**options)
+        _compose_long(buffered)
+
+        assert b"".join(stream_pdf(_compose_long, **options)) == buffered.render()
+
+    def test_pages_are_written_to_output_as_they_finish(self):
+        """Test that finished pages reach the output before the document is closed."""
+        import io
+
+        from backend.services.pdf_generator import PDFBuilder
+
+        out = io.BytesIO()
+        pdf = PDFBuilder(output=out.write)
+        _compose_long(pdf, pages=5)
+
+        assert pdf.page_count >= 5
+        assert out.getvalue().count(b"/Type /Page ") == pdf.page_count
+        assert b"startxref" not in out.getvalue()
+        with pytest.raises(RuntimeError):
+            pdf.render()
+
+        pdf.close()
+        assert out.getvalue().endswith(b"%%EOF")
+
+    def test_first_chunk_arrives_before_layout_finishes(self):
+        """Test that the consumer gets bytes early and the layout waits for it."""
+        from backend.services.pdf_generator import stream_pdf
+
+        state = {"done": False}
+
+        def compose(pdf):
+            _compose_long(pdf, pages=200)
+            state["done"] = True
+
+        chunks = stream_pdf(compose)
+        first = next(chunks)
+
+        assert first.startswith(b"%PDF-")
+        assert state["done"] is False
+        assert sum(len(chunk) for chunk in chunks) > 0
+        assert state["done"] is True
+
+    def test_layout_errors_are_raised_by_the_iterator(self):
+        from backend.services.pdf_generator import stream_pdf
+
+        def compose(pdf):
+            _compose_long(pdf, pages=3)
+            raise ValueError("bad data")
+
+        with pytest.raises(ValueError, match="bad data"):
+            b"".join(stream_pdf(compose))
+
+    def test_abandoned_stream_stops_the_layout_thread(self):
+        import threading
+        import time
+
+        from backend.services.pdf_generator import stream_pdf
+
+        chunks = stream_pdf(lambda pdf: _compose_long(pdf, pages=500))
+        next(chunks)
+        chunks.close()
+
+        deadline = time.monotonic() + 5
+        while any(t.name == "pdf-stream" for t in threading.enumerate()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not any(t.name == "pdf-stream" for t in threading.enumerate())
+
+
+class TestStaticBlocks:
+    """Tests for replaying static blocks from cached operator fragments."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        from backend.services import pdf_generator
+
+        pdf_generator._static_blocks.clear()
+        yield
+        pdf_generator._static_blocks.clear()
+
+    def test_report_is_identical_with_and_without_templates(self, sample_job_with_damages):
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.pdf_generator import PDFBuilder, compose_report, load_report_inputs
+
+        job_id = sample_job_with_damages["job_id"]
+        generate_cost_estimate(job_id)
+        inputs = load_report_inputs(job_id)
+
+        for options in ({}, {"compress": False, "dedupe_state": False}):
+            laid_out = compose_report(job_id, PDFBuilder(static_cache=False, **options), inputs=inputs).render()
+            recorded = compose_report(job_id, PDFBuilder(**options), inputs=inputs).render()
+            replayed = compose_report(job_id, PDFBuilder(**options), inputs=inputs).render()
+            assert laid_out == recorded == replayed
+
+    def test_blocks_are_replayed_per_position(self):
+        from backend.services.pdf_generator import PDFBuilder
+
+        calls = []
+
+        def compose(pdf):
+            for _ in range(2):
+                pdf.add_static("title", lambda: calls.append(pdf.add_section_title("Static")))
+                pdf.add_paragraph("variable")
+            return pdf
+
+        first = compose(PDFBuilder(compress=False)).render()
+        assert len(calls) == 2  # Second block is at a different y
+
+        assert compose(PDFBuilder(compress=False)).render() == first
+        assert len(calls) == 2
+
+    def test_blocks_that_break_the_page_are_not_recorded(self):
+        from backend.services import pdf_generator
+        from backend.services.pdf_generator import PDFBuilder
+
+        pdf = PDFBuilder()
+        pdf.add_paragraph("first page")
+        pdf.y = 50
+        pdf.add_static("title", lambda: pdf.add_section_title("Static"))
+
+        assert pdf.page_count == 1
+        assert pdf_generator._static_blocks == {}
+
+
+def _jpeg(width=64, height=48, components=3, adobe=False, sof=0xC0, body=b"\x00" * 32):
+    """Marker segments of a JPEG (SOI, APP0, optional APP14 Adobe, SOFn) plus filler and EOI."""
+    import struct
+
+    segments = [b"\xff\xd8", b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"]
+    if adobe:
+        segments.append(b"\xff\xee" + struct.pack(">H", 14) + b"Adobe\x00\x64\x00\x00\x00\x00\x02")
+    frame = struct.pack(">BHHB", 8, height, width, components) + b"\x01\x11\x00" * components
+    segments.append(bytes([0xFF, sof]) + struct.pack(">H", 2 + len(frame)) + frame)
+    return b"".join(segments) + body + b"\xff\xd9"
+
+
+class TestJPEGEmbedding:
+    """Tests for DCTDecode image XObjects."""
+
+    @pytest.mark.parametrize("components, adobe", [(1, False), (3, False), (4, True)])
+    def test_frame_header(self, components, adobe):
+        from backend.services.pdf_generator import jpeg_info
+
+        assert jpeg_info(_jpeg(640, 480, components, adobe)) == (640, 480, components, adobe)
+
+    @pytest.mark.parametrize("data", [b"\x89PNG\r\n\x1a\n", _jpeg(sof=0xC3), b"\xff\xd8\xff\xd9"])
+    def test_unsupported_data_is_rejected(self, data):
+        from backend.services.pdf_generator import jpeg_info
+
+        with pytest.raises(ValueError):
+            jpeg_info(data)
+
+    def test_image_is_embedded_once_and_shared_by_pages(self):
+        from backend.services.pdf_generator import PDFBuilder
+
+        data = _jpeg(components=4, adobe=True)
+        pdf = PDFBuilder(compress=False)
+        image = pdf.embed_jpeg(data)
+        assert pdf.embed_jpeg(data) is image
+        for page in range(3):
+            if page:
+                pdf._new_page()
+            pdf.draw_image(image, 50, 500, 160, 120)
+        pdf_bytes = pdf.render()
+
+        assert pdf_bytes.count(b"/Subtype /Image") == 1
+        assert pdf_bytes.count(data) == 1  # Passed through unchanged
+        assert b"/ColorSpace /DeviceCMYK /BitsPerComponent 8 /Decode [1 0 1 0 1 0 1 0] /Filter /DCTDecode" in pdf_bytes
+        assert b"/XObject << /Im1 " in pdf_bytes
+        assert pdf_bytes.count(b"/Im1 Do") == 3
+
+    def test_file_is_memory_mapped_into_the_output(self, tmp_path):
+        """Test that a JPEG file reaches the output as views of the mapping, not copies."""
+        from backend.services.pdf_generator import PDFBuilder
+
+        path = tmp_path / "facade.jpg"
+        path.write_bytes(_jpeg(body=b"\x00" * 3_000_000))
+        chunks = []
+        pdf = PDFBuilder(output=chunks.append)
+        pdf.draw_image(pdf.embed_jpeg(path), 50, 500, 160, 120)
+        pdf.close()
+
+        views = [chunk for chunk in chunks if isinstance(chunk, memoryview)]
+        assert len(views) == 3
+        assert b"".join(views) == path.read_bytes()
+
+    @pytest.mark.parametrize("options", [{}, {"object_streams": True}])
+    def test_streamed_output_with_images_matches_render(self, options, tmp_path):
+        from backend.services.pdf_generator import PDFBuilder, stream_pdf
+
+        path = tmp_path / "facade.jpg"
+        path.write_bytes(_jpeg())
+
+        def compose(pdf):
+            pdf.add_image_grid([(pdf.embed_jpeg(path), f"photo {i}") for i in range(7)])
+
+        buffered = PDFBuilder(**options)
+        compose(buffered)
+
+        assert b"".join(stream_pdf(compose, **options)) == buffered.render()
+
+
+class TestReportPhotos:
+    """Tests for inspection photos in job reports."""
+
+    @pytest.fixture
+    def photo_job(self, sample_job_with_damages):
+        from backend.core.job_paths import job_upload_dir
+        from backend.services.cost_estimation import generate_cost_estimate
+
+        job_id = sample_job_with_damages["job_id"]
+        generate_cost_estimate(job_id)
+        upload_dir = job_upload_dir(job_id)
+        (upload_dir / "facade1.jpg").write_bytes(_jpeg(800, 600))
+        (upload_dir / "facade2.jpg").write_bytes(_jpeg(600, 800, components=1))
+        (upload_dir / "facade3.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        return job_id
+
+    def test_original_jpegs_are_embedded(self, photo_job, monkeypatch):
+        from backend.core import config
+        from backend.services.pdf_generator import compose_report
+
+        monkeypatch.setattr(config, "REPORT_PHOTOS", "original")
+        pdf_bytes = compose_report(photo_job).render()
+
+        assert pdf_bytes.count(b"/Subtype /Image") == 2
+        assert _jpeg(800, 600) in pdf_bytes
+
+    def test_stored_thumbnails_are_preferred(self, photo_job, monkeypatch):
+        from backend.core import config
+        from backend.services.pdf_generator import compose_report
+        from backend.services.storage import get_storage, thumbnail_key
+
+        monkeypatch.setattr(config, "REPORT_PHOTOS", "thumbnail")
+        for name in ("facade1.jpg", "facade2.jpg", "facade3.png"):
+            get_storage().put(thumbnail_key(photo_job, name), _jpeg(64, 48))
+        pdf_bytes = compose_report(photo_job).render()
+
+        assert pdf_bytes.count(b"/Subtype /Image /Width 64 /Height 48") == 3
+        assert _jpeg(800, 600) not in pdf_bytes
+
+    def test_photos_off(self, photo_job, monkeypatch):
+        from backend.core import config
+        from backend.services.pdf_generator import compose_report, load_report_inputs
+
+        monkeypatch.setattr(config, "REPORT_PHOTOS", "off")
+
+        assert load_report_inputs(photo_job)["photos"] == []
+        assert b"/Subtype /Image" not in compose_report(photo_job).render()
+
+    def test_thumbnails_are_made_with_pillow(self, photo_job, monkeypatch):
+        import io
+
+        Image = pytest.importorskip("PIL.Image")
+        from backend.core import config
+        from backend.core.job_paths import job_upload_dir
+        from backend.services.pdf_generator import compose_report
+        from backend.services.storage import get_storage, thumbnail_key
+
+        photo = io.BytesIO()
+        Image.new("RGB", (1600, 1200), (120, 80, 40)).save(photo, "JPEG")
+        (job_upload_dir(photo_job) / "facade1.jpg").write_bytes(photo.getvalue())
+        monkeypatch.setattr(config, "REPORT_PHOTOS", "thumbnail")
+        monkeypatch.setattr(config, "REPORT_THUMBNAIL_SIZE", 320)
+
+        pdf_bytes = compose_report(photo_job).render()
+
+        thumbnail = get_storage().read(thumbnail_key(photo_job, "facade1.jpg"))
+        assert Image.open(io.BytesIO(thumbnail)).size == (320, 240)
+        assert thumbnail in pdf_bytes
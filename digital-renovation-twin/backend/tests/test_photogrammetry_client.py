@@ -0,0 +1,299 @@
+"""Tests for the photogrammetry API client, against a local stand-in server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StandInAPI:
+    """
+    A photogrammetry API on localhost.
+
+    `upload_failures` and `poll_failures` are status codes answered before the
+    real response; `states` are the reconstruction states reported by
+    successive polls (the last one repeats). `assets` are files served under
+    ``/assets/``; point `asset_url` at one to have it reported.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.upload_failures = []
+        self.poll_failures = []
+        self.states = ["processing", "completed"]
+        self.asset_url = "https://assets.example/rec-1.glb"
+        self.assets = {}
+        self.release = threading.Event()
+        self.release.set()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is visible
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _record(self, body=b""):
+                api.requests.append({
+                    "method": self.command, "path": self.path, "headers": dict(self.headers),
+                    "body": body, "port": self.client_address[1], "time": time.monotonic(),
+                })
+
+            def do_POST(self):
+                self._record(self.rfile.read(int(self.headers["Content-Length"])))
+                if api.upload_failures:
+                    self._reply(api.upload_failures.pop(0), {"error": "busy"}, {"Retry-After": "0"})
+                else:
+                    self._reply(202, {"id": "rec-1", "status": "queued"})
+
+            def do_GET(self):
+                self._record()
+                if self.path.startswith("/assets/"):
+                    body = api.assets[self.path.removeprefix("/assets/")]
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if api.poll_failures:
+                    self._reply(api.poll_failures.pop(0), {"error": "busy"})
+                    return
+                api.release.wait(10)
+                state = api.states.pop(0) if len(api.states) > 1 else api.states[0]
+                self._reply(200, {
+                    "status": state,
+                    "viewerUrl": "https://viewer.example/rec-1",
+                    "asset_url": api.asset_url,
+                    "error": "out of memory" if state == "failed" else None,
+                })
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def polls(self):
+        return [
+            request for request in self.requests
+            if request["method"] == "GET" and not request["path"].startswith("/assets/")
+        ]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    from backend.core import config
+    from backend.services.photogrammetry_client import shutdown_photogrammetry
+
+    stand_in = StandInAPI()
+    stand_in.thread.start()
+    monkeypatch.setattr(config, "PHOTOGRAMMETRY_API_URL", stand_in.url)
+    monkeypatch.setattr(config, "PHOTOGRAMMETRY_API_KEY", "secret")
+    monkeypatch.setattr(config, "PHOTOGRAMMETRY_POLL_INITIAL_SECONDS", 0.01)
+    monkeypatch.setattr(config, "PHOTOGRAMMETRY_POLL_MAX_SECONDS", 0.04)
+    yield stand_in
+    stand_in.release.set()
+    shutdown_photogrammetry()
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"facade{index}.jpg"
+        path.write_bytes(b"\xff\xd8\xff\xe0" + bytes([index]) * 100_000)
+        paths.append(path)
+    return paths
+
+
+def _client():
+    from backend.services.photogrammetry_client import get_client
+
+    return get_client()
+
+
+class TestPhotogrammetryClient:
+    """Tests for PhotogrammetryClient against the stand-in API."""
+
+    def test_streams_images_as_multipart(self, api, images, monkeypatch):
+        from pathlib import Path
+
+        def no_read_bytes(self):
+            raise AssertionError("images must be streamed, not read whole")
+
+        monkeypatch.setattr(Path, "read_bytes", no_read_bytes)
+        payload = _client().submit("job-1", images, provider="polycam")
+
+        assert payload == {"id": "rec-1", "status": "queued"}
+        upload = api.requests[0]
+        assert upload["path"] == "/v1/reconstructions"
+        assert upload["headers"]["Authorization"] == "Bearer secret"
+        assert upload["headers"]["Idempotency-Key"] == "job-1"
+        assert upload["headers"]["Content-Type"].startswith("multipart/form-data")
+        for path in images:
+            assert f'name="files"; filename="{path.name}"'.encode() in upload["body"]
+            assert path.open("rb").read() in upload["body"]
+        assert b'name="provider"\r\n\r\npolycam' in upload["body"]
+
+    def test_polls_with_exponential_backoff_over_one_connection(self, api):
+        api.states = ["queued", "processing", "processing", "processing", "processing", "completed"]
+        client = _client()
+        reference = client.submit("job-1", [])["id"]
+
+        result = client.wait_for_result(reference)
+
+        assert result["status"] == "completed"
+        polls = api.polls()
+        assert len(polls) == 6
+        gaps = [later["time"] - earlier["time"] for earlier, later in zip(polls, polls[1:])]
+        assert gaps[0] >= 0.01 and gaps[1] >= 0.02 and min(gaps[2:]) >= 0.04
+        assert len({request["port"] for request in api.requests}) == 1  # Pooled keep-alive connection
+
+    def test_retries_transient_errors(self, api, images):
+        api.upload_failures = [503, 502]
+        api.poll_failures = [429, 500]
+        client = _client()
+
+        reference = client.submit("job-1", images)["id"]
+        assert client.wait_for_result(reference)["status"] == "completed"
+        assert [request["method"] for request in api.requests] == ["POST"] * 3 + ["GET"] * 4
+
+    def test_permanent_errors_are_not_retried(self, api, images, monkeypatch):
+        from backend.core import config
+        from backend.services.reconstruction_service import PhotogrammetryAPIError
+
+        api.upload_failures = [400]
+        with pytest.raises(PhotogrammetryAPIError, match="rejected"):
+            _client().submit("job-1", images)
+        assert len(api.requests) == 1
+
+        monkeypatch.setattr(config, "PHOTOGRAMMETRY_RETRIES", 1)
+        api.upload_failures = [503, 503]
+        with pytest.raises(PhotogrammetryAPIError, match="2 attempts"):
+            _client().submit("job-1", images)
+
+    def test_failed_and_overdue_reconstructions_raise(self, api, monkeypatch):
+        from backend.core import config
+        from backend.services.reconstruction_service import PhotogrammetryAPIError
+
+        api.states = ["failed"]
+        with pytest.raises(PhotogrammetryAPIError, match="out of memory"):
+            _client().wait_for_result("rec-1")
+
+        api.states = ["processing"]
+        monkeypatch.setattr(config, "PHOTOGRAMMETRY_MAX_WAIT_SECONDS", 0.05)
+        with pytest.raises(PhotogrammetryAPIError, match="in time"):
+            _client().wait_for_result("rec-1")
+
+    def test_requires_configuration(self, monkeypatch):
+        from backend.core import config
+        from backend.services.reconstruction_service import PhotogrammetryAPIError
+
+        monkeypatch.setattr(config, "PHOTOGRAMMETRY_API_URL", None)
+        with pytest.raises(PhotogrammetryAPIError, match="not configured"):
+            _client()
+
+
+class TestBackgroundReconstruction:
+    """The external engine runs next to the rest of the pipeline."""
+
+    def _wait_for(self, job_id, status, timeout=10):
+        from backend.services import job_metadata
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            outputs = job_metadata.load_metadata(job_id).get("outputs", {})
+            if outputs.get("reconstruction_status") == status:
+                return outputs
+            time.sleep(0.01)
+        raise AssertionError(f"reconstruction never reached {status}")
+
+    def test_pipeline_completes_while_reconstruction_runs(self, api, sample_job_with_damages, temp_database, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from backend.api.routes_results import router
+        from backend.core.artifacts import read_json
+        from backend.core.job_paths import job_upload_dir
+        from backend.services import reconstruction_service
+
+        monkeypatch.setattr(reconstruction_service, "RECONSTRUCTION_ENGINE", "external_api")
+        api.release.clear()  # Status polls hang until released
+        app = FastAPI()
+        app.include_router(router)
+        job_id = sample_job_with_damages["job_id"]
+        for image in ("facade1.jpg", "facade2.jpg"):
+            (job_upload_dir(job_id) / image).write_bytes(b"\xff\xd8\xff\xe0\x00\x10JFIF" + b"\x00" * 64)
+
+        response = TestClient(app).post(f"/jobs/{job_id}/process")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert response.json()["outputs"]["reconstruction_engine"] == "external_api"
+        api.release.set()
+        outputs = self._wait_for(job_id, "completed")
+        assert outputs["viewer_url"] == "https://viewer.example/rec-1"
+        assert outputs["asset_url"] == "https://assets.example/rec-1.glb"
+        assert outputs["reconstruction_job"] == "rec-1"
+        assert outputs["cost"]  # Pipeline outputs kept
+        meta = read_json(sample_job_with_damages["recon_dir"] / "reconstruction_meta.json")
+        assert meta["status"] == "completed" and meta["job_reference"] == "rec-1"
+
+    def test_failures_are_recorded(self, api, sample_job_with_damages):
+        from backend.services.photogrammetry_client import start_reconstruction
+
+        api.states = ["failed"]
+        job_id = sample_job_with_damages["job_id"]
+
+        metadata = start_reconstruction(job_id)
+
+        assert metadata["status"] == "submitted"
+        outputs = self._wait_for(job_id, "failed")
+        assert "out of memory" in outputs["reconstruction_error"]
+
+    def test_mesh_assets_are_packaged_for_the_viewer(self, api, sample_job_with_damages):
+        from pathlib import Path
+
+        from backend.services.mesh_packaging import load_lod_manifest
+        from backend.services.photogrammetry_client import start_reconstruction
+
+        api.assets["rec-1.obj"] = b"v 0 0 0\nv 1 0 0\nv 0 1 0\nv 0 0 1\nf 1 2 3\nf 1 2 4\nf 1 3 4\nf 2 3 4\n"
+        # Storage on another host: the API key must not be sent there
+        api.asset_url = f"http://localhost:{api.server.server_address[1]}/assets/rec-1.obj"
+        job_id = sample_job_with_damages["job_id"]
+
+        start_reconstruction(job_id)
+        outputs = self._wait_for(job_id, "completed")
+
+        asset = Path(outputs["asset_local_path"])
+        assert asset.parent == sample_job_with_damages["recon_dir"]
+        assert asset.read_bytes() == api.assets["rec-1.obj"]
+        assert outputs["mesh_lods"].endswith("mesh_lods.json")
+        manifest = load_lod_manifest(job_id)
+        assert manifest["source"] == "asset.obj"
+        assert manifest["levels"][-1]["primitives"] == 4
+        download = next(request for request in api.requests if request["path"] == "/assets/rec-1.obj")
+        assert "Authorization" not in download["headers"]
+
+    def test_other_assets_are_only_linked(self, api, sample_job_with_damages):
+        from backend.services.photogrammetry_client import start_reconstruction
+
+        job_id = sample_job_with_damages["job_id"]
+
+        start_reconstruction(job_id)
+        outputs = self._wait_for(job_id, "completed")
+
+        assert outputs["asset_url"] == "https://assets.example/rec-1.glb"
+        assert outputs.get("asset_local_path") is None and outputs.get("mesh_lods") is None
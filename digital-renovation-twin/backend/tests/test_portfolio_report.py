@@ -0,0 +1,147 @@
+"""Tests for multi-job portfolio reports."""
+
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+NOW = datetime(2026, 1, 15, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def processed_jobs(temp_data_dir):
+    """Create `count` jobs run through the mock pipeline; returns their IDs."""
+    from backend.core.job_paths import job_upload_dir
+    from backend.services import job_metadata
+    from backend.services.analyzers import get_damage_analyzer
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.risk_scoring import compute_risk_summary
+
+    def _make(count, status="completed"):
+        job_ids = []
+        for index in range(count):
+            job_id = f"building-{status}-{index:03d}"
+            upload_dir = job_upload_dir(job_id)
+            upload_dir.mkdir(parents=True)
+            names = [f"facade_{n}.jpg" for n in range(3)]
+            for name in names:
+                (upload_dir / name).write_bytes(b"\xff\xd8jpeg")
+            job_metadata.create_job_metadata(job_id, names, label=f"Building {index}")
+            get_damage_analyzer(mode="mock").analyze(job_id)
+            generate_cost_estimate(job_id)
+            compute_risk_summary(job_id)
+            job_metadata.update_status(job_id, status)
+            job_ids.append(job_id)
+        return job_ids
+
+    return _make
+
+
+@pytest.fixture
+def pool():
+    from backend.services.portfolio_report import shutdown_portfolio_pool
+
+    yield
+    shutdown_portfolio_pool()
+
+
+def _render(buildings, **kwargs):
+    from backend.services.pdf_generator import PDFBuilder
+    from backend.services.portfolio_report import compose_portfolio
+
+    return compose_portfolio(PDFBuilder(), buildings, now=NOW, **kwargs).render()
+
+
+class TestComposePortfolio:
+    """Tests for laying out a portfolio report."""
+
+    def test_summary_and_one_section_per_building(self, processed_jobs):
+        import zlib
+
+        from backend.services.portfolio_report import load_portfolio_inputs
+
+        job_ids = processed_jobs(3)
+        pdf_bytes = _render(load_portfolio_inputs(job_ids), workers=1)
+
+        pages = int(re.search(rb"/Type /Pages /Count (\d+)", pdf_bytes).group(1))
+        assert pages > 3
+        assert pdf_bytes.count(b"/BaseFont /Helvetica") == 2  # Fonts are shared by every page
+        text = b"".join(
+            zlib.decompress(pdf_bytes[m.end():m.end() + int(m.group(1))])
+            for m in re.finditer(rb"<< /Length (\d+) /Filter /FlateDecode >>\nstream\n", pdf_bytes)
+        )
+        assert b"(Portfolio Assessment Report)" in text
+        for index in range(3):
+            assert text.count(b"(Building %d)" % index) == 2  # Summary row and section header
+
+    def test_worker_processes_match_inline_rendering(self, processed_jobs, pool):
+        from backend.services.portfolio_report import load_portfolio_inputs
+
+        buildings = load_portfolio_inputs(processed_jobs(6))
+
+        assert _render(buildings, workers=2) == _render(buildings, workers=1)
+
+    def test_summary_inputs_do_not_load_the_damages(self, processed_jobs, monkeypatch):
+        from backend.services import portfolio_report
+
+        def no_full_load(job_id):
+            raise AssertionError("building sections load their own inputs")
+
+        monkeypatch.setattr(portfolio_report, "load_report_inputs", no_full_load)
+        buildings = portfolio_report.load_portfolio_inputs(processed_jobs(2))
+
+        assert [summary["label"] for _, summary in buildings] == ["Building 0", "Building 1"]
+        assert all(summary["damage_count"] > 0 for _, summary in buildings)
+
+    def test_unprocessed_job_is_rejected(self, processed_jobs, sample_job_id, temp_data_dir):
+        from backend.services import job_metadata
+        from backend.services.portfolio_report import load_portfolio_inputs
+
+        job_ids = processed_jobs(1)
+        job_metadata.create_job_metadata(sample_job_id, [])
+
+        with pytest.raises(FileNotFoundError, match=sample_job_id):
+            load_portfolio_inputs(job_ids + [sample_job_id])
+
+    def test_default_jobs_are_the_completed_ones(self, processed_jobs):
+        from backend.services.portfolio_report import portfolio_job_ids
+
+        completed = processed_jobs(2)
+        processed_jobs(1, status="failed")
+
+        assert sorted(portfolio_job_ids()) == completed
+
+
+class TestPortfolioOutputs:
+    """Tests for the CLI command and API endpoint."""
+
+    def test_cli_writes_portfolio_file(self, processed_jobs, tmp_path):
+        from backend.cli import portfolio_cmd
+
+        processed_jobs(2)
+        output = tmp_path / "portfolio.pdf"
+
+        result = portfolio_cmd(None, str(output), workers=1)
+
+        assert result["pages"] >= 3
+        assert output.read_bytes().startswith(b"%PDF-")
+        assert output.read_bytes().endswith(b"%%EOF")
+
+    def test_endpoint_streams_pdf(self, processed_jobs, temp_database, pool):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from backend.api.routes_results import router
+
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        job_ids = processed_jobs(2)
+
+        response = client.post("/jobs/portfolio-report", json={"job_ids": job_ids})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF-") and response.content.endswith(b"%%EOF")
+
+        assert client.post("/jobs/portfolio-report", json={"job_ids": ["missing"]}).status_code == 404
+        assert client.post("/jobs/portfolio-report", json={"job_ids": []}).status_code == 400
@@ -0,0 +1,188 @@
+"""Tests for the reconstruction cache, with a fake colmap executable."""
+
+import os
+import sys
+
+import pytest
+
+# Writes COLMAP's outputs in place and counts its runs
+FAKE_COLMAP = """#!{python}
+import os, sys
+args = sys.argv[1:]
+with open(os.environ["FAKE_COLMAP_RUNS"], "a") as fp:
+    fp.write(args[0] + "\\n")
+with open(args[args.index("--database_path") + 1], "a") as fp:
+    fp.write(args[0] + "\\n")
+if args[0] == "mapper":
+    model = os.path.join(args[args.index("--output_path") + 1], "0")
+    os.makedirs(model, exist_ok=True)
+    with open(os.path.join(model, "points3D.txt"), "w") as fp:
+        fp.write("1 0 0 0 255 0 0 0.1\\n2 1 0 0 0 255 0 0.1\\n3 0 1 0 0 0 255 0.1\\n")
+"""
+
+
+@pytest.fixture
+def colmap(temp_data_dir, tmp_path, monkeypatch):
+    """Runs the colmap_docker engine with the fake; `make_job` creates jobs with given photos."""
+    from backend.core import config
+    from backend.core.job_paths import job_upload_dir
+    from backend.services import reconstruction_service
+    from backend.services.job_metadata import create_job_metadata
+
+    fake = tmp_path / "colmap"
+    fake.write_text(FAKE_COLMAP.format(python=sys.executable))
+    fake.chmod(0o755)
+    runs = tmp_path / "runs.txt"
+    monkeypatch.setattr(config, "COLMAP_EXECUTABLE", str(fake))
+    monkeypatch.setenv("FAKE_COLMAP_RUNS", str(runs))
+    monkeypatch.setattr(reconstruction_service, "RECONSTRUCTION_ENGINE", "colmap_docker")
+
+    class Colmap:
+        def runs(self):
+            return runs.read_text().split() if runs.exists() else []
+
+        def make_job(self, job_id, photos):
+            upload_dir = job_upload_dir(job_id)
+            upload_dir.mkdir(parents=True)
+            for name, content in photos.items():
+                (upload_dir / name).write_bytes(b"\xff\xd8\xff\xe0" + content)
+            create_job_metadata(job_id, list(photos))
+            return job_id
+
+    return Colmap()
+
+
+PHOTOS = {"a.jpg": b"north facade", "b.jpg": b"south facade"}
+
+
+class TestCacheKey:
+    """Tests for reconstruction_cache.cache_key."""
+
+    def test_depends_on_contents_and_settings_not_names(self, colmap, monkeypatch):
+        from backend.core import config
+        from backend.services.reconstruction_cache import cache_key
+
+        first = colmap.make_job("job-1", PHOTOS)
+        renamed = colmap.make_job("job-2", {"z.jpg": PHOTOS["b.jpg"], "y.jpg": PHOTOS["a.jpg"]})
+        edited = colmap.make_job("job-3", {"a.jpg": PHOTOS["a.jpg"], "b.jpg": b"south facade, retaken"})
+
+        key = cache_key(first, "colmap_docker")
+
+        assert cache_key(renamed, "colmap_docker") == key
+        assert cache_key(edited, "colmap_docker") != key
+        assert cache_key(first, "external_api") != key
+        monkeypatch.setattr(config, "COLMAP_MATCHER", "sequential")
+        assert cache_key(first, "colmap_docker") != key
+
+
+class TestReconstructionCache:
+    """The colmap_docker engine through submit_reconstruction_job."""
+
+    def test_same_photos_reuse_the_reconstruction(self, colmap):
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.reconstruction_service import submit_reconstruction_job
+
+        first = submit_reconstruction_job(colmap.make_job("job-1", PHOTOS))
+        assert colmap.runs() == ["feature_extractor", "exhaustive_matcher", "mapper"]
+
+        second = submit_reconstruction_job(colmap.make_job("job-2", PHOTOS))
+
+        assert len(colmap.runs()) == 3  # COLMAP did not run again
+        assert second["cache_key"] == first["cache_key"] and second["cached_from"] == "job-1"
+        assert second["mesh_workspace_path"] == str(job_reconstruction_dir("job-2") / "sparse")
+        assert second["matcher"] == "exhaustive"
+        source = job_reconstruction_dir("job-1") / "sparse" / "0" / "points3D.txt"
+        reused = job_reconstruction_dir("job-2") / "sparse" / "0" / "points3D.txt"
+        assert reused.read_text() == source.read_text()
+        assert os.stat(reused).st_ino == os.stat(source).st_ino  # Hardlinked, not copied
+        assert (job_reconstruction_dir("job-2") / "reconstruction_meta.json").stat().st_nlink == 1
+
+    def test_analysis_results_are_not_shared(self, colmap):
+        import json
+
+        from backend.core import config
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.reconstruction_service import submit_reconstruction_job
+
+        job_id = colmap.make_job("job-1", PHOTOS)
+        source_dir = job_reconstruction_dir(job_id)
+        source_dir.mkdir(parents=True)
+        analyses = ("damages.json", "cost_estimate.json", "risk_summary.json")
+        for name in analyses:  # Left by an earlier run of the pipeline
+            (source_dir / name).write_text(json.dumps({"job_id": job_id}))
+        first = submit_reconstruction_job(job_id)
+
+        submit_reconstruction_job(colmap.make_job("job-2", PHOTOS))
+
+        entry = json.loads((config.RECONSTRUCTION_CACHE_DIR / first["cache_key"] / "entry.json").read_text())
+        assert entry["files"] == ["sparse/0/points3D.txt", "database.db"]
+        target_dir = job_reconstruction_dir("job-2")
+        assert not any((target_dir / name).exists() for name in (*analyses, "colmap.log"))
+        (target_dir / "damages.json").write_text(json.dumps({"job_id": "job-2"}))
+        assert json.loads((source_dir / "damages.json").read_text()) == {"job_id": job_id}
+        assert all((source_dir / name).stat().st_nlink == 1 for name in (*analyses, "colmap.log"))
+
+    def test_changed_photos_rerun_without_touching_the_cache(self, colmap):
+        from backend.core.job_paths import job_reconstruction_dir, job_upload_dir
+        from backend.services.reconstruction_service import submit_reconstruction_job
+
+        job_id = colmap.make_job("job-1", PHOTOS)
+        submit_reconstruction_job(job_id)
+        submit_reconstruction_job(colmap.make_job("job-2", PHOTOS))
+        (job_upload_dir(job_id) / "c.jpg").write_bytes(b"\xff\xd8\xff\xe0 new angle")
+
+        submit_reconstruction_job(job_id)
+
+        assert len(colmap.runs()) == 6
+        database = job_reconstruction_dir(job_id) / "database.db"
+        assert database.read_text().split() == ["feature_extractor", "exhaustive_matcher", "mapper"]
+        assert (job_reconstruction_dir("job-2") / "database.db").read_text() == database.read_text()
+
+    def test_disabled(self, colmap, monkeypatch):
+        from backend.core import config
+        from backend.services.reconstruction_service import submit_reconstruction_job
+
+        monkeypatch.setattr(config, "RECONSTRUCTION_CACHE", False)
+        submit_reconstruction_job(colmap.make_job("job-1", PHOTOS))
+        metadata = submit_reconstruction_job(colmap.make_job("job-2", PHOTOS))
+
+        assert len(colmap.runs()) == 6
+        assert "cache_key" not in metadata
+        assert not config.RECONSTRUCTION_CACHE_DIR.exists()
+
+
+class TestEviction:
+    """Least recently used entries go first once the cache is over budget."""
+
+    def _cache(self, colmap, job_id, photo):
+        from backend.services import reconstruction_cache
+        from backend.services.reconstruction_service import submit_reconstruction_job
+
+        colmap.make_job(job_id, {"a.jpg": photo})
+        return submit_reconstruction_job(job_id)["cache_key"], reconstruction_cache
+
+    def test_evicts_least_recently_used(self, colmap, monkeypatch):
+        from backend.core import config
+
+        key_1, cache = self._cache(colmap, "job-1", b"one")
+        key_2, _ = self._cache(colmap, "job-2", b"two")
+        entry_files = (config.RECONSTRUCTION_CACHE_DIR / key_1 / "files").rglob("*")
+        entry_bytes = sum(path.stat().st_size for path in entry_files if path.is_file())
+        os.utime(config.RECONSTRUCTION_CACHE_DIR / key_1 / "entry.json", (1, 1))
+        os.utime(config.RECONSTRUCTION_CACHE_DIR / key_2 / "entry.json", (2, 2))
+        assert cache.restore(key_1, "job-1") is not None  # Used most recently now
+        monkeypatch.setattr(config, "RECONSTRUCTION_CACHE_MAX_BYTES", 2 * entry_bytes)
+
+        key_3, _ = self._cache(colmap, "job-3", b"six")
+
+        assert sorted(path.name for path in config.RECONSTRUCTION_CACHE_DIR.iterdir()) == sorted([key_1, key_3])
+        assert cache.restore(key_2, "job-2") is None
+
+    def test_entries_larger_than_the_budget_are_not_cached(self, colmap, monkeypatch):
+        from backend.core import config
+
+        monkeypatch.setattr(config, "RECONSTRUCTION_CACHE_MAX_BYTES", 10)
+        key, cache = self._cache(colmap, "job-1", b"one")
+
+        assert cache.restore(key, "job-1") is None
+        assert not config.RECONSTRUCTION_CACHE_DIR.exists()
@@ -0,0 +1,141 @@
+"""Tests for serving the built frontend from its startup manifest."""
+
+import gzip
+import os
+
+import pytest
+
+INDEX = b"<!doctype html><html><head><script src=/assets/index-B2x8s_9Q.js></script></head></html>"
+BUNDLE = b"export const renovation = " + b"'facade', " * 2000 + b"0;\n"
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    root = tmp_path / "static"
+    (root / "assets").mkdir(parents=True)
+    (root / "index.html").write_bytes(INDEX)
+    (root / "robots.txt").write_bytes(b"User-agent: *\n")
+    (root / "assets" / "index-B2x8s_9Q.js").write_bytes(BUNDLE)
+    (root / "assets" / "logo-Dk3kf9aa.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 8)
+    (tmp_path / "secret.txt").write_bytes(b"not served")
+    return root
+
+
+@pytest.fixture
+def client(static_dir):
+    """A client for an app serving `static_dir`, like main.py (bytes on the wire, not decoded)."""
+    import asyncio
+
+    import httpx
+    from fastapi import FastAPI, Request
+
+    from backend.api.static_files import StaticSite
+
+    app = FastAPI()
+    site = StaticSite(static_dir)
+
+    @app.get("/{full_path:path}")
+    async def serve_spa(full_path: str, request: Request):
+        headers = request.headers
+        return site.response(full_path, headers.get("accept-encoding", ""), headers.get("if-none-match"))
+
+    transport = httpx.ASGITransport(app=app)
+
+    async def request(path, headers):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            async with http.stream("GET", path, headers=headers) as response:
+                return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+    def get(path, accept_encoding="", **headers):
+        return asyncio.run(request(path, {"Accept-Encoding": accept_encoding, **headers}))
+
+    return get
+
+
+class TestStaticSite:
+    """Tests for StaticSite responses."""
+
+    def test_hashed_assets_are_immutable_and_precompressed(self, client):
+        response, body = client("/assets/index-B2x8s_9Q.js", "gzip, deflate")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["content-type"].startswith(("application/javascript", "text/javascript"))
+        assert gzip.decompress(body) == BUNDLE
+
+    def test_identity_for_clients_without_compression(self, client):
+        response, body = client("/assets/index-B2x8s_9Q.js")
+
+        assert "content-encoding" not in response.headers
+        assert body == BUNDLE
+        _, image = client("/assets/logo-Dk3kf9aa.png", "gzip")
+        assert image.startswith(b"\x89PNG")
+
+    def test_index_revalidates_by_etag(self, client):
+        response, body = client("/")
+
+        assert body == INDEX
+        assert response.headers["cache-control"] == "no-cache"
+        etag = response.headers["etag"]
+        revalidated, empty = client("/", **{"If-None-Match": etag})
+        assert revalidated.status_code == 304 and empty == b""
+        assert revalidated.headers["etag"] == etag
+        assert client("/", **{"If-None-Match": '"stale"'})[0].status_code == 200
+
+    def test_encodings_have_their_own_etags(self, client):
+        identity, _ = client("/assets/index-B2x8s_9Q.js")
+        compressed, _ = client("/assets/index-B2x8s_9Q.js", "gzip")
+
+        assert identity.headers["etag"] != compressed.headers["etag"]
+        stale, _ = client("/assets/index-B2x8s_9Q.js", "gzip", **{"If-None-Match": identity.headers["etag"]})
+        assert stale.status_code == 200
+
+    def test_client_routes_get_index_but_missing_assets_are_404(self, client):
+        assert client("/results/job-1")[1] == INDEX
+        assert client("/../secret.txt")[1] == INDEX
+        assert client("/assets/index-missing.js")[0].status_code == 404
+
+    def test_requests_do_not_touch_the_filesystem(self, client, monkeypatch):
+        def no_stat(*args, **kwargs):
+            raise AssertionError("served from the manifest")
+
+        monkeypatch.setattr(os, "stat", no_stat)
+
+        assert client("/robots.txt")[1] == b"User-agent: *\n"
+        assert client("/assets/index-B2x8s_9Q.js", "gzip")[0].status_code == 200
+
+
+class TestPrecompress:
+    """Tests for precompress and on-disk variants."""
+
+    def test_writes_variants_once(self, static_dir):
+        from backend.api.static_files import precompress
+
+        written = precompress(static_dir)
+
+        bundle = static_dir / "assets" / "index-B2x8s_9Q.js"
+        assert gzip.decompress((static_dir / "assets" / "index-B2x8s_9Q.js.gz").read_bytes()) == BUNDLE
+        assert not (static_dir / "index.html.gz").exists()  # Too small to be worth it
+        assert not (static_dir / "assets" / "logo-Dk3kf9aa.png.gz").exists()
+        assert written == len(list(static_dir.rglob("*.gz"))) + len(list(static_dir.rglob("*.br")))
+        assert precompress(static_dir) == 0
+        os.utime(bundle, (bundle.stat().st_mtime + 10,) * 2)  # A rebuilt bundle
+        assert precompress(static_dir) == written
+
+    def test_on_disk_variants_are_served(self, static_dir, monkeypatch):
+        from backend.api import static_files
+
+        precompress_target = static_dir / "assets" / "index-B2x8s_9Q.js.gz"
+        static_files.precompress(static_dir)
+        monkeypatch.setattr(static_files, "MEMORY_MAX_BYTES", 100)  # Serve from disk
+
+        site = static_files.StaticSite(static_dir)
+        asset = site.lookup("assets/index-B2x8s_9Q.js")
+
+        assert asset.representations["gzip"].path == precompress_target
+        assert asset.representations["gzip"].body is None
+        assert "assets/index-B2x8s_9Q.js.gz" not in site.manifest
+        response = site.response("assets/index-B2x8s_9Q.js", "gzip")
+        assert response.path == precompress_target and response.headers["content-encoding"] == "gzip"
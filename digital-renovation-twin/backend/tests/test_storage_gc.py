@@ -0,0 +1,189 @@
+"""Tests for storage garbage collection and orphan reconciliation."""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+DAY = 86400
+
+
+@pytest.fixture
+def storage(temp_data_dir, temp_database):
+    """Helpers that lay out job artifacts with controllable ages."""
+    from sqlalchemy import text
+
+    from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+
+    now = time.time()
+
+    def age(path, seconds):
+        stamp = now - seconds
+        os.utime(path, (stamp, stamp))
+
+    def make_job(job_id, *, status="completed", age_days=0.0, size=1000, record=True, meta=True):
+        upload_dir = UPLOADS_DIR / job_id
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "facade.jpg").write_bytes(b"x" * size)
+        if meta:
+            updated = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now - age_days * DAY))
+            (upload_dir / "job_meta.json").write_text(json.dumps({
+                "job_id": job_id, "status": status, "created_at": updated, "updated_at": updated,
+            }))
+        recon_dir = RECONSTRUCTIONS_DIR / job_id
+        recon_dir.mkdir(parents=True)
+        (recon_dir / "damages.json").write_text('{"damages": []}')
+        (REPORTS_DIR / f"{job_id}.pdf").write_bytes(b"%PDF-1.4")
+        for path in (upload_dir, recon_dir, REPORTS_DIR / f"{job_id}.pdf"):
+            age(path, age_days * DAY)
+        if record:
+            temp_database.create_job_record(job_id)
+            temp_database.update_job_record(job_id, status=status)
+            stamp = datetime.fromtimestamp(now - age_days * DAY, timezone.utc).replace(tzinfo=None)
+            with temp_database.get_db() as db:
+                db.execute(
+                    text("UPDATE jobs SET created_at = :stamp, updated_at = :stamp WHERE id = :job_id"),
+                    {"stamp": stamp, "job_id": job_id},
+                )
+        return job_id
+
+    def make_orphan(job_id, age_seconds=2 * DAY):
+        recon_dir = RECONSTRUCTIONS_DIR / job_id
+        recon_dir.mkdir(parents=True)
+        (recon_dir / "damages.json").write_text("{}")
+        age(recon_dir, age_seconds)
+        return recon_dir
+
+    return {"make_job": make_job, "make_orphan": make_orphan, "now": now}
+
+
+def _reasons(report):
+    return {candidate["job_id"]: candidate["reason"] for candidate in report["candidates"]}
+
+
+class TestStorageGC:
+    """Tests for plan_gc / run_gc."""
+
+    def test_finds_orphans_and_half_created_jobs(self, storage, temp_database):
+        """Test that artifacts without a job and jobs without metadata or files are flagged."""
+        from backend.services.storage_gc import plan_gc
+
+        storage["make_job"]("job-ok")
+        storage["make_job"]("job-no-meta", meta=False, record=False, age_days=1)
+        storage["make_orphan"]("job-orphan")
+        temp_database.create_job_record("job-dangling")
+
+        report = plan_gc(max_age_days=0, max_total_bytes=0, grace_seconds=0)
+
+        assert _reasons(report) == {
+            "job-no-meta": "incomplete_upload",
+            "job-orphan": "orphan",
+            "job-dangling": "dangling_record",
+        }
+
+    def test_grace_period_protects_uploads_in_flight(self, storage):
+        """Test that young orphans and metadata-less uploads are left alone."""
+        from backend.services.storage_gc import plan_gc
+
+        storage["make_job"]("job-uploading", meta=False, record=False)
+        storage["make_orphan"]("job-recent-orphan", age_seconds=60)
+
+        report = plan_gc(max_age_days=0, max_total_bytes=0, grace_seconds=3600)
+        assert report["candidates"] == []
+
+    def test_age_retention_respects_statuses(self, storage):
+        """Test that only old jobs in an eligible status expire."""
+        from backend.services.storage_gc import plan_gc
+
+        storage["make_job"]("job-old-done", status="completed", age_days=40)
+        storage["make_job"]("job-old-running", status="processing", age_days=40)
+        storage["make_job"]("job-new-done", status="completed", age_days=1)
+
+        report = plan_gc(max_age_days=30, max_total_bytes=0, statuses=["completed"])
+        assert _reasons(report) == {"job-old-done": "expired"}
+
+    def test_max_bytes_evicts_oldest_first(self, storage):
+        """Test that the byte budget evicts the oldest eligible jobs until it fits."""
+        from backend.services.storage_gc import plan_gc
+
+        for i, days in enumerate((30, 20, 10, 1)):
+            storage["make_job"](f"job-{i}", age_days=days, size=10_000)
+
+        per_job = plan_gc(max_age_days=0, max_total_bytes=0)["bytes_scanned"] // 4
+        report = plan_gc(max_age_days=0, max_total_bytes=per_job * 2)
+
+        assert _reasons(report) == {"job-0": "over_quota", "job-1": "over_quota"}
+        assert report["by_reason"]["over_quota"]["bytes"] == per_job * 2
+
+    def test_dry_run_reports_without_deleting(self, storage):
+        """Test that a dry run reports reclaimable bytes and leaves files in place."""
+        from backend.core.config import RECONSTRUCTIONS_DIR
+        from backend.services.storage_gc import run_gc
+
+        recon_dir = storage["make_orphan"]("job-orphan")
+
+        report = run_gc(dry_run=True, max_age_days=0, max_total_bytes=0, grace_seconds=0)
+
+        assert report["dry_run"] is True
+        assert report["bytes_reclaimable"] > 0
+        assert report["bytes_freed"] == 0
+        assert recon_dir.exists()
+        assert (RECONSTRUCTIONS_DIR / "job-orphan").exists()
+
+    def test_run_removes_files_and_records(self, storage, temp_database):
+        """Test that a real pass removes every artifact and the database row."""
+        from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+        from backend.services.storage_gc import run_gc
+
+        storage["make_job"]("job-old", age_days=100)
+        storage["make_job"]("job-new", age_days=1)
+
+        report = run_gc(max_age_days=30, max_total_bytes=0)
+
+        assert report["jobs_removed"] == 1
+        assert report["bytes_freed"] == report["bytes_reclaimable"] > 1000
+        assert not (UPLOADS_DIR / "job-old").exists()
+        assert not (RECONSTRUCTIONS_DIR / "job-old").exists()
+        assert not (REPORTS_DIR / "job-old.pdf").exists()
+        assert temp_database.get_job_record("job-old", include_deleted=True) is None
+        assert temp_database.get_job_record("job-new") is not None
+
+    def test_tombstoned_jobs_are_left_to_reclaimer(self, storage, temp_database):
+        """Test that GC does not race the reclaimer on tombstoned jobs."""
+        from backend.services.storage_gc import plan_gc
+
+        storage["make_job"]("job-deleted", age_days=100)
+        temp_database.tombstone_job_records(["job-deleted"])
+
+        report = plan_gc(max_age_days=30, max_total_bytes=1, grace_seconds=0)
+        assert report["candidates"] == []
+
+
+class TestDeleteJob:
+    """job_metadata.delete_job removes all of a job's artifacts."""
+
+    def test_delete_job_removes_reconstructions_and_report(self, storage):
+        from backend.core.config import RECONSTRUCTIONS_DIR, REPORTS_DIR, UPLOADS_DIR
+        from backend.services import job_metadata
+
+        storage["make_job"]("job-1", record=False)
+        assert job_metadata.delete_job("job-1") is True
+
+        assert not (UPLOADS_DIR / "job-1").exists()
+        assert not (RECONSTRUCTIONS_DIR / "job-1").exists()
+        assert not (REPORTS_DIR / "job-1.pdf").exists()
+
+
+class TestParseSize:
+    """Tests for the CLI byte-size parser."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [("500000", 500000), ("750M", 750 * 1024 ** 2), ("20G", 20 * 1024 ** 3), ("1.5kb", 1536)],
+    )
+    def test_parse_size(self, value, expected):
+        from backend.cli import _parse_size
+
+        assert _parse_size(value) == expected
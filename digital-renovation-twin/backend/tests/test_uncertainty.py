@@ -0,0 +1,196 @@
+"""Tests for Monte Carlo cost and risk uncertainty intervals."""
+
+import json
+
+import pytest
+
+DAMAGES = [
+    {"type": "crack", "severity": "medium", "approx_length_m": 1.5, "confidence": 0.85},
+    {"type": "spalling", "severity": "high", "approx_area_m2": 0.5, "confidence": 0.9},
+    {"type": "water_damage", "severity": "low", "approx_area_m2": 0.3, "confidence": 0.75},
+    {"type": "moisture", "approx_area_m2": 2.0, "confidence": "n/a"},
+    {"severity": "critical", "confidence": 0.4},
+]
+
+
+def _intervals(job_id, damages, **options):
+    from backend.services.damage_records import DamageRecord
+    from backend.services.uncertainty import damage_intervals
+
+    return damage_intervals(job_id, map(DamageRecord.from_dict, damages), **options)
+
+
+def _points(job_id, damages, tmp_job):
+    """Point estimates from the per-job functions, without intervals."""
+    from backend.services.cost_estimation import generate_cost_estimate
+    from backend.services.risk_scoring import compute_risk_summary
+
+    tmp_job(job_id, damages)
+    cost = json.loads(generate_cost_estimate(job_id, intervals=False).read_text())
+    risk = json.loads(compute_risk_summary(job_id, intervals=False).read_text())
+    return cost["total_cost"], risk["overall_risk_score"]
+
+
+@pytest.fixture
+def tmp_job(temp_data_dir):
+    from backend.core.job_paths import job_reconstruction_dir
+
+    def _write(job_id, damages):
+        recon_dir = job_reconstruction_dir(job_id)
+        recon_dir.mkdir(parents=True, exist_ok=True)
+        (recon_dir / "damages.json").write_text(json.dumps({"job_id": job_id, "damages": damages}))
+
+    return _write
+
+
+class TestSimulateIntervals:
+    """Tests for uncertainty.damage_intervals / simulate_intervals."""
+
+    def test_intervals_are_ordered_and_reproducible(self):
+        from backend.services import uncertainty
+
+        first = _intervals("job-a", DAMAGES)
+        uncertainty._memo.clear()
+        assert _intervals("job-a", DAMAGES) == first
+        assert first["samples"] == 10000
+        for key in ("total_cost", "overall_risk_score"):
+            interval = first[key]
+            assert list(interval) == ["p10", "p50", "p90"]
+            assert interval["p10"] <= interval["p50"] <= interval["p90"]
+        assert first["total_cost"]["p10"] < first["total_cost"]["p90"]
+
+    def test_certain_exact_detections_give_the_point_estimate(self, tmp_job):
+        damages = [{**damage, "confidence": 1.0} for damage in DAMAGES]
+        total_cost, risk_score = _points("job-certain", damages, tmp_job)
+
+        intervals = _intervals("job-certain", damages, samples=200, measurement_error=0.0)
+
+        assert list(intervals["total_cost"].values()) == pytest.approx([total_cost] * 3, abs=0.01)
+        assert list(intervals["overall_risk_score"].values()) == pytest.approx([risk_score] * 3, abs=0.1)
+
+    def test_surveys_larger_than_a_block(self, tmp_job, monkeypatch):
+        from backend.services import uncertainty
+
+        monkeypatch.setattr(uncertainty, "BLOCK_DAMAGES", 4)  # DAMAGES * 3 spans four blocks
+        damages = [{**damage, "confidence": 1.0} for damage in DAMAGES * 3]
+        total_cost, risk_score = _points("job-survey", damages, tmp_job)
+
+        intervals = _intervals("job-survey", damages, samples=200, measurement_error=0.0)
+
+        assert list(intervals["total_cost"].values()) == pytest.approx([total_cost] * 3, abs=0.01)
+        assert list(intervals["overall_risk_score"].values()) == pytest.approx([risk_score] * 3, abs=0.1)
+        assert _intervals("job-survey", DAMAGES * 3) == _intervals("job-survey", DAMAGES * 3)
+
+    def test_confidence_weights_inclusion(self):
+        never = _intervals("job-b", [{**damage, "confidence": 0} for damage in DAMAGES])
+        assert never["total_cost"] == {"p10": 0.0, "p50": 0.0, "p90": 0.0}
+        assert never["overall_risk_score"] == {"p10": 0.0, "p50": 0.0, "p90": 0.0}
+
+        # One $20/m crack of 1 m detected with confidence 0.5: about half the samples include it
+        half = _intervals("job-b", [{"type": "crack", "approx_length_m": 1.0, "confidence": 0.5}], measurement_error=0.0)
+        assert half["total_cost"]["p10"] == 0.0
+        assert half["total_cost"]["p90"] == pytest.approx(20.0)
+
+    def test_invalid_records_raise(self):
+        with pytest.raises(ValueError):
+            _intervals("job-c", [{"type": "crack"}, "crack"])
+
+
+class TestIntervalOutputs:
+    """Tests for intervals in cost_estimate.json, risk_summary.json and the report."""
+
+    def test_per_job_files_match_batch_rescoring(self, tmp_job, monkeypatch):
+        from backend.core import config
+        from backend.core.job_paths import job_reconstruction_dir
+        from backend.services.batch_scoring import rescore_jobs
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.risk_scoring import compute_risk_summary
+
+        monkeypatch.setattr(config, "UNCERTAINTY_INTERVALS", True)
+        job_ids = [f"job-{index}" for index in range(4)]
+        for index, job_id in enumerate(job_ids):
+            tmp_job(job_id, DAMAGES[index:] * (index + 1))
+
+        def outputs():
+            return [
+                (job_reconstruction_dir(job_id) / name).read_bytes()
+                for job_id in job_ids for name in ("cost_estimate.json", "risk_summary.json")
+            ]
+
+        for job_id in job_ids:
+            generate_cost_estimate(job_id)
+            compute_risk_summary(job_id)
+        expected = outputs()
+        rescore_jobs(job_ids)
+
+        assert outputs() == expected
+        cost = json.loads((job_reconstruction_dir(job_ids[0]) / "cost_estimate.json").read_text())
+        risk = json.loads((job_reconstruction_dir(job_ids[0]) / "risk_summary.json").read_text())
+        assert set(cost["total_cost_interval"]) == {"p10", "p50", "p90"}
+        assert set(risk["overall_risk_score_interval"]) == {"p10", "p50", "p90"}
+
+    def test_scoring_a_job_simulates_once(self, tmp_job, monkeypatch):
+        import numpy as np
+
+        from backend.services import cost_estimation, risk_scoring
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.risk_scoring import compute_risk_summary
+
+        tmp_job("job-once", DAMAGES * 2)
+        generators, loads = [], []
+        default_rng = np.random.default_rng
+        monkeypatch.setattr(np.random, "default_rng", lambda seed: generators.append(seed) or default_rng(seed))
+        for module in (cost_estimation, risk_scoring):
+            load = module.load_damage_records
+            monkeypatch.setattr(module, "load_damage_records", lambda job_id, load=load: loads.append(job_id) or load(job_id))
+
+        cost = json.loads(generate_cost_estimate("job-once", intervals=True).read_text())
+        risk = json.loads(compute_risk_summary("job-once", intervals=True).read_text())
+
+        assert len(generators) == 1 and len(loads) == 2
+        assert cost["total_cost_interval"]["p50"] > 0 and risk["overall_risk_score_interval"]["p50"] > 0
+
+        monkeypatch.setitem(risk_scoring.TYPE_WEIGHTS, "crack", 9.0)  # Changes the sampled risk points
+        compute_risk_summary("job-once", intervals=True)
+        assert len(generators) == 2
+
+    def test_report_shows_ranges(self, sample_job_with_damages, monkeypatch):
+        from backend.core import config
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.pdf_generator import PDFBuilder, compose_report, load_report_inputs
+        from backend.services.risk_scoring import compute_risk_summary
+
+        monkeypatch.setattr(config, "UNCERTAINTY_INTERVALS", True)
+        job_id = sample_job_with_damages["job_id"]
+        generate_cost_estimate(job_id)
+        compute_risk_summary(job_id)
+
+        inputs = load_report_inputs(job_id)
+        assert inputs["intervals"]["total_cost"]["p50"] > 0
+        pdf_bytes = compose_report(job_id, PDFBuilder(compress=False), inputs=inputs).render()
+        assert b"Likely range" in pdf_bytes
+        assert b"Risk Score Range" in pdf_bytes
+
+        monkeypatch.setattr(config, "UNCERTAINTY_SAMPLES", 0)
+        generate_cost_estimate(job_id)
+        compute_risk_summary(job_id)
+        assert load_report_inputs(job_id)["intervals"] is None
+
+    def test_reports_do_not_simulate(self, sample_job_with_damages, monkeypatch):
+        from backend.services import uncertainty
+        from backend.services.cost_estimation import generate_cost_estimate
+        from backend.services.pdf_generator import load_report_inputs
+        from backend.services.risk_scoring import compute_risk_summary
+
+        job_id = sample_job_with_damages["job_id"]
+        generate_cost_estimate(job_id, intervals=True)
+        compute_risk_summary(job_id, intervals=True)
+
+        def no_simulation(*args, **kwargs):
+            raise AssertionError("intervals are read from the scored files")
+
+        monkeypatch.setattr(uncertainty, "simulate_intervals", no_simulation)
+        monkeypatch.setattr(uncertainty, "damage_intervals", no_simulation)
+
+        intervals = load_report_inputs(job_id)["intervals"]
+        assert set(intervals) == {"total_cost", "overall_risk_score"}